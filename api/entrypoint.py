@@ -10,6 +10,8 @@ from supertokens_python.framework.fastapi import (
 
 from oss.src.utils.common import is_ee
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.http import close_http_session
+from oss.src.tasks.runtime import stop_worker_loop
 from oss.src.utils.helpers import warn_deprecated_env_vars, validate_required_env_vars
 
 from oss.src.open_api import open_api_tags_metadata
@@ -131,6 +133,13 @@ def on_celery_setup_logging(**kwargs):
     pass  # effectively no-op, preventing celery from reconfiguring logging
 
 
+@signals.worker_process_shutdown.connect
+@signals.worker_shutdown.connect
+def on_celery_worker_shutdown(**kwargs):
+    # tasks run on the worker loop, so do the sessions and pools they share
+    stop_worker_loop()
+
+
 @asynccontextmanager
 async def lifespan(*args, **kwargs):
     """
@@ -147,8 +156,14 @@ async def lifespan(*args, **kwargs):
     warn_deprecated_env_vars()
     validate_required_env_vars()
 
+    await observability.start_consumers()
+
     yield
 
+    await observability.stop_consumers()
+
+    await close_http_session()
+
 
 celery_app = Celery("agenta_app")
 
@@ -457,6 +472,12 @@ app.include_router(
     tags=["Evaluators"],
 )
 
+app.include_router(
+    router=tracing.admin_router,
+    prefix="/admin/tracing",
+    tags=["Tracing", "Admin"],
+)
+
 app.include_router(
     router=evaluations.admin_router,
     prefix="/admin/evaluations",
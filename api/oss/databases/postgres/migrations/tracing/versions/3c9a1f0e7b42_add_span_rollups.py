@@ -0,0 +1,75 @@
+"""add span rollups
+
+Revision ID: 3c9a1f0e7b42
+Revises: fd77265d65dc
+Create Date: 2025-10-20 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "3c9a1f0e7b42"
+down_revision: Union[str, None] = "fd77265d65dc"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # - SPAN ROLLUPS -----------------------------------------------------------
+    op.create_table(
+        "span_rollups",
+        sa.Column("project_id", sa.UUID(), nullable=False),
+        sa.Column("granularity", sa.INTEGER(), nullable=False),
+        sa.Column("timestamp", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("focus", sa.VARCHAR(), nullable=False),
+        sa.Column("count", sa.BIGINT(), nullable=False),
+        sa.Column("duration", sa.NUMERIC(), nullable=True),
+        sa.Column("costs", sa.NUMERIC(), nullable=True),
+        sa.Column("tokens", sa.NUMERIC(), nullable=True),
+        sa.Column("errors_count", sa.BIGINT(), nullable=False),
+        sa.Column("errors_duration", sa.NUMERIC(), nullable=True),
+        sa.Column("errors_costs", sa.NUMERIC(), nullable=True),
+        sa.Column("errors_tokens", sa.NUMERIC(), nullable=True),
+        sa.Column(
+            "metrics",
+            postgresql.JSONB(none_as_null=True, astext_type=sa.Text()),
+            nullable=True,
+        ),
+        sa.PrimaryKeyConstraint(
+            "project_id",
+            "granularity",
+            "focus",
+            "timestamp",
+        ),
+    )
+    op.create_index(
+        "ix_span_rollups_granularity_timestamp",
+        "span_rollups",
+        ["granularity", "timestamp"],
+        if_not_exists=True,
+    )
+    op.create_table(
+        "span_rollup_watermarks",
+        sa.Column("granularity", sa.INTEGER(), nullable=False),
+        sa.Column("oldest", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("newest", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("granularity"),
+    )
+    # --------------------------------------------------------------------------
+
+
+def downgrade() -> None:
+    # - SPAN ROLLUPS -----------------------------------------------------------
+    op.drop_table("span_rollup_watermarks")
+    op.drop_index(
+        "ix_span_rollups_granularity_timestamp",
+        table_name="span_rollups",
+        if_exists=True,
+    )
+    op.drop_table("span_rollups")
+    # --------------------------------------------------------------------------
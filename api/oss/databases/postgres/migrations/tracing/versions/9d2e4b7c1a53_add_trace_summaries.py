@@ -0,0 +1,95 @@
+"""add trace summaries
+
+Revision ID: 9d2e4b7c1a53
+Revises: 3c9a1f0e7b42
+Create Date: 2025-10-22 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "9d2e4b7c1a53"
+down_revision: Union[str, None] = "3c9a1f0e7b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # - TRACE SUMMARIES --------------------------------------------------------
+    op.create_table(
+        "trace_summaries",
+        sa.Column("project_id", sa.UUID(), nullable=False),
+        sa.Column("trace_id", sa.UUID(), nullable=False),
+        sa.Column("root_id", sa.UUID(), nullable=True),
+        sa.Column(
+            "trace_type",
+            postgresql.ENUM(name="tracetype", create_type=False),
+            nullable=True,
+        ),
+        sa.Column("span_name", sa.VARCHAR(), nullable=True),
+        sa.Column("start_time", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column("end_time", sa.TIMESTAMP(timezone=True), nullable=False),
+        sa.Column(
+            "status_code",
+            postgresql.ENUM(name="otelstatuscode", create_type=False),
+            nullable=True,
+        ),
+        sa.Column("span_count", sa.BIGINT(), nullable=False),
+        sa.Column("error_count", sa.BIGINT(), nullable=False),
+        sa.PrimaryKeyConstraint(
+            "project_id",
+            "trace_id",
+        ),
+    )
+    op.create_index(
+        "ix_trace_summaries_project_id_start_time_trace_id",
+        "trace_summaries",
+        ["project_id", sa.text("start_time DESC"), sa.text("trace_id DESC")],
+        if_not_exists=True,
+    )
+    op.execute(
+        """
+        INSERT INTO trace_summaries (
+            project_id,
+            trace_id,
+            root_id,
+            trace_type,
+            span_name,
+            start_time,
+            end_time,
+            status_code,
+            span_count,
+            error_count
+        )
+        SELECT
+            project_id,
+            trace_id,
+            (array_agg(span_id ORDER BY start_time) FILTER (WHERE parent_id IS NULL))[1],
+            (array_agg(trace_type ORDER BY start_time) FILTER (WHERE parent_id IS NULL))[1],
+            (array_agg(span_name ORDER BY start_time) FILTER (WHERE parent_id IS NULL))[1],
+            min(start_time),
+            max(end_time),
+            (array_agg(status_code ORDER BY start_time) FILTER (WHERE parent_id IS NULL))[1],
+            count(*),
+            count(*) FILTER (WHERE status_code = 'STATUS_CODE_ERROR')
+        FROM spans
+        GROUP BY project_id, trace_id
+        """
+    )
+    # --------------------------------------------------------------------------
+
+
+def downgrade() -> None:
+    # - TRACE SUMMARIES --------------------------------------------------------
+    op.drop_index(
+        "ix_trace_summaries_project_id_start_time_trace_id",
+        table_name="trace_summaries",
+        if_exists=True,
+    )
+    op.drop_table("trace_summaries")
+    # --------------------------------------------------------------------------
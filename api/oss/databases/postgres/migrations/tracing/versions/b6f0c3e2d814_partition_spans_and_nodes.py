@@ -0,0 +1,183 @@
+"""partition spans and nodes
+
+Revision ID: b6f0c3e2d814
+Revises: 9d2e4b7c1a53
+Create Date: 2025-10-24 10:00:00.000000
+
+"""
+
+from typing import List, Sequence, Union
+from datetime import datetime, timedelta, timezone
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "b6f0c3e2d814"
+down_revision: Union[str, None] = "9d2e4b7c1a53"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS_AHEAD = 7  # days, the refresh job takes over from there
+
+
+def _prepare(table: str, column: str, primary_key: List[str]) -> datetime:
+    # Runs outside of a transaction, before any lock is taken: the new primary
+    # key index is built and the cutover check is validated without blocking
+    # writes, so that the steps under ACCESS EXCLUSIVE locks do not scan rows.
+    # Rows past the cutover are rejected until the table is partitioned.
+    bind = op.get_bind()
+    legacy = f"{table}_legacy"
+
+    newest = bind.execute(sa.text(f"SELECT max({column}) FROM {table}")).scalar()
+    now = datetime.now(timezone.utc)
+    newest = max(newest, now) if newest else now
+    cutover = datetime(newest.year, newest.month, newest.day, tzinfo=timezone.utc)
+    cutover = cutover + timedelta(days=1)
+
+    # left over, possibly invalid, by an interrupted run
+    op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {legacy}_pkey")
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT IF EXISTS {legacy}_{column}_check")
+
+    # the partition key has to be part of the primary key
+    op.execute(
+        f"CREATE UNIQUE INDEX CONCURRENTLY {legacy}_pkey "
+        f"ON {table} ({', '.join(primary_key + [column])})"
+    )
+
+    # a valid check constraint spares the scan when attaching
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {legacy}_{column}_check "
+        f"CHECK ({column} < '{cutover.isoformat()}') NOT VALID"
+    )
+    op.execute(f"ALTER TABLE {table} VALIDATE CONSTRAINT {legacy}_{column}_check")
+
+    return cutover
+
+
+def _partition(
+    table: str, column: str, primary_key: List[str], cutover: datetime
+) -> None:
+    # The existing table becomes the partition of every row up to the cutover,
+    # keeping its rows and indexes, so that nothing has to be rewritten.
+    bind = op.get_bind()
+    legacy = f"{table}_legacy"
+
+    indexes = bind.execute(
+        sa.text(
+            "SELECT indexname, indexdef FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table "
+            "AND indexname NOT IN (:pkey, :legacy_pkey)"
+        ),
+        {"table": table, "pkey": f"{table}_pkey", "legacy_pkey": f"{legacy}_pkey"},
+    ).all()
+
+    op.execute(f"ALTER TABLE {table} RENAME TO {legacy}")
+
+    for name, _ in indexes:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name}_legacy")
+
+    # swaps in the index built by _prepare(), without a rebuild
+    op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {table}_pkey")
+    op.execute(
+        f"ALTER TABLE {legacy} ADD CONSTRAINT {legacy}_pkey "
+        f"PRIMARY KEY USING INDEX {legacy}_pkey"
+    )
+
+    op.execute(
+        f"CREATE TABLE {table} "
+        f"(LIKE {legacy} INCLUDING DEFAULTS INCLUDING CONSTRAINTS) "
+        f"PARTITION BY RANGE ({column})"
+    )
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {legacy}_{column}_check")
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey "
+        f"PRIMARY KEY ({', '.join(primary_key + [column])})"
+    )
+
+    op.execute(
+        f"ALTER TABLE {table} ATTACH PARTITION {legacy} "
+        f"FOR VALUES FROM (MINVALUE) TO ('{cutover.isoformat()}')"
+    )
+    op.execute(f"ALTER TABLE {legacy} DROP CONSTRAINT {legacy}_{column}_check")
+
+    # matching indexes of the legacy partition are attached, not rebuilt
+    for _, definition in indexes:
+        op.execute(definition)
+
+    for day in range(PARTITIONS_AHEAD):
+        start = cutover + timedelta(days=day)
+        end = start + timedelta(days=1)
+
+        op.execute(
+            f"CREATE TABLE {table}_p{start:%Y%m%d} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+        )
+
+    op.execute(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT")
+
+
+def _unpartition(table: str, column: str, primary_key: List[str]) -> None:
+    bind = op.get_bind()
+    legacy = f"{table}_legacy"
+
+    op.execute(f"ALTER TABLE {table} DETACH PARTITION {legacy}")
+    op.execute(f"INSERT INTO {legacy} SELECT * FROM {table}")
+    op.execute(f"DROP TABLE {table}")
+
+    op.execute(f"ALTER TABLE {legacy} RENAME TO {table}")
+
+    indexes = bind.execute(
+        sa.text(
+            "SELECT indexname FROM pg_indexes "
+            "WHERE schemaname = current_schema() AND tablename = :table "
+            "AND indexname LIKE '%\\_legacy'"
+        ),
+        {"table": table},
+    ).scalars()
+
+    for name in indexes:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name[: -len('_legacy')]}")
+
+    # rows of the same entity may now only differ by partition key
+    op.execute(
+        f"DELETE FROM {table} AS a USING {table} AS b WHERE "
+        + " AND ".join(f"a.{key} = b.{key}" for key in primary_key)
+        + " AND a.ctid < b.ctid"
+    )
+    op.execute(f"ALTER TABLE {table} DROP CONSTRAINT {legacy}_pkey")
+    op.execute(
+        f"ALTER TABLE {table} ADD CONSTRAINT {table}_pkey "
+        f"PRIMARY KEY ({', '.join(primary_key)})"
+    )
+
+
+def upgrade() -> None:
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction. The partitioning
+    # itself then holds ACCESS EXCLUSIVE locks on spans and nodes, briefly, as
+    # it only renames, swaps and attaches: run it when ingestion is quiet.
+    with op.get_context().autocommit_block():
+        spans_cutover = _prepare(
+            "spans", "start_time", ["project_id", "trace_id", "span_id"]
+        )
+        nodes_cutover = _prepare("nodes", "created_at", ["project_id", "node_id"])
+
+    # - SPANS ------------------------------------------------------------------
+    _partition(
+        "spans", "start_time", ["project_id", "trace_id", "span_id"], spans_cutover
+    )
+    # --------------------------------------------------------------------------
+
+    # - NODES ------------------------------------------------------------------
+    _partition("nodes", "created_at", ["project_id", "node_id"], nodes_cutover)
+    # --------------------------------------------------------------------------
+
+
+def downgrade() -> None:
+    # - NODES ------------------------------------------------------------------
+    _unpartition("nodes", "created_at", ["project_id", "node_id"])
+    # --------------------------------------------------------------------------
+
+    # - SPANS ------------------------------------------------------------------
+    _unpartition("spans", "start_time", ["project_id", "trace_id", "span_id"])
+    # --------------------------------------------------------------------------
@@ -0,0 +1,52 @@
+"""add spans analytics indexes
+
+Revision ID: e1a7c4d9b2f6
+Revises: b6f0c3e2d814
+Create Date: 2025-10-27 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "e1a7c4d9b2f6"
+down_revision: Union[str, None] = "b6f0c3e2d814"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # - SPANS ------------------------------------------------------------------
+    op.create_index(
+        "ix_spans_project_id_start_time_root",
+        "spans",
+        ["project_id", "start_time"],
+        postgresql_where=sa.text("parent_id IS NULL"),
+        if_not_exists=True,
+    )
+    op.create_index(
+        "ix_spans_start_time_brin",
+        "spans",
+        ["start_time"],
+        postgresql_using="brin",
+        if_not_exists=True,
+    )
+    # --------------------------------------------------------------------------
+
+
+def downgrade() -> None:
+    # - SPANS ------------------------------------------------------------------
+    op.drop_index(
+        "ix_spans_start_time_brin",
+        table_name="spans",
+        if_exists=True,
+    )
+    op.drop_index(
+        "ix_spans_project_id_start_time_root",
+        table_name="spans",
+        if_exists=True,
+    )
+    # --------------------------------------------------------------------------
@@ -0,0 +1,39 @@
+"""add spans created_at index
+
+Revision ID: f4c2a8e1d7b3
+Revises: e1a7c4d9b2f6
+Create Date: 2025-10-29 10:00:00.000000
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f4c2a8e1d7b3"
+down_revision: Union[str, None] = "e1a7c4d9b2f6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # - SPANS ------------------------------------------------------------------
+    op.create_index(
+        "ix_spans_created_at_brin",
+        "spans",
+        ["created_at"],
+        postgresql_using="brin",
+        if_not_exists=True,
+    )
+    # --------------------------------------------------------------------------
+
+
+def downgrade() -> None:
+    # - SPANS ------------------------------------------------------------------
+    op.drop_index(
+        "ix_spans_created_at_brin",
+        table_name="spans",
+        if_exists=True,
+    )
+    # --------------------------------------------------------------------------
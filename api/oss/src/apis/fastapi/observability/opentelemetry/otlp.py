@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Tuple
 from datetime import datetime
 import gzip
 import zlib
@@ -89,7 +89,7 @@ def _decode_value(any_value):
         return str(any_value)
 
 
-def _parse_attribute(attribute):
+def parse_attribute(attribute):
     """Parse an attribute key-value pair, properly handling all protobuf value types."""
     return (attribute.key, _decode_value(attribute.value))
 
@@ -100,7 +100,8 @@ def _parse_timestamp(timestamp_ns: int) -> str:
     return datetime.fromtimestamp(timestamp).isoformat(timespec="microseconds")
 
 
-def parse_otlp_stream(otlp_stream: bytes) -> List[OTelSpanDTO]:
+def parse_resource_spans(otlp_stream: bytes):
+    """Decompress and decode an OTLP stream into its resource spans."""
     try:
         otlp_stream = _decompress_data(otlp_stream)
     except (OSError, zlib.error) as e:
@@ -125,6 +126,82 @@ def parse_otlp_stream(otlp_stream: bytes) -> List[OTelSpanDTO]:
         legacy_msg.ParseFromString(otlp_stream)
         resource_spans_iterable = legacy_msg.resource_spans
 
+    return resource_spans_iterable
+
+
+def count_otlp_root_spans(otlp_stream: bytes) -> int:
+    return sum(
+        1
+        for resource_span in parse_resource_spans(otlp_stream)
+        for scope_span in resource_span.scope_spans
+        for span in scope_span.spans
+        if not span.parent_span_id
+    )
+
+
+def _is_sampled(trace_id: bytes, percent: int) -> bool:
+    # Same hash as the query-time sampling on spans.trace_id
+    return int(trace_id[:4].hex() or "0", 16) % 100 < percent
+
+
+def _is_error(span) -> bool:
+    return span.status.code == Trace_Proto.Status.STATUS_CODE_ERROR or any(
+        event.name == "exception" for event in span.events
+    )
+
+
+def sample_otlp_stream(otlp_stream: bytes, rate: float) -> Tuple[bytes, int, int]:
+    """
+    Drop the spans of unsampled traces, keeping whole traces and error traces.
+
+    Returns the (possibly re-serialized) stream, and the kept and dropped span counts.
+    """
+
+    percent = max(0, min(int(rate * 100.0), 100))
+
+    resource_spans_iterable = parse_resource_spans(otlp_stream)
+
+    spans = [
+        span
+        for resource_span in resource_spans_iterable
+        for scope_span in resource_span.scope_spans
+        for span in scope_span.spans
+    ]
+
+    if percent == 100:
+        return otlp_stream, len(spans), 0
+
+    trace_ids = {
+        span.trace_id
+        for span in spans
+        if _is_sampled(span.trace_id, percent) or _is_error(span)
+    }
+
+    kept = sum(1 for span in spans if span.trace_id in trace_ids)
+    dropped = len(spans) - kept
+
+    if dropped == 0:
+        return otlp_stream, kept, dropped
+
+    export_request = TraceService_Proto.ExportTraceServiceRequest()
+
+    for resource_span in resource_spans_iterable:
+        for scope_span in resource_span.scope_spans:
+            sampled_spans = [
+                span for span in scope_span.spans if span.trace_id in trace_ids
+            ]
+
+            del scope_span.spans[:]
+            scope_span.spans.extend(sampled_spans)
+
+        export_request.resource_spans.add().CopyFrom(resource_span)
+
+    return export_request.SerializeToString(), kept, dropped
+
+
+def parse_otlp_stream(otlp_stream: bytes) -> List[OTelSpanDTO]:
+    resource_spans_iterable = parse_resource_spans(otlp_stream)
+
     otel_span_dtos = []
 
     for resource_span in resource_spans_iterable:
@@ -172,7 +249,7 @@ def parse_otlp_stream(otlp_stream: bytes) -> List[OTelSpanDTO]:
                 s_attributes = {
                     k: v
                     for k, v in [
-                        _parse_attribute(attribute) for attribute in span.attributes
+                        parse_attribute(attribute) for attribute in span.attributes
                     ]
                 }
 
@@ -184,7 +261,7 @@ def parse_otlp_stream(otlp_stream: bytes) -> List[OTelSpanDTO]:
                         attributes={
                             k: v
                             for k, v in [
-                                _parse_attribute(attribute)
+                                parse_attribute(attribute)
                                 for attribute in event.attributes
                             ]
                         },
@@ -203,7 +280,7 @@ def parse_otlp_stream(otlp_stream: bytes) -> List[OTelSpanDTO]:
                         attributes={
                             k: v
                             for k, v in [
-                                _parse_attribute(attribute)
+                                parse_attribute(attribute)
                                 for attribute in link.attributes
                             ]
                         },
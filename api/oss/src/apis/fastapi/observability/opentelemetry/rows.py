@@ -0,0 +1,343 @@
+from typing import Any, Dict, List, Optional, OrderedDict
+from copy import copy
+from json import dumps, loads
+from math import isinf, isnan
+from datetime import datetime, timezone
+from uuid import UUID
+
+from oss.src.utils.logging import get_module_logger
+from oss.src.core.observability.dtos import (
+    NODE_ROW_COLUMNS,
+    NodeRow,
+    NodeType,
+    TreeType,
+    ExceptionDTO,
+    OTelSpanKind,
+    OTelStatusCode,
+)
+from oss.src.core.observability.utils import (
+    parse_ingest_attributes,
+    calculate_span_costs,
+    cumulate_costs,
+    cumulate_tokens,
+)
+from oss.src.apis.fastapi.observability.opentelemetry.otlp import (
+    SPAN_KINDS,
+    SPAN_STATUS_CODES,
+    parse_resource_spans,
+    parse_attribute,
+)
+from oss.src.apis.fastapi.observability.extractors.canonical_attributes import (
+    CanonicalAttributes,
+    EventData,
+    LinkData,
+)
+from oss.src.apis.fastapi.observability.extractors.adapter_registry import (
+    AdapterRegistry,
+)
+
+log = get_module_logger(__name__)
+
+NODE_TYPES = [
+    "agent",
+    "workflow",
+    "chain",
+    "task",
+    "tool",
+    "embedding",
+    "query",
+    "completion",
+    "chat",
+    "rerank",
+]
+
+adapter_registry = AdapterRegistry()
+
+
+class _NodeRecord:
+    """
+    A `nodes` row under construction.
+
+    Exposes `metrics` the same way `SpanDTO` does, so that the cost and token
+    accumulation helpers can run on records as they do on span DTOs.
+    """
+
+    __slots__ = NODE_ROW_COLUMNS
+
+    def __init__(self, **values: Any):
+        for column, value in values.items():
+            setattr(self, column, value)
+
+
+# HELPERS ----------------------------------------------------------------------
+
+
+def _parse_timestamp(timestamp_ns: int) -> datetime:
+    return datetime.fromtimestamp(timestamp_ns / 1_000_000_000)
+
+
+def _parse_attributes(attributes) -> Dict[str, Any]:
+    return dict(parse_attribute(attribute) for attribute in attributes)
+
+
+def _encode(value: Any) -> Any:
+    # Mirrors SpanDTO.encode()
+    if isinstance(value, dict):
+        return {k: _encode(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_encode(item) for item in value]
+    elif isinstance(value, UUID):
+        return str(value)
+    elif isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _jsonable(value: Any) -> Any:
+    # Mirrors the JSON serialization of OTel attributes in OTelExtraDTO
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items()}
+    elif isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    elif isinstance(value, float) and (isnan(value) or isinf(value)):
+        return None
+    elif isinstance(value, bytes):
+        return value.decode("utf-8")
+    return value
+
+
+def _build_record(span) -> Optional[_NodeRecord]:
+    # SPAN CONTEXT
+    trace_hex = span.trace_id.hex()
+    span_hex = span.span_id.hex()
+    parent_hex = span.parent_span_id.hex()
+
+    # SPAN KIND
+    kind = SPAN_KINDS[span.kind]
+
+    # SPAN TIME
+    start_time = _parse_timestamp(span.start_time_unix_nano)
+    end_time = _parse_timestamp(span.end_time_unix_nano)
+
+    # SPAN STATUS
+    status_code = SPAN_STATUS_CODES[span.status.code if span.status.code else 0]
+    status_message = span.status.message if span.status.message != "" else None
+
+    # SPAN ATTRIBUTES
+    attributes = _parse_attributes(span.attributes)
+
+    # SPAN EVENTS
+    events = [
+        (
+            event.name,
+            _parse_timestamp(event.time_unix_nano),
+            _parse_attributes(event.attributes),
+        )
+        for event in span.events
+    ]
+
+    # SPAN LINKS
+    links = [
+        (
+            "0x" + link.trace_id.hex(),
+            "0x" + link.span_id.hex(),
+            _parse_attributes(link.attributes),
+        )
+        for link in span.links
+    ]
+
+    # FEATURES
+    bag = CanonicalAttributes.model_construct(
+        span_name=span.name,
+        trace_id="0x" + trace_hex,
+        span_id="0x" + span_hex,
+        parent_span_id=("0x" + parent_hex) if parent_hex else None,
+        span_kind=OTelSpanKind(kind),
+        start_time=start_time,
+        end_time=end_time,
+        status_code=OTelStatusCode(status_code),
+        status_message=status_message,
+        span_attributes=copy(attributes),
+        resource_attributes={},
+        events=[
+            EventData.model_construct(
+                name=name,
+                timestamp=timestamp.replace(tzinfo=timezone.utc),
+                attributes=copy(event_attributes),
+            )
+            for name, timestamp, event_attributes in events
+        ],
+        links=[
+            LinkData.model_construct(
+                trace_id=trace_id,
+                span_id=span_id,
+                attributes=copy(link_attributes),
+            )
+            for trace_id, span_id, link_attributes in links
+        ],
+    )
+
+    features = adapter_registry.extract_features(bag)
+
+    # RECORD
+    try:
+        tree_id = UUID(trace_hex)
+        node_id = UUID(tree_id.hex[16:] + span_hex)
+        parent_id = UUID(trace_hex[16:] + parent_hex) if parent_hex else None
+
+        tree_type = features.type.get("tree")
+        tree_type = TreeType(tree_type) if tree_type is not None else None
+
+        node_type = features.type.get("node")
+        node_type = NodeType(node_type if node_type in NODE_TYPES else "task")
+
+        root_id = UUID(features.refs.get("scenario", {}).get("id", str(tree_id)))
+
+        status = {"code": status_code.replace("STATUS_CODE_", "")}
+        if status_message is not None:
+            status["message"] = status_message
+
+        exception = None
+        if features.exception:
+            exception = loads(
+                ExceptionDTO(
+                    timestamp=features.exception.get("timestamp"),
+                    type=features.exception.get("type"),
+                    message=features.exception.get("message"),
+                    stacktrace=features.exception.get("stacktrace"),
+                    attributes=features.exception.get("attributes"),
+                ).model_dump_json()
+            )
+
+        metrics = features.metrics
+        metrics["acc.duration.total"] = round(
+            (end_time - start_time).total_seconds() * 1_000, 3
+        )  # milliseconds
+
+        otel = {
+            "kind": kind,
+            "attributes": _jsonable(attributes),
+            "events": [
+                {
+                    "name": name,
+                    "timestamp": timestamp.isoformat(timespec="microseconds"),
+                    "attributes": _jsonable(event_attributes),
+                }
+                for name, timestamp, event_attributes in events
+            ]
+            or None,
+            "links": [
+                {
+                    "context": {"trace_id": trace_id, "span_id": span_id},
+                    "attributes": _jsonable(link_attributes),
+                }
+                for trace_id, span_id, link_attributes in links
+            ]
+            or None,
+        }
+
+        return _NodeRecord(
+            root_id=root_id,
+            tree_id=tree_id,
+            tree_type=tree_type,
+            node_id=node_id,
+            node_type=node_type,
+            node_name=span.name,
+            parent_id=parent_id,
+            time_start=start_time,
+            time_end=end_time,
+            status=status,
+            data=features.data,
+            metrics=metrics,
+            meta=features.meta,
+            refs=features.refs,
+            exception=exception,
+            links=None,
+            content=None,
+            otel=otel,
+        )
+
+    except Exception:  # pylint: disable=broad-exception-caught
+        log.error(
+            "Failed to build node row for span_id %s (trace_id %s). SpanFeatures: %s",
+            span_hex,
+            trace_hex,
+            features,
+            exc_info=True,
+        )
+
+        return None
+
+
+def _build_tree(records_idx: Dict[UUID, _NodeRecord]) -> OrderedDict:
+    # Mirrors parse_span_idx_to_span_id_tree()
+    tree = OrderedDict()
+    index = {}
+
+    for record in sorted(records_idx.values(), key=lambda record: record.time_start):
+        if record.parent_id is None:
+            tree[record.node_id] = OrderedDict()
+            index[record.node_id] = tree[record.node_id]
+        elif record.parent_id in index:
+            index[record.parent_id][record.node_id] = OrderedDict()
+            index[record.node_id] = index[record.parent_id][record.node_id]
+
+    return tree
+
+
+def _to_row(record: _NodeRecord) -> NodeRow:
+    # Mirrors map_span_dto_to_span_dbe()
+    record.content = dumps(record.data)
+
+    record.data = _encode(record.data)
+    record.metrics = _encode(record.metrics)
+    record.meta = _encode(record.meta)
+    record.refs = _encode(record.refs)
+
+    return tuple(getattr(record, column) for column in NODE_ROW_COLUMNS)
+
+
+# INTERFACE --------------------------------------------------------------------
+
+
+def parse_otlp_stream_to_node_rows(otlp_stream: bytes) -> List[NodeRow]:
+    """
+    Parse an OTLP stream into insert-ready `nodes` rows, in a single pass.
+
+    Equivalent to `parse_otlp_stream`, `parse_from_otel_span_dto`,
+    `ObservabilityService.ingest` and `map_span_dto_to_span_dbe` combined, but
+    without building the intermediate pydantic models. Columns are ordered as
+    in `NODE_ROW_COLUMNS`.
+
+    Only `nodes` rows are covered. `spans` rows depend on the pydantic
+    validation of the `ag.*` attributes in `parse_from_otel_span_dto`, so
+    streams that must also be written as spans (`create-spans-from-nodes`)
+    are ingested by the full pipeline instead.
+    """
+
+    records_idx: Dict[UUID, _NodeRecord] = {}
+
+    for resource_span in parse_resource_spans(otlp_stream):
+        for scope_span in resource_span.scope_spans:
+            for span in scope_span.spans:
+                record = _build_record(span)
+
+                if record is None:
+                    continue
+
+                parse_ingest_attributes("meta", record.meta)
+                parse_ingest_attributes("metrics", record.metrics)
+                parse_ingest_attributes("refs", record.refs)
+
+                records_idx[record.node_id] = record
+
+    records_tree = _build_tree(records_idx)
+
+    for record in records_idx.values():
+        calculate_span_costs(record.node_type.name, record.meta, record.metrics)
+
+    cumulate_costs(records_tree, records_idx)
+
+    cumulate_tokens(records_tree, records_idx)
+
+    return [_to_row(record) for record in records_idx.values()]
@@ -1,4 +1,4 @@
-from typing import Dict, List, Union, Literal, Optional
+from typing import Dict, List, Union, Literal, Optional, Tuple
 from uuid import UUID
 
 from fastapi import APIRouter, Request, Depends, Query, status, HTTPException
@@ -21,6 +21,7 @@ from oss.src.core.observability.dtos import (
     FilteringDTO,
     ConditionDTO,
     Focus,
+    NODE_ROW_COLUMNS,
 )
 
 from oss.src.core.tracing.dtos import OTelFlatSpan
@@ -30,6 +31,24 @@ from oss.src.core.observability.utils import FilteringException
 
 from oss.src.apis.fastapi.observability.opentelemetry.otlp import (
     parse_otlp_stream,
+    count_otlp_root_spans,
+    sample_otlp_stream,
+)
+from oss.src.apis.fastapi.observability.opentelemetry.rows import (
+    parse_otlp_stream_to_node_rows,
+)
+from oss.src.apis.fastapi.observability.utils.queueing import (
+    OTLPBatchRejected,
+    enqueue_otlp_batch,
+    get_otlp_queue_depth,
+    start_otlp_consumers,
+    stop_otlp_consumers,
+)
+from oss.src.apis.fastapi.observability.utils.throttling import (
+    get_otlp_sampling_rate,
+    get_otlp_rate_limit,
+    consume_otlp_tokens,
+    record_dropped_spans,
 )
 from oss.src.apis.fastapi.observability.utils.processing import (
     parse_query_from_params_request,
@@ -68,6 +87,9 @@ from oss.src.utils.env import env
 
 MAX_OTLP_BATCH_SIZE = env.AGENTA_OTLP_MAX_BATCH_BYTES
 MAX_OTLP_BATCH_SIZE_MB = MAX_OTLP_BATCH_SIZE // (1024 * 1024)
+MAX_OTLP_QUEUE_DEPTH = env.AGENTA_OTLP_QUEUE_MAX_DEPTH
+OTLP_QUEUE_RETRY_AFTER = env.AGENTA_OTLP_QUEUE_RETRY_AFTER
+OTLP_FAST_PATH_ENABLED = env.AGENTA_OTLP_FAST_PATH_ENABLED  # nodes rows only
 
 
 log = get_module_logger(__name__)
@@ -94,6 +116,8 @@ class ObservabilityRouter:
         self.service = observability_service
         self.tracing = tracing_service
 
+        self.consumers = []
+
         self.router = APIRouter()
 
         self.otlp = APIRouter()
@@ -192,6 +216,26 @@ class ObservabilityRouter:
             response_model=CollectStatusResponse,
         )
 
+    ### LIFECYCLE
+
+    async def start_consumers(self):
+        """
+        Start the OTLP ingestion consumers, if queueing is enabled.
+        """
+
+        if env.AGENTA_OTLP_QUEUE_ENABLED and not self.consumers:
+            self.consumers = start_otlp_consumers(self._consume_otlp_batch)
+
+    async def stop_consumers(self):
+        """
+        Stop the OTLP ingestion consumers, if any.
+        """
+
+        if self.consumers:
+            await stop_otlp_consumers(self.consumers)
+
+            self.consumers = []
+
     ### OTLP
 
     @intercept_exceptions()
@@ -216,7 +260,7 @@ class ObservabilityRouter:
             # ---------------------------------------------------------------- #
             otlp_stream = await request.body()
             # ---------------------------------------------------------------- #
-        except Exception as e:
+        except Exception:
             log.error(
                 "Failed to process OTLP stream from project %s with error:",
                 request.state.project_id,
@@ -247,54 +291,275 @@ class ObservabilityRouter:
                 status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
             )
 
-        otel_spans = None
+        otlp_stream, response = await self._throttle_otlp_stream(
+            project_id=request.state.project_id,
+            otlp_stream=otlp_stream,
+        )
+
+        if response is not None:
+            return response
+
+        if env.AGENTA_OTLP_QUEUE_ENABLED:
+            return await self._enqueue_otlp_stream(
+                request=request,
+                otlp_stream=otlp_stream,
+            )
+
+        return await self._ingest_otlp_stream(
+            project_id=request.state.project_id,
+            user_id=request.state.user_id,
+            organization_id=getattr(request.state, "organization_id", None),
+            otlp_stream=otlp_stream,
+        )
+
+    async def _throttle_otlp_stream(
+        self,
+        *,
+        project_id: str,
+        otlp_stream: bytes,
+    ) -> Tuple[bytes, Optional[Response]]:
+        """
+        Sample the traces and apply the rate limit of the project, if any.
+        """
+
+        sampling_rate = get_otlp_sampling_rate(project_id)
+        rate_limit = get_otlp_rate_limit(project_id)
+
+        if sampling_rate >= 1.0 and rate_limit <= 0:
+            return otlp_stream, None
+
         try:
             # ---------------------------------------------------------------- #
-            otel_spans = parse_otlp_stream(otlp_stream)
+            otlp_stream, kept, dropped = sample_otlp_stream(
+                otlp_stream,
+                sampling_rate,
+            )
             # ---------------------------------------------------------------- #
-        except Exception as e:
-            log.error(
-                "Failed to parse OTLP stream from project %s with error:",
+        except Exception:
+            log.warn(
+                "Failed to sample OTLP stream from project %s with error:",
+                project_id,
+                exc_info=True,
+            )
+
+            # Parsing errors are reported by the ingestion itself.
+            return otlp_stream, None
+
+        if dropped:
+            record_dropped_spans(
+                project_id=project_id,
+                reason="sampling",
+                spans=dropped,
+            )
+
+        if rate_limit > 0 and kept > 0:
+            allowed, retry_after = await consume_otlp_tokens(
+                project_id=project_id,
+                rate_limit=rate_limit,
+                spans=kept,
+            )
+
+            if not allowed:
+                record_dropped_spans(
+                    project_id=project_id,
+                    reason="rate_limit",
+                    spans=kept,
+                )
+                err_status = ProtoStatus(
+                    message="OTLP rate limit exceeded. Please retry later."
+                )
+                return otlp_stream, Response(
+                    content=err_status.SerializeToString(),
+                    media_type="application/x-protobuf",
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    headers={"Retry-After": str(retry_after)},
+                )
+
+        if kept == 0:
+            export_response = ExportTraceServiceResponse()  # empty == full success
+
+            return otlp_stream, Response(
+                content=export_response.SerializeToString(),
+                media_type="application/x-protobuf",
+                status_code=status.HTTP_200_OK,
+            )
+
+        return otlp_stream, None
+
+    async def _enqueue_otlp_stream(
+        self,
+        *,
+        request: Request,
+        otlp_stream: bytes,
+    ):
+        """
+        Check and enqueue the raw OTLP stream, to be ingested by the consumers.
+        """
+
+        try:
+            # ---------------------------------------------------------------- #
+            depth = await get_otlp_queue_depth()
+            # ---------------------------------------------------------------- #
+        except Exception:
+            log.warn(
+                "Failed to check OTLP queue from project %s with error:",
                 request.state.project_id,
                 exc_info=True,
             )
+
+            depth = None
+
+        if depth is not None and depth >= MAX_OTLP_QUEUE_DEPTH:
+            log.warn(
+                "OTLP queue is full (%s batches >= %s batches) for project %s",
+                depth,
+                MAX_OTLP_QUEUE_DEPTH,
+                request.state.project_id,
+            )
+            err_status = ProtoStatus(
+                message="OTLP ingestion queue is full. Please retry later."
+            )
+            return Response(
+                content=err_status.SerializeToString(),
+                media_type="application/x-protobuf",
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(OTLP_QUEUE_RETRY_AFTER)},
+            )
+
+        # Malformed streams are rejected here, consumers could only drop them.
+        try:
+            # ---------------------------------------------------------------- #
+            delta = count_otlp_root_spans(otlp_stream)
+            # ---------------------------------------------------------------- #
+        except Exception:
             log.error(
-                "OTLP stream: %s",
-                otlp_stream,
+                "Failed to parse OTLP stream from project %s with error:",
+                request.state.project_id,
+                exc_info=True,
             )
             err_status = ProtoStatus(message="Failed to parse OTLP stream.")
             return Response(
                 content=err_status.SerializeToString(),
                 media_type="application/x-protobuf",
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=status.HTTP_400_BAD_REQUEST,
             )
 
         # -------------------------------------------------------------------- #
-        feature_flag = "create-spans-from-nodes"
+        if is_ee():
+            response = await self._check_otlp_entitlements(
+                organization_id=request.state.organization_id,
+                delta=delta,
+            )
 
-        cache_key = {
-            "feature_flag": feature_flag,
-        }
+            if response is not None:
+                return response
+        # -------------------------------------------------------------------- #
 
-        flag_create_spans_from_nodes = await get_cache(
-            namespace="posthog:flags",
-            key=cache_key,
-            retry=False,
+        try:
+            # ---------------------------------------------------------------- #
+            await enqueue_otlp_batch(
+                project_id=request.state.project_id,
+                user_id=request.state.user_id,
+                organization_id=getattr(request.state, "organization_id", None),
+                otlp_stream=otlp_stream,
+            )
+            # ---------------------------------------------------------------- #
+        except Exception:
+            log.warn(
+                "Failed to enqueue OTLP stream from project %s, ingesting inline:",
+                request.state.project_id,
+                exc_info=True,
+            )
+
+            return await self._ingest_otlp_stream(
+                project_id=request.state.project_id,
+                user_id=request.state.user_id,
+                organization_id=getattr(request.state, "organization_id", None),
+                otlp_stream=otlp_stream,
+                #
+                entitled=True,
+            )
+
+        export_response = ExportTraceServiceResponse()  # empty == full success
+
+        return Response(
+            content=export_response.SerializeToString(),
+            media_type="application/x-protobuf",
+            status_code=status.HTTP_200_OK,
         )
 
-        if flag_create_spans_from_nodes is None:
-            if env.POSTHOG_API_KEY:
-                flag_create_spans_from_nodes = posthog.feature_enabled(
-                    feature_flag,
-                    "user distinct id",
-                )
+    async def _consume_otlp_batch(
+        self,
+        *,
+        project_id: str,
+        user_id: str,
+        organization_id: Optional[str] = None,
+        otlp_stream: bytes,
+    ) -> bool:
+        """
+        Ingest an OTLP stream dequeued by a consumer (entitlements already checked).
+        """
 
-                await set_cache(
-                    namespace="posthog:flags",
-                    key=cache_key,
-                    value=flag_create_spans_from_nodes,
-                )
-        # -------------------------------------------------------------------- #
+        response = await self._ingest_otlp_stream(
+            project_id=project_id,
+            user_id=user_id,
+            organization_id=organization_id,
+            otlp_stream=otlp_stream,
+            #
+            entitled=True,
+        )
+
+        if response.status_code == status.HTTP_400_BAD_REQUEST:
+            raise OTLPBatchRejected("Failed to parse OTLP stream.")
+
+        return response.status_code == status.HTTP_200_OK
+
+    async def _ingest_otlp_stream(
+        self,
+        *,
+        project_id: str,
+        user_id: str,
+        organization_id: Optional[str] = None,
+        otlp_stream: bytes,
+        #
+        entitled: bool = False,
+    ):
+        """
+        Parse, normalize, and store the spans of an OTLP stream.
+        """
+
+        flag_create_spans_from_nodes = await self._get_flag_create_spans_from_nodes()
+
+        # The fast path only writes nodes, spans still need the full pipeline.
+        if OTLP_FAST_PATH_ENABLED and not flag_create_spans_from_nodes:
+            return await self._ingest_otlp_rows(
+                project_id=project_id,
+                organization_id=organization_id,
+                otlp_stream=otlp_stream,
+                entitled=entitled,
+            )
+
+        otel_spans = None
+        try:
+            # ---------------------------------------------------------------- #
+            otel_spans = parse_otlp_stream(otlp_stream)
+            # ---------------------------------------------------------------- #
+        except Exception:
+            log.error(
+                "Failed to parse OTLP stream from project %s with error:",
+                project_id,
+                exc_info=True,
+            )
+            log.error(
+                "OTLP stream: %s",
+                otlp_stream,
+            )
+            err_status = ProtoStatus(message="Failed to parse OTLP stream.")
+            return Response(
+                content=err_status.SerializeToString(),
+                media_type="application/x-protobuf",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
 
         # for otel_span in otel_spans:
         #     log.debug(
@@ -329,7 +594,7 @@ class ObservabilityRouter:
         except Exception as e:
             log.error(
                 "Failed to parse spans from project %s with error:",
-                request.state.project_id,
+                project_id,
                 exc_info=True,
             )
             for otel_span in otel_spans:
@@ -348,35 +613,27 @@ class ObservabilityRouter:
         # -------------------------------------------------------------------- #
         delta = sum([1 for span_dto in span_dtos if span_dto.parent is None])
 
-        if is_ee():
-            check, _, _ = await check_entitlements(
-                organization_id=request.state.organization_id,
-                key=Counter.TRACES,
+        if is_ee() and not entitled:
+            response = await self._check_otlp_entitlements(
+                organization_id=organization_id,
                 delta=delta,
             )
 
-            if not check:
-                err_status = ProtoStatus(
-                    message="You have reached your quota limit. Please upgrade your plan to continue."
-                )
-                return Response(
-                    content=err_status.SerializeToString(),
-                    media_type="application/x-protobuf",
-                    status_code=status.HTTP_403_FORBIDDEN,
-                )
+            if response is not None:
+                return response
         # -------------------------------------------------------------------- #
 
         try:
             # ---------------------------------------------------------------- #
             await self.service.ingest(
-                project_id=UUID(request.state.project_id),
+                project_id=UUID(project_id),
                 span_dtos=span_dtos,
             )
             # ---------------------------------------------------------------- #
         except Exception as e:
             log.error(
                 "Failed to ingest spans from project %s with error:",
-                request.state.project_id,
+                project_id,
                 exc_info=True,
             )
             for span_dto in span_dtos:
@@ -396,15 +653,15 @@ class ObservabilityRouter:
             # ---------------------------------------------------------------- #
             if flag_create_spans_from_nodes:
                 await self.tracing.create(
-                    project_id=UUID(request.state.project_id),
-                    user_id=UUID(request.state.user_id),
+                    project_id=UUID(project_id),
+                    user_id=UUID(user_id),
                     span_dtos=tracing_spans,
                 )
             # ---------------------------------------------------------------- #
         except Exception as e:
             log.warn(
                 "Failed to create spans from project %s with error:",
-                request.state.project_id,
+                project_id,
                 exc_info=True,
             )
             for span in tracing_spans:
@@ -430,6 +687,132 @@ class ObservabilityRouter:
             status_code=status.HTTP_200_OK,
         )
 
+    async def _ingest_otlp_rows(
+        self,
+        *,
+        project_id: str,
+        organization_id: Optional[str] = None,
+        otlp_stream: bytes,
+        #
+        entitled: bool = False,
+    ):
+        """
+        Parse and store the spans of an OTLP stream as nodes rows, in a single pass.
+        """
+
+        node_rows = None
+        try:
+            # ---------------------------------------------------------------- #
+            node_rows = parse_otlp_stream_to_node_rows(otlp_stream)
+            # ---------------------------------------------------------------- #
+        except Exception:
+            log.error(
+                "Failed to parse OTLP stream from project %s with error:",
+                project_id,
+                exc_info=True,
+            )
+            err_status = ProtoStatus(message="Failed to parse OTLP stream.")
+            return Response(
+                content=err_status.SerializeToString(),
+                media_type="application/x-protobuf",
+                status_code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # -------------------------------------------------------------------- #
+        parent_id_idx = NODE_ROW_COLUMNS.index("parent_id")
+
+        delta = sum([1 for node_row in node_rows if node_row[parent_id_idx] is None])
+
+        if is_ee() and not entitled:
+            response = await self._check_otlp_entitlements(
+                organization_id=organization_id,
+                delta=delta,
+            )
+
+            if response is not None:
+                return response
+        # -------------------------------------------------------------------- #
+
+        try:
+            # ---------------------------------------------------------------- #
+            await self.service.ingest_rows(
+                project_id=UUID(project_id),
+                node_rows=node_rows,
+            )
+            # ---------------------------------------------------------------- #
+        except Exception as e:
+            log.error(
+                "Failed to ingest spans from project %s with error:",
+                project_id,
+                exc_info=True,
+            )
+            err_status = ProtoStatus(message="Failed to ingest spans.")
+            return Response(
+                content=err_status.SerializeToString(),
+                media_type="application/x-protobuf",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        export_response = ExportTraceServiceResponse()  # empty == full success
+
+        return Response(
+            content=export_response.SerializeToString(),
+            media_type="application/x-protobuf",
+            status_code=status.HTTP_200_OK,
+        )
+
+    async def _get_flag_create_spans_from_nodes(self) -> Optional[bool]:
+        feature_flag = "create-spans-from-nodes"
+
+        cache_key = {
+            "feature_flag": feature_flag,
+        }
+
+        flag_create_spans_from_nodes = await get_cache(
+            namespace="posthog:flags",
+            key=cache_key,
+            retry=False,
+        )
+
+        if flag_create_spans_from_nodes is None:
+            if env.POSTHOG_API_KEY:
+                flag_create_spans_from_nodes = posthog.feature_enabled(
+                    feature_flag,
+                    "user distinct id",
+                )
+
+                await set_cache(
+                    namespace="posthog:flags",
+                    key=cache_key,
+                    value=flag_create_spans_from_nodes,
+                )
+
+        return flag_create_spans_from_nodes
+
+    async def _check_otlp_entitlements(
+        self,
+        *,
+        organization_id: Optional[str],
+        delta: int,
+    ) -> Optional[Response]:
+        check, _, _ = await check_entitlements(
+            organization_id=organization_id,
+            key=Counter.TRACES,
+            delta=delta,
+        )
+
+        if not check:
+            err_status = ProtoStatus(
+                message="You have reached your quota limit. Please upgrade your plan to continue."
+            )
+            return Response(
+                content=err_status.SerializeToString(),
+                media_type="application/x-protobuf",
+                status_code=status.HTTP_403_FORBIDDEN,
+            )
+
+        return None
+
     ### QUERIES
 
     @intercept_exceptions()
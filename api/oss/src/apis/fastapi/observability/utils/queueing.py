@@ -0,0 +1,227 @@
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from asyncio import CancelledError, Task, create_task, gather, sleep
+from socket import gethostname
+from os import getpid
+
+from redis.asyncio import Redis
+
+from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+
+log = get_module_logger(__name__)
+
+AGENTA_OTLP_QUEUE_STREAM = "otlp:v1:traces"
+AGENTA_OTLP_QUEUE_GROUP = "otlp:v1:ingestion"
+AGENTA_OTLP_QUEUE_BLOCK = 5_000  # milliseconds to block on empty stream
+AGENTA_OTLP_QUEUE_READ_COUNT = 16  # messages per read
+AGENTA_OTLP_QUEUE_IDLE_TIME = 60_000  # milliseconds before reclaiming
+AGENTA_OTLP_QUEUE_ATTEMPTS_MAX = 3  # deliveries before dropping a batch
+AGENTA_OTLP_QUEUE_ERROR_DELAY = 1  # seconds to wait after a consumer error
+
+OTLPBatchHandler = Callable[..., Awaitable[bool]]
+
+
+class OTLPBatchRejected(Exception):
+    """Raised by handlers for batches that would fail again if retried."""
+
+
+_r: Optional[Redis] = None
+
+
+# HELPERS ----------------------------------------------------------------------
+
+
+def _redis() -> Redis:
+    global _r  # pylint: disable=global-statement
+
+    if _r is None:
+        _r = Redis.from_url(
+            url=env.REDIS_URL,
+            decode_responses=False,
+        )
+
+    return _r
+
+
+def _decode(fields: Dict[bytes, bytes]) -> Dict[str, Any]:
+    return {
+        "project_id": fields[b"project_id"].decode(),
+        "user_id": fields[b"user_id"].decode(),
+        "organization_id": fields.get(b"organization_id", b"").decode() or None,
+        "attempts": int(fields.get(b"attempts", b"0")),
+        "otlp_stream": fields[b"otlp_stream"],
+    }
+
+
+async def _ensure_group() -> None:
+    try:
+        await _redis().xgroup_create(
+            name=AGENTA_OTLP_QUEUE_STREAM,
+            groupname=AGENTA_OTLP_QUEUE_GROUP,
+            id="0",
+            mkstream=True,
+        )
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+async def _read(consumer: str) -> List[Tuple[bytes, Dict[bytes, bytes]]]:
+    # Batches left pending by consumers that died mid-ingestion come first.
+    claimed = await _redis().xautoclaim(
+        name=AGENTA_OTLP_QUEUE_STREAM,
+        groupname=AGENTA_OTLP_QUEUE_GROUP,
+        consumername=consumer,
+        min_idle_time=AGENTA_OTLP_QUEUE_IDLE_TIME,
+        start_id="0-0",
+        count=AGENTA_OTLP_QUEUE_READ_COUNT,
+    )
+
+    entries = [entry for entry in (claimed[1] if claimed else []) if entry[1]]
+
+    if entries:
+        return entries
+
+    response = await _redis().xreadgroup(
+        groupname=AGENTA_OTLP_QUEUE_GROUP,
+        consumername=consumer,
+        streams={AGENTA_OTLP_QUEUE_STREAM: ">"},
+        count=AGENTA_OTLP_QUEUE_READ_COUNT,
+        block=AGENTA_OTLP_QUEUE_BLOCK,
+    )
+
+    return response[0][1] if response else []
+
+
+async def _settle(message_id: bytes) -> None:
+    # Acknowledged entries are deleted so that XLEN reflects the backlog.
+    async with _redis().pipeline(transaction=True) as pipe:
+        pipe.xack(AGENTA_OTLP_QUEUE_STREAM, AGENTA_OTLP_QUEUE_GROUP, message_id)
+        pipe.xdel(AGENTA_OTLP_QUEUE_STREAM, message_id)
+
+        await pipe.execute()
+
+
+async def _handle(
+    message_id: bytes,
+    fields: Dict[bytes, bytes],
+    handler: OTLPBatchHandler,
+) -> None:
+    batch = _decode(fields)
+    attempts = batch.pop("attempts") + 1
+
+    success = False
+
+    try:
+        success = await handler(**batch)
+
+    except OTLPBatchRejected:
+        log.error(
+            "[OTLP] [queue] Dropping batch from project %s, rejected with error:",
+            batch["project_id"],
+            exc_info=True,
+        )
+
+        await _settle(message_id)
+
+        return
+
+    except Exception:  # pylint: disable=broad-exception-caught
+        log.error(
+            "[OTLP] [queue] Failed to ingest batch from project %s with error:",
+            batch["project_id"],
+            exc_info=True,
+        )
+
+    if not success:
+        if attempts < AGENTA_OTLP_QUEUE_ATTEMPTS_MAX:
+            await enqueue_otlp_batch(**batch, attempts=attempts)
+
+        else:
+            log.error(
+                "[OTLP] [queue] Dropping batch from project %s after %s attempts",
+                batch["project_id"],
+                attempts,
+            )
+
+    await _settle(message_id)
+
+
+async def _consume(
+    consumer: str,
+    handler: OTLPBatchHandler,
+) -> None:
+    await _ensure_group()
+
+    while True:
+        try:
+            entries = await _read(consumer)
+
+            for message_id, fields in entries:
+                await _handle(message_id, fields, handler)
+
+        except CancelledError:
+            raise
+
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.error(
+                "[OTLP] [queue] Consumer %s failed with error:",
+                consumer,
+                exc_info=True,
+            )
+
+            await sleep(AGENTA_OTLP_QUEUE_ERROR_DELAY)
+
+
+# INTERFACE --------------------------------------------------------------------
+
+
+async def enqueue_otlp_batch(
+    *,
+    project_id: str,
+    user_id: str,
+    organization_id: Optional[str] = None,
+    otlp_stream: bytes,
+    attempts: int = 0,
+) -> None:
+    await _redis().xadd(
+        name=AGENTA_OTLP_QUEUE_STREAM,
+        fields={
+            "project_id": project_id,
+            "user_id": user_id,
+            "organization_id": organization_id or "",
+            "attempts": attempts,
+            "otlp_stream": otlp_stream,
+        },
+    )
+
+
+async def get_otlp_queue_depth() -> int:
+    return await _redis().xlen(AGENTA_OTLP_QUEUE_STREAM)
+
+
+def start_otlp_consumers(
+    handler: OTLPBatchHandler,
+    concurrency: int = env.AGENTA_OTLP_QUEUE_CONSUMERS,
+) -> List[Task]:
+    prefix = f"{gethostname()}-{getpid()}"
+
+    log.info(
+        "[OTLP] [queue] Starting consumers",
+        consumers=concurrency,
+        prefix=prefix,
+    )
+
+    return [
+        create_task(_consume(f"{prefix}-{idx}", handler)) for idx in range(concurrency)
+    ]
+
+
+async def stop_otlp_consumers(
+    consumers: List[Task],
+) -> None:
+    for consumer in consumers:
+        consumer.cancel()
+
+    await gather(*consumers, return_exceptions=True)
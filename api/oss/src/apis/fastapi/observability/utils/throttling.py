@@ -0,0 +1,141 @@
+from typing import Optional, Tuple
+from json import loads
+from math import ceil
+
+import newrelic.agent
+from redis.asyncio import Redis
+
+from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+
+log = get_module_logger(__name__)
+
+AGENTA_OTLP_SAMPLING_RATE = env.AGENTA_OTLP_SAMPLING_RATE
+AGENTA_OTLP_SAMPLING_RATES = loads(env.AGENTA_OTLP_SAMPLING_RATES)
+AGENTA_OTLP_RATE_LIMIT = env.AGENTA_OTLP_RATE_LIMIT
+AGENTA_OTLP_RATE_LIMITS = loads(env.AGENTA_OTLP_RATE_LIMITS)
+AGENTA_OTLP_RATE_BURST = env.AGENTA_OTLP_RATE_BURST
+AGENTA_OTLP_RATE_BURST_SECONDS = 10  # default burst, in seconds of rate limit
+AGENTA_OTLP_RATE_KEY = "otlp:v1:buckets"
+
+# KEYS[1]: bucket -- ARGV[1]: rate (tokens/s), ARGV[2]: capacity, ARGV[3]: cost
+# Returns the number of seconds to wait, 0 when the tokens were consumed.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), capacity)
+
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'timestamp')
+local tokens = tonumber(bucket[1]) or capacity
+local timestamp = tonumber(bucket[2]) or now
+
+tokens = math.min(capacity, tokens + math.max(0, now - timestamp) * rate)
+
+local wait = 0
+
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'timestamp', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+
+return tostring(wait)
+"""
+
+_r: Optional[Redis] = None
+_token_bucket = None
+
+
+# HELPERS ----------------------------------------------------------------------
+
+
+def _redis() -> Redis:
+    global _r  # pylint: disable=global-statement
+
+    if _r is None:
+        _r = Redis.from_url(
+            url=env.REDIS_URL,
+            decode_responses=True,
+        )
+
+    return _r
+
+
+def _script():
+    global _token_bucket  # pylint: disable=global-statement
+
+    if _token_bucket is None:
+        _token_bucket = _redis().register_script(TOKEN_BUCKET_SCRIPT)
+
+    return _token_bucket
+
+
+# INTERFACE --------------------------------------------------------------------
+
+
+def get_otlp_sampling_rate(project_id: str) -> float:
+    return float(AGENTA_OTLP_SAMPLING_RATES.get(project_id, AGENTA_OTLP_SAMPLING_RATE))
+
+
+def get_otlp_rate_limit(project_id: str) -> int:
+    return int(AGENTA_OTLP_RATE_LIMITS.get(project_id, AGENTA_OTLP_RATE_LIMIT))
+
+
+async def consume_otlp_tokens(
+    *,
+    project_id: str,
+    rate_limit: int,
+    spans: int,
+) -> Tuple[bool, int]:
+    """
+    Take `spans` tokens from the bucket of the project.
+
+    Returns whether the spans are allowed and, if not, the seconds to wait.
+    Fails open when the bucket cannot be reached.
+    """
+
+    capacity = AGENTA_OTLP_RATE_BURST or rate_limit * AGENTA_OTLP_RATE_BURST_SECONDS
+
+    try:
+        wait = float(
+            await _script()(
+                keys=[f"{AGENTA_OTLP_RATE_KEY}:{project_id}"],
+                args=[rate_limit, capacity, spans],
+            )
+        )
+
+    except Exception:  # pylint: disable=broad-exception-caught
+        log.warn(
+            "[OTLP] [limits] Failed to check rate limit for project %s with error:",
+            project_id,
+            exc_info=True,
+        )
+
+        return True, 0
+
+    if wait > 0:
+        return False, max(1, ceil(wait))
+
+    return True, 0
+
+
+def record_dropped_spans(
+    *,
+    project_id: str,
+    reason: str,
+    spans: int,
+) -> None:
+    newrelic.agent.record_custom_metric(f"Custom/OTLP/DroppedSpans/{reason}", spans)
+
+    log.info(
+        "[OTLP] [limits] Dropped spans",
+        project_id=project_id,
+        reason=reason,
+        spans=spans,
+    )
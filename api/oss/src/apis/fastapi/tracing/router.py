@@ -1,10 +1,13 @@
-from typing import Optional, List, Tuple, Dict, Union
+from typing import AsyncIterator, Literal, Optional, List, Tuple, Dict, Union
 from uuid import UUID
+from datetime import datetime
 
-from fastapi import APIRouter, Request, Depends, status, HTTPException
+from fastapi import APIRouter, Request, Depends, Query, status, HTTPException
+from fastapi.responses import StreamingResponse
 
 from oss.src.utils.common import is_ee
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
 from oss.src.utils.exceptions import intercept_exceptions, suppress_exceptions
 from oss.src.utils.caching import get_cache, set_cache, invalidate_cache
 
@@ -15,6 +18,11 @@ from oss.src.apis.fastapi.tracing.utils import (
     parse_trace_id_to_uuid,
     parse_spans_from_request,
     parse_spans_into_response,
+    parse_spans_into_ndjson,
+    parse_spans_into_arrow,
+    is_arrow_available,
+    EXPORT_MEDIA_TYPES,
+    EXPORT_FILE_EXTENSIONS,
     parse_analytics_from_params_request,
     parse_analytics_from_body_request,
     merge_analytics,
@@ -43,6 +51,9 @@ from oss.src.core.tracing.dtos import (
 
 log = get_module_logger(__name__)
 
+AGENTA_TRACING_ROLLUPS_ENABLED = env.AGENTA_TRACING_ROLLUPS_ENABLED
+AGENTA_TRACING_EXPORT_BATCH_SIZE = env.AGENTA_TRACING_EXPORT_BATCH_SIZE
+
 
 class TracingRouter:
     def __init__(
@@ -53,6 +64,28 @@ class TracingRouter:
 
         self.router = APIRouter()
 
+        self.admin_router = APIRouter()
+
+        ### ROLLUPS
+
+        # POST /api/admin/tracing/rollups/refresh
+        self.admin_router.add_api_route(
+            path="/rollups/refresh",
+            methods=["POST"],
+            endpoint=self.refresh_rollups,
+            response_model_exclude_none=True,
+        )
+
+        ### PARTITIONS
+
+        # POST /api/admin/tracing/partitions/refresh
+        self.admin_router.add_api_route(
+            path="/partitions/refresh",
+            methods=["POST"],
+            endpoint=self.refresh_partitions,
+            response_model_exclude_none=True,
+        )
+
         ### CRUD ON TRACES
 
         self.router.add_api_route(
@@ -127,6 +160,15 @@ class TracingRouter:
             response_model_exclude_none=True,
         )
 
+        self.router.add_api_route(
+            "/spans/export",
+            self.export_spans,
+            methods=["POST"],
+            operation_id="export_spans_rpc",
+            status_code=status.HTTP_200_OK,
+            response_class=StreamingResponse,
+        )
+
         self.router.add_api_route(
             "/spans/analytics",
             self.fetch_legacy_analytics,
@@ -147,6 +189,61 @@ class TracingRouter:
             response_model_exclude_none=True,
         )
 
+    ### ROLLUPS
+
+    @intercept_exceptions()
+    async def refresh_rollups(
+        self,
+        *,
+        trigger_interval: Optional[int] = Query(1, ge=1, le=1440),
+        trigger_datetime: Optional[datetime] = Query(None),
+    ):
+        # ----------------------------------------------------------------------
+        # THIS IS AN ADMIN ENDPOINT
+        # NO CHECK FOR PERMISSIONS / ENTITLEMENTS
+        # ----------------------------------------------------------------------
+
+        if not trigger_datetime or not trigger_interval:
+            return {"status": "error"}
+
+        if not AGENTA_TRACING_ROLLUPS_ENABLED:
+            return {"status": "skipped"}
+
+        check = await self.service.refresh_rollups(
+            timestamp=trigger_datetime,
+            interval=trigger_interval,
+        )
+
+        if not check:
+            return {"status": "failure"}
+
+        return {"status": "success"}
+
+    ### PARTITIONS
+
+    @intercept_exceptions()
+    async def refresh_partitions(
+        self,
+        *,
+        trigger_datetime: Optional[datetime] = Query(None),
+    ):
+        # ----------------------------------------------------------------------
+        # THIS IS AN ADMIN ENDPOINT
+        # NO CHECK FOR PERMISSIONS / ENTITLEMENTS
+        # ----------------------------------------------------------------------
+
+        if not trigger_datetime:
+            return {"status": "error"}
+
+        check = await self.service.refresh_partitions(
+            timestamp=trigger_datetime,
+        )
+
+        if not check:
+            return {"status": "failure"}
+
+        return {"status": "success"}
+
     ### HELPERS
 
     async def _upsert(
@@ -515,6 +612,79 @@ class TracingRouter:
 
         return spans_response
 
+    @intercept_exceptions()
+    async def export_spans(  # EXPORT
+        self,
+        request: Request,
+        query: Optional[TracingQuery] = Depends(parse_query_from_params_request),
+        #
+        file_type: Optional[Literal["ndjson", "arrow"]] = Query(None),
+    ) -> StreamingResponse:
+        file_type = file_type or "ndjson"
+
+        if file_type == "arrow" and not is_arrow_available():
+            raise HTTPException(
+                status_code=400,
+                detail="Arrow exports require pyarrow to be installed.",
+            )
+
+        body_json = None
+        query_from_body = None
+
+        try:
+            body_json = await request.json()
+
+            if body_json:
+                query_from_body = parse_query_from_body_request(**body_json)
+
+        except (ValueError, TypeError):  # no JSON body, or not a query object
+            pass
+
+        merged_query = merge_queries(query, query_from_body)
+
+        batches = self.service.export(
+            project_id=UUID(request.state.project_id),
+            #
+            query=merged_query,
+            #
+            batch_size=AGENTA_TRACING_EXPORT_BATCH_SIZE,
+        )
+
+        # surfaces query errors before the response starts
+        try:
+            first_batch = await anext(batches, None)
+        except FilteringException as e:
+            raise HTTPException(
+                status_code=400,
+                detail=str(e),
+            ) from e
+
+        async def _batches() -> AsyncIterator[List[OTelFlatSpan]]:
+            if first_batch is None:
+                return
+
+            yield first_batch
+
+            async for batch in batches:
+                yield batch
+
+        format = (
+            merged_query.formatting.format if merged_query.formatting else None
+        ) or Format.AGENTA
+
+        if file_type == "arrow":
+            content = parse_spans_into_arrow(_batches(), format=format)
+        else:
+            content = parse_spans_into_ndjson(_batches(), format=format)
+
+        filename = f"spans.{EXPORT_FILE_EXTENSIONS[file_type]}"
+
+        return StreamingResponse(
+            content,
+            media_type=EXPORT_MEDIA_TYPES[file_type],
+            headers={"Content-Disposition": f"attachment; filename={filename}"},
+        )
+
     @intercept_exceptions()
     @suppress_exceptions(default=OldAnalyticsResponse())
     async def fetch_legacy_analytics(
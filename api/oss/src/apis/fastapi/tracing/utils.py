@@ -1,12 +1,18 @@
-from typing import Optional, Union, Dict, Tuple, List
+from typing import Any, AsyncIterator, Optional, Union, Dict, Tuple, List
 from json import loads, dumps
 from copy import deepcopy
 from hashlib import blake2b
+from io import BytesIO
 from traceback import format_exc
 from datetime import datetime
 
 from fastapi import Query
 
+try:
+    import pyarrow as pa  # optional, only needed for Arrow IPC exports
+except ImportError:
+    pa = None
+
 from oss.src.utils.logging import get_module_logger
 
 from oss.src.core.tracing.dtos import (
@@ -218,6 +224,7 @@ def merge_queries(
             formatting=query_body.formatting or query_param.formatting or Formatting(),
             windowing=query_body.windowing or query_param.windowing or Windowing(),
             filtering=query_body.filtering or query_param.filtering or Filtering(),
+            sharding=query_body.sharding or query_param.sharding,
         )
 
     return TracingQuery(
@@ -727,6 +734,126 @@ def parse_spans_into_response(
     return spans if spans else traces
 
 
+# -- EXPORT
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "arrow": "application/vnd.apache.arrow.stream",
+}
+
+EXPORT_FILE_EXTENSIONS = {
+    "ndjson": "ndjson",
+    "arrow": "arrows",
+}
+
+# flat, fixed schema: nested fields are exported as JSON strings
+EXPORT_STRING_COLUMNS = [
+    "trace_id",
+    "span_id",
+    "parent_id",
+    "trace_type",
+    "span_type",
+    "span_kind",
+    "span_name",
+    "status_code",
+    "status_message",
+]
+EXPORT_TIMESTAMP_COLUMNS = [
+    "start_time",
+    "end_time",
+]
+EXPORT_JSON_COLUMNS = [
+    "attributes",
+    "references",
+    "links",
+    "hashes",
+    "exception",
+    "events",
+]
+
+
+def is_arrow_available() -> bool:
+    return pa is not None
+
+
+def _build_arrow_schema():
+    return pa.schema(
+        [(name, pa.string()) for name in EXPORT_STRING_COLUMNS]
+        + [(name, pa.timestamp("us", tz="UTC")) for name in EXPORT_TIMESTAMP_COLUMNS]
+        + [(name, pa.string()) for name in EXPORT_JSON_COLUMNS]
+    )
+
+
+def _parse_spans_into_arrow_batch(
+    span_dtos: OTelFlatSpans,
+    schema: Any,
+) -> Any:
+    rows = [
+        span_dto.model_dump(mode="json", exclude_none=True) for span_dto in span_dtos
+    ]
+
+    columns: Dict[str, list] = {}
+
+    for name in EXPORT_STRING_COLUMNS:
+        columns[name] = [row.get(name) for row in rows]
+
+    for name in EXPORT_TIMESTAMP_COLUMNS:
+        columns[name] = [getattr(span_dto, name) for span_dto in span_dtos]
+
+    for name in EXPORT_JSON_COLUMNS:
+        columns[name] = [
+            dumps(row[name]) if row.get(name) is not None else None for row in rows
+        ]
+
+    return pa.RecordBatch.from_pydict(columns, schema=schema)
+
+
+async def parse_spans_into_ndjson(
+    batches: AsyncIterator[OTelFlatSpans],
+    format: Format = Format.AGENTA,
+) -> AsyncIterator[bytes]:
+    async for span_dtos in batches:
+        span_dtos = parse_spans_into_response(
+            span_dtos,
+            focus=Focus.SPAN,
+            format=format,
+        )
+
+        yield b"".join(
+            span_dto.model_dump_json(exclude_none=True).encode() + b"\n"
+            for span_dto in span_dtos or []
+        )
+
+
+async def parse_spans_into_arrow(
+    batches: AsyncIterator[OTelFlatSpans],
+    format: Format = Format.AGENTA,
+) -> AsyncIterator[bytes]:
+    schema = _build_arrow_schema()
+    sink = BytesIO()
+
+    with pa.ipc.new_stream(sink, schema) as writer:
+        async for span_dtos in batches:
+            span_dtos = parse_spans_into_response(
+                span_dtos,
+                focus=Focus.SPAN,
+                format=format,
+            )
+
+            if not span_dtos:
+                continue
+
+            writer.write_batch(_parse_spans_into_arrow_batch(span_dtos, schema))
+
+            # hand over what the writer produced, then reuse the buffer
+            yield sink.getvalue()
+
+            sink.seek(0)
+            sink.truncate()
+
+    yield sink.getvalue()  # end-of-stream marker
+
+
 # -- ANALYTICS
 
 
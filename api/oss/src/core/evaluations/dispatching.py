@@ -0,0 +1,294 @@
+from typing import List, NamedTuple, Optional, Tuple
+from uuid import UUID, uuid4
+from datetime import datetime, timedelta
+from math import ceil
+
+from redis.asyncio import Redis
+
+from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+
+log = get_module_logger(__name__)
+
+# Live runs are dispatched window by window. A lease per run makes sure that a
+# window is not dispatched while the previous one is still being processed, and
+# a watermark per run, the end of the last processed window, makes sure that the
+# next window starts where the previous one ended: missed ticks are caught up in
+# one larger window. Large windows are split into shards of traces, by hash of
+# their trace id, processed in parallel. Shards that succeed are recorded. The
+# last shard to complete refreshes the metrics of the window, moves the
+# watermark and releases the lease if all shards succeeded, and only releases
+# the lease otherwise: the window is then dispatched again, as it was planned,
+# with the shards that did not succeed only, at most `LIVE_MAX_ATTEMPTS` times.
+
+LIVE_LEASE_TTL = env.AGENTA_EVALUATIONS_LIVE_LEASE_TTL  # seconds
+LIVE_MAX_CATCHUP = env.AGENTA_EVALUATIONS_LIVE_MAX_CATCHUP  # minutes
+LIVE_SHARD_INTERVAL = env.AGENTA_EVALUATIONS_LIVE_SHARD_INTERVAL  # minutes
+LIVE_MAX_SHARDS = env.AGENTA_EVALUATIONS_LIVE_MAX_SHARDS
+LIVE_MAX_ATTEMPTS = 3  # dispatches of a window before its failed shards are skipped
+LIVE_WATERMARK_TTL = 7 * 24 * 60 * 60  # seconds, for runs no longer live
+LIVE_KEY = "evaluations:v1:live"
+
+# KEYS[1]: lease, KEYS[2]: pending shards, KEYS[3]: watermark, KEYS[4]: window,
+# KEYS[5]: succeeded shards -- ARGV[1]: token, ARGV[2]: ttl (seconds), ARGV[3]:
+# watermark the window starts from ('' for none), ARGV[4]: oldest, ARGV[5]:
+# newest, ARGV[6]: shards, ARGV[7]: window ttl (seconds). Returns the oldest,
+# newest, shards and attempts of the window, planned now or left unfinished by
+# a previous attempt, then the shards to dispatch; nothing when the run is
+# leased or the window is stale (the watermark moved since it was planned).
+ACQUIRE_LEASE_SCRIPT = """
+if (redis.call('GET', KEYS[3]) or '') ~= ARGV[3] then
+    return {}
+end
+
+if not redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[2]) then
+    return {}
+end
+
+if redis.call('EXISTS', KEYS[4]) == 0 then
+    redis.call('DEL', KEYS[5])
+    redis.call('HSET', KEYS[4], 'oldest', ARGV[4], 'newest', ARGV[5], 'shards', ARGV[6])
+end
+
+local attempts = redis.call('HINCRBY', KEYS[4], 'attempts', 1)
+local window = redis.call('HMGET', KEYS[4], 'oldest', 'newest', 'shards')
+local acquired = {window[1], window[2], window[3], attempts}
+
+for shard = 0, tonumber(window[3]) - 1 do
+    if redis.call('SISMEMBER', KEYS[5], shard) == 0 then
+        table.insert(acquired, shard)
+    end
+end
+
+redis.call('SET', KEYS[2], #acquired - 4, 'EX', ARGV[2])
+redis.call('EXPIRE', KEYS[4], ARGV[7])
+redis.call('EXPIRE', KEYS[5], ARGV[7])
+
+return acquired
+"""
+
+# KEYS[1]: lease, KEYS[2]: pending shards, KEYS[3]: succeeded shards --
+# ARGV[1]: token, ARGV[2]: shard, ARGV[3]: 1 if the shard succeeded, else 0.
+# Returns the shards still pending, -1 when the lease was lost, and the shards
+# that succeeded so far.
+COMPLETE_SHARD_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return {-1, 0}
+end
+
+if ARGV[3] == '1' then
+    redis.call('SADD', KEYS[3], ARGV[2])
+end
+
+return {math.max(0, redis.call('DECR', KEYS[2])), redis.call('SCARD', KEYS[3])}
+"""
+
+# KEYS[1]: lease, KEYS[2]: pending shards, KEYS[3]: watermark, KEYS[4]: window,
+# KEYS[5]: succeeded shards -- ARGV[1]: token, ARGV[2]: watermark ('' to leave
+# it and the window as they are), ARGV[3]: ttl (seconds). Returns 1 when
+# released.
+RELEASE_LEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return 0
+end
+
+if ARGV[2] ~= '' then
+    redis.call('SET', KEYS[3], ARGV[2], 'EX', ARGV[3])
+    redis.call('DEL', KEYS[4], KEYS[5])
+end
+
+redis.call('DEL', KEYS[1], KEYS[2])
+
+return 1
+"""
+
+
+class Lease(NamedTuple):
+    token: str
+    oldest: datetime
+    newest: datetime
+    shards: int
+    attempts: int
+    pending: List[int]  # shards to dispatch
+
+
+_r: Optional[Redis] = None
+
+
+# HELPERS ----------------------------------------------------------------------
+
+
+def _redis() -> Redis:
+    global _r  # pylint: disable=global-statement
+
+    if _r is None:
+        _r = Redis.from_url(
+            url=env.REDIS_URL,
+            decode_responses=True,
+        )
+
+    return _r
+
+
+def _keys(
+    run_id: UUID,
+) -> Tuple[str, str, str, str, str]:
+    return (
+        f"{LIVE_KEY}:{run_id}:lease",
+        f"{LIVE_KEY}:{run_id}:pending",
+        f"{LIVE_KEY}:{run_id}:watermark",
+        f"{LIVE_KEY}:{run_id}:window",
+        f"{LIVE_KEY}:{run_id}:succeeded",
+    )
+
+
+# INTERFACE --------------------------------------------------------------------
+
+
+def get_trace_shard(
+    trace_id: str,
+    shards: int,
+) -> int:
+    if shards <= 1:
+        return 0
+
+    # the first 32 bits of the trace id, as hashed by the tracing query
+    return int(str(trace_id).replace("-", "")[:8], 16) % shards
+
+
+def plan_window(
+    *,
+    oldest: datetime,
+    newest: datetime,
+    watermark: Optional[datetime] = None,
+) -> Optional[Tuple[datetime, datetime, int]]:
+    """
+    Return the window to dispatch, from the watermark if any, and its shards,
+    or None when the window was already processed.
+    """
+
+    if watermark is not None:
+        oldest = watermark
+
+    oldest = max(oldest, newest - timedelta(minutes=LIVE_MAX_CATCHUP))
+
+    if oldest >= newest:
+        return None
+
+    minutes = (newest - oldest).total_seconds() / 60
+    shards = min(LIVE_MAX_SHARDS, max(1, ceil(minutes / LIVE_SHARD_INTERVAL)))
+
+    return oldest, newest, shards
+
+
+async def get_watermark(
+    *,
+    run_id: UUID,
+) -> Optional[datetime]:
+    _, _, watermark_key, _, _ = _keys(run_id)
+
+    watermark = await _redis().get(watermark_key)
+
+    return datetime.fromisoformat(watermark) if watermark else None
+
+
+async def acquire_lease(
+    *,
+    run_id: UUID,
+    oldest: datetime,
+    newest: datetime,
+    shards: int,
+    watermark: Optional[datetime] = None,
+) -> Optional[Lease]:
+    """
+    Return the lease of the run, on the window planned from `watermark` or on
+    the window left unfinished from it, or None if the run is already leased or
+    if its watermark is no longer `watermark`.
+    """
+
+    keys = _keys(run_id)
+
+    token = uuid4().hex
+
+    acquired = await _redis().eval(
+        ACQUIRE_LEASE_SCRIPT,
+        len(keys),
+        *keys,
+        token,
+        LIVE_LEASE_TTL,
+        watermark.isoformat() if watermark else "",
+        oldest.isoformat(),
+        newest.isoformat(),
+        shards,
+        LIVE_WATERMARK_TTL,
+    )
+
+    if not acquired:
+        return None
+
+    return Lease(
+        token=token,
+        oldest=datetime.fromisoformat(acquired[0]),
+        newest=datetime.fromisoformat(acquired[1]),
+        shards=int(acquired[2]),
+        attempts=int(acquired[3]),
+        pending=[int(shard) for shard in acquired[4:]],
+    )
+
+
+async def complete_shard(
+    *,
+    run_id: UUID,
+    lease: str,
+    shard: int,
+    shards: int,
+    succeeded: bool,
+) -> Tuple[bool, bool]:
+    """
+    Return whether the shard was the last one of the window to complete and,
+    if so, whether all shards of the window succeeded.
+    """
+
+    lease_key, pending_key, _, _, succeeded_key = _keys(run_id)
+
+    pending, done = await _redis().eval(
+        COMPLETE_SHARD_SCRIPT,
+        3,
+        lease_key,
+        pending_key,
+        succeeded_key,
+        lease,
+        shard,
+        1 if succeeded else 0,
+    )
+
+    if int(pending) < 0:
+        log.warn("[LIVE] Lease lost, window left to the next tick", run_id=run_id)
+
+    return int(pending) == 0, int(done) >= shards
+
+
+async def release_lease(
+    *,
+    run_id: UUID,
+    lease: str,
+    watermark: Optional[datetime] = None,
+) -> bool:
+    """
+    Release the lease of the run and, if `watermark` is given, move its
+    watermark and forget its window. Otherwise, the window is dispatched again
+    on the next tick, with the shards that did not succeed only.
+    """
+
+    keys = _keys(run_id)
+
+    released = await _redis().eval(
+        RELEASE_LEASE_SCRIPT,
+        len(keys),
+        *keys,
+        lease,
+        watermark.isoformat() if watermark else "",
+        LIVE_WATERMARK_TTL,
+    )
+
+    return bool(int(released))
@@ -1,5 +1,7 @@
 from typing import List, Optional, Tuple, Dict, Any
 from uuid import UUID
+from json import dumps
+from hashlib import blake2b
 from asyncio import sleep
 from copy import deepcopy
 from datetime import datetime, timedelta, timezone
@@ -7,9 +9,18 @@ from datetime import datetime, timedelta, timezone
 from celery import current_app as celery_dispatch
 
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.caching import get_cache, set_cache, invalidate_cache
 
 from oss.src.core.shared.dtos import Reference, Windowing, Tags, Meta, Data
 from oss.src.core.evaluations.interfaces import EvaluationsDAOInterface
+from oss.src.core.evaluations.dispatching import (
+    LIVE_MAX_ATTEMPTS,
+    Lease,
+    get_watermark,
+    plan_window,
+    acquire_lease,
+    release_lease,
+)
 from oss.src.core.evaluations.types import (
     EvaluationStatus,
     # EVALUATION RUN
@@ -93,6 +104,12 @@ from oss.src.services.db_manager import (
 )
 from oss.src.utils.helpers import get_slug_from_name_and_id
 from oss.src.core.evaluations.utils import get_metrics_keys_from_schema
+from oss.src.core.evaluations.utils import (
+    PartialMetrics,
+    make_partial_metrics,
+    merge_partial_metrics,
+    finalize_partial_metrics,
+)
 
 
 log = get_module_logger(__name__)
@@ -131,6 +148,14 @@ DEFAULT_METRICS = [
 
 DEFAULT_REFRESH_INTERVAL = 1  # minute(s)
 
+# Run metrics are refreshed from partial metrics, cached, of the results older
+# than the settle delay, which leaves time for their traces to be ingested.
+# Partials only grow with new results: they are dropped, and rebuilt from
+# scratch, when results of their run are edited or deleted.
+METRICS_SETTLE_DELAY = timedelta(minutes=5)
+METRICS_PARTIALS_NAMESPACE = "evaluation_metrics_partials"
+METRICS_PARTIALS_TTL = 24 * 60 * 60  # 1 day, rebuilt from scratch when missing
+
 
 class EvaluationsService:
     def __init__(
@@ -177,39 +202,128 @@ class EvaluationsService:
             user_id = run.created_by_id
 
             try:
-                log.info(
-                    "[LIVE] Dispatching...",
+                await self._dispatch_live_run(
                     project_id=project_id,
+                    user_id=user_id,
+                    #
                     run_id=run.id,
                     #
                     newest=newest,
                     oldest=oldest,
                 )
 
-                celery_dispatch.send_task(  # type: ignore
-                    "src.tasks.evaluations.live.evaluate",
-                    kwargs=dict(
-                        project_id=project_id,
-                        user_id=user_id,
-                        #
-                        run_id=run.id,
-                        #
-                        newest=newest,
-                        oldest=oldest,
-                    ),
-                )
-
-                log.info(
-                    "[LIVE] Dispatched.   ",
-                    project_id=project_id,
-                    run_id=run.id,
-                )
-
             except Exception as e:  # pylint: disable=broad-exception-caught
                 log.error(f"[LIVE] Error refreshing run {run.id}: {e}", exc_info=True)
 
         return True
 
+    async def _dispatch_live_run(
+        self,
+        *,
+        project_id: UUID,
+        user_id: UUID,
+        #
+        run_id: UUID,
+        #
+        newest: datetime,
+        oldest: datetime,
+    ) -> None:
+        try:
+            watermark = await get_watermark(run_id=run_id)
+
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.warn("[LIVE] Could not fetch watermark", run_id=run_id, exc_info=True)
+
+            watermark = None
+
+        window = plan_window(oldest=oldest, newest=newest, watermark=watermark)
+
+        if not window:
+            log.info("[LIVE] Already processed", run_id=run_id, newest=newest)
+            return
+
+        oldest, newest, shards = window
+
+        lease: Optional[Lease] = None
+
+        try:
+            lease = await acquire_lease(
+                run_id=run_id,
+                oldest=oldest,
+                newest=newest,
+                shards=shards,
+                watermark=watermark,
+            )
+
+            if not lease:
+                log.info("[LIVE] Still processing, skipped", run_id=run_id)
+                return
+
+        except Exception:  # pylint: disable=broad-exception-caught
+            log.warn("[LIVE] Could not lease run", run_id=run_id, exc_info=True)
+
+        if lease is None:  # as a single window, without de-duplication
+            token, shards, pending = None, 1, [0]
+
+        else:  # as planned now, or as left unfinished
+            token, oldest, newest, shards = (
+                lease.token,
+                lease.oldest,
+                lease.newest,
+                lease.shards,
+            )
+            pending = lease.pending
+
+            if pending and lease.attempts > LIVE_MAX_ATTEMPTS:
+                log.error(
+                    "[LIVE] Shards failed too many times, skipped",
+                    run_id=run_id,
+                    oldest=oldest,
+                    newest=newest,
+                    pending=pending,
+                )
+
+                pending = list()
+
+            if not pending:  # the window is done, or given up on
+                await release_lease(run_id=run_id, lease=token, watermark=newest)
+                return
+
+        log.info(
+            "[LIVE] Dispatching...",
+            project_id=project_id,
+            run_id=run_id,
+            #
+            newest=newest,
+            oldest=oldest,
+            shards=shards,
+            pending=pending,
+        )
+
+        for shard in pending:
+            celery_dispatch.send_task(  # type: ignore
+                "src.tasks.evaluations.live.evaluate",
+                kwargs=dict(
+                    project_id=project_id,
+                    user_id=user_id,
+                    #
+                    run_id=run_id,
+                    #
+                    newest=newest,
+                    oldest=oldest,
+                    #
+                    shard=shard,
+                    shards=shards,
+                    lease=token,
+                ),
+            )
+
+        log.info(
+            "[LIVE] Dispatched.   ",
+            project_id=project_id,
+            run_id=run_id,
+        )
+
     async def fetch_live_runs(
         self,
         *,
@@ -529,23 +643,54 @@ class EvaluationsService:
         #
         scenario_id: UUID,
     ) -> Optional[UUID]:
-        return await self.evaluations_dao.delete_scenario(
+        scenario = await self.evaluations_dao.fetch_scenario(
             project_id=project_id,
             #
             scenario_id=scenario_id,
         )
 
+        scenario_id = await self.evaluations_dao.delete_scenario(
+            project_id=project_id,
+            #
+            scenario_id=scenario_id,
+        )
+
+        if scenario and scenario_id:
+            await self._invalidate_run_metrics(
+                project_id=project_id,
+                #
+                run_ids=[scenario.run_id],
+            )
+
+        return scenario_id
+
     async def delete_scenarios(
         self,
         *,
         project_id: UUID,
         scenario_ids: List[UUID],
     ) -> List[UUID]:
-        return await self.evaluations_dao.delete_scenarios(
+        scenarios = await self.evaluations_dao.fetch_scenarios(
+            project_id=project_id,
+            #
+            scenario_ids=scenario_ids,
+        )
+
+        scenario_ids = await self.evaluations_dao.delete_scenarios(
             project_id=project_id,
             scenario_ids=scenario_ids,
         )
 
+        await self._invalidate_run_metrics(
+            project_id=project_id,
+            #
+            run_ids=[
+                scenario.run_id for scenario in scenarios if scenario.id in scenario_ids
+            ],
+        )
+
+        return scenario_ids
+
     async def query_scenarios(
         self,
         *,
@@ -636,13 +781,22 @@ class EvaluationsService:
     ) -> Optional[EvaluationResult]:
         result.version = CURRENT_VERSION
 
-        return await self.evaluations_dao.edit_result(
+        result = await self.evaluations_dao.edit_result(
             project_id=project_id,
             user_id=user_id,
             #
             result=result,
         )
 
+        if result:
+            await self._invalidate_run_metrics(
+                project_id=project_id,
+                #
+                run_ids=[result.run_id],
+            )
+
+        return result
+
     async def edit_results(
         self,
         *,
@@ -654,13 +808,21 @@ class EvaluationsService:
         for result in results:
             result.version = CURRENT_VERSION
 
-        return await self.evaluations_dao.edit_results(
+        results = await self.evaluations_dao.edit_results(
             project_id=project_id,
             user_id=user_id,
             #
             results=results,
         )
 
+        await self._invalidate_run_metrics(
+            project_id=project_id,
+            #
+            run_ids=[result.run_id for result in results],
+        )
+
+        return results
+
     async def delete_result(
         self,
         *,
@@ -668,12 +830,27 @@ class EvaluationsService:
         #
         result_id: UUID,
     ) -> Optional[UUID]:
-        return await self.evaluations_dao.delete_result(
+        result = await self.evaluations_dao.fetch_result(
             project_id=project_id,
             #
             result_id=result_id,
         )
 
+        result_id = await self.evaluations_dao.delete_result(
+            project_id=project_id,
+            #
+            result_id=result_id,
+        )
+
+        if result and result_id:
+            await self._invalidate_run_metrics(
+                project_id=project_id,
+                #
+                run_ids=[result.run_id],
+            )
+
+        return result_id
+
     async def delete_results(
         self,
         *,
@@ -681,12 +858,26 @@ class EvaluationsService:
         #
         result_ids: List[UUID],
     ) -> List[UUID]:
-        return await self.evaluations_dao.delete_results(
+        results = await self.evaluations_dao.fetch_results(
+            project_id=project_id,
+            #
+            result_ids=result_ids,
+        )
+
+        result_ids = await self.evaluations_dao.delete_results(
             project_id=project_id,
             #
             result_ids=result_ids,
         )
 
+        await self._invalidate_run_metrics(
+            project_id=project_id,
+            #
+            run_ids=[result.run_id for result in results if result.id in result_ids],
+        )
+
+        return result_ids
+
     async def query_results(
         self,
         *,
@@ -796,8 +987,6 @@ class EvaluationsService:
         timestamp: Optional[datetime] = None,
         interval: Optional[int] = None,
     ) -> List[EvaluationMetrics]:
-        metrics_data: Dict[str, Any] = dict()
-
         run = await self.fetch_run(
             project_id=project_id,
             #
@@ -848,20 +1037,191 @@ class EvaluationsService:
             log.warning("[WARN] No steps metrics keys found")
             return []
 
-        step_keys = list(steps_metrics_keys.keys())
-
-        steps_trace_ids: Dict[str, List[str]] = dict()
+        if scenario_id is None and timestamp is None and interval is None:
+            metrics_data = await self._refresh_run_metrics(
+                project_id=project_id,
+                #
+                run_id=run_id,
+                steps_metrics_keys=steps_metrics_keys,
+            )
 
-        for step_key in step_keys:
-            results = await self.query_results(
+        else:
+            metrics_data = await self._compute_steps_metrics(
                 project_id=project_id,
+                #
                 result=EvaluationResultQuery(
                     run_id=run_id,
                     scenario_id=scenario_id,
-                    step_key=step_key,
                     timestamp=timestamp,
                     interval=interval,
                 ),
+                steps_metrics_keys=steps_metrics_keys,
+            )
+
+        if not metrics_data:
+            # log.warning("[WARN] No metrics data: no metrics will be stored")
+            return []
+
+        metrics_create = [
+            EvaluationMetricsCreate(
+                run_id=run_id,
+                scenario_id=scenario_id,
+                timestamp=timestamp,
+                interval=interval,
+                #
+                status=EvaluationStatus.SUCCESS,
+                #
+                data=metrics_data,
+            )
+        ]
+
+        metrics = await self.create_metrics(
+            project_id=project_id,
+            user_id=user_id,
+            #
+            metrics=metrics_create,
+        )
+
+        return metrics
+
+    async def _refresh_run_metrics(
+        self,
+        *,
+        project_id: UUID,
+        #
+        run_id: UUID,
+        steps_metrics_keys: Dict[str, List[Dict[str, str]]],
+    ) -> Dict[str, Any]:
+        """
+        Compute the metrics of a run incrementally, from partial metrics of the
+        results older than `METRICS_SETTLE_DELAY`, updated with the results
+        written since their watermark, and from the newer results, aggregated
+        on the fly, as their traces may not be ingested yet.
+        """
+
+        settled = datetime.now(timezone.utc) - METRICS_SETTLE_DELAY
+
+        keys = blake2b(
+            dumps(steps_metrics_keys, sort_keys=True).encode(),
+            digest_size=8,
+        ).hexdigest()
+
+        state = await get_cache(
+            namespace=METRICS_PARTIALS_NAMESPACE,
+            project_id=str(project_id),
+            key=str(run_id),
+            retry=False,
+        )
+
+        watermark: Optional[datetime] = None
+        partials: Dict[str, PartialMetrics] = dict()
+
+        if state and state.get("keys") == keys:  # else, the metrics keys changed
+            watermark = datetime.fromisoformat(state["watermark"])
+            partials = state.get("partials") or dict()
+
+        if watermark is None or watermark < settled:
+            steps_metrics = await self._compute_steps_metrics(
+                project_id=project_id,
+                #
+                result=EvaluationResultQuery(
+                    run_id=run_id,
+                ),
+                windowing=Windowing(
+                    oldest=watermark,
+                    newest=settled,
+                    order="ascending",
+                ),
+                steps_metrics_keys=steps_metrics_keys,
+                sketch=True,
+            )
+
+            for step_key, step_metrics in steps_metrics.items():
+                partials[step_key] = merge_partial_metrics(
+                    partials.get(step_key),
+                    make_partial_metrics(step_metrics),
+                )
+
+            watermark = settled
+
+            await set_cache(
+                namespace=METRICS_PARTIALS_NAMESPACE,
+                project_id=str(project_id),
+                key=str(run_id),
+                value={
+                    "keys": keys,
+                    "watermark": watermark.isoformat(),
+                    "partials": partials,
+                },
+                ttl=METRICS_PARTIALS_TTL,
+            )
+
+        steps_metrics = await self._compute_steps_metrics(
+            project_id=project_id,
+            #
+            result=EvaluationResultQuery(
+                run_id=run_id,
+            ),
+            windowing=Windowing(
+                oldest=watermark,
+                order="ascending",
+            ),
+            steps_metrics_keys=steps_metrics_keys,
+            sketch=True,
+        )
+
+        metrics_data: Dict[str, Any] = dict()
+
+        for step_key in partials.keys() | steps_metrics.keys():
+            step_metrics = finalize_partial_metrics(
+                merge_partial_metrics(
+                    partials.get(step_key),
+                    make_partial_metrics(steps_metrics.get(step_key)),
+                )
+            )
+
+            if step_metrics:
+                metrics_data[step_key] = step_metrics
+
+        return metrics_data
+
+    async def _invalidate_run_metrics(
+        self,
+        *,
+        project_id: UUID,
+        #
+        run_ids: List[UUID],
+    ) -> None:
+        for run_id in set(run_ids):
+            await invalidate_cache(
+                namespace=METRICS_PARTIALS_NAMESPACE,
+                project_id=str(project_id),
+                key=str(run_id),
+            )
+
+    async def _compute_steps_metrics(
+        self,
+        *,
+        project_id: UUID,
+        #
+        result: EvaluationResultQuery,
+        windowing: Optional[Windowing] = None,
+        steps_metrics_keys: Dict[str, List[Dict[str, str]]],
+        sketch: bool = False,
+    ) -> Dict[str, Any]:
+        metrics_data: Dict[str, Any] = dict()
+
+        step_keys = list(steps_metrics_keys.keys())
+
+        steps_trace_ids: Dict[str, List[str]] = dict()
+
+        for step_key in step_keys:
+            results = await self.query_results(
+                project_id=project_id,
+                result=result.model_copy(
+                    update={"step_key": step_key},
+                ),
+                windowing=windowing,
             )
 
             if not results:
@@ -894,6 +1254,11 @@ class EvaluationsService:
                     MetricSpec(
                         type=MetricType(metric.get("type")),
                         path=metric.get("path") or "*",
+                        sketch=(
+                            sketch
+                            if metric.get("type") == MetricType.NUMERIC_CONTINUOUS
+                            else None
+                        ),
                     )
                     for metric in step_metrics_keys
                 ] + [
@@ -927,31 +1292,7 @@ class EvaluationsService:
             except Exception as e:
                 log.error(e, exc_info=True)
 
-        if not metrics_data:
-            # log.warning("[WARN] No metrics data: no metrics will be stored")
-            return []
-
-        metrics_create = [
-            EvaluationMetricsCreate(
-                run_id=run_id,
-                scenario_id=scenario_id,
-                timestamp=timestamp,
-                interval=interval,
-                #
-                status=EvaluationStatus.SUCCESS,
-                #
-                data=metrics_data,
-            )
-        ]
-
-        metrics = await self.create_metrics(
-            project_id=project_id,
-            user_id=user_id,
-            #
-            metrics=metrics_create,
-        )
-
-        return metrics
+        return metrics_data
 
     # - EVALUATION QUEUE -------------------------------------------------------
 
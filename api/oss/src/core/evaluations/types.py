@@ -115,6 +115,9 @@ class EvaluationRunData(BaseModel):
     steps: Optional[List[EvaluationRunDataStep]] = None
     repeats: Optional[int] = 1
     mappings: Optional[List[EvaluationRunDataMapping]] = None
+    # live runs only: invocations at once, and per second by annotation step key
+    concurrency: Optional[int] = None
+    rate_limits: Optional[Dict[str, float]] = None
 
     @field_validator("repeats")
     def set_repeats(cls, v):
@@ -1,8 +1,34 @@
-from typing import List, Tuple, Dict, Optional
+from typing import Any, Awaitable, Callable, Iterable, List, Tuple, Dict, Optional
 from uuid import UUID
-from asyncio import sleep
-
-from oss.src.core.tracing.dtos import OTelSpansTree
+from json import dumps
+from math import floor
+from asyncio import Lock, Semaphore, gather, get_running_loop, sleep
+
+from redis.asyncio import Redis
+
+from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+
+from oss.src.core.blobs.utils import compute_blob_id
+from oss.src.core.tracing.dtos import OTelSpansTree, MetricType
+
+from oss.src.dbs.postgres.tracing.sketches import merge_sketches
+from oss.src.dbs.postgres.tracing.utils import (
+    PERCENTILES_VALUES,
+    compute_range,
+    parse_pcts,
+    compute_iqrs,
+    compute_cqvs,
+    compute_pscs,
+    merge_sketch_values,
+    compute_sketch_pcts,
+    compute_sketch_hist,
+    parse_bin_freq,
+    normalize_freq,
+    compute_uniq,
+)
+
+log = get_module_logger(__name__)
 
 # Divides cleanly into 1, 2, 3, 4, 5, 6, 8, 10, ...
 BLOCKS = 1 * 2 * 3 * 4 * 5
@@ -151,3 +177,384 @@ async def fetch_trace(
             await sleep(delay)
 
     return None
+
+
+class RateLimiter:
+    """Spaces out acquisitions to at most `rate` per second, None for no limit."""
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+    ):
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.next = 0.0
+        self.lock = Lock()
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+
+        async with self.lock:
+            now = get_running_loop().time()
+            wait = self.next - now
+            self.next = max(now, self.next) + self.interval
+
+        if wait > 0:
+            await sleep(wait)
+
+
+async def gather_bounded(
+    jobs: Iterable[Callable[[], Awaitable[Any]]],
+    *,
+    concurrency: int,
+) -> List[Any]:
+    """Run the jobs with at most `concurrency` of them at a time, in order."""
+
+    semaphore = Semaphore(max(1, concurrency))
+
+    async def _run(job: Callable[[], Awaitable[Any]]) -> Any:
+        async with semaphore:
+            return await job()
+
+    return list(await gather(*(_run(job) for job in jobs)))
+
+
+def batched(
+    items: List[Any],
+    size: int,
+) -> List[List[Any]]:
+    size = max(1, size)
+
+    return [items[idx : idx + size] for idx in range(0, len(items), size)]
+
+
+# Partial metrics are mergeable aggregates of the metrics of a step, as returned
+# by tracing analytics, with sketches for numeric/continuous metrics: counts,
+# sums, extremes, sketches and frequencies. Partials of disjoint sets of
+# results merge into the partial of their union, and finalize into the metrics
+# that analytics would return for it, percentiles and histograms of
+# numeric/continuous metrics being approximated by their sketches.
+
+PartialMetrics = Dict[str, Dict[str, Any]]
+
+_FREQ_TYPES = [
+    MetricType.NUMERIC_DISCRETE.value,
+    MetricType.BINARY.value,
+    MetricType.CATEGORICAL_SINGLE.value,
+    MetricType.CATEGORICAL_MULTIPLE.value,
+]
+
+
+def _merge_freq(
+    a: Optional[List[List[Any]]],
+    b: Optional[List[List[Any]]],
+) -> List[List[Any]]:
+    merged: Dict[str, List[Any]] = {}
+
+    for value, count in (a or []) + (b or []):
+        key = dumps(value, sort_keys=True)
+
+        if key in merged:
+            merged[key][1] += count
+        else:
+            merged[key] = [value, count]
+
+    return list(merged.values())
+
+
+def _freq_quantiles(
+    freq: List[List[Any]],
+    levels: List[float],
+) -> List[Optional[float]]:
+    buckets = sorted((float(value), count) for value, count in freq if count)
+    count = sum(bucket_count for _, bucket_count in buckets)
+
+    def rank_value(rank: int) -> float:
+        seen = 0
+
+        for value, bucket_count in buckets:
+            seen += bucket_count
+            if seen > rank:
+                break
+
+        return value
+
+    if count == 0:
+        return [None for _ in levels]
+
+    quantiles: List[Optional[float]] = []
+
+    for level in levels:
+        rank = level * (count - 1)
+        lower = floor(rank)
+
+        # interpolates between ranks, as percentile_cont() does
+        value = rank_value(lower)
+        if rank > lower:
+            value += (rank_value(lower + 1) - value) * (rank - lower)
+
+        quantiles.append(value)
+
+    return quantiles
+
+
+def _sort_freq(
+    freq: Optional[List[List[Any]]],
+) -> List[Dict[str, Any]]:
+    # as ordered by analytics: most frequent first, then by value
+    try:
+        ordered = sorted(freq or [], key=lambda f: (-f[1], f[0]))
+    except TypeError:  # values of mixed types
+        ordered = sorted(freq or [], key=lambda f: (-f[1], dumps(f[0])))
+
+    return [{"value": v, "count": c} for v, c in ordered]
+
+
+def make_partial_metrics(
+    metrics: Optional[Dict[str, Dict[str, Any]]],
+) -> PartialMetrics:
+    """Keep the mergeable parts of the metrics of a step, per path."""
+
+    partial: PartialMetrics = {}
+
+    for path, value in (metrics or {}).items():
+        if not value or not value.get("count"):
+            continue
+
+        kind = value.get("type")
+
+        metric: Dict[str, Any] = {"type": kind, "count": value["count"]}
+
+        if kind == MetricType.NUMERIC_CONTINUOUS.value:
+            for key in ("sum", "min", "max", "sketch"):
+                if value.get(key) is not None:
+                    metric[key] = value[key]
+
+        elif kind in _FREQ_TYPES:
+            metric["freq"] = [
+                [f.get("value"), f.get("count", 0)] for f in value.get("freq") or []
+            ]
+
+        partial[path] = metric
+
+    return partial
+
+
+def merge_partial_metrics(
+    a: Optional[PartialMetrics],
+    b: Optional[PartialMetrics],
+) -> PartialMetrics:
+    merged: PartialMetrics = {path: dict(metric) for path, metric in (a or {}).items()}
+
+    for path, metric in (b or {}).items():
+        if path not in merged:
+            merged[path] = dict(metric)
+            continue
+
+        target = merged[path]
+
+        target["count"] = target.get("count", 0) + metric.get("count", 0)
+
+        if "freq" in metric:
+            target["freq"] = _merge_freq(target.get("freq"), metric["freq"])
+
+        if "sketch" in metric:
+            target["sketch"] = merge_sketches(target.get("sketch"), metric["sketch"])
+
+        for key, pick in (("sum", None), ("min", min), ("max", max)):
+            if metric.get(key) is None:
+                continue
+            elif target.get(key) is None:
+                target[key] = metric[key]
+            elif pick is None:
+                target[key] += metric[key]
+            else:
+                target[key] = pick(target[key], metric[key])
+
+    return merged
+
+
+def finalize_partial_metrics(
+    partial: Optional[PartialMetrics],
+) -> Dict[str, Dict[str, Any]]:
+    """Compute the metrics of a step, per path, from their partial."""
+
+    metrics: Dict[str, Dict[str, Any]] = {}
+
+    for path, metric in (partial or {}).items():
+        kind = metric.get("type")
+        count = metric.get("count", 0)
+
+        value: Dict[str, Any] = {"type": kind, "count": count}
+
+        if kind == MetricType.NUMERIC_CONTINUOUS.value:
+            value |= merge_sketch_values([metric])
+            value = compute_sketch_pcts(value)
+            value = compute_sketch_hist(value)
+            value = compute_iqrs(value)
+            value = compute_cqvs(value)
+            value = compute_pscs(value)
+            value.pop("sketch", None)
+
+        elif kind == MetricType.NUMERIC_DISCRETE.value:
+            freq = metric.get("freq") or []
+            values = [float(v) for v, c in freq if c]
+
+            if values:
+                value["sum"] = sum(float(v) * c for v, c in freq)
+                value["mean"] = value["sum"] / count if count else None
+                value["min"] = min(values)
+                value["max"] = max(values)
+                value = compute_range(value)
+
+                value |= parse_pcts(_freq_quantiles(freq, PERCENTILES_VALUES))
+                value = compute_iqrs(value)
+                value = compute_cqvs(value)
+                value = compute_pscs(value)
+
+            value |= compute_uniq(normalize_freq(_sort_freq(freq)))
+
+        elif kind == MetricType.BINARY.value:
+            freq = {("true" if v else "false"): c for v, c in metric.get("freq") or []}
+
+            value |= compute_uniq(normalize_freq(parse_bin_freq(freq)))
+
+        elif kind in _FREQ_TYPES:
+            value |= compute_uniq(normalize_freq(_sort_freq(metric.get("freq"))))
+
+        metrics[path] = value
+
+    return metrics
+
+
+# Evaluations are memoized on the evaluator revision and the data it scores, so
+# that re-running an evaluation only re-invokes evaluators on new data. Memos
+# hold the annotation trace, which the new result links to. Deterministic
+# built-in evaluators are memoized unless their revision sets `meta.memoize` to
+# false, other evaluators (LLM judges, code, webhooks) only if it sets it true.
+# Memos are kept next to the live runs state, not in the cache: they outlive
+# project-wide cache invalidations, e.g. on variant commits, and evictions, and
+# only expire after `MEMOS_TTL`.
+
+MEMOS_KEY = "evaluations:v1:memos"
+MEMOS_TTL = env.AGENTA_EVALUATIONS_MEMOS_TTL  # 0 to disable
+
+DETERMINISTIC_EVALUATORS = [
+    "auto_exact_match",
+    "auto_contains_json",
+    "auto_similarity_match",
+    "auto_regex_test",
+    "field_match_test",
+    "auto_json_diff",
+    "auto_starts_with",
+    "auto_ends_with",
+    "auto_contains",
+    "auto_contains_any",
+    "auto_contains_all",
+    "auto_levenshtein_distance",
+]
+
+
+_r: Optional[Redis] = None
+
+
+def _redis() -> Redis:
+    global _r  # pylint: disable=global-statement
+
+    if _r is None:
+        _r = Redis.from_url(
+            url=env.REDIS_URL,
+            decode_responses=True,
+        )
+
+    return _r
+
+
+def _memo_name(
+    project_id: UUID,
+    key: Dict[str, str],
+) -> str:
+    return f"{MEMOS_KEY}:{project_id}:" + ":".join(key[name] for name in sorted(key))
+
+
+def is_memoizable(
+    evaluator_revision: Any,
+) -> bool:
+    if not MEMOS_TTL or not evaluator_revision or not evaluator_revision.id:
+        return False
+
+    memoize = (evaluator_revision.meta or {}).get("memoize")
+
+    if memoize is not None:
+        return bool(memoize)
+
+    uri = evaluator_revision.data.uri if evaluator_revision.data else None
+    parts = (uri or "").split(":")
+
+    return (
+        len(parts) == 4
+        and parts[:2] == ["agenta", "built-in"]
+        and parts[2] in DETERMINISTIC_EVALUATORS
+    )
+
+
+def compute_memo_key(
+    *,
+    evaluator_revision: Any,
+    request_data: Any,
+    trace_id: Optional[str] = None,
+) -> Dict[str, str]:
+    """
+    Hash what the evaluator scores: its parameters, the inputs and outputs, and
+    the testcase data. The trace is left out, its ids differ on every run.
+
+    Annotations link to the trace they score, so callers that must not reuse
+    them across traces, like live runs, pass the `trace_id` to scope the key.
+    """
+
+    testcase = request_data.testcase or {}
+
+    return {
+        "evaluator_revision_id": str(evaluator_revision.id),
+        **({"trace_id": str(trace_id)} if trace_id else {}),
+        "data_id": str(
+            compute_blob_id(
+                blob_data={
+                    "parameters": request_data.parameters,
+                    "inputs": request_data.inputs,
+                    "outputs": request_data.outputs,
+                    "testcase": testcase.get("data"),
+                },
+                set_id=evaluator_revision.id,
+            )
+        ),
+    }
+
+
+async def get_memo(
+    *,
+    project_id: UUID,
+    key: Dict[str, str],
+) -> Optional[str]:
+    """Return the annotation trace id memoized under the key, if any."""
+
+    try:
+        return await _redis().get(_memo_name(project_id, key))
+
+    except Exception:  # pylint: disable=broad-exception-caught
+        log.warn("[MEMOS] Failed to read memo", project_id=project_id)
+
+        return None
+
+
+async def set_memo(
+    *,
+    project_id: UUID,
+    key: Dict[str, str],
+    trace_id: str,
+) -> None:
+    try:
+        await _redis().set(_memo_name(project_id, key), trace_id, ex=MEMOS_TTL)
+
+    except Exception:  # pylint: disable=broad-exception-caught
+        log.warn("[MEMOS] Failed to write memo", project_id=project_id)
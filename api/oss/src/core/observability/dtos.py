@@ -1,7 +1,7 @@
 from enum import Enum
 from uuid import UUID
 from datetime import datetime
-from typing import List, Dict, Any, Union, Optional
+from typing import List, Dict, Any, Union, Optional, Tuple
 
 from pydantic import BaseModel
 
@@ -230,6 +230,33 @@ class OTelSpanDTO(BaseModel):
     links: Optional[List[OTelLinkDTO]] = None
 
 
+## --- ROWS --- ##
+
+
+NODE_ROW_COLUMNS = (
+    "root_id",
+    "tree_id",
+    "tree_type",
+    "node_id",
+    "node_type",
+    "node_name",
+    "parent_id",
+    "time_start",
+    "time_end",
+    "status",
+    "data",
+    "metrics",
+    "meta",
+    "refs",
+    "exception",
+    "links",
+    "content",
+    "otel",
+)
+
+NodeRow = Tuple[Any, ...]
+
+
 ## --- QUERY --- ##
 
 
@@ -6,6 +6,7 @@ from oss.src.core.observability.dtos import (
     SpanDTO,
     AnalyticsDTO,
     BucketDTO,
+    NodeRow,
 )
 
 
@@ -49,6 +50,14 @@ class ObservabilityDAOInterface:
     ) -> None:
         raise NotImplementedError
 
+    async def create_rows(
+        self,
+        *,
+        project_id: UUID,
+        node_rows: List[NodeRow],
+    ) -> None:
+        raise NotImplementedError
+
     async def read_one(
         self,
         *,
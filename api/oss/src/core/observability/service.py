@@ -7,6 +7,7 @@ from oss.src.core.observability.dtos import (
     AnalyticsDTO,
     SpanDTO,
     BucketDTO,
+    NodeRow,
 )
 from oss.src.core.observability.utils import (
     parse_span_dtos_to_span_idx,
@@ -93,6 +94,17 @@ class ObservabilityService:
             span_dtos=span_idx.values(),
         )
 
+    async def ingest_rows(
+        self,
+        *,
+        project_id: UUID,
+        node_rows: List[NodeRow],
+    ) -> None:
+        await self.observability_dao.create_rows(
+            project_id=project_id,
+            node_rows=node_rows,
+        )
+
     async def create(
         self,
         *,
@@ -2,7 +2,7 @@ from enum import Enum
 from uuid import UUID
 from datetime import datetime
 from traceback import print_exc
-from typing import List, Dict, OrderedDict, Callable, Any
+from typing import List, Dict, OrderedDict, Callable, Any, Optional
 
 from litellm import cost_calculator
 
@@ -170,6 +170,29 @@ def parse_ingest_value(
         del attributes[key]
 
 
+def parse_ingest_attributes(
+    field: str,
+    attributes: Optional[Dict[str, Any]],
+) -> None:
+    if attributes is not None:
+        for key in list(attributes.keys()):
+            scoped_key = f"{field}.{key}"
+            if _is_uuid_key(scoped_key):
+                parse_ingest_value(attributes, UUID, key)
+            elif _is_literal_key(scoped_key):
+                parse_ingest_value(attributes, str, key)
+            elif _is_integer_key(scoped_key):
+                parse_ingest_value(attributes, int, key)
+            elif _is_float_key(scoped_key):
+                parse_ingest_value(attributes, float, key)
+            elif _is_datetime_key(scoped_key):
+                parse_ingest_value(attributes, datetime.fromisoformat, key)
+            elif _is_string_key(scoped_key):
+                parse_ingest_value(attributes, str, key)
+            else:  # All other keys are supported as is
+                pass
+
+
 def parse_ingest(
     span_dtos: List[SpanDTO],
 ) -> None:
@@ -180,23 +203,7 @@ def parse_ingest(
             "refs": span_dto.refs,
         }
         for field, attributes in typecheck.items():
-            if attributes is not None:
-                for key in list(attributes.keys()):
-                    scoped_key = f"{field}.{key}"
-                    if _is_uuid_key(scoped_key):
-                        parse_ingest_value(attributes, UUID, key)
-                    elif _is_literal_key(scoped_key):
-                        parse_ingest_value(attributes, str, key)
-                    elif _is_integer_key(scoped_key):
-                        parse_ingest_value(attributes, int, key)
-                    elif _is_float_key(scoped_key):
-                        parse_ingest_value(attributes, float, key)
-                    elif _is_datetime_key(scoped_key):
-                        parse_ingest_value(attributes, datetime.fromisoformat, key)
-                    elif _is_string_key(scoped_key):
-                        parse_ingest_value(attributes, str, key)
-                    else:  # All other keys are supported as is
-                        pass
+            parse_ingest_attributes(field, attributes)
 
 
 def parse_span_dtos_to_span_idx(
@@ -393,41 +400,46 @@ TYPES_WITH_COSTS = [
 ]
 
 
+def calculate_span_costs(
+    node_type: Optional[str],
+    meta: Optional[Dict[str, Any]],
+    metrics: Optional[Dict[str, Any]],
+) -> None:
+    if node_type and node_type.lower() in TYPES_WITH_COSTS and meta and metrics:
+        model = meta.get("response.model") or meta.get("configuration.model")
+        prompt_tokens = metrics.get("unit.tokens.prompt", 0.0)
+        completion_tokens = metrics.get("unit.tokens.completion", 0.0)
+
+        try:
+            costs = cost_calculator.cost_per_token(
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+
+            if not costs:
+                return
+
+            prompt_cost, completion_cost = costs
+            total_cost = prompt_cost + completion_cost
+
+            metrics["unit.costs.prompt"] = prompt_cost
+            metrics["unit.costs.completion"] = completion_cost
+            metrics["unit.costs.total"] = total_cost
+
+        except:  # pylint: disable=bare-except
+            log.warn(
+                "Failed to calculate costs",
+                model=model,
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+            )
+
+
 def calculate_costs(span_idx: Dict[str, SpanDTO]):
     for span in span_idx.values():
-        if (
-            span.node.type
-            and span.node.type.name.lower() in TYPES_WITH_COSTS
-            and span.meta
-            and span.metrics
-        ):
-            model = span.meta.get("response.model") or span.meta.get(
-                "configuration.model"
-            )
-            prompt_tokens = span.metrics.get("unit.tokens.prompt", 0.0)
-            completion_tokens = span.metrics.get("unit.tokens.completion", 0.0)
-
-            try:
-                costs = cost_calculator.cost_per_token(
-                    model=model,
-                    prompt_tokens=prompt_tokens,
-                    completion_tokens=completion_tokens,
-                )
-
-                if not costs:
-                    continue
-
-                prompt_cost, completion_cost = costs
-                total_cost = prompt_cost + completion_cost
-
-                span.metrics["unit.costs.prompt"] = prompt_cost
-                span.metrics["unit.costs.completion"] = completion_cost
-                span.metrics["unit.costs.total"] = total_cost
-
-            except:  # pylint: disable=bare-except
-                log.warn(
-                    "Failed to calculate costs",
-                    model=model,
-                    prompt_tokens=prompt_tokens,
-                    completion_tokens=completion_tokens,
-                )
+        calculate_span_costs(
+            span.node.type.name if span.node.type else None,
+            span.meta,
+            span.metrics,
+        )
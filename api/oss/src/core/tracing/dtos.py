@@ -348,10 +348,16 @@ class Formatting(BaseModel):
     format: Optional[Format] = None
 
 
+class Sharding(BaseModel):
+    shard: int = 0
+    shards: int = 1
+
+
 class TracingQuery(BaseModel):
     formatting: Optional[Formatting] = None
     windowing: Optional[Windowing] = None
     filtering: Optional[Filtering] = None
+    sharding: Optional[Sharding] = None
 
 
 _C_OPS = list(ComparisonOperator)
@@ -408,6 +414,7 @@ class MetricSpec(BaseModel):
     vmin: Optional[float] = None
     vmax: Optional[float] = None
     edge: Optional[bool] = None
+    sketch: Optional[bool] = None  # approximate pcts/hist, mergeable sketch
 
 
 class MetricsBucket(BaseModel):
@@ -1,5 +1,6 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncGenerator, List, Optional, Dict, Any
 from uuid import UUID
+from datetime import datetime, timedelta
 from abc import ABC, abstractmethod
 
 from oss.src.core.tracing.dtos import (
@@ -156,6 +157,18 @@ class TracingDAOInterface(ABC):
     ) -> List[OTelFlatSpan]:
         raise NotImplementedError
 
+    @abstractmethod
+    def export(
+        self,
+        *,
+        project_id: UUID,
+        #
+        query: TracingQuery,
+        #
+        batch_size: int,
+    ) -> AsyncGenerator[List[OTelFlatSpan], None]:
+        raise NotImplementedError
+
     ### ANALYTICS
 
     @abstractmethod
@@ -178,3 +191,27 @@ class TracingDAOInterface(ABC):
         specs: List[MetricSpec],
     ) -> List[MetricsBucket]:
         raise NotImplementedError
+
+    ### ROLLUPS
+
+    @abstractmethod
+    async def refresh_rollups(
+        self,
+        *,
+        oldest: datetime,
+        newest: datetime,
+    ) -> bool:
+        raise NotImplementedError
+
+    ### PARTITIONS
+
+    @abstractmethod
+    async def refresh_partitions(
+        self,
+        *,
+        timestamp: datetime,
+        interval: timedelta,
+        ahead: int,
+        retention: Optional[timedelta] = None,
+    ) -> bool:
+        raise NotImplementedError
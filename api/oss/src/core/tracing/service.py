@@ -1,8 +1,10 @@
-from typing import List, Optional, Dict, Any
+from typing import AsyncGenerator, List, Optional, Dict, Any
 from uuid import UUID
+from datetime import datetime, timedelta
 
 
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
 
 from oss.src.core.tracing.interfaces import TracingDAOInterface
 from oss.src.core.tracing.utils import parse_query, parse_ingest
@@ -26,6 +28,22 @@ from oss.src.core.tracing.utils import (
 
 log = get_module_logger(__name__)
 
+# refreshes select spans on created_at, the start of the transactions that
+# ingested them, and look back a few minutes to catch late commits
+ROLLUPS_LOOKBACK_MINUTES = 5
+
+PARTITION_INTERVAL = (
+    timedelta(weeks=1)
+    if env.AGENTA_TRACING_PARTITION_INTERVAL == "week"
+    else timedelta(days=1)
+)
+PARTITIONS_AHEAD = max(1, env.AGENTA_TRACING_PARTITIONS_AHEAD)
+PARTITION_RETENTION = (
+    timedelta(days=env.AGENTA_TRACING_RETENTION_DAYS)
+    if env.AGENTA_TRACING_RETENTION_DAYS > 0
+    else None
+)
+
 
 class TracingService:
     def __init__(
@@ -221,6 +239,26 @@ class TracingService:
 
         return span_dtos
 
+    async def export(
+        self,
+        *,
+        project_id: UUID,
+        #
+        query: TracingQuery,
+        #
+        batch_size: int,
+    ) -> AsyncGenerator[List[OTelFlatSpan], None]:
+        parse_query(query)
+
+        async for span_dtos in self.tracing_dao.export(
+            project_id=project_id,
+            #
+            query=query,
+            #
+            batch_size=batch_size,
+        ):
+            yield span_dtos
+
     async def legacy_analytics(
         self,
         *,
@@ -256,3 +294,35 @@ class TracingService:
         )
 
         return bucket_dtos
+
+    async def refresh_rollups(
+        self,
+        *,
+        timestamp: datetime,
+        interval: int,
+    ) -> bool:
+        newest = timestamp
+        oldest = timestamp - timedelta(
+            minutes=max(interval, ROLLUPS_LOOKBACK_MINUTES),
+        )
+
+        check = await self.tracing_dao.refresh_rollups(
+            oldest=oldest,
+            newest=newest,
+        )
+
+        return check
+
+    async def refresh_partitions(
+        self,
+        *,
+        timestamp: datetime,
+    ) -> bool:
+        check = await self.tracing_dao.refresh_partitions(
+            timestamp=timestamp,
+            interval=PARTITION_INTERVAL,
+            ahead=PARTITIONS_AHEAD,
+            retention=PARTITION_RETENTION,
+        )
+
+        return check
@@ -21,4 +21,18 @@ curl \
     -H "Authorization: Access ${AGENTA_AUTH_KEY}" \
     "http://api:8000/admin/evaluations/runs/refresh?trigger_interval=${TRIGGER_INTERVAL}&trigger_datetime=${TRIGGER_DATETIME}" || echo "❌ CURL failed"
 
+curl \
+    -s \
+    -w "\nHTTP_STATUS:%{http_code}\n" \
+    -X POST \
+    -H "Authorization: Access ${AGENTA_AUTH_KEY}" \
+    "http://api:8000/admin/tracing/rollups/refresh?trigger_interval=${TRIGGER_INTERVAL}&trigger_datetime=${TRIGGER_DATETIME}" || echo "❌ CURL failed"
+
+curl \
+    -s \
+    -w "\nHTTP_STATUS:%{http_code}\n" \
+    -X POST \
+    -H "Authorization: Access ${AGENTA_AUTH_KEY}" \
+    "http://api:8000/admin/tracing/partitions/refresh?trigger_datetime=${TRIGGER_DATETIME}" || echo "❌ CURL failed"
+
 echo "[$(date)] queries.sh done" >> /proc/1/fd/1
\ No newline at end of file
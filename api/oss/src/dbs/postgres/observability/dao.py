@@ -13,6 +13,7 @@ from sqlalchemy.dialects import postgresql
 from oss.src.utils.logging import get_module_logger
 
 from oss.src.dbs.postgres.shared.engine import engine
+from oss.src.dbs.postgres.shared.utils import map_dbes_to_values, bulk_insert
 from oss.src.dbs.postgres.observability.dbes import NodesDBE
 from oss.src.dbs.postgres.observability.mappings import (
     map_span_dto_to_span_dbe,
@@ -21,7 +22,7 @@ from oss.src.dbs.postgres.observability.mappings import (
 )
 
 from oss.src.core.observability.interfaces import ObservabilityDAOInterface
-from oss.src.core.observability.dtos import TreeType
+from oss.src.core.observability.dtos import TreeType, NodeRow, NODE_ROW_COLUMNS
 from oss.src.core.observability.dtos import (
     QueryDTO,
     SpanDTO,
@@ -545,8 +546,42 @@ class ObservabilityDAO(ObservabilityDAOInterface):
         ]
 
         async with engine.tracing_session() as session:
-            for span_dbe in span_dbes:
-                session.add(span_dbe)
+            await _insert_nodes(
+                session=session,
+                project_id=project_id,
+                values=map_dbes_to_values(span_dbes),
+            )
+
+            await session.commit()
+
+    async def create_rows(
+        self,
+        *,
+        project_id: UUID,
+        node_rows: List[NodeRow],
+    ) -> None:
+        if not node_rows:
+            return
+
+        values = [
+            {
+                **{
+                    column: value
+                    for column, value in zip(NODE_ROW_COLUMNS, node_row)
+                    if value is not None
+                },
+                "project_id": project_id,
+                "tree_type": TreeType.INVOCATION,
+            }
+            for node_row in node_rows
+        ]
+
+        async with engine.tracing_session() as session:
+            await _insert_nodes(
+                session=session,
+                project_id=project_id,
+                values=values,
+            )
 
             await session.commit()
 
@@ -690,6 +725,43 @@ class ObservabilityDAO(ObservabilityDAOInterface):
                     await session.commit()
 
 
+async def _insert_nodes(
+    *,
+    session,
+    project_id: UUID,
+    values: List[dict],
+) -> None:
+    # The primary key includes the partition key, created_at, which is set on
+    # insert: it no longer catches nodes that are sent again, e.g. by retried
+    # batches. Those are skipped here instead, the last copy of a node within
+    # the batch wins. Retries are sequential, concurrent copies may still race.
+    values = list({value["node_id"]: value for value in values}.values())
+
+    existing = set(
+        (
+            await session.execute(
+                select(NodesDBE.node_id).filter(
+                    NodesDBE.project_id == project_id,
+                    NodesDBE.node_id.in_([value["node_id"] for value in values]),
+                )
+            )
+        )
+        .scalars()
+        .all()
+    )
+
+    values = [value for value in values if value["node_id"] not in existing]
+
+    if not values:
+        return
+
+    await bulk_insert(
+        session=session,
+        DBE=NodesDBE,
+        values=values,
+    )
+
+
 def _chunk(
     stmt: Select,
     page: Optional[int] = None,
@@ -11,7 +11,8 @@ class NodesDBE(Base, SpanDBA):
         PrimaryKeyConstraint(
             "project_id",
             "node_id",
-        ),  # focus = node
+            "created_at",
+        ),  # focus = node, including the partition key
         Index(
             "index_project_id_tree_id",
             "project_id",
@@ -27,4 +28,7 @@ class NodesDBE(Base, SpanDBA):
             "project_id",
             "created_at",
         ),  # sorting and pagination
+        {
+            "postgresql_partition_by": "RANGE (created_at)",
+        },  # see tracing/partitions.py
     )
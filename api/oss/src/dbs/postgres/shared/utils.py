@@ -1,6 +1,8 @@
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence
 
-from sqlalchemy import Select, and_, or_
+from sqlalchemy import Select, and_, or_, inspect
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from oss.src.core.shared.dtos import Windowing
 
@@ -101,3 +103,82 @@ def apply_windowing(
         stmt = stmt.limit(windowing.limit)
 
     return stmt
+
+
+# asyncpg accepts at most 32767 bind parameters per statement
+BULK_INSERT_MAX_PARAMETERS = 32_000
+
+
+def map_dbes_to_values(
+    dbes: Sequence[Any],
+) -> List[Dict[str, Any]]:
+    """
+    Extract the column values of transient DBEs, skipping None values like
+    the ORM does on INSERT, so that server defaults still apply.
+    """
+
+    values = []
+
+    for dbe in dbes:
+        state = inspect(dbe)
+        columns = state.mapper.columns.keys()
+
+        values.append(
+            {
+                key: value
+                for key, value in state.dict.items()
+                if key in columns and value is not None
+            }
+        )
+
+    return values
+
+
+async def bulk_insert(
+    *,
+    session: AsyncSession,
+    DBE,
+    values: List[Dict[str, Any]],
+    conflict: Optional[List[str]] = None,
+    update: Optional[List[str]] = None,
+    extra: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Insert rows with multi-row INSERT statements, instead of per-row ORM flushes.
+
+    Without `conflict`, duplicates raise an IntegrityError as a plain INSERT
+    would. With `conflict`, rows colliding on those columns are upserted: the
+    `update` columns are taken from the new row (NULL when skipped as None)
+    and the `extra` values are set. Rows repeating the same `conflict`
+    values are collapsed, the last one wins, since a single statement cannot
+    update the same row twice.
+    """
+
+    if conflict:
+        values = list(
+            {
+                tuple(value.get(key) for key in conflict): value for value in values
+            }.values()
+        )
+
+    batches: Dict[tuple, List[Dict[str, Any]]] = {}
+
+    for value in values:
+        batches.setdefault(tuple(value.keys()), []).append(value)
+
+    for keys, rows in batches.items():
+        size = max(1, BULK_INSERT_MAX_PARAMETERS // max(1, len(keys)))
+
+        for offset in range(0, len(rows), size):
+            stmt = insert(DBE.__table__).values(rows[offset : offset + size])
+
+            if conflict:
+                stmt = stmt.on_conflict_do_update(
+                    index_elements=conflict,
+                    set_={
+                        **{key: stmt.excluded[key] for key in (update or [])},
+                        **(extra or {}),
+                    },
+                )
+
+            await session.execute(stmt)
@@ -1,9 +1,9 @@
-from typing import Any, Dict, Optional, List, cast as type_cast
+from typing import Any, AsyncGenerator, Dict, Optional, List, Tuple, cast as type_cast
 from uuid import UUID
 from traceback import format_exc
-from datetime import datetime
+from datetime import datetime, timedelta
 
-from sqlalchemy import cast, func, select, text, distinct
+from sqlalchemy import cast, delete, func, select, text, distinct, tuple_
 from sqlalchemy.types import Numeric, BigInteger
 from sqlalchemy.sql import Select, and_, or_
 from sqlalchemy.exc import DBAPIError
@@ -15,6 +15,7 @@ from sqlalchemy.sql.elements import ColumnElement, Label
 from sqlalchemy.dialects.postgresql import BIT
 
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
 from oss.src.utils.exceptions import suppress_exceptions
 
 from oss.src.core.shared.dtos import Windowing
@@ -33,16 +34,26 @@ from oss.src.core.tracing.dtos import (
     ListOperator,
 )
 
-from oss.src.dbs.postgres.shared.utils import apply_windowing
+from oss.src.dbs.postgres.shared.utils import (
+    apply_windowing,
+    map_dbes_to_values,
+    bulk_insert,
+)
 from oss.src.dbs.postgres.shared.exceptions import check_entity_creation_conflict
 from oss.src.dbs.postgres.shared.engine import engine
-from oss.src.dbs.postgres.tracing.dbes import SpanDBE
+from oss.src.dbs.postgres.tracing.dbes import (
+    SpanDBE,
+    TraceSummaryDBE,
+    SpanRollupDBE,
+    SpanRollupWatermarkDBE,
+)
 from oss.src.dbs.postgres.tracing.mappings import (
     map_span_dbe_to_link_dto,
     map_span_dbe_to_span_dbe,
     map_span_dto_to_span_dbe,
     map_span_dbe_to_span_dto,
     map_buckets,
+    map_rollups_to_buckets,
 )
 from oss.src.dbs.postgres.tracing.utils import (
     DEBUG_ARGS,
@@ -52,6 +63,7 @@ from oss.src.dbs.postgres.tracing.utils import (
     filter,
     #
     parse_windowing,
+    apply_sharding,
     build_specs_values,
     build_base_cte,
     build_extract_cte,
@@ -64,14 +76,130 @@ from oss.src.dbs.postgres.tracing.utils import (
     compute_cqvs,
     compute_pscs,
     normalize_hist,
+    compute_sketch_pcts,
+    compute_sketch_hist,
     parse_bin_freq,
     normalize_freq,
     compute_uniq,
 )
+from oss.src.dbs.postgres.tracing.partitions import (
+    PARTITIONED_TABLES,
+    PARTITIONS_STMT,
+    parse_partition_bound,
+    plan_partitions,
+    build_create_partition_stmts,
+    build_drop_partition_stmt,
+)
+from oss.src.dbs.postgres.tracing.rollups import (
+    ROLLUP_MAX_REFRESH,
+    Rollup,
+    floor_timestamp,
+    ceil_timestamp,
+    build_rollup_touched_stmt,
+    plan_refreshes,
+    build_rollup_totals_stmt,
+    build_rollup_continuous_stmt,
+    build_rollup_categorical_stmt,
+    parse_rollups,
+    merge_rollups,
+    plan_rollups,
+    is_rollup_spec,
+    parse_rollup_metric,
+)
 
 
 log = get_module_logger(__name__)
 
+AGENTA_TRACING_ROLLUPS_ENABLED = env.AGENTA_TRACING_ROLLUPS_ENABLED
+
+EXPORT_BATCH_SIZE = env.AGENTA_TRACING_EXPORT_BATCH_SIZE  # spans per page and yield
+
+# the primary key, which includes the partition key
+SPAN_CONFLICT_COLUMNS = [
+    "project_id",
+    "trace_id",
+    "span_id",
+    "start_time",
+]
+
+# same columns as in map_span_dbe_to_span_dbe()
+SPAN_UPDATE_COLUMNS = [
+    "parent_id",
+    "span_kind",
+    "span_name",
+    "start_time",
+    "end_time",
+    "status_code",
+    "status_message",
+    "attributes",
+    "events",
+    "links",
+]
+
+# locks the traces, in a stable order, until the end of the transaction
+TRACE_SUMMARIES_LOCK_STMT = text(
+    """
+    SELECT pg_advisory_xact_lock(hashtextextended(key, 0))
+    FROM (SELECT unnest(CAST(:keys AS TEXT[])) AS key ORDER BY key) AS keys
+    """
+)
+
+# recomputes the summaries of the traces from their spans
+TRACE_SUMMARIES_UPSERT_STMT = text(
+    """
+    INSERT INTO trace_summaries (
+        project_id,
+        trace_id,
+        root_id,
+        trace_type,
+        span_name,
+        start_time,
+        end_time,
+        status_code,
+        span_count,
+        error_count
+    )
+    SELECT
+        project_id,
+        trace_id,
+        (array_agg(span_id ORDER BY start_time) FILTER (WHERE parent_id IS NULL))[1],
+        (array_agg(trace_type ORDER BY start_time) FILTER (WHERE parent_id IS NULL))[1],
+        (array_agg(span_name ORDER BY start_time) FILTER (WHERE parent_id IS NULL))[1],
+        min(start_time),
+        max(end_time),
+        (array_agg(status_code ORDER BY start_time) FILTER (WHERE parent_id IS NULL))[1],
+        count(*),
+        count(*) FILTER (WHERE status_code = 'STATUS_CODE_ERROR')
+    FROM spans
+    WHERE project_id = :project_id
+    AND trace_id = ANY(CAST(:trace_ids AS UUID[]))
+    GROUP BY project_id, trace_id
+    ON CONFLICT (project_id, trace_id) DO UPDATE SET
+        root_id = EXCLUDED.root_id,
+        trace_type = EXCLUDED.trace_type,
+        span_name = EXCLUDED.span_name,
+        start_time = EXCLUDED.start_time,
+        end_time = EXCLUDED.end_time,
+        status_code = EXCLUDED.status_code,
+        span_count = EXCLUDED.span_count,
+        error_count = EXCLUDED.error_count
+    """
+)
+
+# drops the summaries of the traces left without spans
+TRACE_SUMMARIES_DELETE_STMT = text(
+    """
+    DELETE FROM trace_summaries
+    WHERE project_id = :project_id
+    AND trace_id = ANY(CAST(:trace_ids AS UUID[]))
+    AND NOT EXISTS (
+        SELECT 1 FROM spans
+        WHERE spans.project_id = trace_summaries.project_id
+        AND spans.trace_id = trace_summaries.trace_id
+    )
+    """
+)
+
 
 class TracingDAO(TracingDAOInterface):
     def __init__(self):
@@ -97,8 +225,22 @@ class TracingDAO(TracingDAOInterface):
 
         try:
             async with engine.tracing_session() as session:
+                await self._check_span_conflicts(
+                    session=session,
+                    project_id=project_id,
+                    span_dbes=[span_dbe],
+                )
+
                 session.add(span_dbe)
 
+                await session.flush()
+
+                await self._refresh_trace_summaries(
+                    session=session,
+                    project_id=project_id,
+                    trace_ids=[span_dbe.trace_id],
+                )
+
                 await session.commit()
 
                 link_dto = map_span_dbe_to_link_dto(
@@ -133,7 +275,23 @@ class TracingDAO(TracingDAOInterface):
 
         try:
             async with engine.tracing_session() as session:
-                session.add_all(span_dbes)
+                await self._check_span_conflicts(
+                    session=session,
+                    project_id=project_id,
+                    span_dbes=span_dbes,
+                )
+
+                await bulk_insert(
+                    session=session,
+                    DBE=SpanDBE,
+                    values=map_dbes_to_values(span_dbes),
+                )
+
+                await self._refresh_trace_summaries(
+                    session=session,
+                    project_id=project_id,
+                    trace_ids=[span_dbe.trace_id for span_dbe in span_dbes],
+                )
 
                 await session.commit()
 
@@ -246,6 +404,14 @@ class TracingDAO(TracingDAOInterface):
                 user_id=user_id,
             )
 
+            await session.flush()
+
+            await self._refresh_trace_summaries(
+                session=session,
+                project_id=project_id,
+                trace_ids=[existing_span_dbe.trace_id],
+            )
+
             await session.commit()
 
             link_dto = map_span_dbe_to_link_dto(
@@ -273,54 +439,76 @@ class TracingDAO(TracingDAOInterface):
             for span_dto in span_dtos
         ]
 
-        span_ids = [span_dbe.span_id for span_dbe in new_span_dbes]
+        # the same span sent twice is written once, the last one wins
+        new_span_dbes = list(
+            {
+                (span_dbe.trace_id, span_dbe.span_id): span_dbe
+                for span_dbe in new_span_dbes
+            }.values()
+        )
 
-        async with engine.tracing_session() as session:
-            link_dtos: List[OTelLink] = []
+        span_ids = [(dbe.trace_id, dbe.span_id) for dbe in new_span_dbes]
 
-            stmt = select(SpanDBE).filter(
-                SpanDBE.project_id == project_id,
-                SpanDBE.span_id.in_(span_ids),
+        async with engine.tracing_session() as session:
+            # edits, not creations: nothing is written when no span exists yet
+            stmt = (
+                select(SpanDBE.span_id)
+                .filter(
+                    SpanDBE.project_id == project_id,
+                    tuple_(SpanDBE.trace_id, SpanDBE.span_id).in_(span_ids),
+                )
+                .limit(1)
             )
 
-            stmt = stmt.limit(len(span_ids))
-
             result = await session.execute(stmt)
 
-            existing_span_dbes = result.scalars().all()
-
-            if not existing_span_dbes:
-                return link_dtos
-
-            existing_span_dbes = {
-                span_dbe.span_id: span_dbe for span_dbe in existing_span_dbes
-            }
+            if result.first() is None:
+                return []
 
-            for new_span_dbe in new_span_dbes:
-                existing_span_dbe = existing_span_dbes.get(new_span_dbe.span_id)
+            # spans moved in time would not conflict with their previous rows
+            await session.execute(
+                delete(SpanDBE).where(
+                    SpanDBE.project_id == project_id,
+                    tuple_(SpanDBE.trace_id, SpanDBE.span_id).in_(span_ids),
+                    tuple_(
+                        SpanDBE.trace_id,
+                        SpanDBE.span_id,
+                        SpanDBE.start_time,
+                    ).not_in(
+                        [
+                            (dbe.trace_id, dbe.span_id, dbe.start_time)
+                            for dbe in new_span_dbes
+                        ]
+                    ),
+                )
+            )
 
-                if existing_span_dbe:
-                    map_span_dbe_to_span_dbe(
-                        existing_span_dbe=existing_span_dbe,
-                        new_span_dbe=new_span_dbe,
-                        user_id=user_id,
-                    )
+            await bulk_insert(
+                session=session,
+                DBE=SpanDBE,
+                values=map_dbes_to_values(new_span_dbes),
+                conflict=SPAN_CONFLICT_COLUMNS,
+                update=SPAN_UPDATE_COLUMNS,
+                extra={
+                    "updated_at": func.now(),
+                    "updated_by_id": user_id,
+                },
+            )
 
-                    del existing_span_dbes[new_span_dbe.span_id]
+            await self._refresh_trace_summaries(
+                session=session,
+                project_id=project_id,
+                trace_ids=[new_span_dbe.trace_id for new_span_dbe in new_span_dbes],
+            )
 
-                else:
-                    session.add(new_span_dbe)
+            await session.commit()
 
-                link_dto = map_span_dbe_to_link_dto(
+            link_dtos = [
+                map_span_dbe_to_link_dto(
                     span_dbe=new_span_dbe,
                 )
-
-                link_dtos.append(link_dto)
-
-            for remaining_span_dbe in existing_span_dbes.values():
-                await session.delete(remaining_span_dbe)
-
-            await session.commit()
+                for new_span_dbe in new_span_dbes
+            ]
 
             return link_dtos
 
@@ -354,6 +542,14 @@ class TracingDAO(TracingDAOInterface):
 
             await session.delete(span_dbe)
 
+            await session.flush()
+
+            await self._refresh_trace_summaries(
+                session=session,
+                project_id=project_id,
+                trace_ids=[span_dbe.trace_id],
+            )
+
             await session.commit()
 
             return link_dto
@@ -392,6 +588,14 @@ class TracingDAO(TracingDAOInterface):
             for span_dbe in span_dbes:
                 await session.delete(span_dbe)
 
+            await session.flush()
+
+            await self._refresh_trace_summaries(
+                session=session,
+                project_id=project_id,
+                trace_ids=[span_dbe.trace_id for span_dbe in span_dbes],
+            )
+
             await session.commit()
 
             return link_dtos
@@ -494,6 +698,14 @@ class TracingDAO(TracingDAOInterface):
             for span_dbe in span_dbes:
                 await session.delete(span_dbe)
 
+            await session.flush()
+
+            await self._refresh_trace_summaries(
+                session=session,
+                project_id=project_id,
+                trace_ids=[span_dbe.trace_id for span_dbe in span_dbes],
+            )
+
             await session.commit()
 
             return link_dtos
@@ -530,10 +742,111 @@ class TracingDAO(TracingDAOInterface):
             for span_dbe in span_dbes:
                 await session.delete(span_dbe)
 
+            await session.flush()
+
+            await self._refresh_trace_summaries(
+                session=session,
+                project_id=project_id,
+                trace_ids=[span_dbe.trace_id for span_dbe in span_dbes],
+            )
+
             await session.commit()
 
             return link_dtos
 
+    async def _check_span_conflicts(
+        self,
+        *,
+        session,
+        project_id: UUID,
+        span_dbes: List[SpanDBE],
+    ) -> None:
+        """
+        Raise an EntityCreationConflict for spans that already exist, whatever
+        their start time.
+
+        The primary key includes the partition key, start_time, so it only
+        catches spans created again with the same start time. The traces are
+        locked first, as for their summaries, so that concurrent creations of
+        the same span are serialized.
+        """
+
+        span_ids = [(dbe.trace_id, dbe.span_id) for dbe in span_dbes]
+
+        if not span_ids:
+            return
+
+        await session.execute(
+            TRACE_SUMMARIES_LOCK_STMT,
+            {
+                "keys": sorted(
+                    {f"{project_id}:{UUID(str(trace_id))}" for trace_id, _ in span_ids}
+                )
+            },
+        )
+
+        duplicate = None
+        seen = set()
+
+        for span_id in span_ids:
+            if span_id in seen:
+                duplicate = span_id
+                break
+
+            seen.add(span_id)
+
+        if duplicate is None:
+            stmt = (
+                select(SpanDBE.trace_id, SpanDBE.span_id)
+                .filter(
+                    SpanDBE.project_id == project_id,
+                    tuple_(SpanDBE.trace_id, SpanDBE.span_id).in_(span_ids),
+                )
+                .limit(1)
+            )
+
+            duplicate = (await session.execute(stmt)).first()
+
+        if duplicate is not None:
+            trace_id, span_id = duplicate
+
+            raise EntityCreationConflict(
+                conflict={
+                    "trace_id": str(trace_id),
+                    "span_id": str(span_id),
+                },
+            )
+
+    async def _refresh_trace_summaries(
+        self,
+        *,
+        session,
+        project_id: UUID,
+        trace_ids: List[UUID],
+    ) -> None:
+        """
+        Recompute the summaries of the given traces, within the transaction
+        that wrote their spans.
+
+        Refreshes of the same trace are serialized, so that the last one to
+        run sees every span committed by the others.
+        """
+
+        trace_ids = sorted({UUID(str(trace_id)) for trace_id in trace_ids})
+
+        if not trace_ids:
+            return
+
+        await session.execute(
+            TRACE_SUMMARIES_LOCK_STMT,
+            {"keys": [f"{project_id}:{trace_id}" for trace_id in trace_ids]},
+        )
+
+        params = {"project_id": project_id, "trace_ids": trace_ids}
+
+        await session.execute(TRACE_SUMMARIES_UPSERT_STMT, params)
+        await session.execute(TRACE_SUMMARIES_DELETE_STMT, params)
+
     ### QUERY
 
     @suppress_exceptions(default=[])
@@ -547,10 +860,6 @@ class TracingDAO(TracingDAOInterface):
         # DE-STRUCTURING
         focus = query.formatting.focus if query.formatting else None
 
-        oldest = query.windowing.oldest if query.windowing else None
-        newest = query.windowing.newest if query.windowing else None
-        next = query.windowing.next if query.windowing else None
-        limit = query.windowing.limit if query.windowing else None
         rate = query.windowing.rate if query.windowing else None
 
         operator = query.filtering.operator if query.filtering else None
@@ -567,18 +876,20 @@ class TracingDAO(TracingDAOInterface):
                 await session.execute(TIMEOUT_STMT)
                 # -------
 
-                # BASE (SUB-)STMT
-                base: Select = select(SpanDBE)
-                # ---------------
-
                 # GROUPING
                 if focus == Focus.TRACE:
-                    base = select(
-                        SpanDBE.trace_id,
-                        SpanDBE.start_time,
-                    ).distinct(SpanDBE.trace_id)
+                    return await self._query_traces(
+                        session=session,
+                        project_id=project_id,
+                        #
+                        query=query,
+                    )
                 # --------
 
+                # BASE (SUB-)STMT
+                base: Select = select(SpanDBE)
+                # ---------------
+
                 # SCOPING
                 base = base.filter(SpanDBE.project_id == project_id)
                 # -------
@@ -612,64 +923,20 @@ class TracingDAO(TracingDAOInterface):
                             % 100
                             < percent
                         )
-                # ---------
-
-                # GROUPING
-                if focus == Focus.TRACE:
-                    # WINDOWING
-                    if newest:
-                        if next:
-                            base = base.filter(SpanDBE.start_time <= newest)
-                        else:
-                            base = base.filter(SpanDBE.start_time < newest)
-                    if oldest:
-                        base = base.filter(SpanDBE.start_time >= oldest)
-                    # ---------
 
-                    base = base.order_by(SpanDBE.trace_id, SpanDBE.start_time.desc())
+                base = apply_sharding(base, query.sharding)
 
-                    inner = base.subquery("latest_per_trace")
-
-                    uniq = select(inner.c.trace_id)
-
-                    uniq = uniq.order_by(inner.c.start_time.desc())
-
-                    if next and newest:
-                        uniq = uniq.filter(
-                            or_(
-                                inner.c.start_time < newest,
-                                and_(
-                                    inner.c.start_time == newest,
-                                    inner.c.trace_id < next,
-                                ),
-                            )
-                        )
-
-                    if limit:
-                        uniq = uniq.limit(limit)
-
-                    stmt = (
-                        select(SpanDBE)
-                        .filter(SpanDBE.trace_id.in_(uniq))
-                        .order_by(
-                            func.max(SpanDBE.start_time)
-                            .over(partition_by=SpanDBE.trace_id)
-                            .desc(),
-                            SpanDBE.start_time.asc(),
-                        )
+                if query.windowing:
+                    stmt = apply_windowing(
+                        stmt=base,
+                        DBE=SpanDBE,
+                        attribute="start_time",
+                        order="descending",
+                        windowing=query.windowing,
                     )
                 else:
-                    if query.windowing:
-                        stmt = apply_windowing(
-                            stmt=base,
-                            DBE=SpanDBE,
-                            attribute="start_time",
-                            order="descending",
-                            windowing=query.windowing,
-                        )
-                    else:
-                        stmt = base
-                # --------
+                    stmt = base
+                # ---------
 
                 # DEBUGGING
                 # log.trace(str(stmt.compile(**DEBUG_ARGS)).replace("\n", " "))
@@ -703,6 +970,280 @@ class TracingDAO(TracingDAOInterface):
             log.error(format_exc())
             raise e
 
+    async def _query_traces(
+        self,
+        *,
+        session,
+        project_id: UUID,
+        #
+        query: TracingQuery,  # type: ignore
+    ) -> List[OTelFlatSpan]:
+        """
+        Page over trace summaries, ordered by trace start_time (descending),
+        then read the spans of the traces in that page only.
+
+        A trace matches the filtering conditions when any of its spans does.
+        """
+
+        # DE-STRUCTURING
+        oldest = query.windowing.oldest if query.windowing else None
+        newest = query.windowing.newest if query.windowing else None
+        next = query.windowing.next if query.windowing else None
+        limit = query.windowing.limit if query.windowing else None
+        rate = query.windowing.rate if query.windowing else None
+
+        operator = query.filtering.operator if query.filtering else None
+        conditions = query.filtering.conditions if query.filtering else None
+        # --------------
+
+        # BASE (SUB-)STMT
+        page: Select = select(TraceSummaryDBE.trace_id)
+        # ---------------
+
+        # SCOPING
+        page = page.filter(TraceSummaryDBE.project_id == project_id)
+        # -------
+
+        # FILTERING
+        if operator and conditions:
+            page = page.filter(
+                select(SpanDBE.span_id)
+                .filter(
+                    SpanDBE.project_id == TraceSummaryDBE.project_id,
+                    SpanDBE.trace_id == TraceSummaryDBE.trace_id,
+                    type_cast(
+                        ColumnElement[bool],
+                        combine(
+                            operator=operator,
+                            clauses=filter(conditions),
+                        ),
+                    ),
+                )
+                .exists()
+            )
+        # ---------
+
+        # WINDOWING
+        if rate is not None:
+            percent = max(0, min(int(rate * 100.0), 100))
+
+            if percent == 0:
+                return []
+
+            if percent < 100:
+                page = page.where(
+                    cast(
+                        text("concat('x', left(cast(trace_id as varchar), 8))"),
+                        BIT(32),
+                    ).cast(BigInteger)
+                    % 100
+                    < percent
+                )
+
+        page = apply_sharding(page, query.sharding)
+
+        if newest:
+            if next:
+                page = page.filter(
+                    or_(
+                        TraceSummaryDBE.start_time < newest,
+                        and_(
+                            TraceSummaryDBE.start_time == newest,
+                            TraceSummaryDBE.trace_id < next,
+                        ),
+                    )
+                )
+            else:
+                page = page.filter(TraceSummaryDBE.start_time < newest)
+        if oldest:
+            page = page.filter(TraceSummaryDBE.start_time >= oldest)
+
+        page = page.order_by(
+            TraceSummaryDBE.start_time.desc(),
+            TraceSummaryDBE.trace_id.desc(),
+        )
+
+        if limit:
+            page = page.limit(limit)
+        # ---------
+
+        # EXECUTION
+        trace_ids = (await session.execute(page)).scalars().all()
+        # ---------
+
+        if not trace_ids:
+            return []
+
+        # HYDRATION
+        stmt = (
+            select(SpanDBE)
+            .filter(
+                SpanDBE.project_id == project_id,
+                SpanDBE.trace_id.in_(trace_ids),
+            )
+            .order_by(SpanDBE.start_time.asc())
+        )
+
+        dbes = list((await session.execute(stmt)).scalars().all())
+
+        positions = {trace_id: position for position, trace_id in enumerate(trace_ids)}
+
+        dbes.sort(key=lambda dbe: positions[dbe.trace_id])  # stable
+        # ---------
+
+        span_dtos = [map_span_dbe_to_span_dto(span_dbe=dbe) for dbe in dbes]
+
+        return span_dtos
+
+    async def export(
+        self,
+        *,
+        project_id: UUID,
+        #
+        query: TracingQuery,  # type: ignore
+        #
+        batch_size: int = EXPORT_BATCH_SIZE,
+    ) -> AsyncGenerator[List[OTelFlatSpan], None]:
+        """
+        Yield the spans matching the query, in batches of at most `batch_size`,
+        in ascending (start_time, trace_id, span_id) order.
+
+        Spans are read in keyset pages of `batch_size` rows, each page in its
+        own short session, closed before the page is yielded, so memory stays
+        bounded by the batch size, no statement hits the timeout, and no
+        connection is held while slow clients drain the stream.
+        """
+
+        # DE-STRUCTURING
+        oldest = query.windowing.oldest if query.windowing else None
+        newest = query.windowing.newest if query.windowing else None
+        limit = query.windowing.limit if query.windowing else None
+        rate = query.windowing.rate if query.windowing else None
+
+        operator = query.filtering.operator if query.filtering else None
+        conditions = query.filtering.conditions if query.filtering else None
+        # --------------
+
+        # BASE (SUB-)STMT
+        base: Select = select(SpanDBE)
+        # ---------------
+
+        # SCOPING
+        base = base.filter(SpanDBE.project_id == project_id)
+        # -------
+
+        # FILTERING
+        if operator and conditions:
+            base = base.filter(
+                type_cast(
+                    ColumnElement[bool],
+                    combine(
+                        operator=operator,
+                        clauses=filter(conditions),
+                    ),
+                )
+            )
+        # ---------
+
+        # WINDOWING
+        if rate is not None:
+            percent = max(0, min(int(rate * 100.0), 100))
+
+            if percent == 0:
+                return
+
+            if percent < 100:
+                base = base.where(
+                    cast(
+                        text("concat('x', left(cast(trace_id as varchar), 8))"),
+                        BIT(32),
+                    ).cast(BigInteger)
+                    % 100
+                    < percent
+                )
+
+        base = apply_sharding(base, query.sharding)
+
+        if newest:
+            base = base.filter(SpanDBE.start_time < newest)
+        if oldest:
+            base = base.filter(SpanDBE.start_time >= oldest)
+
+        base = base.order_by(
+            SpanDBE.start_time.asc(),
+            SpanDBE.trace_id.asc(),
+            SpanDBE.span_id.asc(),
+        )
+        # ---------
+
+        cursor: Optional[Tuple[datetime, UUID, UUID]] = None
+        exported = 0
+
+        try:
+            while limit is None or exported < limit:
+                page_size = batch_size
+
+                if limit is not None:
+                    page_size = min(page_size, limit - exported)
+
+                # KEYSET PAGINATION
+                stmt = base
+
+                if cursor:
+                    stmt = stmt.filter(
+                        tuple_(
+                            SpanDBE.start_time,
+                            SpanDBE.trace_id,
+                            SpanDBE.span_id,
+                        )
+                        > tuple_(*cursor)
+                    )
+
+                stmt = stmt.limit(page_size)
+                # -----------------
+
+                async with engine.tracing_session() as session:
+                    # TIMEOUT
+                    await session.execute(TIMEOUT_STMT)
+                    # -------
+
+                    # EXECUTION
+                    result = await session.execute(stmt)
+
+                    dbes = result.scalars().all()
+                    # ---------
+
+                if dbes:
+                    cursor = (
+                        dbes[-1].start_time,
+                        dbes[-1].trace_id,
+                        dbes[-1].span_id,
+                    )
+
+                    yield [map_span_dbe_to_span_dto(span_dbe=dbe) for dbe in dbes]
+
+                exported += len(dbes)
+
+                if len(dbes) < page_size:
+                    break
+
+        except DBAPIError as e:
+            log.error(f"{type(e).__name__}: {e}")
+            log.error(format_exc())
+
+            if "QueryCanceledError" in str(e.orig):
+                raise Exception(  # pylint: disable=broad-exception-raised
+                    "TracingQuery export was cancelled due to timeout. "
+                    "Please try again with a narrower filter."
+                ) from e
+
+            raise e
+
+        except Exception as e:
+            log.error(f"{type(e).__name__}: {e}")
+            log.error(format_exc())
+            raise e
+
     ### ANALYTICS
 
     @suppress_exceptions(default=[])
@@ -725,6 +1266,35 @@ class TracingDAO(TracingDAOInterface):
             timestamps,
         ) = parse_windowing(query.windowing)
 
+        # ROLLUPS
+        if AGENTA_TRACING_ROLLUPS_ENABLED and not (
+            query.filtering and query.filtering.conditions
+        ):
+            try:
+                buckets = await self._legacy_analytics_from_rollups(
+                    project_id=project_id,
+                    #
+                    focus=(
+                        query.formatting.focus
+                        if query.formatting and query.formatting.focus
+                        else Focus.SPAN
+                    ),
+                    oldest=oldest,
+                    newest=newest,
+                    interval=interval,
+                    timestamps=timestamps,
+                )
+
+                if buckets is not None:
+                    return buckets
+
+            except Exception:  # pylint: disable=broad-exception-caught
+                log.warning(
+                    "[TRACING] [analytics] failed to read rollups, scanning spans",
+                    exc_info=True,
+                )
+        # -------
+
         try:
             async with engine.tracing_session() as session:
                 await session.execute(TIMEOUT_STMT)
@@ -736,7 +1306,7 @@ class TracingDAO(TracingDAOInterface):
                 _tokens = None
                 _timestamp = func.date_bin(
                     text(f"'{stride}'"),
-                    SpanDBE.created_at,
+                    SpanDBE.start_time,
                     oldest,
                 ).label("timestamp")
                 # ------------------
@@ -796,13 +1366,13 @@ class TracingDAO(TracingDAOInterface):
 
                 # WINDOWING
                 total_stmt = total_stmt.filter(
-                    SpanDBE.created_at >= oldest,
-                    SpanDBE.created_at < newest,
+                    SpanDBE.start_time >= oldest,
+                    SpanDBE.start_time < newest,
                 )
 
                 errors_stmt = errors_stmt.filter(
-                    SpanDBE.created_at >= oldest,
-                    SpanDBE.created_at < newest,
+                    SpanDBE.start_time >= oldest,
+                    SpanDBE.start_time < newest,
                 )
                 # ---------
 
@@ -957,6 +1527,33 @@ class TracingDAO(TracingDAOInterface):
             for idx, s in enumerate(specs)
         }
 
+        # ROLLUPS
+        if (
+            AGENTA_TRACING_ROLLUPS_ENABLED
+            and not query.filtering.conditions
+            and (query.windowing.rate is None or query.windowing.rate >= 1.0)
+            and all(is_rollup_spec(s) for s in metric_specs.values())
+        ):
+            try:
+                buckets = await self._analytics_from_rollups(
+                    project_id=project_id,
+                    #
+                    oldest=oldest,
+                    newest=newest,
+                    interval=interval,
+                    metric_specs=metric_specs,
+                )
+
+                if buckets is not None:
+                    return buckets
+
+            except Exception:  # pylint: disable=broad-exception-caught
+                log.warning(
+                    "[TRACING] [analytics] failed to read rollups, scanning spans",
+                    exc_info=True,
+                )
+        # -------
+
         type_flags = build_type_flags(
             metric_specs=list(metric_specs.values()),
         )
@@ -1034,6 +1631,17 @@ class TracingDAO(TracingDAOInterface):
                 value = compute_pscs(value)
             elif kind == "cont_hist":
                 value = normalize_hist(r["value"] or [])
+            elif kind == "cont_sketch":
+                value = r["value"] or {}
+                options = {
+                    key: value.pop(key, None)
+                    for key in ("bins", "vmin", "vmax", "edge")
+                }
+                value = compute_sketch_pcts(value)
+                value = compute_sketch_hist(value, **options)
+                value = compute_iqrs(value)
+                value = compute_cqvs(value)
+                value = compute_pscs(value)
 
             elif kind == "disc_count":
                 value = r["value"] or {}
@@ -1119,3 +1727,481 @@ class TracingDAO(TracingDAOInterface):
         # ---------
 
         return buckets
+
+    async def _legacy_analytics_from_rollups(
+        self,
+        *,
+        project_id: UUID,
+        #
+        focus: Focus,
+        oldest: datetime,
+        newest: datetime,
+        interval: int,
+        timestamps: List[datetime],
+    ) -> Optional[List[Bucket]]:
+        async with engine.tracing_session() as session:
+            await session.execute(TIMEOUT_STMT)
+
+            watermarks = await self._read_rollup_watermarks(session=session)
+
+            segments = plan_rollups(
+                oldest=oldest,
+                newest=newest,
+                interval=interval,
+                watermarks=watermarks,
+            )
+
+            if segments is None:
+                return None
+
+            rollups = await self._read_rollups(
+                session=session,
+                project_id=project_id,
+                focus=focus,
+                segments=segments,
+                totals=True,
+                metrics=False,
+            )
+
+        rollups = merge_rollups(
+            rollups,
+            granularity=interval,
+            origin=oldest,
+        )
+
+        buckets = map_rollups_to_buckets(
+            rollups=rollups,
+            interval=interval,
+            timestamps=timestamps,
+        )
+
+        return buckets
+
+    async def _analytics_from_rollups(
+        self,
+        *,
+        project_id: UUID,
+        #
+        oldest: datetime,
+        newest: datetime,
+        interval: int,
+        metric_specs: Dict[int, MetricSpec],
+    ) -> Optional[List[MetricsBucket]]:
+        async with engine.tracing_session() as session:
+            await session.execute(TIMEOUT_STMT)
+
+            watermarks = await self._read_rollup_watermarks(session=session)
+
+            segments = plan_rollups(
+                oldest=oldest,
+                newest=newest,
+                interval=interval,
+                watermarks=watermarks,
+            )
+
+            if segments is None:
+                return None
+
+            rollups = await self._read_rollups(
+                session=session,
+                project_id=project_id,
+                focus=Focus.TRACE,
+                segments=segments,
+                totals=False,
+                metrics=True,
+            )
+
+        rollups = merge_rollups(
+            rollups,
+            granularity=interval,
+            origin=oldest,
+        )
+
+        buckets: List[MetricsBucket] = []
+
+        for rollup in rollups:
+            metrics: Dict[str, Dict[str, Any]] = dict()
+
+            for spec in metric_specs.values():
+                value = parse_rollup_metric(
+                    (rollup["metrics"] or {}).get(spec.path),
+                    spec,
+                )
+
+                if not value:
+                    continue
+
+                _path = "attributes." + spec.path  # revert path prefix removal
+
+                metrics[_path] = dict(type=spec.type.value) | value
+
+            if not metrics:
+                continue
+
+            bucket = MetricsBucket(
+                timestamp=rollup["timestamp"],
+                interval=interval,
+                metrics=metrics,
+            )
+            buckets.append(bucket)
+
+        return buckets
+
+    ### ROLLUPS
+
+    @suppress_exceptions(default=False)
+    async def refresh_rollups(
+        self,
+        *,
+        oldest: datetime,
+        newest: datetime,
+    ) -> bool:
+        """
+        Recompute the rollups of all projects for the minutes that the spans
+        created in [oldest, newest) started in, per minute from spans and per
+        hour from the per-minute rollups.
+
+        When the rollups lag behind `oldest`, the refresh resumes from where
+        they stop instead, at most `ROLLUP_MAX_REFRESH` at a time.
+        """
+
+        oldest = floor_timestamp(oldest, 1)
+        newest = floor_timestamp(newest, 1)
+
+        async with engine.tracing_session() as session:
+            watermarks = await self._read_rollup_watermarks(session=session)
+
+            minutes = watermarks.get(1)
+
+            if minutes is not None and minutes[1] < oldest:
+                oldest = minutes[1]
+                newest = min(newest, oldest + ROLLUP_MAX_REFRESH)
+
+            if newest <= oldest:
+                return True
+
+            timestamps = (
+                (
+                    await session.execute(
+                        build_rollup_touched_stmt(
+                            oldest=oldest,
+                            newest=newest,
+                        )
+                    )
+                )
+                .scalars()
+                .all()
+            )
+
+            for _oldest, _newest in plan_refreshes(timestamps):
+                await self._refresh_rollups(
+                    session=session,
+                    oldest=_oldest,
+                    newest=_newest,
+                )
+
+            # WATERMARKS
+            # spans start before they are created: all spans that started before
+            # newest and were created since the rollups began are now rolled up
+            if minutes is None:
+                minutes = (oldest, newest)
+            elif oldest <= minutes[1] and newest >= minutes[0]:
+                minutes = (min(oldest, minutes[0]), max(newest, minutes[1]))
+
+            hours = (ceil_timestamp(minutes[0], 60), floor_timestamp(minutes[1], 60))
+
+            watermarks = [
+                dict(granularity=granularity, oldest=_oldest, newest=_newest)
+                for granularity, (_oldest, _newest) in ((1, minutes), (60, hours))
+                if _oldest < _newest
+            ]
+
+            await bulk_insert(
+                session=session,
+                DBE=SpanRollupWatermarkDBE,
+                values=watermarks,
+                conflict=["granularity"],
+                update=["oldest", "newest"],
+            )
+            # ----------
+
+            await session.commit()
+
+        return True
+
+    async def _refresh_rollups(
+        self,
+        *,
+        session,
+        oldest: datetime,
+        newest: datetime,
+    ) -> None:
+        # MINUTES
+        rollups = await self._compute_rollups(
+            session=session,
+            oldest=oldest,
+            newest=newest,
+            focuses=[Focus.TRACE, Focus.SPAN],
+            totals=True,
+            metrics=True,
+        )
+
+        await self._replace_rollups(
+            session=session,
+            granularity=1,
+            oldest=oldest,
+            newest=newest,
+            rollups=rollups,
+        )
+        # -------
+
+        # HOURS
+        hours_oldest = floor_timestamp(oldest, 60)
+        hours_newest = ceil_timestamp(newest, 60)
+
+        rollups = (
+            (
+                await session.execute(
+                    select(SpanRollupDBE.__table__).where(
+                        SpanRollupDBE.granularity == 1,
+                        SpanRollupDBE.timestamp >= hours_oldest,
+                        SpanRollupDBE.timestamp < hours_newest,
+                    )
+                )
+            )
+            .mappings()
+            .all()
+        )
+
+        rollups = merge_rollups(
+            [dict(rollup) for rollup in rollups],
+            granularity=60,
+            origin=hours_oldest,
+        )
+
+        await self._replace_rollups(
+            session=session,
+            granularity=60,
+            oldest=hours_oldest,
+            newest=hours_newest,
+            rollups=rollups,
+        )
+        # -----
+
+    async def _read_rollup_watermarks(
+        self,
+        *,
+        session,
+    ) -> Dict[int, Tuple[datetime, datetime]]:
+        watermark_dbes = (
+            (await session.execute(select(SpanRollupWatermarkDBE))).scalars().all()
+        )
+
+        return {
+            watermark_dbe.granularity: (watermark_dbe.oldest, watermark_dbe.newest)
+            for watermark_dbe in watermark_dbes
+        }
+
+    async def _compute_rollups(
+        self,
+        *,
+        session,
+        oldest: datetime,
+        newest: datetime,
+        project_id: Optional[UUID] = None,
+        focuses: List[Focus],
+        totals: bool,
+        metrics: bool,
+    ) -> List[Rollup]:
+        rollups: List[Rollup] = []
+
+        for focus in focuses:
+            totals_rows = []
+            continuous_rows = []
+            categorical_rows = []
+
+            if totals:
+                totals_rows = (
+                    await session.execute(
+                        build_rollup_totals_stmt(
+                            focus=focus,
+                            oldest=oldest,
+                            newest=newest,
+                            project_id=project_id,
+                        )
+                    )
+                ).all()
+
+            if metrics and focus == Focus.TRACE:
+                continuous_rows = (
+                    await session.execute(
+                        build_rollup_continuous_stmt(
+                            oldest=oldest,
+                            newest=newest,
+                            project_id=project_id,
+                        )
+                    )
+                ).all()
+
+                categorical_rows = (
+                    await session.execute(
+                        build_rollup_categorical_stmt(
+                            oldest=oldest,
+                            newest=newest,
+                            project_id=project_id,
+                        )
+                    )
+                ).all()
+
+            rollups += parse_rollups(
+                focus=focus,
+                totals_rows=totals_rows,
+                continuous_rows=continuous_rows,
+                categorical_rows=categorical_rows,
+            )
+
+        return rollups
+
+    async def _read_rollups(
+        self,
+        *,
+        session,
+        project_id: UUID,
+        focus: Focus,
+        segments: List[Tuple[Optional[int], datetime, datetime]],
+        totals: bool,
+        metrics: bool,
+    ) -> List[Rollup]:
+        rollups: List[Rollup] = []
+
+        for granularity, oldest, newest in segments:
+            if granularity is None:
+                rollups += await self._compute_rollups(
+                    session=session,
+                    oldest=oldest,
+                    newest=newest,
+                    project_id=project_id,
+                    focuses=[focus],
+                    totals=totals,
+                    metrics=metrics,
+                )
+
+                continue
+
+            rollups += [
+                dict(rollup)
+                for rollup in (
+                    await session.execute(
+                        select(SpanRollupDBE.__table__).where(
+                            SpanRollupDBE.project_id == project_id,
+                            SpanRollupDBE.granularity == granularity,
+                            SpanRollupDBE.focus == focus.value,
+                            SpanRollupDBE.timestamp >= oldest,
+                            SpanRollupDBE.timestamp < newest,
+                        )
+                    )
+                )
+                .mappings()
+                .all()
+            ]
+
+        return rollups
+
+    async def _replace_rollups(
+        self,
+        *,
+        session,
+        granularity: int,
+        oldest: datetime,
+        newest: datetime,
+        rollups: List[Rollup],
+    ) -> None:
+        await session.execute(
+            delete(SpanRollupDBE).where(
+                SpanRollupDBE.granularity == granularity,
+                SpanRollupDBE.timestamp >= oldest,
+                SpanRollupDBE.timestamp < newest,
+            )
+        )
+
+        await bulk_insert(
+            session=session,
+            DBE=SpanRollupDBE,
+            values=rollups,
+        )
+
+    ### PARTITIONS
+
+    @suppress_exceptions(default=False)
+    async def refresh_partitions(
+        self,
+        *,
+        timestamp: datetime,
+        interval: timedelta,
+        ahead: int,
+        retention: Optional[timedelta] = None,
+    ) -> bool:
+        """
+        Create the partitions of spans and nodes ahead of `timestamp`, and drop
+        the ones that fall out of `retention`, if any.
+        """
+
+        for table in PARTITIONED_TABLES:
+            async with engine.tracing_session() as session:
+                rows = (await session.execute(PARTITIONS_STMT, {"table": table})).all()
+
+                if not rows:  # not partitioned
+                    continue
+
+                bounds = {
+                    name: bound
+                    for name, bound in (
+                        (row.name, parse_partition_bound(row.bound)) for row in rows
+                    )
+                    if bound is not None
+                }
+
+                creates, drops = plan_partitions(
+                    table=table,
+                    bounds=bounds,
+                    timestamp=timestamp,
+                    interval=interval,
+                    ahead=ahead,
+                    retention=retention,
+                )
+
+                for partition in creates:
+                    for stmt in build_create_partition_stmts(
+                        table=table,
+                        partition=partition,
+                    ):
+                        await session.execute(stmt)
+
+                for name in drops:
+                    await session.execute(
+                        build_drop_partition_stmt(table=table, name=name)
+                    )
+
+                if drops and table == "spans":
+                    await session.execute(
+                        delete(TraceSummaryDBE).where(
+                            TraceSummaryDBE.start_time
+                            < max(bounds[name][1] for name in drops),
+                            ~select(SpanDBE.span_id)
+                            .filter(
+                                SpanDBE.project_id == TraceSummaryDBE.project_id,
+                                SpanDBE.trace_id == TraceSummaryDBE.trace_id,
+                            )
+                            .exists(),
+                        )
+                    )
+
+                await session.commit()
+
+                if creates or drops:
+                    log.info(
+                        f"[PARTITIONS] {table}: "
+                        f"created {[name for name, _, _ in creates]}, dropped {drops}"
+                    )
+
+        return True
@@ -1,5 +1,6 @@
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy import Column, UUID, TIMESTAMP, Enum as ENUM, VARCHAR
+from sqlalchemy import INTEGER, BIGINT, NUMERIC
 
 from oss.src.core.tracing.dtos import OTelStatusCode as StatusCode
 from oss.src.core.tracing.dtos import OTelSpanKind as SpanKind
@@ -81,3 +82,121 @@ class SpanDBA:
         JSONB(none_as_null=True),
         nullable=True,
     )
+
+
+class TraceSummaryDBA:
+    __abstract__ = True
+
+    trace_id = Column(
+        UUID,
+        nullable=False,
+    )
+    root_id = Column(
+        UUID,
+        nullable=True,
+    )  # span_id of the root span
+
+    trace_type = Column(
+        ENUM(TraceType),
+        nullable=True,
+    )
+    span_name = Column(
+        VARCHAR,
+        nullable=True,
+    )  # of the root span
+
+    start_time = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )  # earliest span start_time
+    end_time = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )  # latest span end_time
+
+    status_code = Column(
+        ENUM(StatusCode),
+        nullable=True,
+    )  # of the root span
+
+    span_count = Column(
+        BIGINT,
+        nullable=False,
+    )
+    error_count = Column(
+        BIGINT,
+        nullable=False,
+    )
+
+
+class SpanRollupDBA:
+    __abstract__ = True
+
+    granularity = Column(
+        INTEGER,
+        nullable=False,
+    )  # minutes
+    timestamp = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )
+    focus = Column(
+        VARCHAR,
+        nullable=False,
+    )
+
+    count = Column(
+        BIGINT,
+        nullable=False,
+    )
+    duration = Column(
+        NUMERIC,
+        nullable=True,
+    )
+    costs = Column(
+        NUMERIC,
+        nullable=True,
+    )
+    tokens = Column(
+        NUMERIC,
+        nullable=True,
+    )
+
+    errors_count = Column(
+        BIGINT,
+        nullable=False,
+    )
+    errors_duration = Column(
+        NUMERIC,
+        nullable=True,
+    )
+    errors_costs = Column(
+        NUMERIC,
+        nullable=True,
+    )
+    errors_tokens = Column(
+        NUMERIC,
+        nullable=True,
+    )
+
+    metrics = Column(
+        JSONB(none_as_null=True),
+        nullable=True,
+    )
+
+
+class SpanRollupWatermarkDBA:
+    __abstract__ = True
+
+    granularity = Column(
+        INTEGER,
+        nullable=False,
+    )  # minutes
+    oldest = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )
+    newest = Column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )
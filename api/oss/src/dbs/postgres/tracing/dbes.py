@@ -6,7 +6,12 @@ from sqlalchemy import (
 )
 
 from oss.src.dbs.postgres.shared.base import Base
-from oss.src.dbs.postgres.tracing.dbas import SpanDBA
+from oss.src.dbs.postgres.tracing.dbas import (
+    SpanDBA,
+    TraceSummaryDBA,
+    SpanRollupDBA,
+    SpanRollupWatermarkDBA,
+)
 from oss.src.dbs.postgres.shared.dbas import ProjectScopeDBA, LifecycleDBA
 
 
@@ -24,7 +29,8 @@ class SpanDBE(
             "project_id",
             "trace_id",
             "span_id",
-        ),  # for uniqueness
+            "start_time",
+        ),  # for uniqueness, including the partition key
         Index(
             "ix_project_id",
             "project_id",
@@ -44,6 +50,22 @@ class SpanDBE(
             "project_id",
             "start_time",
         ),  # for sorting and scrolling
+        Index(
+            "ix_spans_project_id_start_time_root",
+            "project_id",
+            "start_time",
+            postgresql_where=text("parent_id IS NULL"),
+        ),  # for analytics, on root spans
+        Index(
+            "ix_spans_start_time_brin",
+            "start_time",
+            postgresql_using="brin",
+        ),  # for rollups, across projects
+        Index(
+            "ix_spans_created_at_brin",
+            "created_at",
+            postgresql_using="brin",
+        ),  # for rollup refreshes, across projects
         Index(
             "ix_spans_project_id_trace_type",
             "project_id",
@@ -99,4 +121,63 @@ class SpanDBE(
             text("to_tsvector('simple', events)"),
             postgresql_using="gin",
         ),  # for full-text search on events
+        {
+            "postgresql_partition_by": "RANGE (start_time)",
+        },  # see partitions.py
+    )
+
+
+class TraceSummaryDBE(
+    Base,
+    ProjectScopeDBA,
+    TraceSummaryDBA,
+):
+    __tablename__ = "trace_summaries"
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "project_id",
+            "trace_id",
+        ),  # for uniqueness
+        Index(
+            "ix_trace_summaries_project_id_start_time_trace_id",
+            "project_id",
+            desc("start_time"),
+            desc("trace_id"),
+        ),  # for sorting and scrolling
+    )
+
+
+class SpanRollupDBE(
+    Base,
+    ProjectScopeDBA,
+    SpanRollupDBA,
+):
+    __tablename__ = "span_rollups"
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "project_id",
+            "granularity",
+            "focus",
+            "timestamp",
+        ),  # for uniqueness and windowing
+        Index(
+            "ix_span_rollups_granularity_timestamp",
+            "granularity",
+            "timestamp",
+        ),  # for refreshing
+    )
+
+
+class SpanRollupWatermarkDBE(
+    Base,
+    SpanRollupWatermarkDBA,
+):
+    __tablename__ = "span_rollup_watermarks"
+
+    __table_args__ = (
+        PrimaryKeyConstraint(
+            "granularity",
+        ),  # for uniqueness
     )
@@ -1,4 +1,4 @@
-from typing import Optional, List, Tuple
+from typing import Any, Dict, Optional, List, Tuple
 from uuid import UUID
 from datetime import datetime, timezone
 
@@ -247,3 +247,51 @@ def map_buckets(
     ]
 
     return buckets
+
+
+def map_rollups_to_buckets(
+    rollups: List[Dict[str, Any]],
+    interval: int,
+    timestamps: Optional[List[datetime]] = None,
+) -> List[Bucket]:
+    total_metrics = {
+        rollup["timestamp"].isoformat(): Analytics(
+            count=rollup["count"],
+            duration=rollup["duration"],
+            costs=rollup["costs"],
+            tokens=rollup["tokens"],
+        )
+        for rollup in rollups
+    }
+
+    errors_metrics = {
+        rollup["timestamp"].isoformat(): Analytics(
+            count=rollup["errors_count"],
+            duration=rollup["errors_duration"],
+            costs=rollup["errors_costs"],
+            tokens=rollup["errors_tokens"],
+        )
+        for rollup in rollups
+        if rollup["errors_count"]
+    }
+
+    total_timestamps = timestamps
+    if not total_timestamps:
+        total_timestamps = sorted(total_metrics.keys())
+
+    total_timestamps = [
+        timestamp.isoformat() if isinstance(timestamp, datetime) else timestamp
+        for timestamp in total_timestamps
+    ]
+
+    buckets = [
+        Bucket(
+            timestamp=timestamp,
+            interval=interval,
+            total=total_metrics.get(timestamp, Analytics()),
+            errors=errors_metrics.get(timestamp, Analytics()),
+        )
+        for timestamp in total_timestamps
+    ]
+
+    return buckets
@@ -0,0 +1,157 @@
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from re import compile as compile_regex
+
+from sqlalchemy import text
+from sqlalchemy.sql.elements import TextClause
+
+# Spans and nodes are range-partitioned on the column their queries window on
+# (spans.start_time, nodes.created_at). Partitions are created ahead of time
+# and dropped, whole, once they fall out of retention. Rows outside of every
+# partition land in the DEFAULT partition, and are moved out of it when their
+# partition is created.
+
+PARTITIONED_TABLES = {
+    "spans": "start_time",
+    "nodes": "created_at",
+}
+
+PARTITION_EPOCH = datetime(1970, 1, 5, tzinfo=timezone.utc)  # a monday
+
+PARTITION_MAX_CREATE = 64  # per table and per refresh
+
+Bounds = Tuple[Optional[datetime], Optional[datetime]]  # None = MINVALUE
+Partition = Tuple[str, datetime, datetime]
+
+PARTITIONS_STMT = text("""
+    SELECT child.relname AS name, pg_get_expr(child.relpartbound, child.oid) AS bound
+    FROM pg_inherits
+    JOIN pg_class AS parent ON parent.oid = pg_inherits.inhparent
+    JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid
+    WHERE parent.relname = :table
+    AND parent.relkind = 'p'
+    """)
+
+_BOUND_REGEX = compile_regex(r"FROM \((MINVALUE|'[^']+')\) TO \((MAXVALUE|'[^']+')\)")
+
+
+# HELPERS ----------------------------------------------------------------------
+
+
+def _parse_bound_value(value: str) -> Optional[datetime]:
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+
+    return datetime.fromisoformat(value.strip("'")).astimezone(timezone.utc)
+
+
+# INTERFACE --------------------------------------------------------------------
+
+
+def floor_partition(
+    timestamp: datetime,
+    interval: timedelta,
+) -> datetime:
+    return PARTITION_EPOCH + ((timestamp - PARTITION_EPOCH) // interval) * interval
+
+
+def parse_partition_bound(
+    bound: str,
+) -> Optional[Bounds]:
+    """Parse `pg_get_expr(relpartbound)`, None for the DEFAULT partition."""
+
+    match = _BOUND_REGEX.search(bound or "")
+
+    if not match:
+        return None
+
+    return _parse_bound_value(match.group(1)), _parse_bound_value(match.group(2))
+
+
+def plan_partitions(
+    *,
+    table: str,
+    bounds: Dict[str, Bounds],
+    timestamp: datetime,
+    interval: timedelta,
+    ahead: int,
+    retention: Optional[timedelta] = None,
+) -> Tuple[List[Partition], List[str]]:
+    """
+    Plan the partitions to create, contiguous to the newest one and up to
+    `ahead` intervals past `timestamp`, and the partitions to drop, entirely
+    older than `retention`.
+    """
+
+    uppers = [upper for _, upper in bounds.values() if upper is not None]
+
+    newest = max(uppers) if uppers else floor_partition(timestamp, interval)
+    horizon = timestamp + ahead * interval
+
+    creates: List[Partition] = []
+
+    while newest < horizon and len(creates) < PARTITION_MAX_CREATE:
+        start = newest
+        end = floor_partition(start, interval) + interval
+
+        creates.append((f"{table}_p{start:%Y%m%d}", start, end))
+
+        newest = end
+
+    drops: List[str] = []
+
+    if retention is not None:
+        oldest = timestamp - retention
+
+        drops = sorted(
+            name
+            for name, (_, upper) in bounds.items()
+            if upper is not None and upper <= oldest
+        )
+
+    return creates, drops
+
+
+def build_create_partition_stmts(
+    *,
+    table: str,
+    partition: Partition,
+) -> List[TextClause]:
+    """
+    Create the partition detached, move in the rows of the DEFAULT partition
+    that belong to it, then attach it.
+    """
+
+    name, start, end = partition
+    column = PARTITIONED_TABLES[table]
+
+    start, end = start.isoformat(), end.isoformat()
+
+    return [
+        text(
+            f"CREATE TABLE IF NOT EXISTS {name} "
+            f"(LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"
+        ),
+        text(
+            f"WITH moved AS ("
+            f"DELETE FROM {table}_default "
+            f"WHERE {column} >= '{start}' AND {column} < '{end}' "
+            f"RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved"
+        ),
+        text(
+            f"ALTER TABLE {table} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{start}') TO ('{end}')"
+        ),
+    ]
+
+
+def build_drop_partition_stmt(
+    *,
+    table: str,
+    name: str,
+) -> TextClause:
+    if table not in PARTITIONED_TABLES or not name.startswith(f"{table}_"):
+        raise ValueError(f"{name} is not a partition of {table}")
+
+    return text(f'DROP TABLE IF EXISTS "{name}"')
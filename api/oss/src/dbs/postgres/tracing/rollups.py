@@ -0,0 +1,628 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from sqlalchemy import Integer, String, cast, func, literal, select, text, true
+from sqlalchemy import and_, column, values
+from sqlalchemy.sql import Select
+from sqlalchemy.sql.selectable import FromClause
+from sqlalchemy.types import Numeric
+from sqlalchemy.dialects.postgresql import ARRAY, TEXT
+
+from oss.src.core.tracing.dtos import (
+    Condition,
+    Focus,
+    ListOperator,
+    MetricSpec,
+    MetricType,
+)
+
+from oss.src.dbs.postgres.tracing.dbes import SpanDBE
+from oss.src.dbs.postgres.tracing.sketches import (
+    build_sketch_key,
+    merge_sketches,
+)
+from oss.src.dbs.postgres.tracing.utils import (
+    filter,
+    compute_iqrs,
+    compute_cqvs,
+    compute_pscs,
+    merge_sketch_values,
+    compute_sketch_pcts,
+    compute_sketch_hist,
+    normalize_freq,
+    compute_uniq,
+)
+
+# Span rollups hold per-project, per-minute and per-hour aggregates of spans:
+# counts and sums for legacy analytics, for both focuses, and metrics for
+# analytics, on root spans only (focus = trace), for the paths below.
+# Like analytics, they are binned on start_time, the partition key. Refreshes
+# select spans on created_at, when they were ingested, and recompute the minutes
+# they started in, however late they were ingested.
+
+ROLLUP_MAX_REFRESH = timedelta(days=1)
+ROLLUP_REFRESH_GAP = timedelta(minutes=15)  # merged into one recompute if under
+ROLLUP_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+ROLLUP_CONTINUOUS_PATHS = [
+    "ag.metrics.duration.cumulative",
+    "ag.metrics.errors.cumulative",
+    "ag.metrics.costs.cumulative.total",
+    "ag.metrics.tokens.cumulative.total",
+]
+ROLLUP_CATEGORICAL_PATHS = [
+    "ag.type.trace",
+    "ag.type.span",
+]
+
+ROLLUP_TOTALS = [
+    "count",
+    "duration",
+    "costs",
+    "tokens",
+]
+
+Rollup = Dict[str, Any]
+Segment = Tuple[Optional[int], datetime, datetime]
+
+
+# HELPERS ----------------------------------------------------------------------
+
+
+def _add(a: Any, b: Any) -> Any:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return a + b
+
+
+def _min(a: Any, b: Any) -> Any:
+    return b if a is None else a if b is None else min(a, b)
+
+
+def _max(a: Any, b: Any) -> Any:
+    return b if a is None else a if b is None else max(a, b)
+
+
+def _merge_counts(
+    a: Optional[Dict[str, int]],
+    b: Optional[Dict[str, int]],
+) -> Dict[str, int]:
+    merged = dict(a or {})
+
+    for key, count in (b or {}).items():
+        merged[key] = merged.get(key, 0) + int(count)
+
+    return merged
+
+
+def _merge_metric(
+    target: Dict[str, Any],
+    source: Dict[str, Any],
+) -> Dict[str, Any]:
+    target["count"] = target.get("count", 0) + source.get("count", 0)
+
+    if "freq" in source:
+        target["freq"] = _merge_counts(target.get("freq"), source["freq"])
+
+    if "sketch" in source:
+        target["sum"] = _add(target.get("sum"), source.get("sum"))
+        target["min"] = _min(target.get("min"), source.get("min"))
+        target["max"] = _max(target.get("max"), source.get("max"))
+        target["sketch"] = merge_sketches(target.get("sketch"), source["sketch"])
+
+    return target
+
+
+def _merge_rollup(
+    target: Rollup,
+    source: Rollup,
+) -> Rollup:
+    for total in ROLLUP_TOTALS:
+        target[total] = _add(target[total], source.get(total))
+        target[f"errors_{total}"] = _add(
+            target[f"errors_{total}"], source.get(f"errors_{total}")
+        )
+
+    if source.get("metrics"):
+        metrics = target["metrics"] = target["metrics"] or {}
+
+        for path, metric in source["metrics"].items():
+            _merge_metric(metrics.setdefault(path, {}), metric)
+
+    return target
+
+
+def _empty_rollup(
+    *,
+    project_id: UUID,
+    granularity: int,
+    focus: str,
+    timestamp: datetime,
+) -> Rollup:
+    return {
+        "project_id": project_id,
+        "granularity": granularity,
+        "focus": focus,
+        "timestamp": timestamp,
+        **{total: None for total in ROLLUP_TOTALS},
+        **{f"errors_{total}": None for total in ROLLUP_TOTALS},
+        "count": 0,
+        "errors_count": 0,
+        "metrics": None,
+    }
+
+
+def _build_rollup_extract_cte(
+    *,
+    paths: List[str],
+    name: str,
+    oldest: datetime,
+    newest: datetime,
+    project_id: Optional[UUID] = None,
+) -> FromClause:
+    rollup_paths = (
+        values(
+            column("idx", Integer),
+            column("path", ARRAY(TEXT())),
+            name=f"{name}_paths",
+        )
+        .data([(idx, path.split(".")) for idx, path in enumerate(paths)])
+        .alias(f"{name}_paths")
+    )
+
+    timestamp = func.date_bin(
+        text("'1 minute'"),
+        SpanDBE.start_time,
+        oldest,
+    ).label("timestamp")
+
+    extract_stmt = (
+        select(
+            SpanDBE.project_id,
+            timestamp,
+            rollup_paths.c.idx,
+            SpanDBE.attributes.op("#>")(rollup_paths.c.path).label("jv"),
+        )
+        .select_from(SpanDBE)
+        .join(rollup_paths, true())
+        .where(
+            SpanDBE.start_time >= oldest,
+            SpanDBE.start_time < newest,
+            SpanDBE.parent_id.is_(None),
+        )
+    )
+
+    if project_id is not None:
+        extract_stmt = extract_stmt.where(SpanDBE.project_id == project_id)
+
+    return extract_stmt.cte(f"{name}_extract")
+
+
+# INTERFACE --------------------------------------------------------------------
+
+
+def floor_timestamp(
+    timestamp: datetime,
+    granularity: int,
+) -> datetime:
+    step = timedelta(minutes=granularity)
+
+    return ROLLUP_EPOCH + ((timestamp - ROLLUP_EPOCH) // step) * step
+
+
+def ceil_timestamp(
+    timestamp: datetime,
+    granularity: int,
+) -> datetime:
+    floored = floor_timestamp(timestamp, granularity)
+
+    return floored if floored == timestamp else floored + timedelta(minutes=granularity)
+
+
+def build_rollup_touched_stmt(
+    *,
+    oldest: datetime,
+    newest: datetime,
+) -> Select:
+    """Minutes the spans created in [oldest, newest) started in, across projects."""
+
+    timestamp = func.date_bin(
+        text("'1 minute'"),
+        SpanDBE.start_time,
+        ROLLUP_EPOCH,
+    ).label("timestamp")
+
+    return (
+        select(timestamp)
+        .where(
+            SpanDBE.created_at >= oldest,
+            SpanDBE.created_at < newest,
+        )
+        .distinct()
+    )
+
+
+def plan_refreshes(
+    timestamps: Iterable[datetime],
+) -> List[Tuple[datetime, datetime]]:
+    """
+    Merge the minutes to recompute into [oldest, newest) ranges, across gaps of
+    up to `ROLLUP_REFRESH_GAP`, so that they are recomputed in a few queries.
+    """
+
+    ranges: List[Tuple[datetime, datetime]] = []
+
+    step = timedelta(minutes=1)
+
+    for timestamp in sorted(set(timestamps)):
+        if ranges and timestamp - ranges[-1][1] <= ROLLUP_REFRESH_GAP:
+            ranges[-1] = (ranges[-1][0], timestamp + step)
+        else:
+            ranges.append((timestamp, timestamp + step))
+
+    return ranges
+
+
+def build_rollup_totals_stmt(
+    *,
+    focus: Focus,
+    oldest: datetime,
+    newest: datetime,
+    project_id: Optional[UUID] = None,
+) -> Select:
+    """Per-minute counts and sums, as in `TracingDAO.legacy_analytics()`."""
+
+    inc_or_cum = "cumulative" if focus == Focus.TRACE else "incremental"
+
+    metrics = SpanDBE.attributes["ag"]["metrics"]
+
+    duration = cast(metrics["duration"]["cumulative"].astext, Numeric)
+    costs = cast(metrics["costs"][inc_or_cum]["total"].astext, Numeric)
+    tokens = cast(metrics["tokens"][inc_or_cum]["total"].astext, Numeric)
+
+    is_error = and_(
+        *filter(
+            [
+                Condition(
+                    field="events",
+                    operator=ListOperator.IN,
+                    value=[{"name": "exception"}],
+                )
+            ]
+        )
+    )
+
+    timestamp = func.date_bin(
+        text("'1 minute'"),
+        SpanDBE.start_time,
+        oldest,
+    ).label("timestamp")
+
+    totals_stmt = (
+        select(
+            SpanDBE.project_id,
+            timestamp,
+            func.count().label("count"),  # pylint: disable=not-callable
+            func.sum(duration).label("duration"),
+            func.sum(costs).label("costs"),
+            func.sum(tokens).label("tokens"),
+            func.count()  # pylint: disable=not-callable
+            .filter(is_error)
+            .label("errors_count"),
+            func.sum(duration).filter(is_error).label("errors_duration"),
+            func.sum(costs).filter(is_error).label("errors_costs"),
+            func.sum(tokens).filter(is_error).label("errors_tokens"),
+        )
+        .select_from(SpanDBE)
+        .where(
+            SpanDBE.start_time >= oldest,
+            SpanDBE.start_time < newest,
+        )
+        .group_by(SpanDBE.project_id, text("timestamp"))
+    )
+
+    if focus == Focus.TRACE:
+        totals_stmt = totals_stmt.where(SpanDBE.parent_id.is_(None))
+
+    if project_id is not None:
+        totals_stmt = totals_stmt.where(SpanDBE.project_id == project_id)
+
+    return totals_stmt
+
+
+def build_rollup_continuous_stmt(
+    *,
+    oldest: datetime,
+    newest: datetime,
+    project_id: Optional[UUID] = None,
+) -> Select:
+    """Per-minute sketch buckets of root spans, for `ROLLUP_CONTINUOUS_PATHS`."""
+
+    extract_cte = _build_rollup_extract_cte(
+        paths=ROLLUP_CONTINUOUS_PATHS,
+        name="rollup_cont",
+        oldest=oldest,
+        newest=newest,
+        project_id=project_id,
+    )
+
+    value = cast(extract_cte.c.jv.op("#>>")(text("'{}'")), Numeric)
+
+    cont_raw = (
+        select(
+            extract_cte.c.project_id,
+            extract_cte.c.timestamp,
+            extract_cte.c.idx,
+            value.label("value"),
+        ).where(
+            extract_cte.c.jv.isnot(None),
+            func.jsonb_typeof(extract_cte.c.jv) == literal("number"),
+        )
+    ).cte("rollup_cont_raw")
+
+    key = build_sketch_key(cont_raw.c.value).label("key")
+
+    return select(
+        cont_raw.c.project_id,
+        cont_raw.c.timestamp,
+        cont_raw.c.idx,
+        key,
+        func.count().label("count"),  # pylint: disable=not-callable
+        func.sum(cont_raw.c.value).label("sum"),
+        func.min(cont_raw.c.value).label("min"),
+        func.max(cont_raw.c.value).label("max"),
+    ).group_by(
+        cont_raw.c.project_id,
+        cont_raw.c.timestamp,
+        cont_raw.c.idx,
+        text("key"),
+    )
+
+
+def build_rollup_categorical_stmt(
+    *,
+    oldest: datetime,
+    newest: datetime,
+    project_id: Optional[UUID] = None,
+) -> Select:
+    """Per-minute frequencies of root spans, for `ROLLUP_CATEGORICAL_PATHS`."""
+
+    extract_cte = _build_rollup_extract_cte(
+        paths=ROLLUP_CATEGORICAL_PATHS,
+        name="rollup_cls",
+        oldest=oldest,
+        newest=newest,
+        project_id=project_id,
+    )
+
+    value = cast(extract_cte.c.jv.op("#>>")(text("'{}'")), String).label("value")
+
+    return (
+        select(
+            extract_cte.c.project_id,
+            extract_cte.c.timestamp,
+            extract_cte.c.idx,
+            value,
+            func.count().label("count"),  # pylint: disable=not-callable
+        )
+        .where(
+            extract_cte.c.jv.isnot(None),
+            func.jsonb_typeof(extract_cte.c.jv) == literal("string"),
+        )
+        .group_by(
+            extract_cte.c.project_id,
+            extract_cte.c.timestamp,
+            extract_cte.c.idx,
+            text("value"),
+        )
+    )
+
+
+def parse_rollups(
+    *,
+    focus: Focus,
+    totals_rows: Iterable[Any] = (),
+    continuous_rows: Iterable[Any] = (),
+    categorical_rows: Iterable[Any] = (),
+) -> List[Rollup]:
+    """Assemble per-minute rollups from the rows of the statements above."""
+
+    rollups: Dict[tuple, Rollup] = {}
+
+    def _rollup(row) -> Rollup:
+        key = (row.project_id, row.timestamp)
+
+        if key not in rollups:
+            rollups[key] = _empty_rollup(
+                project_id=row.project_id,
+                granularity=1,
+                focus=focus.value,
+                timestamp=row.timestamp,
+            )
+
+        return rollups[key]
+
+    for row in totals_rows:
+        _merge_rollup(
+            _rollup(row),
+            {
+                **{total: getattr(row, total) for total in ROLLUP_TOTALS},
+                **{
+                    f"errors_{total}": getattr(row, f"errors_{total}")
+                    for total in ROLLUP_TOTALS
+                },
+            },
+        )
+
+    for row in continuous_rows:
+        _merge_rollup(
+            _rollup(row),
+            {
+                "metrics": {
+                    ROLLUP_CONTINUOUS_PATHS[row.idx]: {
+                        "count": row.count,
+                        "sum": float(row.sum),
+                        "min": float(row.min),
+                        "max": float(row.max),
+                        "sketch": {row.key: row.count},
+                    }
+                }
+            },
+        )
+
+    for row in categorical_rows:
+        _merge_rollup(
+            _rollup(row),
+            {
+                "metrics": {
+                    ROLLUP_CATEGORICAL_PATHS[row.idx]: {
+                        "count": row.count,
+                        "freq": {row.value: row.count},
+                    }
+                }
+            },
+        )
+
+    return list(rollups.values())
+
+
+def merge_rollups(
+    rollups: Iterable[Rollup],
+    *,
+    granularity: int,
+    origin: datetime,
+) -> List[Rollup]:
+    """
+    Merge rollups into buckets of `granularity` minutes, aligned on `origin`.
+
+    Used both to derive per-hour rollups from per-minute rollups and to merge
+    rollups into the buckets of an analytics query.
+    """
+
+    step = timedelta(minutes=granularity)
+
+    merged: Dict[tuple, Rollup] = {}
+
+    for rollup in rollups:
+        timestamp = origin + ((rollup["timestamp"] - origin) // step) * step
+
+        key = (rollup["project_id"], rollup["focus"], timestamp)
+
+        if key not in merged:
+            merged[key] = _empty_rollup(
+                project_id=rollup["project_id"],
+                granularity=granularity,
+                focus=rollup["focus"],
+                timestamp=timestamp,
+            )
+
+        _merge_rollup(merged[key], rollup)
+
+    return sorted(merged.values(), key=lambda rollup: rollup["timestamp"])
+
+
+def plan_rollups(
+    *,
+    oldest: datetime,
+    newest: datetime,
+    interval: int,
+    watermarks: Dict[int, Tuple[datetime, datetime]],
+) -> Optional[List[Segment]]:
+    """
+    Split [oldest, newest) into segments read from rollups, per granularity,
+    or from spans, when the granularity is None.
+
+    Returns None when rollups cannot answer: when `oldest` is not aligned on a
+    minute or when the rollups do not reach back to `oldest`.
+    """
+
+    minutes = watermarks.get(1)
+    hours = watermarks.get(60)
+
+    if floor_timestamp(oldest, 1) != oldest:
+        return None
+
+    if minutes is None or minutes[0] > oldest:
+        return None
+
+    segments: List[Segment] = []
+
+    start = oldest
+
+    if (
+        hours is not None
+        and hours[0] <= oldest
+        and interval % 60 == 0
+        and floor_timestamp(oldest, 60) == oldest
+    ):
+        end = min(floor_timestamp(newest, 60), hours[1])
+
+        if end > start:
+            segments.append((60, start, end))
+            start = end
+
+    end = min(floor_timestamp(newest, 1), minutes[1])
+
+    if end > start:
+        segments.append((1, start, end))
+        start = end
+
+    if newest > start:
+        segments.append((None, start, newest))
+
+    return segments
+
+
+def is_rollup_spec(
+    spec: MetricSpec,
+) -> bool:
+    if spec.type == MetricType.NUMERIC_CONTINUOUS:
+        return spec.path in ROLLUP_CONTINUOUS_PATHS
+
+    if spec.type == MetricType.CATEGORICAL_SINGLE:
+        return spec.path in ROLLUP_CATEGORICAL_PATHS
+
+    return False
+
+
+def parse_rollup_metric(
+    metric: Optional[Dict[str, Any]],
+    spec: MetricSpec,
+) -> Dict[str, Any]:
+    """Compute what `TracingDAO.analytics()` returns for one spec and bucket."""
+
+    if not metric or not metric.get("count"):
+        return {}
+
+    count = metric["count"]
+
+    value: Dict[str, Any] = {"count": count}
+
+    if spec.type == MetricType.CATEGORICAL_SINGLE:
+        freq = sorted(
+            ({"value": k, "count": c} for k, c in (metric.get("freq") or {}).items()),
+            key=lambda f: (-f["count"], f["value"]),
+        )
+
+        return value | compute_uniq(normalize_freq(freq))
+
+    value = merge_sketch_values([metric])
+    value = compute_sketch_pcts(value)
+    value = compute_sketch_hist(
+        value,
+        bins=spec.bins,
+        vmin=spec.vmin,
+        vmax=spec.vmax,
+        edge=spec.edge,
+    )
+    value = compute_iqrs(value)
+    value = compute_cqvs(value)
+    value = compute_pscs(value)
+
+    if not spec.sketch:
+        value.pop("sketch", None)
+
+    return value
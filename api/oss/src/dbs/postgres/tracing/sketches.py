@@ -0,0 +1,210 @@
+from typing import Any, Dict, Iterable, List, Optional
+from math import ceil, floor, log
+
+from sqlalchemy import BigInteger, case, cast, func, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+# Log-bucketed quantile sketches (DDSketch-like), stored as JSONB objects that
+# map bucket keys to counts, e.g. {"z": 2, "p-347": 5, "p12": 1, "n3": 1}:
+#   "p<i>" counts positive values in (gamma^(i-1), gamma^i]
+#   "n<i>" counts negative values in [-gamma^i, -gamma^(i-1))
+#   "z" counts zeros
+# Sketches are merged by summing counts, per key, across buckets and projects.
+# Quantiles read from a sketch are within SKETCH_ACCURACY of the exact values.
+
+SKETCH_ACCURACY = 0.01  # relative
+SKETCH_GAMMA = (1 + SKETCH_ACCURACY) / (1 - SKETCH_ACCURACY)
+SKETCH_LOG_GAMMA = log(SKETCH_GAMMA)
+
+Sketch = Dict[str, int]
+
+
+# HELPERS ----------------------------------------------------------------------
+
+
+def _parse_sketch_key(key: str) -> float:
+    if key == "z":
+        return 0.0
+
+    value = 2 * SKETCH_GAMMA ** int(key[1:]) / (SKETCH_GAMMA + 1)
+
+    return value if key[0] == "p" else -value
+
+
+def _sort_sketch(sketch: Sketch) -> List[tuple]:
+    return sorted(
+        ((_parse_sketch_key(key), count) for key, count in sketch.items() if count),
+        key=lambda item: item[0],
+    )
+
+
+def _rank_value(buckets: List[tuple], rank: int) -> float:
+    seen = 0
+
+    for value, bucket_count in buckets:
+        seen += bucket_count
+        if seen > rank:
+            break
+
+    return value
+
+
+def _clamp(
+    value: float,
+    lowest: Optional[float] = None,
+    highest: Optional[float] = None,
+) -> float:
+    if lowest is not None:
+        value = max(value, lowest)
+    if highest is not None:
+        value = min(value, highest)
+
+    return value
+
+
+# INTERFACE --------------------------------------------------------------------
+
+
+def build_sketch_key(
+    value: ColumnElement,
+) -> ColumnElement:
+    """SQL counterpart of `sketch_key()`, on a numeric column."""
+
+    def _index(magnitude: ColumnElement) -> ColumnElement:
+        return cast(
+            func.ceil(func.ln(magnitude) / literal(SKETCH_LOG_GAMMA)),
+            BigInteger,
+        )
+
+    return case(
+        (value > 0, func.concat(literal("p"), _index(value))),
+        (value < 0, func.concat(literal("n"), _index(-value))),
+        else_=literal("z"),
+    )
+
+
+def sketch_key(
+    value: float,
+) -> str:
+    if value > 0:
+        return f"p{ceil(log(value) / SKETCH_LOG_GAMMA)}"
+    if value < 0:
+        return f"n{ceil(log(-value) / SKETCH_LOG_GAMMA)}"
+
+    return "z"
+
+
+def build_sketch(
+    values: Iterable[float],
+) -> Sketch:
+    sketch: Sketch = {}
+
+    for value in values:
+        key = sketch_key(value)
+        sketch[key] = sketch.get(key, 0) + 1
+
+    return sketch
+
+
+def merge_sketches(
+    *sketches: Optional[Sketch],
+) -> Sketch:
+    merged: Sketch = {}
+
+    for sketch in sketches:
+        for key, count in (sketch or {}).items():
+            merged[key] = merged.get(key, 0) + int(count)
+
+    return merged
+
+
+def sketch_quantiles(
+    sketch: Sketch,
+    levels: List[float],
+    *,
+    lowest: Optional[float] = None,
+    highest: Optional[float] = None,
+) -> List[Optional[float]]:
+    """
+    Approximate `percentile_cont(levels)` from a sketch.
+
+    `lowest` and `highest`, the exact extremes when known, bound the estimates.
+    """
+
+    buckets = _sort_sketch(sketch)
+    count = sum(bucket_count for _, bucket_count in buckets)
+
+    if count == 0:
+        return [None for _ in levels]
+
+    quantiles: List[Optional[float]] = []
+
+    for level in levels:
+        rank = level * (count - 1)
+        lower = floor(rank)
+
+        # interpolates between ranks, as percentile_cont() does
+        value = _rank_value(buckets, lower)
+        if rank > lower:
+            value += (_rank_value(buckets, lower + 1) - value) * (rank - lower)
+
+        quantiles.append(_clamp(value, lowest, highest))
+
+    return quantiles
+
+
+def sketch_histogram(
+    sketch: Sketch,
+    *,
+    bins: int,
+    vmin: float,
+    vmax: float,
+    edge: Optional[bool] = True,
+    lowest: Optional[float] = None,
+    highest: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Approximate the `cont_hist` histogram from a sketch.
+
+    Bins follow `build_numeric_continuous_blocks()`: edge-aligned bins split
+    [vmin, vmax] evenly, center-aligned bins are centered on evenly spaced
+    points. Each sketch bucket falls in the bin of its representative value.
+    """
+
+    is_edge_aligned = edge is None or edge is True
+
+    if bins <= 1 or vmin == vmax:
+        bins = 1
+
+    if is_edge_aligned or bins == 1:
+        width = (vmax - vmin) / bins
+        intervals = [
+            [vmin + (b - 1) * width, vmin + b * width] for b in range(1, bins + 1)
+        ]
+    else:
+        width = (vmax - vmin) / (bins - 1)
+        intervals = [
+            [vmin + (b - 1) * width - width / 2, vmin + (b - 1) * width + width / 2]
+            for b in range(1, bins + 1)
+        ]
+
+    intervals[0][0] = vmin
+    intervals[-1][1] = vmax
+
+    counts = [0] * bins
+
+    for value, bucket_count in _sort_sketch(sketch):
+        value = _clamp(value, lowest, highest)
+
+        if value < vmin or value > vmax:
+            continue
+
+        for b, (start, end) in enumerate(intervals):
+            if start <= value and (value < end or (b == bins - 1 and value <= end)):
+                counts[b] += bucket_count
+                break
+
+    return [
+        {"bin": b + 1, "count": counts[b], "interval": intervals[b]}
+        for b in range(bins)
+    ]
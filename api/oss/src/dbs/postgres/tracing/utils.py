@@ -2,7 +2,7 @@ from typing import Any, Dict, Tuple, Optional, Union, List, cast as type_cast
 from json import dumps
 from datetime import datetime, timedelta, time, timezone
 from uuid import UUID
-from math import ceil, floor
+from math import ceil, floor, sqrt
 
 from sqlalchemy import case, cast, func, literal, literal_column, select, text
 from sqlalchemy import and_, or_, not_, Column, bindparam, Text
@@ -19,6 +19,12 @@ from sqlalchemy.dialects.postgresql import aggregate_order_by
 from oss.src.utils.logging import get_module_logger
 
 from oss.src.dbs.postgres.tracing.dbes import SpanDBE
+from oss.src.dbs.postgres.tracing.sketches import (
+    build_sketch_key,
+    merge_sketches,
+    sketch_quantiles,
+    sketch_histogram,
+)
 
 from oss.src.core.tracing.dtos import (
     Filtering,
@@ -44,6 +50,7 @@ from oss.src.core.tracing.dtos import (
     ListOperator,
     ExistenceOperator,
     Windowing,
+    Sharding,
     #
     MetricType,
     MetricSpec,
@@ -907,6 +914,28 @@ def parse_windowing(
     return oldest, newest, stride, interval, timestamps
 
 
+def apply_sharding(
+    stmt: Select,
+    sharding: Optional[Sharding] = None,
+) -> Select:
+    """
+    Keep the rows of the traces of the shard only, by the first 32 bits of
+    their trace id, the same hash as `get_trace_shard()`.
+    """
+
+    if not sharding or sharding.shards <= 1:
+        return stmt
+
+    return stmt.where(
+        cast(
+            text("concat('x', left(cast(trace_id as varchar), 8))"),
+            BIT(32),
+        ).cast(BigInteger)
+        % sharding.shards
+        == sharding.shard
+    )
+
+
 PERCENTILE_LEVELS = {
     k: v / 100
     for k, v in {
@@ -1007,6 +1036,7 @@ def build_specs_values(
             s.vmin,
             s.vmax,
             (s.edge if s.edge is not None else True),
+            (s.sketch if s.sketch is not None else False),
         )
         for idx, s in enumerate(metric_specs)
     ]
@@ -1019,6 +1049,7 @@ def build_specs_values(
         column("vmin", Numeric),
         column("vmax", Numeric),
         column("edge", Boolean),
+        column("sketch", Boolean),
         name="specs_values",
     ).data(data)
 
@@ -1036,7 +1067,7 @@ def build_base_cte(
 ) -> Optional[FromClause]:
     timestamp = func.date_bin(
         text(f"'{stride}'"),
-        SpanDBE.created_at,
+        SpanDBE.start_time,
         oldest,
     ).label("timestamp")
 
@@ -1047,14 +1078,14 @@ def build_base_cte(
             SpanDBE.trace_id,
             SpanDBE.span_id,
             SpanDBE.parent_id,
-            SpanDBE.created_at,
+            SpanDBE.start_time,
             SpanDBE.attributes.label("attributes"),
         )
         .select_from(SpanDBE)
         .where(
             SpanDBE.project_id == project_id,
-            SpanDBE.created_at >= oldest,
-            SpanDBE.created_at < newest,
+            SpanDBE.start_time >= oldest,
+            SpanDBE.start_time < newest,
         )
         .where(SpanDBE.parent_id.is_(None))
     )
@@ -1103,6 +1134,7 @@ def build_extract_cte(
             specs_values.c.vmin,
             specs_values.c.vmax,
             specs_values.c.edge,
+            specs_values.c.sketch,
             base_cte.c.attributes.op("#>")(specs_values.c.path).label("jv"),
         )
         .select_from(base_cte)
@@ -1166,6 +1198,7 @@ def build_numeric_continuous_blocks(
             extract_cte.c.vmin.label("vmin_opt"),
             extract_cte.c.vmax.label("vmax_opt"),
             extract_cte.c.edge.label("edge_opt"),
+            extract_cte.c.sketch.label("sketch_opt"),
             cast(extract_cte.c.jv.op("#>>")(text("'{}'")), Numeric).label("value"),
         ).where(
             extract_cte.c.type == literal(MetricType.NUMERIC_CONTINUOUS.value),
@@ -1188,6 +1221,7 @@ def build_numeric_continuous_blocks(
             func.max(cont_raw.c.vmin_opt).label("vmin_opt"),
             func.max(cont_raw.c.vmax_opt).label("vmax_opt"),
             func.bool_or(cont_raw.c.edge_opt).label("edge_opt"),
+            func.bool_or(cont_raw.c.sketch_opt).label("sketch_opt"),
         ).group_by(cont_raw.c.timestamp, cont_raw.c.idx)
     ).cte("cont_minmax")
 
@@ -1247,7 +1281,7 @@ def build_numeric_continuous_blocks(
     results.append(cont_basics)
 
     # -------------------------------------------------
-    # 5. Percentiles
+    # 5. Percentiles (exact)
     # -------------------------------------------------
     cont_pcts = (
         select(
@@ -1267,11 +1301,63 @@ def build_numeric_continuous_blocks(
                 & (cont_raw.c.idx == cont_minmax.c.idx),
             )
         )
-        .where(cont_minmax.c.n > 0)
+        .where(
+            cont_minmax.c.n > 0,
+            cont_minmax.c.sketch_opt.isnot(True),
+        )
         .group_by(cont_raw.c.timestamp, cont_raw.c.idx)
     )
     results.append(cont_pcts)
 
+    # -------------------------------------------------
+    # 5b. Sketch (approximate percentiles and histogram)
+    # -------------------------------------------------
+    cont_keys = (
+        select(
+            cont_raw.c.timestamp,
+            cont_raw.c.idx,
+            build_sketch_key(cont_raw.c.value).label("key"),
+            func.count().label("count"),
+        )
+        .where(cont_raw.c.sketch_opt.is_(True))
+        .group_by(cont_raw.c.timestamp, cont_raw.c.idx, text("key"))
+    ).cte("cont_keys")
+
+    cont_sketch = (
+        select(
+            cont_keys.c.timestamp,
+            cont_keys.c.idx,
+            literal("cont_sketch").label("kind"),
+            func.jsonb_build_object(
+                "sketch",
+                func.jsonb_object_agg(cont_keys.c.key, cont_keys.c.count),
+                "count",
+                func.max(cont_minmax.c.n),
+                "min",
+                func.max(cont_minmax.c.vmin),
+                "max",
+                func.max(cont_minmax.c.vmax),
+                "bins",
+                func.max(cont_minmax.c.bins_opt),
+                "vmin",
+                func.max(cont_minmax.c.vmin_opt),
+                "vmax",
+                func.max(cont_minmax.c.vmax_opt),
+                "edge",
+                func.bool_or(cont_minmax.c.edge_opt),
+            ).label("value"),
+        )
+        .select_from(
+            cont_keys.join(
+                cont_minmax,
+                (cont_keys.c.timestamp == cont_minmax.c.timestamp)
+                & (cont_keys.c.idx == cont_minmax.c.idx),
+            )
+        )
+        .group_by(cont_keys.c.timestamp, cont_keys.c.idx)
+    )
+    results.append(cont_sketch)
+
     # -------------------------------------------------
     # 6. Chosen min/max/bins
     # -------------------------------------------------
@@ -1303,7 +1389,10 @@ def build_numeric_continuous_blocks(
             chosen_max.label("vmax"),
             cont_minmax.c.n.label("n"),
             cont_minmax.c.edge_opt.label("edge"),
-        ).where(cont_minmax.c.n > 0)
+        ).where(
+            cont_minmax.c.n > 0,
+            cont_minmax.c.sketch_opt.isnot(True),
+        )
     ).cte("cont_bins")
 
     # -------------------------------------------------
@@ -2005,6 +2094,96 @@ def normalize_hist(
     return {"hist": hist}
 
 
+def merge_sketch_values(
+    values: List[Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Merge numeric continuous values computed with sketches, e.g. across time
+    buckets or projects, into a value that `compute_sketch_pcts()` and
+    `compute_sketch_hist()` accept.
+    """
+
+    merged: Dict[str, Any] = {"count": 0, "sketch": {}}
+
+    for value in values:
+        if not value or not value.get("count"):
+            continue
+
+        merged["count"] += value["count"]
+        merged["sketch"] = merge_sketches(merged["sketch"], value.get("sketch"))
+
+        for key, pick in (("sum", None), ("min", min), ("max", max)):
+            if value.get(key) is None:
+                continue
+            elif merged.get(key) is None:
+                merged[key] = value[key]
+            elif pick is None:
+                merged[key] += value[key]
+            else:
+                merged[key] = pick(merged[key], value[key])
+
+    if merged.get("sum") is not None and merged["count"]:
+        merged["mean"] = merged["sum"] / merged["count"]
+
+    return compute_range(merged)
+
+
+def compute_sketch_pcts(
+    value: Dict[str, Any],
+) -> Dict[str, Any]:
+    sketch = value.get("sketch")
+
+    if not sketch:
+        return value
+
+    value["pcts"] = parse_pcts(
+        sketch_quantiles(
+            sketch,
+            PERCENTILES_VALUES,
+            lowest=value.get("min"),
+            highest=value.get("max"),
+        )
+    ).get("pcts")
+
+    return value
+
+
+def compute_sketch_hist(
+    value: Dict[str, Any],
+    bins: Optional[int] = None,
+    vmin: Optional[float] = None,
+    vmax: Optional[float] = None,
+    edge: Optional[bool] = None,
+) -> Dict[str, Any]:
+    sketch = value.get("sketch")
+    count = value.get("count") or 0
+
+    if not sketch or not count:
+        return value
+
+    # same defaults as build_numeric_continuous_blocks()
+    vmin = vmin if vmin is not None else value.get("min")
+    vmax = vmax if vmax is not None else value.get("max")
+    bins = bins if bins is not None else int(ceil(sqrt(count)))
+
+    if vmin is None or vmax is None:
+        return value
+
+    hist = sketch_histogram(
+        sketch,
+        bins=1 if count <= 1 or vmin == vmax else bins,
+        vmin=float(vmin),
+        vmax=float(vmax),
+        edge=edge,
+        lowest=value.get("min"),
+        highest=value.get("max"),
+    )
+
+    value["hist"] = normalize_hist(hist).get("hist")
+
+    return value
+
+
 def parse_bin_freq(
     value: Dict[str, Any],
 ) -> List[Dict[str, Any]]:
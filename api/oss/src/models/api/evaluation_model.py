@@ -275,6 +275,11 @@ class LLMRunRateLimit(BaseModel):
     max_retries: int
     retry_delay: int
     delay_between_batches: int
+    trace_concurrency: Optional[int] = None
+    annotation_concurrency: Optional[int] = None
+    queue_size: Optional[int] = None
+    requests_per_second: Optional[float] = None
+    tokens_per_minute: Optional[int] = None
 
 
 class LMProvidersEnum(str, Enum):
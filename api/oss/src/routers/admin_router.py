@@ -9,6 +9,7 @@ from pydantic import BaseModel
 from fastapi.responses import JSONResponse
 
 from oss.src.utils.common import APIRouter, is_ee
+from oss.src.utils.caching import get_cache_stats
 
 from oss.src.services.user_service import create_new_user
 from oss.src.services.api_key_service import create_api_key
@@ -528,3 +529,13 @@ async def create_account(
             status_code=404,
             content="Could not create account.",
         )
+
+
+@router.get(
+    "/cache/stats",
+    operation_id="fetch_cache_stats",
+)
+async def fetch_cache_stats():
+    """Cache lookups per tier and latency per namespace, in this API process."""
+
+    return get_cache_stats()
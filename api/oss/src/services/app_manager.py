@@ -11,6 +11,7 @@ from oss.src.utils.common import is_ee
 from oss.src.services import db_manager
 from oss.src.models.shared_models import AppType
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.caching import invalidate_cache
 from oss.src.models.db_models import AppVariantDB, AppDB
 
 if is_ee():
@@ -115,6 +116,12 @@ async def update_variant_url(
         deployment_id=deployment.id,
     )
 
+    # the OpenAPI schema of the service may have changed
+    await invalidate_cache(
+        namespace="openapi_discovery",
+        project_id=project_id,
+    )
+
     return {"uri": deployment.uri}
 
 
@@ -14,7 +14,7 @@ from supertokens_python.asyncio import get_user as get_supertokens_user_by_id
 
 from oss.src.utils.env import env
 from oss.src.utils.logging import get_module_logger
-from oss.src.utils.caching import get_cache, set_cache
+from oss.src.utils.caching import get_cache, get_cache_many, set_cache
 
 from oss.src.utils.common import is_ee
 from oss.src.services import db_manager
@@ -251,12 +251,26 @@ async def verify_access_token(
         raise UnauthorizedException() from exc
 
 
+def _set_request_state(
+    request: Request,
+    state: dict,
+) -> None:
+    request.state.user_id = state.get("user_id")
+    request.state.user_email = state.get("user_email")
+    request.state.project_id = state.get("project_id")
+    request.state.workspace_id = state.get("workspace_id")
+    request.state.organization_id = state.get("organization_id")
+    request.state.organization_name = state.get("organization_name")
+    request.state.credentials = state.get("credentials")
+
+
 async def verify_bearer_token(
     request: Request,
     bearer_token: str,  # pylint: disable=unused-argument / NOT IMPLEMENTED YET
     query_project_id: Optional[str] = None,
     query_workspace_id: Optional[str] = None,
 ):
+    session_user_id = None
     user_id = None
     user_email = None
     organization_name = None
@@ -272,6 +286,44 @@ async def verify_bearer_token(
         if not session_user_id:
             raise UnauthorizedException()
 
+        state_cache_key = {
+            "u_id": session_user_id[-12:],
+            "p_id": query_project_id[-12:] if query_project_id else "",
+            "w_id": query_workspace_id[-12:] if query_workspace_id else "",
+        }
+
+        # The user and the state are fetched in one round trip and without
+        # locks, since a cached state is all that is needed. On misses, they are
+        # fetched again with get_cache() below, which locks against stampedes.
+        user, state = await get_cache_many(
+            [
+                {
+                    "project_id": query_project_id,
+                    "user_id": session_user_id,
+                    "namespace": "get_supertokens_user_by_id",
+                    "key": cache_key,
+                },
+                {
+                    "project_id": query_project_id,
+                    "user_id": session_user_id,
+                    "namespace": "verify_bearer_token",
+                    "key": state_cache_key,
+                },
+            ],
+            retry=False,
+        )
+
+        if user is not None and user.get("deny"):
+            raise UnauthorizedException()
+
+        if state is not None:
+            if state.get("deny"):
+                raise UnauthorizedException()
+
+            _set_request_state(request, state)
+
+            return
+
         user: dict = await get_cache(
             project_id=query_project_id,
             user_id=session_user_id,
@@ -355,15 +407,11 @@ async def verify_bearer_token(
         project_id = None
         workspace_id = None
 
-        cache_key = {
-            "u_id": user_id[-12:],  # Use last 12 characters of user_id for cache key
-            "p_id": query_project_id[-12:] if query_project_id else "",
-            "w_id": query_workspace_id[-12:] if query_workspace_id else "",
-        }
+        cache_key = state_cache_key
 
         state = await get_cache(
             project_id=query_project_id,
-            user_id=user_id,
+            user_id=session_user_id,
             namespace="verify_bearer_token",
             key=cache_key,
         )
@@ -373,13 +421,7 @@ async def verify_bearer_token(
             if state.get("deny"):
                 raise UnauthorizedException()
 
-            request.state.user_id = state.get("user_id")
-            request.state.user_email = state.get("user_email")
-            request.state.project_id = state.get("project_id")
-            request.state.workspace_id = state.get("workspace_id")
-            request.state.organization_id = state.get("organization_id")
-            request.state.organization_name = state.get("organization_name")
-            request.state.credentials = state.get("credentials")
+            _set_request_state(request, state)
 
             return
 
@@ -406,7 +448,7 @@ async def verify_bearer_token(
             if not workspace:
                 await set_cache(
                     project_id=query_project_id,
-                    user_id=user_id,
+                    user_id=session_user_id,
                     namespace="verify_bearer_token",
                     key=cache_key,
                     value={"deny": True},
@@ -417,7 +459,7 @@ async def verify_bearer_token(
             if project.workspace_id != workspace.id:
                 await set_cache(
                     project_id=query_project_id,
-                    user_id=user_id,
+                    user_id=session_user_id,
                     namespace="verify_bearer_token",
                     key=cache_key,
                     value={"deny": True},
@@ -437,7 +479,7 @@ async def verify_bearer_token(
             if not project:
                 await set_cache(
                     project_id=query_project_id,
-                    user_id=user_id,
+                    user_id=session_user_id,
                     namespace="verify_bearer_token",
                     key=cache_key,
                     value={"deny": True},
@@ -459,7 +501,7 @@ async def verify_bearer_token(
             if not workspace:
                 await set_cache(
                     project_id=query_project_id,
-                    user_id=user_id,
+                    user_id=session_user_id,
                     namespace="verify_bearer_token",
                     key=cache_key,
                     value={"deny": True},
@@ -505,7 +547,7 @@ async def verify_bearer_token(
         if not (project_id and workspace_id):
             await set_cache(
                 project_id=query_project_id,
-                user_id=user_id,
+                user_id=session_user_id,
                 namespace="verify_bearer_token",
                 key=cache_key,
                 value={"deny": True},
@@ -564,19 +606,13 @@ async def verify_bearer_token(
 
         await set_cache(
             project_id=query_project_id,
-            user_id=user_id,
+            user_id=session_user_id,
             namespace="verify_bearer_token",
             key=cache_key,
             value=state,
         )
 
-        request.state.user_id = state.get("user_id")
-        request.state.user_email = state.get("user_email")
-        request.state.project_id = state.get("project_id")
-        request.state.workspace_id = state.get("workspace_id")
-        request.state.organization_id = state.get("organization_id")
-        request.state.organization_name = state.get("organization_name")
-        request.state.credentials = state.get("credentials")
+        _set_request_state(request, state)
 
     except GatewayTimeoutException as exc:
         raise exc
@@ -584,7 +620,7 @@ async def verify_bearer_token(
     except UnauthorizedException as exc:
         await set_cache(
             project_id=query_project_id,
-            user_id=user_id,
+            user_id=session_user_id,
             namespace="verify_bearer_token",
             key=cache_key,
             value={"deny": True},
@@ -595,7 +631,7 @@ async def verify_bearer_token(
     except Exception as exc:  # pylint: disable=bare-except
         await set_cache(
             project_id=query_project_id,
-            user_id=user_id,
+            user_id=session_user_id,
             namespace="verify_bearer_token",
             key=cache_key,
             value={"deny": True},
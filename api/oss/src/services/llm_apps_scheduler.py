@@ -0,0 +1,303 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from json import loads
+from time import monotonic
+from typing import Any, Deque, Dict, List, Optional
+
+from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+
+log = get_module_logger(__name__)
+
+# Invocations of LLM apps are scheduled in a sliding window: up to `limit`
+# requests in flight at all times, with `limit` adapted to the observed error
+# rate (additive increase, multiplicative decrease), within optional budgets
+# of requests per second and tokens per minute per provider.
+
+PROVIDER_LIMITS: Dict[str, Dict[str, float]] = loads(
+    env.AGENTA_EVALUATIONS_PROVIDER_LIMITS
+)
+
+AIMD_WINDOW = 20  # completions per error rate sample
+AIMD_ERROR_RATE = 0.2  # above which the window shrinks
+AIMD_DECREASE = 0.5
+
+RETRY_AFTER_DEFAULT = 5.0  # seconds, when a 429 does not say
+RETRY_AFTER_MAX = 300.0  # seconds
+
+PROVIDER_PREFIXES = {
+    "gpt": "openai",
+    "o1": "openai",
+    "o3": "openai",
+    "o4": "openai",
+    "claude": "anthropic",
+    "gemini": "gemini",
+    "mistral": "mistral",
+    "command": "cohere",
+}
+DEFAULT_PROVIDER = "default"
+
+
+class ThrottledError(Exception):
+    """Raised when an invocation is answered with a 429."""
+
+    def __init__(
+        self,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(f"Throttled, retry after {retry_after} seconds")
+
+        self.retry_after = retry_after
+
+
+# HELPERS ----------------------------------------------------------------------
+
+
+def _find_model(
+    data: Any,
+) -> Optional[str]:
+    if isinstance(data, dict):
+        model = data.get("model")
+
+        if isinstance(model, str) and model:
+            return model
+
+        data = list(data.values())
+
+    if isinstance(data, list):
+        for value in data:
+            model = _find_model(value)
+
+            if model:
+                return model
+
+    return None
+
+
+# INTERFACE --------------------------------------------------------------------
+
+
+def parse_retry_after(
+    value: Optional[str],
+) -> float:
+    """Parse a `Retry-After` header, in seconds or as an HTTP date."""
+
+    if not value:
+        return RETRY_AFTER_DEFAULT
+
+    try:
+        seconds = float(value)
+
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(value)
+
+        except (TypeError, ValueError):
+            return RETRY_AFTER_DEFAULT
+
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+
+        seconds = (date - datetime.now(timezone.utc)).total_seconds()
+
+    return min(max(0.0, seconds), RETRY_AFTER_MAX)
+
+
+def get_provider(
+    parameters: Optional[Dict],
+) -> str:
+    """Guess the provider of an app revision from the model in its parameters."""
+
+    model = (_find_model(parameters) or "").lower()
+
+    if "/" in model:
+        return model.split("/", 1)[0]
+
+    for prefix, provider in PROVIDER_PREFIXES.items():
+        if model.startswith(prefix):
+            return provider
+
+    return DEFAULT_PROVIDER
+
+
+class Budget:
+    """
+    Requests per second and tokens per minute, as token buckets.
+
+    Tokens are only known once a request completes: they are paid afterwards,
+    and requests wait while the tokens bucket is overdrawn.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_second: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+    ):
+        self.requests_rate = requests_per_second or 0.0
+        self.tokens_rate = (tokens_per_minute or 0.0) / 60.0
+
+        self.requests = max(1.0, self.requests_rate)  # a second of burst
+        self.tokens = tokens_per_minute or 0.0  # a minute of burst
+        self.paused_until = 0.0
+
+        self.timestamp = monotonic()
+        self.lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        elapsed = max(0.0, now - self.timestamp)
+
+        if self.requests_rate:
+            self.requests = min(
+                max(1.0, self.requests_rate),
+                self.requests + elapsed * self.requests_rate,
+            )
+
+        if self.tokens_rate:
+            self.tokens = min(
+                self.tokens_rate * 60.0,
+                self.tokens + elapsed * self.tokens_rate,
+            )
+
+        self.timestamp = now
+
+    def _wait(self, now: float) -> float:
+        wait = max(0.0, self.paused_until - now)
+
+        if self.requests_rate and self.requests < 1.0:
+            wait = max(wait, (1.0 - self.requests) / self.requests_rate)
+
+        if self.tokens_rate and self.tokens < 0.0:
+            wait = max(wait, -self.tokens / self.tokens_rate)
+
+        return wait
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            while True:
+                now = monotonic()
+
+                self._refill(now)
+
+                wait = self._wait(now)
+
+                if wait <= 0:
+                    break
+
+                await asyncio.sleep(wait)
+
+            if self.requests_rate:
+                self.requests -= 1.0
+
+    def record(self, tokens: Optional[float]) -> None:
+        if self.tokens_rate and tokens:
+            self._refill(monotonic())
+
+            self.tokens -= tokens
+
+    def pause(self, seconds: float) -> None:
+        self.paused_until = max(self.paused_until, monotonic() + seconds)
+
+
+_budgets: Dict[str, Budget] = dict()
+
+
+def get_provider_budget(
+    provider: str,
+) -> Optional[Budget]:
+    """Budgets of providers are shared by every invocation of the process."""
+
+    limits = PROVIDER_LIMITS.get(provider)
+
+    if not limits:
+        return None
+
+    if provider not in _budgets:
+        _budgets[provider] = Budget(
+            requests_per_second=limits.get("requests_per_second"),
+            tokens_per_minute=limits.get("tokens_per_minute"),
+        )
+
+    return _budgets[provider]
+
+
+class Scheduler:
+    """Sliding window of in-flight invocations, with AIMD and budgets."""
+
+    def __init__(
+        self,
+        *,
+        max_concurrency: int,
+        budgets: Optional[List[Budget]] = None,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.limit = float(self.max_concurrency)
+        self.budgets = [budget for budget in budgets or [] if budget]
+
+        self.outcomes: Deque[bool] = deque(maxlen=AIMD_WINDOW)
+        self.completions = 0
+
+        self.paused_until = 0.0
+
+    @property
+    def concurrency(self) -> int:
+        return max(1, int(self.limit))
+
+    async def acquire(self) -> None:
+        wait = self.paused_until - monotonic()
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        for budget in self.budgets:
+            await budget.acquire()
+
+    def record(
+        self,
+        *,
+        error: bool,
+        tokens: Optional[float] = None,
+    ) -> None:
+        for budget in self.budgets:
+            budget.record(tokens)
+
+        self.outcomes.append(error)
+        self.completions += 1
+
+        if self.completions % AIMD_WINDOW:
+            return
+
+        error_rate = sum(self.outcomes) / len(self.outcomes)
+
+        if error_rate > AIMD_ERROR_RATE:
+            self._decrease()
+        else:
+            self.limit = min(float(self.max_concurrency), self.limit + 1.0)
+
+    def throttle(
+        self,
+        retry_after: float,
+    ) -> None:
+        for budget in self.budgets:
+            budget.pause(retry_after)
+
+        now = monotonic()
+
+        # concurrent 429s shrink the window once
+        if now >= self.paused_until:
+            self._decrease()
+
+        self.paused_until = max(self.paused_until, now + retry_after)
+
+    def _decrease(self) -> None:
+        limit = max(1.0, self.limit * AIMD_DECREASE)
+
+        if limit < self.limit:
+            log.info(
+                "[SCHEDULER] Reducing concurrency",
+                concurrency=int(limit),
+            )
+
+        self.limit = limit
@@ -3,18 +3,40 @@ import asyncio
 import traceback
 import aiohttp
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from hashlib import blake2b
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.http import get_http_session
+from oss.src.utils.caching import get_cache, set_cache
 from oss.src.utils import common
 from oss.src.services import helpers
 from oss.src.services.auth_helper import sign_secret_token
 from oss.src.services.db_manager import get_project_by_id
 from oss.src.apis.fastapi.tracing.utils import make_hash_id
 from oss.src.models.shared_models import InvokationResult, Result, Error
+from oss.src.services.llm_apps_scheduler import (
+    Budget,
+    Scheduler,
+    ThrottledError,
+    get_provider,
+    get_provider_budget,
+    parse_retry_after,
+)
 
 log = get_module_logger(__name__)
 
+MAX_THROTTLED_RETRIES = 10  # 429s, retried on top of `max_retries`
+
+OPENAPI_CACHE_NAMESPACE = "openapi_discovery"
+OPENAPI_CACHE_TTL = 60 * 60  # 1 hour, and invalidated on redeploy
+OPENAPI_MAX_RECURSIVE_DEPTH = 5
+
+SECRET_HEADERS_TTL = 5 * 60  # 5 minutes, secret tokens expire after 15 minutes
+
+_secret_headers: Dict[Tuple[str, str], Tuple[float, Dict[str, str]]] = dict()
+
 
 def get_nested_value(d: dict, keys: list, default=None):
     """
@@ -228,109 +250,106 @@ async def invoke_app(
 
     payload = await make_payload(datapoint, parameters, openapi_parameters)
 
-    project = await get_project_by_id(
+    headers = await get_secret_headers(
+        user_id=user_id,
         project_id=project_id,
     )
 
-    secret_token = await sign_secret_token(
-        user_id=str(user_id),
-        project_id=str(project_id),
-        workspace_id=str(project.workspace_id),
-        organization_id=str(project.organization_id),
-    )
+    client = get_http_session()
 
-    headers = {}
-    if secret_token:
-        headers = {"Authorization": f"Secret {secret_token}"}
-    headers["ngrok-skip-browser-warning"] = "1"
+    app_response = {}
 
-    async with aiohttp.ClientSession() as client:
-        app_response = {}
+    try:
+        log.info(
+            "Invoking application...",
+            scenario_id=scenario_id,
+            testcase_id=(
+                datapoint["testcase_id"] if "testcase_id" in datapoint else None
+            ),
+            url=url,
+        )
+        response = await client.post(
+            url,
+            json=payload,
+            headers=headers,
+            timeout=900,
+        )
 
-        try:
-            log.info(
-                "Invoking application...",
-                scenario_id=scenario_id,
-                testcase_id=(
-                    datapoint["testcase_id"] if "testcase_id" in datapoint else None
-                ),
-                url=url,
-            )
-            response = await client.post(
-                url,
-                json=payload,
-                headers=headers,
-                timeout=900,
+        if response.status == 429:
+            response.release()
+            raise ThrottledError(
+                retry_after=parse_retry_after(response.headers.get("Retry-After"))
             )
-            app_response = await response.json()
-            response.raise_for_status()
 
-            (
-                value,
-                kind,
-                cost,
-                tokens,
-                latency,
-            ) = extract_result_from_response(app_response)
-
-            trace_id = app_response.get("trace_id", None)
-            span_id = app_response.get("span_id", None)
-
-            log.info(
-                "Invoked application.   ",
-                scenario_id=scenario_id,
-                trace_id=trace_id,
-            )
+        app_response = await response.json()
+        response.raise_for_status()
 
-            return InvokationResult(
-                result=Result(
-                    type=kind,
-                    value=value,
-                    error=None,
-                ),
-                latency=latency,
-                cost=cost,
-                tokens=tokens,
-                trace_id=trace_id,
-                span_id=span_id,
-            )
+        (
+            value,
+            kind,
+            cost,
+            tokens,
+            latency,
+        ) = extract_result_from_response(app_response)
 
-        except aiohttp.ClientResponseError as e:
-            error_message = app_response.get("detail", {}).get(
-                "error", f"HTTP error {e.status}: {e.message}"
-            )
-            stacktrace = app_response.get("detail", {}).get(
-                "message"
-            ) or app_response.get("detail", {}).get(
-                "traceback", "".join(traceback.format_exception_only(type(e), e))
-            )
-            log.error(f"HTTP error occurred during request: {error_message}")
-        except aiohttp.ServerTimeoutError as e:
-            error_message = "Request timed out"
-            stacktrace = "".join(traceback.format_exception_only(type(e), e))
-            log.error(error_message)
-        except aiohttp.ClientConnectionError as e:
-            error_message = f"Connection error: {str(e)}"
-            stacktrace = "".join(traceback.format_exception_only(type(e), e))
-            log.error(error_message)
-        except json.JSONDecodeError as e:
-            error_message = "Failed to decode JSON from response"
-            stacktrace = "".join(traceback.format_exception_only(type(e), e))
-            log.error(error_message)
-        except Exception as e:
-            error_message = f"Unexpected error: {str(e)}"
-            stacktrace = "".join(traceback.format_exception_only(type(e), e))
-            log.error(error_message)
+        trace_id = app_response.get("trace_id", None)
+        span_id = app_response.get("span_id", None)
+
+        log.info(
+            "Invoked application.   ",
+            scenario_id=scenario_id,
+            trace_id=trace_id,
+        )
 
         return InvokationResult(
             result=Result(
-                type="error",
-                error=Error(
-                    message=error_message,
-                    stacktrace=stacktrace,
-                ),
-            )
+                type=kind,
+                value=value,
+                error=None,
+            ),
+            latency=latency,
+            cost=cost,
+            tokens=tokens,
+            trace_id=trace_id,
+            span_id=span_id,
+        )
+
+    except ThrottledError:
+        raise
+    except aiohttp.ClientResponseError as e:
+        error_message = app_response.get("detail", {}).get(
+            "error", f"HTTP error {e.status}: {e.message}"
+        )
+        stacktrace = app_response.get("detail", {}).get("message") or app_response.get(
+            "detail", {}
+        ).get("traceback", "".join(traceback.format_exception_only(type(e), e)))
+        log.error(f"HTTP error occurred during request: {error_message}")
+    except aiohttp.ServerTimeoutError as e:
+        error_message = "Request timed out"
+        stacktrace = "".join(traceback.format_exception_only(type(e), e))
+        log.error(error_message)
+    except aiohttp.ClientConnectionError as e:
+        error_message = f"Connection error: {str(e)}"
+        stacktrace = "".join(traceback.format_exception_only(type(e), e))
+        log.error(error_message)
+    except json.JSONDecodeError as e:
+        error_message = "Failed to decode JSON from response"
+        stacktrace = "".join(traceback.format_exception_only(type(e), e))
+        log.error(error_message)
+    except Exception as e:
+        error_message = f"Unexpected error: {str(e)}"
+        stacktrace = "".join(traceback.format_exception_only(type(e), e))
+        log.error(error_message)
+
+    return InvokationResult(
+        result=Result(
+            type="error",
+            error=Error(
+                message=error_message,
+                stacktrace=stacktrace,
+            ),
         )
+    )
 
 
 async def run_with_retry(
@@ -343,6 +362,7 @@ async def run_with_retry(
     user_id: str,
     project_id: str,
     scenario_id: Optional[str] = None,
+    scheduler: Optional[Scheduler] = None,
     **kwargs,
 ) -> InvokationResult:
     """
@@ -355,6 +375,7 @@ async def run_with_retry(
         max_retry_count (int): The maximum number of retries.
         retry_delay (int): The delay between retries in seconds.
         openapi_parameters (List[Dict]): The OpenAPI parameters for the app.
+        scheduler (Scheduler): Throttled by 429s, which are retried after their `Retry-After`.
 
     Returns:
         InvokationResult: The invokation result.
@@ -369,6 +390,7 @@ async def run_with_retry(
     # hash_id = make_hash_id(references=references, links=links)
 
     retries = 0
+    throttles = 0
     last_exception = None
     while retries < max_retry_count:
         try:
@@ -383,6 +405,16 @@ async def run_with_retry(
                 **kwargs,
             )
             return result
+        except ThrottledError as e:
+            last_exception = e
+            throttles += 1
+            if throttles > MAX_THROTTLED_RETRIES:
+                retries = max_retry_count
+                break
+            log.warn(f"Throttled. Retrying in {e.retry_after} seconds")
+            if scheduler is not None:
+                scheduler.throttle(e.retry_after)
+            await asyncio.sleep(e.retry_after)
         except aiohttp.ClientError as e:
             last_exception = e
             log.error(f"Error in evaluation. Retrying in {retry_delay} seconds:", e)
@@ -420,36 +452,137 @@ async def batch_invoke(
     user_id: str,
     project_id: str,
     scenarios: Optional[List[Dict]] = None,
+    on_result: Optional[Callable[[int, InvokationResult], Awaitable[None]]] = None,
+    content_hash: Optional[str] = None,
     **kwargs,
 ) -> List[InvokationResult]:
     """
-    Invokes the LLm apps in batches, processing the testset data.
+    Invokes the LLm apps over a sliding window, processing the testset data.
+
+    Up to `batch_size` invocations are in flight at all times, fewer while
+    errors are frequent or a 429 asks to back off, and within the requests per
+    second and tokens per minute budgets of the run and of the provider.
 
     Args:
         uri (str): The URI of the LLm app.
         testset_data (List[Dict]): The testset data to be processed.
         parameters (Dict): The parameters for the LLm app.
         rate_limit_config (Dict): The rate limit configuration.
+        on_result (Callable): Awaited with the index and result of each invocation, as soon as it completes.
+        content_hash (str): The hash of the deployment, see `get_deployment_hash()`, to reuse its OpenAPI discovery.
 
     Returns:
-        List[InvokationResult]: The list of app outputs after running all batches.
+        List[InvokationResult]: The list of app outputs, in testset order.
     """
     batch_size = rate_limit_config[
         "batch_size"
-    ]  # Number of testset to make in each batch
+    ]  # Number of invocations in flight at most
     max_retries = rate_limit_config[
         "max_retries"
     ]  # Maximum number of times to retry the failed llm call
     retry_delay = rate_limit_config[
         "retry_delay"
     ]  # Delay before retrying the failed llm call (in seconds)
-    delay_between_batches = rate_limit_config[
-        "delay_between_batches"
-    ]  # Delay between batches (in seconds)
+    # `delay_between_batches` is no longer used, the window never drains
+
+    list_of_app_outputs: List[Optional[InvokationResult]] = [None] * len(
+        testset_data
+    )  # Outputs, in testset order
+
+    scheduler = Scheduler(
+        max_concurrency=batch_size,
+        budgets=[
+            get_provider_budget(get_provider(parameters)),
+            (
+                Budget(
+                    requests_per_second=rate_limit_config.get("requests_per_second"),
+                    tokens_per_minute=rate_limit_config.get("tokens_per_minute"),
+                )
+                if rate_limit_config.get("requests_per_second")
+                or rate_limit_config.get("tokens_per_minute")
+                else None
+            ),
+        ],
+    )
+
+    headers = await get_secret_headers(
+        user_id=user_id,
+        project_id=project_id,
+    )
+
+    _, _, openapi_parameters = await discover_openapi(
+        uri,
+        headers,
+        project_id=project_id,
+        content_hash=content_hash,
+    )
+
+    async def invoke(index: int) -> InvokationResult:
+        result = await run_with_retry(
+            uri,
+            testset_data[index],
+            parameters,
+            max_retries,
+            retry_delay,
+            openapi_parameters,
+            user_id,
+            project_id,
+            scenarios[index].get("id") if scenarios else None,
+            scheduler=scheduler,
+            **kwargs,
+        )
+
+        scheduler.record(
+            error=result.result.error is not None,
+            tokens=result.tokens,
+        )
+
+        list_of_app_outputs[index] = result
+
+        if on_result is not None:
+            await on_result(index, result)
+
+        return result
+
+    tasks: Set[asyncio.Future] = set()
+
+    for index in range(len(testset_data)):
+        while len(tasks) >= scheduler.concurrency:
+            done, tasks = await asyncio.wait(
+                tasks,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+
+            for task in done:
+                task.result()  # raise, as gather would
+
+        await scheduler.acquire()
+
+        tasks.add(asyncio.ensure_future(invoke(index)))
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    return list_of_app_outputs
+
 
-    list_of_app_outputs: List[
-        InvokationResult
-    ] = []  # Outputs after running all batches
+async def get_secret_headers(
+    *,
+    user_id: str,
+    project_id: str,
+) -> Dict[str, str]:
+    """
+    Return the headers to invoke apps on behalf of a user, with a secret token
+    signed at most every `SECRET_HEADERS_TTL`, instead of once per invocation.
+    """
+
+    cache_key = (str(user_id), str(project_id))
+    now = monotonic()
+
+    cached = _secret_headers.get(cache_key)
+
+    if cached is not None and now - cached[0] < SECRET_HEADERS_TTL:
+        return dict(cached[1])
 
     project = await get_project_by_id(
         project_id=project_id,
@@ -467,8 +600,70 @@ async def batch_invoke(
         headers = {"Authorization": f"Secret {secret_token}"}
     headers["ngrok-skip-browser-warning"] = "1"
 
+    for key, (signed_at, _) in list(_secret_headers.items()):
+        if now - signed_at >= SECRET_HEADERS_TTL:
+            del _secret_headers[key]
+
+    _secret_headers[cache_key] = (now, headers)
+
+    return dict(headers)
+
+
+def get_deployment_hash(
+    deployment: Any,
+) -> str:
+    """Hash a deployment, which changes whenever its app is redeployed."""
+
+    content = f"{deployment.id}:{deployment.uri}:{deployment.updated_at}"
+
+    return blake2b(content.encode(), digest_size=16).hexdigest()
+
+
+async def discover_openapi(
+    uri: str,
+    headers: Optional[Dict[str, str]],
+    *,
+    project_id: Optional[str] = None,
+    content_hash: Optional[str] = None,
+) -> Tuple[str, str, List[Dict]]:
+    """
+    Find the OpenAPI schema of an app, walking up its URI, and parse its parameters.
+
+    Results are cached by URI and content hash, when given, and invalidated
+    when the app is redeployed.
+
+    Args:
+        uri (str): The URI of the app.
+        headers (Dict[str, str]): The headers to fetch the schema with.
+        project_id (str): The ID of the project of the app.
+        content_hash (str): The hash of the deployment of the app.
+
+    Returns:
+        Tuple[str, str, List[Dict]]: The runtime prefix, the route path and the OpenAPI parameters.
+    """
+
+    cache_key = {
+        "uri": uri,
+        "hash": content_hash,
+    }
+
+    if content_hash:
+        discovery = await get_cache(
+            project_id=project_id,
+            namespace=OPENAPI_CACHE_NAMESPACE,
+            key=cache_key,
+            retry=False,
+        )
+
+        if discovery is not None:
+            return (
+                discovery["runtime_prefix"],
+                discovery["route_path"],
+                discovery["openapi_parameters"],
+            )
+
     openapi_parameters = None
-    max_recursive_depth = 5
+    max_recursive_depth = OPENAPI_MAX_RECURSIVE_DEPTH
     runtime_prefix = uri
     route_path = ""
 
@@ -491,45 +686,28 @@ async def batch_invoke(
                 route_path = ""
                 runtime_prefix = runtime_prefix[:-1]
 
-    # Final attempt to fetch OpenAPI parameters
-    openapi_parameters = await get_parameters_from_openapi(
-        runtime_prefix + "/openapi.json",
-        route_path,
-        headers,
-    )
-
-    # 🆕 Rewritten loop instead of recursion
-    for start_idx in range(0, len(testset_data), batch_size):
-        tasks = []
-
-        end_idx = min(start_idx + batch_size, len(testset_data))
-        for index in range(start_idx, end_idx):
-            task = asyncio.ensure_future(
-                run_with_retry(
-                    uri,
-                    testset_data[index],
-                    parameters,
-                    max_retries,
-                    retry_delay,
-                    openapi_parameters,
-                    user_id,
-                    project_id,
-                    scenarios[index].get("id") if scenarios else None,
-                    **kwargs,
-                )
-            )
-            tasks.append(task)
-
-        results = await asyncio.gather(*tasks)
-
-        for result in results:
-            list_of_app_outputs.append(result)
+    if not openapi_parameters:
+        # Final attempt to fetch OpenAPI parameters
+        openapi_parameters = await get_parameters_from_openapi(
+            runtime_prefix + "/openapi.json",
+            route_path,
+            headers,
+        )
 
-        # Delay between batches if more to come
-        if end_idx < len(testset_data):
-            await asyncio.sleep(delay_between_batches)
+    if content_hash and openapi_parameters:
+        await set_cache(
+            project_id=project_id,
+            namespace=OPENAPI_CACHE_NAMESPACE,
+            key=cache_key,
+            value={
+                "runtime_prefix": runtime_prefix,
+                "route_path": route_path,
+                "openapi_parameters": openapi_parameters,
+            },
+            ttl=OPENAPI_CACHE_TTL,
+        )
 
-    return list_of_app_outputs
+    return runtime_prefix, route_path, openapi_parameters
 
 
 async def get_parameters_from_openapi(
@@ -589,8 +767,9 @@ async def _get_openai_json_from_uri(
         headers = {}
     headers["ngrok-skip-browser-warning"] = "1"
 
-    async with aiohttp.ClientSession() as client:
-        resp = await client.get(uri, headers=headers, timeout=5)
-        resp_text = await resp.text()
-        json_data = json.loads(resp_text)
-        return json_data
+    client = get_http_session()
+
+    resp = await client.get(uri, headers=headers, timeout=5)
+    resp_text = await resp.text()
+    json_data = json.loads(resp_text)
+    return json_data
@@ -1,7 +1,7 @@
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from uuid import UUID
 from json import dumps
-from asyncio import get_event_loop
+from asyncio import Queue, ensure_future, gather
 
 from celery import shared_task, states
 
@@ -9,6 +9,8 @@ from fastapi import Request
 
 from oss.src.utils.helpers import parse_url, get_slug_from_name_and_id
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+from oss.src.tasks.runtime import run_task
 from oss.src.utils.common import is_ee
 from oss.src.services.auth_helper import sign_secret_token
 from oss.src.services import llm_apps_service
@@ -116,6 +118,10 @@ from oss.src.core.queries.dtos import (
 from oss.src.core.evaluations.utils import (
     get_metrics_keys_from_schema,
     fetch_trace,
+    is_memoizable,
+    compute_memo_key,
+    get_memo,
+    set_memo,
 )
 
 
@@ -217,6 +223,10 @@ annotations_router = AnnotationsRouter(
     annotations_service=annotations_service,
 )  # TODO: REMOVE/REPLACE ONCE ANNOTATE IS MOVED TO 'core'
 
+TRACE_CONCURRENCY = env.AGENTA_EVALUATIONS_TRACE_CONCURRENCY
+ANNOTATION_CONCURRENCY = env.AGENTA_EVALUATIONS_ANNOTATION_CONCURRENCY
+QUEUE_SIZE = env.AGENTA_EVALUATIONS_QUEUE_SIZE
+
 # ------------------------------------------------------------------------------
 
 
@@ -784,6 +794,42 @@ def annotate(
     Returns:
         None
     """
+    return run_task(
+        self,
+        _annotate_run(
+            self,
+            task_id=self.request.id,
+            #
+            project_id=project_id,
+            user_id=user_id,
+            #
+            run_id=run_id,
+            #
+            testset_id=testset_id,
+            revision_id=revision_id,
+            autoeval_ids=autoeval_ids,
+            #
+            run_config=run_config,
+        ),
+    )
+
+
+async def _annotate_run(
+    self,
+    *,
+    task_id: Optional[str],
+    #
+    project_id: UUID,
+    user_id: UUID,
+    #
+    run_id: UUID,
+    #
+    testset_id: str,
+    revision_id: str,
+    autoeval_ids: Optional[List[str]],
+    #
+    run_config: Dict[str, int],
+):
     request = Request(
         scope={
             "type": "http",
@@ -794,8 +840,6 @@ def annotate(
     request.state.project_id = str(project_id)
     request.state.user_id = str(user_id)
 
-    loop = get_event_loop()
-
     run = None
 
     try:
@@ -807,41 +851,33 @@ def annotate(
         # ----------------------------------------------------------------------
 
         # fetch project --------------------------------------------------------
-        project = loop.run_until_complete(
-            get_project_by_id(
-                project_id=str(project_id),
-            ),
+        project = await get_project_by_id(
+            project_id=str(project_id),
         )
         # ----------------------------------------------------------------------
 
         # fetch secrets --------------------------------------------------------
-        secrets = loop.run_until_complete(
-            get_llm_providers_secrets(
-                project_id=str(project_id),
-            ),
+        secrets = await get_llm_providers_secrets(
+            project_id=str(project_id),
         )
         # ----------------------------------------------------------------------
 
         # prepare credentials --------------------------------------------------
-        secret_token = loop.run_until_complete(
-            sign_secret_token(
-                user_id=str(user_id),
-                project_id=str(project_id),
-                workspace_id=str(project.workspace_id),
-                organization_id=str(project.organization_id),
-            )
+        secret_token = await sign_secret_token(
+            user_id=str(user_id),
+            project_id=str(project_id),
+            workspace_id=str(project.workspace_id),
+            organization_id=str(project.organization_id),
         )
 
         credentials = f"Secret {secret_token}"
         # ----------------------------------------------------------------------
 
         # fetch run ------------------------------------------------------------
-        run = loop.run_until_complete(
-            evaluations_service.fetch_run(
-                project_id=project_id,
-                #
-                run_id=run_id,
-            )
+        run = await evaluations_service.fetch_run(
+            project_id=project_id,
+            #
+            run_id=run_id,
         )
 
         assert run, f"Evaluation run with id {run_id} not found!"
@@ -857,16 +893,12 @@ def annotate(
 
         invocation_steps_keys = [step.key for step in invocation_steps]
         annotation_steps_keys = [step.key for step in annotation_steps]
-
-        nof_annotations = len(annotation_steps)
         # ----------------------------------------------------------------------
 
         # fetch testset --------------------------------------------------------
-        testset_response = loop.run_until_complete(
-            simple_testsets_router.fetch_simple_testset(
-                request=request,
-                testset_id=testset_id,
-            )
+        testset_response = await simple_testsets_router.fetch_simple_testset(
+            request=request,
+            testset_id=testset_id,
         )
 
         assert testset_response.count != 0, f"Testset with id {testset_id} not found!"
@@ -883,29 +915,21 @@ def annotate(
         # ----------------------------------------------------------------------
 
         # fetch application ----------------------------------------------------
-        revision = loop.run_until_complete(
-            fetch_app_variant_revision_by_id(revision_id),
-        )
+        revision = await fetch_app_variant_revision_by_id(revision_id)
 
         assert revision is not None, f"App revision with id {revision_id} not found!"
 
-        variant = loop.run_until_complete(
-            fetch_app_variant_by_id(str(revision.variant_id)),
-        )
+        variant = await fetch_app_variant_by_id(str(revision.variant_id))
 
         assert variant is not None, (
             f"App variant with id {revision.variant_id} not found!"
         )
 
-        app = loop.run_until_complete(
-            fetch_app_by_id(str(variant.app_id)),
-        )
+        app = await fetch_app_by_id(str(variant.app_id))
 
         assert app is not None, f"App with id {variant.app_id} not found!"
 
-        deployment = loop.run_until_complete(
-            get_deployment_by_id(str(revision.base.deployment_id)),
-        )
+        deployment = await get_deployment_by_id(str(revision.base.deployment_id))
 
         assert deployment is not None, (
             f"Deployment with id {revision.base.deployment_id} not found!"
@@ -926,12 +950,10 @@ def annotate(
         evaluator_references = {step.key: step.references for step in annotation_steps}
 
         evaluators = {
-            evaluator_key: loop.run_until_complete(
-                workflows_service.fetch_workflow_revision(
-                    project_id=project_id,
-                    #
-                    workflow_revision_ref=evaluator_refs.get("evaluator_revision"),
-                )
+            evaluator_key: await workflows_service.fetch_workflow_revision(
+                project_id=project_id,
+                #
+                workflow_revision_ref=evaluator_refs.get("evaluator_revision"),
             )
             for evaluator_key, evaluator_refs in evaluator_references.items()
         }
@@ -943,38 +965,13 @@ def annotate(
             headers = {"Authorization": credentials}
         headers["ngrok-skip-browser-warning"] = "1"
 
-        openapi_parameters = None
-        max_recursive_depth = 5
-        runtime_prefix = uri
-        route_path = ""
+        content_hash = llm_apps_service.get_deployment_hash(deployment)
 
-        while max_recursive_depth > 0 and not openapi_parameters:
-            try:
-                openapi_parameters = loop.run_until_complete(
-                    llm_apps_service.get_parameters_from_openapi(
-                        runtime_prefix + "/openapi.json",
-                        route_path,
-                        headers,
-                    ),
-                )
-            except Exception:  # pylint: disable=broad-exception-caught
-                openapi_parameters = None
-
-            if not openapi_parameters:
-                max_recursive_depth -= 1
-                if not runtime_prefix.endswith("/"):
-                    route_path = "/" + runtime_prefix.split("/")[-1] + route_path
-                    runtime_prefix = "/".join(runtime_prefix.split("/")[:-1])
-                else:
-                    route_path = ""
-                    runtime_prefix = runtime_prefix[:-1]
-
-        openapi_parameters = loop.run_until_complete(
-            llm_apps_service.get_parameters_from_openapi(
-                runtime_prefix + "/openapi.json",
-                route_path,
-                headers,
-            ),
+        await llm_apps_service.discover_openapi(
+            uri,
+            headers,
+            project_id=str(project_id),
+            content_hash=content_hash,
         )
         # ----------------------------------------------------------------------
 
@@ -988,13 +985,11 @@ def annotate(
             for _ in range(nof_testcases)
         ]
 
-        scenarios = loop.run_until_complete(
-            evaluations_service.create_scenarios(
-                project_id=project_id,
-                user_id=user_id,
-                #
-                scenarios=scenarios_create,
-            )
+        scenarios = await evaluations_service.create_scenarios(
+            project_id=project_id,
+            user_id=user_id,
+            #
+            scenarios=scenarios_create,
         )
 
         assert len(scenarios) == nof_testcases, (
@@ -1016,13 +1011,11 @@ def annotate(
             for idx, scenario in enumerate(scenarios)
         ]
 
-        steps = loop.run_until_complete(
-            evaluations_service.create_results(
-                project_id=project_id,
-                user_id=user_id,
-                #
-                results=results_create,
-            )
+        steps = await evaluations_service.create_results(
+            project_id=project_id,
+            user_id=user_id,
+            #
+            results=results_create,
         )
 
         assert len(steps) == nof_testcases, (
@@ -1042,442 +1035,158 @@ def annotate(
         )
         # ----------------------------------------------------------------------
 
-        # invoke application ---------------------------------------------------
-        invocations: List[InvokationResult] = loop.run_until_complete(
-            llm_apps_service.batch_invoke(
-                project_id=str(project_id),
-                user_id=str(user_id),
-                testset_data=testcases_data,  # type: ignore
-                parameters=revision_parameters,  # type: ignore
-                uri=uri,
-                rate_limit_config=run_config,
-                application_id=str(app.id),  # DO NOT REMOVE
-                references={
-                    "testset": {"id": testset_id},
-                    "application": {"id": str(app.id)},
-                    "application_variant": {"id": str(variant.id)},
-                    "application_revision": {"id": str(revision.id)},
-                },
-                scenarios=[
-                    s.model_dump(
-                        mode="json",
-                        exclude_none=True,
-                    )
-                    for s in scenarios
-                ],
-            )
+        # configure pipeline ---------------------------------------------------
+        # invocations feed trace fetches, which feed evaluations, each stage
+        # with its own workers, through bounded queues
+        trace_concurrency = max(
+            1, run_config.get("trace_concurrency") or TRACE_CONCURRENCY
         )
-        # ----------------------------------------------------------------------
-
-        # create invocation results --------------------------------------------
-        results_create = [
-            EvaluationResultCreate(
-                run_id=run_id,
-                scenario_id=scenario.id,
-                step_key=invocation_steps_keys[0],
-                #
-                status=(
-                    EvaluationStatus.SUCCESS
-                    if not invocations[idx].result.error
-                    else EvaluationStatus.FAILURE
-                ),
-                #
-                trace_id=invocations[idx].trace_id,
-                error=(
-                    invocations[idx].result.error.model_dump(mode="json")
-                    if invocations[idx].result.error
-                    else None
-                ),
-            )
-            for idx, scenario in enumerate(scenarios)
-        ]
-
-        steps = loop.run_until_complete(
-            evaluations_service.create_results(
-                project_id=project_id,
-                user_id=user_id,
-                #
-                results=results_create,
-            )
+        annotation_concurrency = max(
+            1, run_config.get("annotation_concurrency") or ANNOTATION_CONCURRENCY
         )
+        queue_size = max(1, run_config.get("queue_size") or QUEUE_SIZE)
 
-        assert len(steps) == nof_testcases, (
-            f"Failed to create evaluation steps for run {run_id}!"
-        )
-        # ----------------------------------------------------------------------
+        invocations_queue: Queue = Queue(maxsize=queue_size)
+        traces_queue: Queue = Queue(maxsize=queue_size)
 
         run_has_errors = 0
         run_status = EvaluationStatus.SUCCESS
 
-        # run evaluators -------------------------------------------------------
-        for idx in range(nof_testcases):
-            scenario = scenarios[idx]
-            testcase = testcases[idx]
-            invocation = invocations[idx]
-            invocation_step_key = invocation_steps_keys[0]
+        run_errors: Dict[int, int] = dict()
 
-            scenario_has_errors = 0
-            scenario_status = EvaluationStatus.SUCCESS
+        log.info(
+            "[PIPELINE]  ",
+            run_id=run_id,
+            trace_concurrency=trace_concurrency,
+            annotation_concurrency=annotation_concurrency,
+            queue_size=queue_size,
+        )
 
-            # skip the iteration if error in the invocation --------------------
-            if invocation.result.error:
-                log.error(
-                    f"There is an error in invocation {invocation.trace_id} so we skip its evaluation"
-                )
+        async def queue_invocation(
+            idx: int,
+            invocation: InvokationResult,
+        ) -> None:
+            await invocations_queue.put((idx, invocation))
 
-                scenario_has_errors += 1
-                run_has_errors += 1
-                scenario_status = EvaluationStatus.ERRORS
-                run_status = EvaluationStatus.ERRORS
+        async def fetch_traces() -> None:
+            while True:
+                item = await invocations_queue.get()
 
-                error = invocation.result.error.model_dump(mode="json") is not None
-            # ------------------------------------------------------------------
+                if item is None:
+                    return
 
-            # proceed with the evaluation otherwise ----------------------------
-            else:
-                if not invocation.trace_id:
-                    log.warn(f"invocation trace_id is missing.")
-                    scenario_has_errors += 1
-                    scenario_status = EvaluationStatus.ERRORS
-                    continue
+                idx, invocation = item
 
                 trace = None
-                if invocation.trace_id:
-                    trace = loop.run_until_complete(
-                        fetch_trace(
+
+                if not invocation.result.error and invocation.trace_id:
+                    try:
+                        trace = await fetch_trace(
                             tracing_router=tracing_router,
                             request=request,
                             trace_id=invocation.trace_id,
                         )
-                    )
-
-                if trace:
-                    log.info(
-                        f"Trace found  ",
-                        scenario_id=scenario.id,
-                        step_key=invocation_step_key,
-                        trace_id=invocation.trace_id,
-                    )
-                else:
-                    log.warn(
-                        f"Trace missing",
-                        scenario_id=scenario.id,
-                        step_key=invocation_step_key,
-                        trace_id=invocation.trace_id,
-                    )
-                    scenario_has_errors += 1
-                    scenario_status = EvaluationStatus.ERRORS
-                    continue
-
-                if not isinstance(trace.spans, dict):
-                    log.warn(
-                        f"Trace with id {invocation.trace_id} has no root spans",
-                    )
-                    scenario_has_errors += 1
-                    scenario_status = EvaluationStatus.ERRORS
-                    continue
-
-                root_span = list(trace.spans.values())[0]
-
-                if isinstance(root_span, list):
-                    log.warn(
-                        f"More than one root span for trace with id {invocation.trace_id}.",
-                    )
-                    scenario_has_errors += 1
-                    scenario_status = EvaluationStatus.ERRORS
-                    continue
-
-                # run the evaluators if no error in the invocation -------------
-                for jdx in range(nof_annotations):
-                    annotation_step_key = annotation_steps_keys[jdx]
-
-                    step_has_errors = 0
-                    step_status = EvaluationStatus.SUCCESS
-
-                    references: Dict[str, Any] = {
-                        **evaluator_references[annotation_step_key],
-                        "testset": {"id": testset_id},
-                        "testcase": {"id": str(testcase.id)},
-                    }
-                    links: Dict[str, Any] = {
-                        invocation_steps_keys[0]: {
-                            "trace_id": invocation.trace_id,
-                            "span_id": invocation.span_id,
-                        }
-                    }
-
-                    # invoke annotation workflow -------------------------------
-                    evaluator_revision = evaluators[annotation_step_key]
-
-                    if not evaluator_revision:
-                        log.error(
-                            f"Evaluator revision for {annotation_step_key} not found!"
-                        )
-                        step_has_errors += 1
-                        scenario_has_errors += 1
-                        run_has_errors += 1
-                        step_status = EvaluationStatus.FAILURE
-                        scenario_status = EvaluationStatus.ERRORS
-                        run_status = EvaluationStatus.ERRORS
-                        continue
-
-                    _revision = evaluator_revision.model_dump(
-                        mode="json",
-                        exclude_none=True,
-                    )
-                    interface = (
-                        dict(
-                            uri=evaluator_revision.data.uri,
-                            url=evaluator_revision.data.url,
-                            headers=evaluator_revision.data.headers,
-                            schemas=evaluator_revision.data.schemas,
-                        )
-                        if evaluator_revision.data
-                        else dict()
-                    )
-                    configuration = (
-                        dict(
-                            script=evaluator_revision.data.script,
-                            parameters=evaluator_revision.data.parameters,
-                        )
-                        if evaluator_revision.data
-                        else dict()
-                    )
-                    parameters = configuration.get("parameters")
-
-                    _testcase = testcase.model_dump(mode="json")
-                    inputs = testcase.data
-                    if isinstance(inputs, dict):
-                        if "testcase_dedup_id" in inputs:
-                            del inputs["testcase_dedup_id"]
 
-                    _trace: Optional[dict] = (
-                        trace.model_dump(
-                            mode="json",
-                            exclude_none=True,
+                    except Exception:  # pylint: disable=broad-exception-caught
+                        log.warn(
+                            "Trace fetch failed",
+                            scenario_id=scenarios[idx].id,
+                            trace_id=invocation.trace_id,
+                            exc_info=True,
                         )
-                        if trace
-                        else None
-                    )
 
-                    _root_span = root_span.model_dump(mode="json", exclude_none=True)
-                    testcase_data = testcase.data
+                await traces_queue.put((idx, invocation, trace))
 
-                    root_span_attributes: dict = _root_span.get("attributes") or {}
-                    root_span_attributes_ag: dict = root_span_attributes.get("ag") or {}
-                    root_span_attributes_ag_data: dict = (
-                        root_span_attributes_ag.get("data") or {}
-                    )
-                    root_span_attributes_ag_data_outputs = (
-                        root_span_attributes_ag_data.get("outputs")
-                    )
-                    root_span_attributes_ag_data_inputs = (
-                        root_span_attributes_ag_data.get("inputs")
-                    )
+        async def annotate_scenarios() -> None:
+            while True:
+                item = await traces_queue.get()
 
-                    outputs = root_span_attributes_ag_data_outputs
-                    inputs = testcase_data or root_span_attributes_ag_data_inputs
+                if item is None:
+                    return
 
-                    workflow_service_request_data = WorkflowServiceRequestData(
-                        revision=_revision,
-                        parameters=parameters,
-                        #
-                        testcase=_testcase,
-                        inputs=inputs,
-                        #
-                        trace=_trace,
-                        outputs=outputs,
-                    )
-
-                    flags = (
-                        evaluator_revision.flags.model_dump(
-                            mode="json",
-                            exclude_none=True,
-                            exclude_unset=True,
-                        )
-                        if evaluator_revision.flags
-                        else None
-                    )
+                idx, invocation, trace = item
 
-                    workflow_service_request = WorkflowServiceRequest(
-                        version="2025.07.14",
-                        #
-                        flags=flags,
+                try:
+                    run_errors[idx] = await _annotate_scenario(
+                        project_id=project_id,
+                        user_id=user_id,
+                        request=request,
                         #
-                        interface=interface,
-                        configuration=configuration,
+                        run_id=run_id,
+                        testset_id=testset_id,
+                        scenario=scenarios[idx],
+                        testcase=testcases[idx],
                         #
-                        data=workflow_service_request_data,
+                        invocation_step_key=invocation_steps_keys[0],
+                        invocation=invocation,
+                        trace=trace,
                         #
-                        references=references,
-                        links=links,
+                        annotation_steps_keys=annotation_steps_keys,
+                        evaluators=evaluators,
+                        evaluator_references=evaluator_references,
                     )
 
-                    log.info(
-                        "Invoking evaluator...  ",
-                        scenario_id=scenario.id,
-                        testcase_id=testcase.id,
-                        trace_id=invocation.trace_id,
-                        uri=interface.get("uri"),
-                    )
-                    workflows_service_response = loop.run_until_complete(
-                        workflows_service.invoke_workflow(
-                            project_id=project_id,
-                            user_id=user_id,
-                            #
-                            request=workflow_service_request,
-                            #
-                            annotate=True,
-                        )
-                    )
-                    log.info(
-                        "Invoked evaluator      ",
-                        scenario_id=scenario.id,
-                        trace_id=workflows_service_response.trace_id,
+                except Exception:  # pylint: disable=broad-exception-caught
+                    log.error(
+                        "Failed to evaluate scenario",
+                        scenario_id=scenarios[idx].id,
+                        exc_info=True,
                     )
-                    # ----------------------------------------------------------
-
-                    # run evaluator --------------------------------------------
-                    trace_id = workflows_service_response.trace_id
-
-                    error = None
-                    has_error = workflows_service_response.status.code != 200
-
-                    # if error in evaluator, no annotation, only step ----------
-                    if has_error:
-                        log.warn(
-                            f"There is an error in annotation {annotation_step_key} for invocation {invocation.trace_id}."
-                        )
-
-                        step_has_errors += 1
-                        scenario_has_errors += 1
-                        run_has_errors += 1
-                        step_status = EvaluationStatus.FAILURE
-                        scenario_status = EvaluationStatus.ERRORS
-                        run_status = EvaluationStatus.ERRORS
 
-                        error = workflows_service_response.status.model_dump(
-                            mode="json"
-                        )
-
-                    # ----------------------------------------------------------
+                    run_errors[idx] = 1
 
-                    # else, first annotation, then step ------------------------
-                    else:
-                        outputs = (
-                            workflows_service_response.data.outputs
-                            if workflows_service_response.data
-                            else None
-                        )
-
-                        annotation = workflows_service_response
-
-                        trace_id = annotation.trace_id
-
-                        if not annotation.trace_id:
-                            log.warn(f"annotation trace_id is missing.")
-                            scenario_has_errors += 1
-                            scenario_status = EvaluationStatus.ERRORS
-                            continue
-
-                        trace = None
-                        if annotation.trace_id:
-                            trace = loop.run_until_complete(
-                                fetch_trace(
-                                    tracing_router=tracing_router,
-                                    request=request,
-                                    trace_id=annotation.trace_id,
-                                )
-                            )
-
-                        if trace:
-                            log.info(
-                                f"Trace found  ",
-                                scenario_id=scenario.id,
-                                step_key=annotation_step_key,
-                                trace_id=annotation.trace_id,
-                            )
-                        else:
-                            log.warn(
-                                f"Trace missing",
-                                scenario_id=scenario.id,
-                                step_key=annotation_step_key,
-                                trace_id=annotation.trace_id,
-                            )
-                            scenario_has_errors += 1
-                            scenario_status = EvaluationStatus.ERRORS
-                            continue
-                    # ----------------------------------------------------------
-
-                    results_create = [
-                        EvaluationResultCreate(
-                            run_id=run_id,
-                            scenario_id=scenario.id,
-                            step_key=annotation_step_key,
-                            #
-                            status=step_status,
-                            #
-                            trace_id=trace_id,
-                            error=error,
-                        )
-                    ]
+        async def run_pipeline() -> None:
+            fetchers = [ensure_future(fetch_traces()) for _ in range(trace_concurrency)]
+            annotators = [
+                ensure_future(annotate_scenarios())
+                for _ in range(annotation_concurrency)
+            ]
 
-                    steps = loop.run_until_complete(
-                        evaluations_service.create_results(
-                            project_id=project_id,
-                            user_id=user_id,
-                            #
-                            results=results_create,
+            try:
+                # invoke application -------------------------------------------
+                await llm_apps_service.batch_invoke(
+                    project_id=str(project_id),
+                    user_id=str(user_id),
+                    testset_data=testcases_data,  # type: ignore
+                    parameters=revision_parameters,  # type: ignore
+                    uri=uri,
+                    rate_limit_config=run_config,
+                    application_id=str(app.id),  # DO NOT REMOVE
+                    references={
+                        "testset": {"id": testset_id},
+                        "application": {"id": str(app.id)},
+                        "application_variant": {"id": str(variant.id)},
+                        "application_revision": {"id": str(revision.id)},
+                    },
+                    scenarios=[
+                        s.model_dump(
+                            mode="json",
+                            exclude_none=True,
                         )
-                    )
+                        for s in scenarios
+                    ],
+                    on_result=queue_invocation,
+                    content_hash=content_hash,
+                )
+                # --------------------------------------------------------------
 
-                    assert len(steps) == 1, (
-                        f"Failed to create evaluation step for scenario with id {scenario.id}!"
-                    )
-            # ------------------------------------------------------------------
+            finally:
+                for _ in fetchers:
+                    await invocations_queue.put(None)
 
-            scenario_edit = EvaluationScenarioEdit(
-                id=scenario.id,
-                tags=scenario.tags,
-                meta=scenario.meta,
-                status=scenario_status,
-            )
+                await gather(*fetchers)
 
-            scenario = loop.run_until_complete(
-                evaluations_service.edit_scenario(
-                    project_id=project_id,
-                    user_id=user_id,
-                    #
-                    scenario=scenario_edit,
-                )
-            )
+                for _ in annotators:
+                    await traces_queue.put(None)
 
-            assert scenario, (
-                f"Failed to edit evaluation scenario with id {scenario.id}!"
-            )
+                await gather(*annotators)
 
-            if scenario_status != EvaluationStatus.FAILURE:
-                try:
-                    metrics = loop.run_until_complete(
-                        evaluations_service.refresh_metrics(
-                            project_id=project_id,
-                            user_id=user_id,
-                            #
-                            run_id=run_id,
-                            scenario_id=scenario.id,
-                        )
-                    )
+        await run_pipeline()
 
-                    if not metrics:
-                        log.warning(
-                            f"Refreshing metrics failed for {run_id} | {scenario.id}"
-                        )
+        run_has_errors = sum(run_errors.values())
 
-                except Exception as e:
-                    log.warning(
-                        f"Refreshing metrics failed for {run_id} | {scenario.id}",
-                        exc_info=True,
-                    )
+        if run_has_errors:
+            run_status = EvaluationStatus.ERRORS
         # ----------------------------------------------------------------------
 
     except Exception as e:  # pylint: disable=broad-exception-caught
@@ -1486,7 +1195,7 @@ def annotate(
             exc_info=True,
         )
 
-        self.update_state(state=states.FAILURE)
+        self.update_state(task_id=task_id, state=states.FAILURE)
 
         run_status = EvaluationStatus.FAILURE
 
@@ -1495,26 +1204,24 @@ def annotate(
 
     if run_status != EvaluationStatus.FAILURE:
         try:
-            metrics = loop.run_until_complete(
-                evaluations_service.refresh_metrics(
-                    project_id=project_id,
-                    user_id=user_id,
-                    #
-                    run_id=run_id,
-                )
+            metrics = await evaluations_service.refresh_metrics(
+                project_id=project_id,
+                user_id=user_id,
+                #
+                run_id=run_id,
             )
 
             if not metrics:
                 log.warning(f"Refreshing metrics failed for {run_id}")
 
-                self.update_state(state=states.FAILURE)
+                self.update_state(task_id=task_id, state=states.FAILURE)
 
                 run_status = EvaluationStatus.FAILURE
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             log.warning(f"Refreshing metrics failed for {run_id}", exc_info=True)
 
-            self.update_state(state=states.FAILURE)
+            self.update_state(task_id=task_id, state=states.FAILURE)
 
             run_status = EvaluationStatus.FAILURE
 
@@ -1533,26 +1240,462 @@ def annotate(
         data=run.data,
     )
 
-    loop.run_until_complete(
-        evaluations_service.edit_run(
-            project_id=project_id,
-            user_id=user_id,
-            #
-            run=run_edit,
-        )
+    await evaluations_service.edit_run(
+        project_id=project_id,
+        user_id=user_id,
+        #
+        run=run_edit,
     )
 
     # edit meters to avoid conting failed evaluations --------------------------
     if run_status == EvaluationStatus.FAILURE:
         if is_ee():
-            loop.run_until_complete(
-                check_entitlements(
-                    organization_id=project.organization_id,
-                    key=Counter.EVALUATIONS,
-                    delta=-1,
-                )
+            await check_entitlements(
+                organization_id=project.organization_id,
+                key=Counter.EVALUATIONS,
+                delta=-1,
             )
 
     log.info("[DONE]      ", run_id=run_id, project_id=project_id, user_id=user_id)
 
     return
+
+
+async def _annotate_testcase(
+    *,
+    project_id: UUID,
+    user_id: UUID,
+    #
+    run_id: UUID,
+    testset_id: str,
+    scenario: Any,
+    testcase: Any,
+    #
+    invocation_step_key: str,
+    invocation: InvokationResult,
+    trace: Any,
+    root_span: Any,
+    #
+    annotation_step_key: str,
+    evaluator_revision: Optional[WorkflowRevision],
+    evaluator_references: Dict[str, Any],
+    #
+    request: Request,
+) -> Tuple[Optional[EvaluationResultCreate], int, int]:
+    """
+    Run one evaluator on one invocation.
+
+    Returns the result to create, if any, and the scenario and run errors.
+    """
+
+    step_status = EvaluationStatus.SUCCESS
+
+    references: Dict[str, Any] = {
+        **evaluator_references,
+        "testset": {"id": testset_id},
+        "testcase": {"id": str(testcase.id)},
+    }
+    links: Dict[str, Any] = {
+        invocation_step_key: {
+            "trace_id": invocation.trace_id,
+            "span_id": invocation.span_id,
+        }
+    }
+
+    # invoke annotation workflow -----------------------------------------------
+    if not evaluator_revision:
+        log.error(f"Evaluator revision for {annotation_step_key} not found!")
+        return None, 1, 1
+
+    _revision = evaluator_revision.model_dump(
+        mode="json",
+        exclude_none=True,
+    )
+    interface = (
+        dict(
+            uri=evaluator_revision.data.uri,
+            url=evaluator_revision.data.url,
+            headers=evaluator_revision.data.headers,
+            schemas=evaluator_revision.data.schemas,
+        )
+        if evaluator_revision.data
+        else dict()
+    )
+    configuration = (
+        dict(
+            script=evaluator_revision.data.script,
+            parameters=evaluator_revision.data.parameters,
+        )
+        if evaluator_revision.data
+        else dict()
+    )
+    parameters = configuration.get("parameters")
+
+    _testcase = testcase.model_dump(mode="json")
+    inputs = testcase.data
+    if isinstance(inputs, dict):
+        if "testcase_dedup_id" in inputs:
+            del inputs["testcase_dedup_id"]
+
+    _trace: Optional[dict] = (
+        trace.model_dump(
+            mode="json",
+            exclude_none=True,
+        )
+        if trace
+        else None
+    )
+
+    _root_span = root_span.model_dump(mode="json", exclude_none=True)
+    testcase_data = testcase.data
+
+    root_span_attributes: dict = _root_span.get("attributes") or {}
+    root_span_attributes_ag: dict = root_span_attributes.get("ag") or {}
+    root_span_attributes_ag_data: dict = root_span_attributes_ag.get("data") or {}
+    root_span_attributes_ag_data_outputs = root_span_attributes_ag_data.get("outputs")
+    root_span_attributes_ag_data_inputs = root_span_attributes_ag_data.get("inputs")
+
+    outputs = root_span_attributes_ag_data_outputs
+    inputs = testcase_data or root_span_attributes_ag_data_inputs
+
+    workflow_service_request_data = WorkflowServiceRequestData(
+        revision=_revision,
+        parameters=parameters,
+        #
+        testcase=_testcase,
+        inputs=inputs,
+        #
+        trace=_trace,
+        outputs=outputs,
+    )
+
+    # reuse the annotation of the same evaluator on the same data, if any ------
+    memo_key = (
+        compute_memo_key(
+            evaluator_revision=evaluator_revision,
+            request_data=workflow_service_request_data,
+        )
+        if is_memoizable(evaluator_revision)
+        else None
+    )
+
+    memo_trace_id = (
+        await get_memo(project_id=project_id, key=memo_key) if memo_key else None
+    )
+
+    if memo_trace_id:
+        log.info(
+            "Reused evaluator       ",
+            scenario_id=scenario.id,
+            trace_id=memo_trace_id,
+        )
+
+        result_create = EvaluationResultCreate(
+            run_id=run_id,
+            scenario_id=scenario.id,
+            step_key=annotation_step_key,
+            #
+            status=EvaluationStatus.SUCCESS,
+            #
+            trace_id=memo_trace_id,
+        )
+
+        return result_create, 0, 0
+    # --------------------------------------------------------------------------
+
+    flags = (
+        evaluator_revision.flags.model_dump(
+            mode="json",
+            exclude_none=True,
+            exclude_unset=True,
+        )
+        if evaluator_revision.flags
+        else None
+    )
+
+    workflow_service_request = WorkflowServiceRequest(
+        version="2025.07.14",
+        #
+        flags=flags,
+        #
+        interface=interface,
+        configuration=configuration,
+        #
+        data=workflow_service_request_data,
+        #
+        references=references,
+        links=links,
+    )
+
+    log.info(
+        "Invoking evaluator...  ",
+        scenario_id=scenario.id,
+        testcase_id=testcase.id,
+        trace_id=invocation.trace_id,
+        uri=interface.get("uri"),
+    )
+    workflows_service_response = await workflows_service.invoke_workflow(
+        project_id=project_id,
+        user_id=user_id,
+        #
+        request=workflow_service_request,
+        #
+        annotate=True,
+    )
+    log.info(
+        "Invoked evaluator      ",
+        scenario_id=scenario.id,
+        trace_id=workflows_service_response.trace_id,
+    )
+    # --------------------------------------------------------------------------
+
+    # run evaluator ------------------------------------------------------------
+    trace_id = workflows_service_response.trace_id
+
+    error = None
+    has_error = workflows_service_response.status.code != 200
+
+    # if error in evaluator, no annotation, only step --------------------------
+    if has_error:
+        log.warn(
+            f"There is an error in annotation {annotation_step_key} for invocation {invocation.trace_id}."
+        )
+
+        step_status = EvaluationStatus.FAILURE
+
+        error = workflows_service_response.status.model_dump(mode="json")
+
+    # --------------------------------------------------------------------------
+
+    # else, first annotation, then step ----------------------------------------
+    else:
+        annotation = workflows_service_response
+
+        trace_id = annotation.trace_id
+
+        if not annotation.trace_id:
+            log.warn(f"annotation trace_id is missing.")
+            return None, 1, 0
+
+        annotation_trace = await fetch_trace(
+            tracing_router=tracing_router,
+            request=request,
+            trace_id=annotation.trace_id,
+        )
+
+        if annotation_trace:
+            log.info(
+                f"Trace found  ",
+                scenario_id=scenario.id,
+                step_key=annotation_step_key,
+                trace_id=annotation.trace_id,
+            )
+
+            if memo_key:
+                await set_memo(
+                    project_id=project_id,
+                    key=memo_key,
+                    trace_id=annotation.trace_id,
+                )
+        else:
+            log.warn(
+                f"Trace missing",
+                scenario_id=scenario.id,
+                step_key=annotation_step_key,
+                trace_id=annotation.trace_id,
+            )
+            return None, 1, 0
+    # --------------------------------------------------------------------------
+
+    result_create = EvaluationResultCreate(
+        run_id=run_id,
+        scenario_id=scenario.id,
+        step_key=annotation_step_key,
+        #
+        status=step_status,
+        #
+        trace_id=trace_id,
+        error=error,
+    )
+
+    return result_create, int(has_error), int(has_error)
+
+
+async def _annotate_scenario(
+    *,
+    project_id: UUID,
+    user_id: UUID,
+    request: Request,
+    #
+    run_id: UUID,
+    testset_id: str,
+    scenario: Any,
+    testcase: Any,
+    #
+    invocation_step_key: str,
+    invocation: InvokationResult,
+    trace: Any,
+    #
+    annotation_steps_keys: List[str],
+    evaluators: Dict[str, Optional[WorkflowRevision]],
+    evaluator_references: Dict[str, Dict[str, Any]],
+) -> int:
+    """
+    Run the evaluators on the invocation of a scenario, then write its results,
+    status and metrics.
+
+    Returns the errors that count against the run.
+    """
+
+    scenario_has_errors = 0
+    run_has_errors = 0
+
+    # create invocation result -------------------------------------------------
+    results_create = [
+        EvaluationResultCreate(
+            run_id=run_id,
+            scenario_id=scenario.id,
+            step_key=invocation_step_key,
+            #
+            status=(
+                EvaluationStatus.SUCCESS
+                if not invocation.result.error
+                else EvaluationStatus.FAILURE
+            ),
+            #
+            trace_id=invocation.trace_id,
+            error=(
+                invocation.result.error.model_dump(mode="json")
+                if invocation.result.error
+                else None
+            ),
+        )
+    ]
+    # --------------------------------------------------------------------------
+
+    # skip the evaluation if error in the invocation ---------------------------
+    if invocation.result.error:
+        log.error(
+            f"There is an error in invocation {invocation.trace_id} so we skip its evaluation"
+        )
+
+        scenario_has_errors += 1
+        run_has_errors += 1
+
+    elif not invocation.trace_id:
+        log.warn(f"invocation trace_id is missing.")
+        scenario_has_errors += 1
+
+    elif not trace:
+        log.warn(
+            f"Trace missing",
+            scenario_id=scenario.id,
+            step_key=invocation_step_key,
+            trace_id=invocation.trace_id,
+        )
+        scenario_has_errors += 1
+
+    elif not isinstance(trace.spans, dict):
+        log.warn(
+            f"Trace with id {invocation.trace_id} has no root spans",
+        )
+        scenario_has_errors += 1
+
+    elif isinstance(list(trace.spans.values())[0], list):
+        log.warn(
+            f"More than one root span for trace with id {invocation.trace_id}.",
+        )
+        scenario_has_errors += 1
+    # --------------------------------------------------------------------------
+
+    # run the evaluators otherwise ---------------------------------------------
+    else:
+        log.info(
+            f"Trace found  ",
+            scenario_id=scenario.id,
+            step_key=invocation_step_key,
+            trace_id=invocation.trace_id,
+        )
+
+        root_span = list(trace.spans.values())[0]
+
+        for annotation_step_key in annotation_steps_keys:
+            result_create, step_errors, step_run_errors = await _annotate_testcase(
+                project_id=project_id,
+                user_id=user_id,
+                #
+                run_id=run_id,
+                testset_id=testset_id,
+                scenario=scenario,
+                testcase=testcase,
+                #
+                invocation_step_key=invocation_step_key,
+                invocation=invocation,
+                trace=trace,
+                root_span=root_span,
+                #
+                annotation_step_key=annotation_step_key,
+                evaluator_revision=evaluators.get(annotation_step_key),
+                evaluator_references=evaluator_references.get(annotation_step_key)
+                or dict(),
+                #
+                request=request,
+            )
+
+            scenario_has_errors += step_errors
+            run_has_errors += step_run_errors
+
+            if result_create:
+                results_create.append(result_create)
+    # --------------------------------------------------------------------------
+
+    # create results, edit scenario, refresh metrics ---------------------------
+    steps = await evaluations_service.create_results(
+        project_id=project_id,
+        user_id=user_id,
+        #
+        results=results_create,
+    )
+
+    assert len(steps) == len(results_create), (
+        f"Failed to create evaluation steps for scenario with id {scenario.id}!"
+    )
+
+    scenario_edit = EvaluationScenarioEdit(
+        id=scenario.id,
+        tags=scenario.tags,
+        meta=scenario.meta,
+        status=(
+            EvaluationStatus.ERRORS if scenario_has_errors else EvaluationStatus.SUCCESS
+        ),
+    )
+
+    edited_scenario = await evaluations_service.edit_scenario(
+        project_id=project_id,
+        user_id=user_id,
+        #
+        scenario=scenario_edit,
+    )
+
+    assert edited_scenario, f"Failed to edit evaluation scenario with id {scenario.id}!"
+
+    try:
+        metrics = await evaluations_service.refresh_metrics(
+            project_id=project_id,
+            user_id=user_id,
+            #
+            run_id=run_id,
+            scenario_id=scenario.id,
+        )
+
+        if not metrics:
+            log.warning(f"Refreshing metrics failed for {run_id} | {scenario.id}")
+
+    except Exception:  # pylint: disable=broad-exception-caught
+        log.warning(
+            f"Refreshing metrics failed for {run_id} | {scenario.id}",
+            exc_info=True,
+        )
+    # --------------------------------------------------------------------------
+
+    return run_has_errors
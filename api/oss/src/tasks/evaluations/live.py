@@ -1,5 +1,6 @@
-from typing import List, Dict, Any, Optional
+from typing import Awaitable, List, Dict, Any, Optional, Tuple
 from uuid import UUID
+from functools import partial
 import asyncio
 from datetime import datetime
 
@@ -7,6 +8,8 @@ from celery import shared_task
 from fastapi import Request
 
 from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+from oss.src.tasks.runtime import run_task
 from oss.src.services.auth_helper import sign_secret_token
 from oss.src.services.db_manager import get_project_by_id
 from oss.src.core.secrets.utils import get_llm_providers_secrets
@@ -77,6 +80,7 @@ from oss.src.core.tracing.dtos import (
     Format,
     Focus,
     TracingQuery,
+    Sharding,
     OTelSpansTree as Trace,
     LogicalOperator,
     SimpleTraceReferences,
@@ -96,7 +100,20 @@ from oss.src.core.evaluators.dtos import (
     EvaluatorRevision,
 )
 
-from oss.src.core.evaluations.utils import fetch_trace
+from oss.src.core.evaluations.utils import (
+    RateLimiter,
+    batched,
+    fetch_trace,
+    gather_bounded,
+    is_memoizable,
+    compute_memo_key,
+    get_memo,
+    set_memo,
+)
+from oss.src.core.evaluations.dispatching import (
+    complete_shard,
+    release_lease,
+)
 
 
 log = get_module_logger(__name__)
@@ -189,6 +206,10 @@ annotations_router = AnnotationsRouter(
     annotations_service=annotations_service,
 )  # TODO: REMOVE/REPLACE ONCE ANNOTATE IS MOVED TO 'core'
 
+LIVE_CONCURRENCY = env.AGENTA_EVALUATIONS_LIVE_CONCURRENCY
+LIVE_RATE_LIMIT = env.AGENTA_EVALUATIONS_LIVE_RATE_LIMIT
+LIVE_BATCH_SIZE = env.AGENTA_EVALUATIONS_LIVE_BATCH_SIZE
+
 # ------------------------------------------------------------------------------
 
 
@@ -207,18 +228,54 @@ def evaluate(
     #
     newest: datetime,
     oldest: datetime,
+    #
+    shard: int = 0,
+    shards: int = 1,
+    lease: Optional[str] = None,
+):
+    return run_task(
+        self,
+        _evaluate_run(
+            project_id=project_id,
+            user_id=user_id,
+            #
+            run_id=run_id,
+            #
+            newest=newest,
+            oldest=oldest,
+            #
+            shard=shard,
+            shards=shards,
+            lease=lease,
+        ),
+    )
+
+
+async def _evaluate_run(
+    *,
+    project_id: UUID,
+    user_id: UUID,
+    #
+    run_id: UUID,
+    #
+    newest: datetime,
+    oldest: datetime,
+    #
+    shard: int,
+    shards: int,
+    lease: Optional[str],
 ):
     request = Request(scope={"type": "http", "http_version": "1.1", "scheme": "http"})
 
     request.state.project_id = str(project_id)
     request.state.user_id = str(user_id)
 
-    loop = asyncio.get_event_loop()
-
     # count in minutes
     timestamp = oldest
     interval = int((newest - oldest).total_seconds() / 60)
 
+    succeeded = False
+
     try:
         # ----------------------------------------------------------------------
         log.info(
@@ -233,15 +290,15 @@ def evaluate(
             run_id=run_id,
             timestamp=timestamp,
             interval=interval,
+            shard=shard,
+            shards=shards,
         )
         # ----------------------------------------------------------------------
 
         # fetch evaluation run -------------------------------------------------
-        run = loop.run_until_complete(
-            evaluations_service.fetch_run(
-                project_id=project_id,
-                run_id=run_id,
-            )
+        run = await evaluations_service.fetch_run(
+            project_id=project_id,
+            run_id=run_id,
         )
 
         assert run, f"Evaluation run with id {run_id} not found!"
@@ -270,7 +327,6 @@ def evaluate(
 
         nof_inputs = len(input_steps_keys)
         nof_invocations = len(invocation_steps_keys)
-        nof_annotations = len(annotation_steps_keys)
         # ----------------------------------------------------------------------
 
         # initialize query variables -------------------------------------------
@@ -313,12 +369,10 @@ def evaluate(
             query_step_key,
             query_revision_ref,
         ) in query_revision_refs.items():
-            query_revision = loop.run_until_complete(
-                queries_service.fetch_query_revision(
-                    project_id=project_id,
-                    #
-                    query_revision_ref=query_revision_ref,
-                )
+            query_revision = await queries_service.fetch_query_revision(
+                project_id=project_id,
+                #
+                query_revision_ref=query_revision_ref,
             )
 
             if query_revision and not query_revision.data:
@@ -346,12 +400,10 @@ def evaluate(
             evaluator_step_key,
             evaluator_revision_ref,
         ) in evaluator_revision_refs.items():
-            evaluator_revision = loop.run_until_complete(
-                evaluators_service.fetch_evaluator_revision(
-                    project_id=project_id,
-                    #
-                    evaluator_revision_ref=evaluator_revision_ref,
-                )
+            evaluator_revision = await evaluators_service.fetch_evaluator_revision(
+                project_id=project_id,
+                #
+                evaluator_revision_ref=evaluator_revision_ref,
             )
 
             if evaluator_revision and not evaluator_revision.data:
@@ -405,14 +457,16 @@ def evaluate(
                 formatting=formatting,
                 filtering=filtering,
                 windowing=windowing,
+                sharding=Sharding(
+                    shard=shard,
+                    shards=shards,
+                ),
             )
 
-            tracing_response = loop.run_until_complete(
-                tracing_router.query_spans(
-                    request=request,
-                    #
-                    query=query,
-                )
+            tracing_response = await tracing_router.query_spans(
+                request=request,
+                #
+                query=query,
             )
 
             nof_traces = tracing_response.count
@@ -426,6 +480,118 @@ def evaluate(
             query_traces[query_step_key] = tracing_response.traces or dict()
         # ----------------------------------------------------------------------
 
+        # configure execution --------------------------------------------------
+        concurrency = max(1, run.data.concurrency or LIVE_CONCURRENCY)
+        rate_limits = run.data.rate_limits or dict()
+
+        semaphore = asyncio.Semaphore(concurrency)
+        rate_limiters = {
+            annotation_step_key: RateLimiter(
+                rate_limits.get(annotation_step_key, LIVE_RATE_LIMIT)
+            )
+            for annotation_step_key in annotation_steps_keys
+        }
+
+        log.info(
+            "[LIMITS]    ",
+            run_id=run_id,
+            concurrency=concurrency,
+            rate_limits=rate_limits,
+        )
+
+        async def annotate(
+            *,
+            idx: int,
+            query_step_key: str,
+            annotation_step_key: str,
+            scenario_id: UUID,
+            query_trace_id: str,
+            query_trace: Trace,
+            root_span: Any,
+        ) -> Tuple[int, Optional[EvaluationResultCreate], bool]:
+            # waits for its rate limit before taking a slot
+            await rate_limiters[annotation_step_key].acquire()
+
+            async with semaphore:
+                try:
+                    return (
+                        idx,
+                        *await _annotate(
+                            project_id=project_id,
+                            user_id=user_id,
+                            request=request,
+                            #
+                            run_id=run_id,
+                            timestamp=timestamp,
+                            interval=interval,
+                            #
+                            query_step_key=query_step_key,
+                            annotation_step_key=annotation_step_key,
+                            scenario_id=scenario_id,
+                            query_trace_id=query_trace_id,
+                            query_trace=query_trace,
+                            root_span=root_span,
+                            #
+                            evaluator_revision=evaluator_revisions.get(
+                                annotation_step_key
+                            ),
+                            evaluator_references=evaluator_references.get(
+                                annotation_step_key
+                            )
+                            or dict(),
+                        ),
+                    )
+
+                except Exception:  # pylint: disable=broad-exception-caught
+                    log.error(
+                        f"Failed to run evaluator {annotation_step_key} for query {query_trace_id}.",
+                        run_id=run_id,
+                        exc_info=True,
+                    )
+
+                    return idx, None, True
+
+        async def create_results(
+            results_create: List[EvaluationResultCreate],
+        ) -> None:
+            results = await evaluations_service.create_results(
+                project_id=project_id,
+                user_id=user_id,
+                #
+                results=results_create,
+            )
+
+            assert len(results) == len(results_create), (
+                f"Failed to create evaluation results for run {run_id}!"
+            )
+
+        async def evaluate_traces(
+            jobs: List[Awaitable[Tuple[int, Optional[EvaluationResultCreate], bool]]],
+        ) -> Dict[int, int]:
+            # results are flushed in batches, as evaluators complete
+            scenario_has_errors: Dict[int, int] = dict()
+            results_create: List[EvaluationResultCreate] = list()
+
+            for job in asyncio.as_completed(jobs):
+                idx, result_create, has_errors = await job
+
+                if has_errors:
+                    scenario_has_errors[idx] = scenario_has_errors.get(idx, 0) + 1
+
+                if result_create:
+                    results_create.append(result_create)
+
+                if len(results_create) >= LIVE_BATCH_SIZE:
+                    await create_results(results_create)
+                    results_create = list()
+
+            if results_create:
+                await create_results(results_create)
+
+            return scenario_has_errors
+
+        # ----------------------------------------------------------------------
+
         # run online evaluation ------------------------------------------------
         for query_step_key in query_traces.keys():
             if not query_traces[query_step_key].keys():
@@ -446,13 +612,11 @@ def evaluate(
                 for _ in range(nof_traces)
             ]
 
-            scenarios = loop.run_until_complete(
-                evaluations_service.create_scenarios(
-                    project_id=project_id,
-                    user_id=user_id,
-                    #
-                    scenarios=scenarios_create,
-                )
+            scenarios = await evaluations_service.create_scenarios(
+                project_id=project_id,
+                user_id=user_id,
+                #
+                scenarios=scenarios_create,
             )
 
             if len(scenarios) != nof_traces:
@@ -483,30 +647,18 @@ def evaluate(
                 for scenario_id, query_trace_id in zip(scenario_ids, query_trace_ids)
             ]
 
-            results = loop.run_until_complete(
-                evaluations_service.create_results(
-                    project_id=project_id,
-                    user_id=user_id,
-                    #
-                    results=results_create,
-                )
-            )
-
-            assert len(results) == nof_traces, (
-                f"Failed to create evaluation results for run {run_id}!"
-            )
+            for batch in batched(results_create, LIVE_BATCH_SIZE):
+                await create_results(batch)
             # ------------------------------------------------------------------
 
             scenario_has_errors: Dict[int, int] = dict()
-            scenario_status: Dict[int, EvaluationStatus] = dict()
 
             # iterate over query traces ----------------------------------------
+            jobs = list()
+
             for idx, trace in enumerate(query_traces[query_step_key].values()):
                 scenario_has_errors[idx] = 0
-                scenario_status[idx] = EvaluationStatus.SUCCESS
 
-                scenario = scenarios[idx]
-                scenario_id = scenario_ids[idx]
                 query_trace_id = query_trace_ids[idx]
 
                 if not isinstance(trace.spans, dict):
@@ -515,7 +667,6 @@ def evaluate(
                         run_id=run_id,
                     )
                     scenario_has_errors[idx] += 1
-                    scenario_status[idx] = EvaluationStatus.ERRORS
                     continue
 
                 root_span = list(trace.spans.values())[0]
@@ -526,308 +677,424 @@ def evaluate(
                         run_id=run_id,
                     )
                     scenario_has_errors[idx] += 1
-                    scenario_status[idx] = EvaluationStatus.ERRORS
                     continue
 
-                query_span_id = root_span.span_id
-
                 log.info(
                     "[TRACE]     ",
                     run_id=run_id,
                     trace_id=query_trace_id,
                 )
 
-                # run evaluator revisions --------------------------------------
-                for jdx in range(nof_annotations):
-                    annotation_step_key = annotation_steps_keys[jdx]
-
-                    step_has_errors = 0
-                    step_status = EvaluationStatus.SUCCESS
-
-                    references: Dict[str, Any] = {
-                        **evaluator_references[annotation_step_key],
-                    }
-                    links: Dict[str, Any] = {
-                        query_step_key: dict(
-                            trace_id=query_trace_id,
-                            span_id=query_span_id,
-                        )
-                    }
-
-                    # invoke annotation workflow -------------------------------
-                    evaluator_revision = evaluator_revisions[annotation_step_key]
-
-                    if not evaluator_revision:
-                        log.error(
-                            f"Evaluator revision for {annotation_step_key} not found!"
-                        )
-                        step_has_errors += 1
-                        scenario_has_errors[idx] += 1
-                        # run_has_errors += 1
-                        step_status = EvaluationStatus.FAILURE
-                        scenario_status[idx] = EvaluationStatus.ERRORS
-                        # run_status = EvaluationStatus.ERRORS
-                        continue
-
-                    _revision = evaluator_revision.model_dump(
-                        mode="json",
-                        exclude_none=True,
-                    )
-                    interface = (
-                        dict(
-                            uri=evaluator_revision.data.uri,
-                            url=evaluator_revision.data.url,
-                            headers=evaluator_revision.data.headers,
-                            schemas=evaluator_revision.data.schemas,
-                        )
-                        if evaluator_revision.data
-                        else dict()
-                    )
-                    configuration = (
-                        dict(
-                            script=evaluator_revision.data.script,
-                            parameters=evaluator_revision.data.parameters,
-                        )
-                        if evaluator_revision.data
-                        else dict()
-                    )
-                    parameters = configuration.get("parameters")
-
-                    _testcase = None
-                    inputs = None
-
-                    _trace: Optional[dict] = (
-                        trace.model_dump(
-                            mode="json",
-                            exclude_none=True,
-                        )
-                        if trace
-                        else None
-                    )
-
-                    _root_span = root_span.model_dump(mode="json", exclude_none=True)
-                    testcase_data = None
-
-                    root_span_attributes: dict = _root_span.get("attributes") or {}
-                    root_span_attributes_ag: dict = root_span_attributes.get("ag") or {}
-                    root_span_attributes_ag_data: dict = (
-                        root_span_attributes_ag.get("data") or {}
-                    )
-                    root_span_attributes_ag_data_outputs = (
-                        root_span_attributes_ag_data.get("outputs")
-                    )
-                    root_span_attributes_ag_data_inputs = (
-                        root_span_attributes_ag_data.get("inputs")
-                    )
-
-                    outputs = root_span_attributes_ag_data_outputs
-                    inputs = testcase_data or root_span_attributes_ag_data_inputs
-
-                    workflow_service_request_data = WorkflowServiceRequestData(
-                        revision=_revision,
-                        parameters=parameters,
-                        #
-                        testcase=_testcase,
-                        inputs=inputs,
-                        #
-                        trace=_trace,
-                        outputs=outputs,
-                    )
-
-                    flags = (
-                        evaluator_revision.flags.model_dump(
-                            mode="json",
-                            exclude_none=True,
-                            exclude_unset=True,
-                        )
-                        if evaluator_revision.flags
-                        else None
-                    )
-
-                    workflow_service_request = WorkflowServiceRequest(
-                        version="2025.07.14",
-                        #
-                        flags=flags,
-                        #
-                        interface=interface,
-                        configuration=configuration,
-                        #
-                        data=workflow_service_request_data,
-                        #
-                        references=references,
-                        links=links,
-                    )
-
-                    log.info(
-                        "Invoking evaluator...  ",
-                        scenario_id=scenario.id,
-                        trace_id=query_trace_id,
-                        uri=interface.get("uri"),
-                    )
-                    workflows_service_response = loop.run_until_complete(
-                        workflows_service.invoke_workflow(
-                            project_id=project_id,
-                            user_id=user_id,
-                            #
-                            request=workflow_service_request,
-                            #
-                            annotate=True,
-                        )
-                    )
-                    log.info(
-                        "Invoked evaluator      ",
-                        scenario_id=scenario.id,
-                        trace_id=workflows_service_response.trace_id,
-                    )
-
-                    trace_id = workflows_service_response.trace_id
-
-                    error = None
-                    has_error = workflows_service_response.status.code != 200
-
-                    # if error in evaluator, no annotation, only step ----------
-                    if has_error:
-                        log.warn(
-                            f"There is an error in evaluator {evaluator_step_key} for query {query_trace_id}."
-                        )
-
-                        step_has_errors += 1
-                        step_status = EvaluationStatus.FAILURE
-                        scenario_has_errors[idx] += 1
-                        scenario_status[idx] = EvaluationStatus.ERRORS
-
-                        error = workflows_service_response.status.model_dump(
-                            mode="json",
-                            exclude_none=True,
-                        )
-                    # ----------------------------------------------------------
-
-                    # else, first annotation, then step ------------------------
-                    else:
-                        outputs = (
-                            workflows_service_response.data.outputs
-                            if workflows_service_response.data
-                            else None
-                        )
-
-                        annotation = workflows_service_response
-
-                        trace_id = annotation.trace_id
-
-                        if not annotation.trace_id:
-                            log.warn(f"annotation trace_id is missing.")
-                            scenario_has_errors[idx] += 1
-                            scenario_status[idx] = EvaluationStatus.ERRORS
-                            continue
-
-                        trace = None
-                        if annotation.trace_id:
-                            trace = loop.run_until_complete(
-                                fetch_trace(
-                                    tracing_router=tracing_router,
-                                    request=request,
-                                    trace_id=annotation.trace_id,
-                                )
-                            )
-
-                        if trace:
-                            log.info(
-                                f"Trace found  ",
-                                scenario_id=scenario.id,
-                                step_key=annotation_step_key,
-                                trace_id=annotation.trace_id,
-                            )
-                        else:
-                            log.warn(
-                                f"Trace missing",
-                                scenario_id=scenario.id,
-                                step_key=annotation_step_key,
-                                trace_id=annotation.trace_id,
-                            )
-                            scenario_has_errors[idx] += 1
-                            scenario_status[idx] = EvaluationStatus.ERRORS
-                            continue
-                    # ----------------------------------------------------------
-
-                    results_create = [
-                        EvaluationResultCreate(
-                            run_id=run_id,
-                            scenario_id=scenario_id,
-                            step_key=annotation_step_key,
-                            #
-                            timestamp=timestamp,
-                            interval=interval,
-                            #
-                            status=step_status,
-                            #
-                            trace_id=trace_id,
-                            error=error,
-                        )
-                    ]
-
-                    results = loop.run_until_complete(
-                        evaluations_service.create_results(
-                            project_id=project_id,
-                            user_id=user_id,
-                            #
-                            results=results_create,
-                        )
+                jobs.extend(
+                    annotate(
+                        idx=idx,
+                        query_step_key=query_step_key,
+                        annotation_step_key=annotation_step_key,
+                        scenario_id=scenario_ids[idx],
+                        query_trace_id=query_trace_id,
+                        query_trace=trace,
+                        root_span=root_span,
                     )
+                    for annotation_step_key in annotation_steps_keys
+                )
+            # ------------------------------------------------------------------
 
-                    assert len(results) == 1, (
-                        f"Failed to create evaluation result for scenario with id {scenario.id}!"
-                    )
-                # --------------------------------------------------------------
+            # run evaluator revisions ------------------------------------------
+            for idx, has_errors in (await evaluate_traces(jobs)).items():
+                scenario_has_errors[idx] += has_errors
+            # ------------------------------------------------------------------
 
-                scenario_edit = EvaluationScenarioEdit(
+            # edit scenarios ---------------------------------------------------
+            scenarios_edit = [
+                EvaluationScenarioEdit(
                     id=scenario.id,
                     tags=scenario.tags,
                     meta=scenario.meta,
-                    status=scenario_status[idx],
+                    status=(
+                        EvaluationStatus.ERRORS
+                        if scenario_has_errors[idx]
+                        else EvaluationStatus.SUCCESS
+                    ),
                 )
+                for idx, scenario in enumerate(scenarios)
+            ]
 
-                scenario = loop.run_until_complete(
-                    evaluations_service.edit_scenario(
-                        project_id=project_id,
-                        user_id=user_id,
-                        #
-                        scenario=scenario_edit,
-                    )
+            for batch in batched(scenarios_edit, LIVE_BATCH_SIZE):
+                edited_scenarios = await evaluations_service.edit_scenarios(
+                    project_id=project_id,
+                    user_id=user_id,
+                    #
+                    scenarios=batch,
                 )
 
-                if not scenario or not scenario.id:
+                if len(edited_scenarios) != len(batch):
                     log.error(
-                        f"Failed to update evaluation scenario with id {scenario_id}!",
+                        "Failed to update evaluation scenarios!",
                         run_id=run_id,
                     )
 
-                loop.run_until_complete(
-                    evaluations_service.refresh_metrics(
+            await gather_bounded(
+                (
+                    partial(
+                        evaluations_service.refresh_metrics,
                         project_id=project_id,
                         user_id=user_id,
                         #
                         run_id=run_id,
                         scenario_id=scenario_id,
                     )
-                )
+                    for scenario_id in scenario_ids
+                ),
+                concurrency=concurrency,
+            )
             # ------------------------------------------------------------------
 
-        loop.run_until_complete(
-            evaluations_service.refresh_metrics(
-                project_id=project_id,
-                user_id=user_id,
-                #
-                run_id=run_id,
-                timestamp=timestamp,
-                interval=interval,
-            )
-        )
+        succeeded = True
+
     except Exception as e:  # pylint: disable=broad-exception-caught
         log.error(e, exc_info=True)
 
+    finally:  # also when cancelled
+        await _complete_window(
+            project_id=project_id,
+            user_id=user_id,
+            #
+            run_id=run_id,
+            timestamp=timestamp,
+            interval=interval,
+            newest=newest,
+            #
+            shard=shard,
+            shards=shards,
+            lease=lease,
+            succeeded=succeeded,
+        )
+
     log.info(
         "[DONE]      ",
         run_id=run_id,
     )
 
     return
+
+
+async def _complete_window(
+    *,
+    project_id: UUID,
+    user_id: UUID,
+    #
+    run_id: UUID,
+    timestamp: datetime,
+    interval: int,
+    newest: datetime,
+    #
+    shard: int,
+    shards: int,
+    lease: Optional[str],
+    succeeded: bool,
+) -> None:
+    """
+    Complete the shard and, once all shards of the window are done, refresh
+    the metrics of the window and move the watermark if they all succeeded.
+    """
+
+    try:
+        last, complete = True, succeeded
+
+        if lease is not None:
+            last, complete = await complete_shard(
+                run_id=run_id,
+                lease=lease,
+                shard=shard,
+                shards=shards,
+                succeeded=succeeded,
+            )
+
+        if not last:
+            return
+
+        if complete:
+            try:
+                await evaluations_service.refresh_metrics(
+                    project_id=project_id,
+                    user_id=user_id,
+                    #
+                    run_id=run_id,
+                    timestamp=timestamp,
+                    interval=interval,
+                )
+
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                log.error(e, exc_info=True)
+
+        if lease is not None:
+            await release_lease(
+                run_id=run_id,
+                lease=lease,
+                watermark=newest if complete else None,
+            )
+
+            if not complete:
+                log.warn(
+                    "[LIVE] Shards failed, window left to the next tick",
+                    run_id=run_id,
+                )
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        log.error(e, exc_info=True)
+
+
+async def _annotate(
+    *,
+    project_id: UUID,
+    user_id: UUID,
+    request: Request,
+    #
+    run_id: UUID,
+    timestamp: datetime,
+    interval: int,
+    #
+    query_step_key: str,
+    annotation_step_key: str,
+    scenario_id: UUID,
+    query_trace_id: str,
+    query_trace: Trace,
+    root_span: Any,
+    #
+    evaluator_revision: Optional[EvaluatorRevision],
+    evaluator_references: Dict[str, Reference],
+) -> Tuple[Optional[EvaluationResultCreate], bool]:
+    """Run one evaluator on one query trace, returns its result and errors."""
+
+    step_status = EvaluationStatus.SUCCESS
+
+    references: Dict[str, Any] = {
+        **evaluator_references,
+    }
+    links: Dict[str, Any] = {
+        query_step_key: dict(
+            trace_id=query_trace_id,
+            span_id=root_span.span_id,
+        )
+    }
+
+    # invoke annotation workflow -----------------------------------------------
+    if not evaluator_revision:
+        log.error(f"Evaluator revision for {annotation_step_key} not found!")
+        return None, True
+
+    _revision = evaluator_revision.model_dump(
+        mode="json",
+        exclude_none=True,
+    )
+    interface = (
+        dict(
+            uri=evaluator_revision.data.uri,
+            url=evaluator_revision.data.url,
+            headers=evaluator_revision.data.headers,
+            schemas=evaluator_revision.data.schemas,
+        )
+        if evaluator_revision.data
+        else dict()
+    )
+    configuration = (
+        dict(
+            script=evaluator_revision.data.script,
+            parameters=evaluator_revision.data.parameters,
+        )
+        if evaluator_revision.data
+        else dict()
+    )
+    parameters = configuration.get("parameters")
+
+    _testcase = None
+    inputs = None
+
+    _trace: Optional[dict] = (
+        query_trace.model_dump(
+            mode="json",
+            exclude_none=True,
+        )
+        if query_trace
+        else None
+    )
+
+    _root_span = root_span.model_dump(mode="json", exclude_none=True)
+    testcase_data = None
+
+    root_span_attributes: dict = _root_span.get("attributes") or {}
+    root_span_attributes_ag: dict = root_span_attributes.get("ag") or {}
+    root_span_attributes_ag_data: dict = root_span_attributes_ag.get("data") or {}
+    root_span_attributes_ag_data_outputs = root_span_attributes_ag_data.get("outputs")
+    root_span_attributes_ag_data_inputs = root_span_attributes_ag_data.get("inputs")
+
+    outputs = root_span_attributes_ag_data_outputs
+    inputs = testcase_data or root_span_attributes_ag_data_inputs
+
+    workflow_service_request_data = WorkflowServiceRequestData(
+        revision=_revision,
+        parameters=parameters,
+        #
+        testcase=_testcase,
+        inputs=inputs,
+        #
+        trace=_trace,
+        outputs=outputs,
+    )
+
+    # reuse the annotation of the same evaluator on the same trace, if any -----
+    memo_key = (
+        compute_memo_key(
+            evaluator_revision=evaluator_revision,
+            request_data=workflow_service_request_data,
+            trace_id=query_trace_id,
+        )
+        if is_memoizable(evaluator_revision)
+        else None
+    )
+
+    memo_trace_id = (
+        await get_memo(project_id=project_id, key=memo_key) if memo_key else None
+    )
+
+    if memo_trace_id:
+        log.info(
+            "Reused evaluator       ",
+            scenario_id=scenario_id,
+            trace_id=memo_trace_id,
+        )
+
+        result_create = EvaluationResultCreate(
+            run_id=run_id,
+            scenario_id=scenario_id,
+            step_key=annotation_step_key,
+            #
+            timestamp=timestamp,
+            interval=interval,
+            #
+            status=EvaluationStatus.SUCCESS,
+            #
+            trace_id=memo_trace_id,
+        )
+
+        return result_create, False
+    # --------------------------------------------------------------------------
+
+    flags = (
+        evaluator_revision.flags.model_dump(
+            mode="json",
+            exclude_none=True,
+            exclude_unset=True,
+        )
+        if evaluator_revision.flags
+        else None
+    )
+
+    workflow_service_request = WorkflowServiceRequest(
+        version="2025.07.14",
+        #
+        flags=flags,
+        #
+        interface=interface,
+        configuration=configuration,
+        #
+        data=workflow_service_request_data,
+        #
+        references=references,
+        links=links,
+    )
+
+    log.info(
+        "Invoking evaluator...  ",
+        scenario_id=scenario_id,
+        trace_id=query_trace_id,
+        uri=interface.get("uri"),
+    )
+    workflows_service_response = await workflows_service.invoke_workflow(
+        project_id=project_id,
+        user_id=user_id,
+        #
+        request=workflow_service_request,
+        #
+        annotate=True,
+    )
+    log.info(
+        "Invoked evaluator      ",
+        scenario_id=scenario_id,
+        trace_id=workflows_service_response.trace_id,
+    )
+
+    trace_id = workflows_service_response.trace_id
+
+    error = None
+    has_error = workflows_service_response.status.code != 200
+
+    # if error in evaluator, no annotation, only step --------------------------
+    if has_error:
+        log.warn(
+            f"There is an error in evaluator {annotation_step_key} for query {query_trace_id}."
+        )
+
+        step_status = EvaluationStatus.FAILURE
+
+        error = workflows_service_response.status.model_dump(
+            mode="json",
+            exclude_none=True,
+        )
+    # --------------------------------------------------------------------------
+
+    # else, first annotation, then step ----------------------------------------
+    else:
+        annotation = workflows_service_response
+
+        trace_id = annotation.trace_id
+
+        if not annotation.trace_id:
+            log.warn(f"annotation trace_id is missing.")
+            return None, True
+
+        trace = await fetch_trace(
+            tracing_router=tracing_router,
+            request=request,
+            trace_id=annotation.trace_id,
+        )
+
+        if trace:
+            log.info(
+                f"Trace found  ",
+                scenario_id=scenario_id,
+                step_key=annotation_step_key,
+                trace_id=annotation.trace_id,
+            )
+
+            if memo_key:
+                await set_memo(
+                    project_id=project_id,
+                    key=memo_key,
+                    trace_id=annotation.trace_id,
+                )
+        else:
+            log.warn(
+                f"Trace missing",
+                scenario_id=scenario_id,
+                step_key=annotation_step_key,
+                trace_id=annotation.trace_id,
+            )
+            return None, True
+    # --------------------------------------------------------------------------
+
+    result_create = EvaluationResultCreate(
+        run_id=run_id,
+        scenario_id=scenario_id,
+        step_key=annotation_step_key,
+        #
+        timestamp=timestamp,
+        interval=interval,
+        #
+        status=step_status,
+        #
+        trace_id=trace_id,
+        error=error,
+    )
+
+    return result_create, has_error
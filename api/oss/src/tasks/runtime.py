@@ -0,0 +1,125 @@
+from asyncio import (
+    AbstractEventLoop,
+    new_event_loop,
+    run_coroutine_threadsafe,
+    set_event_loop,
+)
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from threading import Lock, Thread
+from time import monotonic
+from typing import Any, Coroutine, Optional
+
+from celery import Task
+from celery.exceptions import TaskRevokedError, TimeLimitExceeded
+from celery.worker import state as worker_state
+
+from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+from oss.src.utils.http import close_http_session
+
+log = get_module_logger(__name__)
+
+# Tasks run on one long-lived event loop per worker process, in a thread of its
+# own, so that DB engines, Redis clients and HTTP sessions, which are bound to
+# the loop that opened them, are reused across tasks. Task bodies are blocking
+# calls that wait for their coroutine on that loop: with `--pool=threads`, a
+# worker process runs as many evaluations at once as its concurrency.
+
+TASK_TIME_LIMIT = env.AGENTA_EVALUATIONS_TASK_TIME_LIMIT  # 0 for no limit
+REVOKE_POLL_INTERVAL = 1.0  # seconds
+
+_loop: Optional[AbstractEventLoop] = None
+_thread: Optional[Thread] = None
+_lock = Lock()
+
+
+def _run_loop(loop: AbstractEventLoop) -> None:
+    set_event_loop(loop)
+
+    loop.run_forever()
+
+
+def get_worker_loop() -> AbstractEventLoop:
+    """Return the event loop of the worker process, starting it if needed."""
+
+    global _loop, _thread  # pylint: disable=global-statement
+
+    with _lock:
+        if _loop is None or _loop.is_closed():
+            _loop = new_event_loop()
+            _thread = Thread(
+                target=_run_loop,
+                args=(_loop,),
+                name="worker-loop",
+                daemon=True,
+            )
+            _thread.start()
+
+    return _loop
+
+
+def run_task(
+    task: Task,
+    coroutine: Coroutine[Any, Any, Any],
+    *,
+    time_limit: Optional[float] = None,
+) -> Any:
+    """
+    Run the coroutine of a task on the worker loop and wait for it.
+
+    The coroutine is cancelled when the task is revoked or runs for longer than
+    `time_limit` seconds, and the matching Celery exception is raised.
+    """
+
+    task_id = task.request.id
+    time_limit = TASK_TIME_LIMIT if time_limit is None else time_limit
+    deadline = monotonic() + time_limit if time_limit else None
+
+    future = run_coroutine_threadsafe(coroutine, get_worker_loop())
+
+    while True:
+        try:
+            return future.result(timeout=REVOKE_POLL_INTERVAL)
+
+        except FutureTimeoutError:
+            pass
+
+        if task_id and task_id in worker_state.revoked:
+            future.cancel()
+
+            log.warn("[TASK] Revoked, cancelled", task_id=task_id)
+
+            raise TaskRevokedError(task_id)
+
+        if deadline and monotonic() > deadline:
+            future.cancel()
+
+            log.warn("[TASK] Time limit exceeded, cancelled", task_id=task_id)
+
+            raise TimeLimitExceeded(time_limit)
+
+
+def stop_worker_loop() -> None:
+    """Close the shared resources of the worker loop, then stop it."""
+
+    global _loop, _thread  # pylint: disable=global-statement
+
+    with _lock:
+        loop, thread = _loop, _thread
+        _loop, _thread = None, None
+
+    if loop is None or loop.is_closed():
+        return
+
+    try:
+        run_coroutine_threadsafe(close_http_session(), loop).result(timeout=10)
+
+    except Exception:  # pylint: disable=broad-exception-caught
+        log.warn("[TASK] Could not close the HTTP session", exc_info=True)
+
+    loop.call_soon_threadsafe(loop.stop)
+
+    if thread is not None:
+        thread.join(timeout=10)
+
+    loop.close()
@@ -1,10 +1,25 @@
-from typing import Any, Type, Optional, Union
+from typing import Any, Awaitable, Callable, Dict, List, Type, Optional, Tuple, Union
 from json import dumps, loads
 from random import random
-from asyncio import sleep
+from time import monotonic, perf_counter
+from fnmatch import fnmatchcase
+from collections import OrderedDict
+from functools import lru_cache, partial
+from asyncio import (
+    AbstractEventLoop,
+    CancelledError,
+    Future,
+    Task,
+    gather,
+    get_running_loop,
+    shield,
+    sleep,
+    wait_for,
+)
 
+import orjson
 from redis.asyncio import Redis
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 from oss.src.utils.logging import get_module_logger
 from oss.src.utils.env import env
@@ -20,9 +35,69 @@ AGENTA_CACHE_JITTER_SPREAD = 1 / 3  # Spread of jitter in backoff
 AGENTA_CACHE_LEAKAGE_PROBABILITY = 0.05  # Probability of early leak
 AGENTA_CACHE_LOCK_TTL = 1  # TTL for cache locks
 
-AGENTA_CACHE_SCAN_BATCH_SIZE = 500
+# Entries are versioned by a generation per project (and user) and one per
+# namespace, folded into their names. Invalidating a project or a namespace
+# increments its generation, in one round trip, instead of scanning for its
+# entries: entries of older generations are no longer read and expire through
+# their TTLs. Generations are cached in L1 like entries. When they are not,
+# entries are read and written by scripts that look their generations up first,
+# so that generations never cost a round trip of their own.
+
+# KEYS[1]: project generation, KEYS[2]: namespace generation -- ARGV[1]: name
+# prefix, ARGV[2]: name suffix, ARGV[3]: ttl (seconds, 0 to keep). Returns the
+# generations and the entry, renewed if found.
+GET_SCRIPT = """
+local project = redis.call('GET', KEYS[1]) or '0'
+local namespace = redis.call('GET', KEYS[2]) or '0'
+local name = ARGV[1] .. 'g' .. project .. '.' .. namespace .. ARGV[2]
+local raw = redis.call('GET', name)
+
+if raw and tonumber(ARGV[3]) > 0 then
+    redis.call('EXPIRE', name, ARGV[3])
+end
+
+return {project, namespace, raw}
+"""
+
+# KEYS[1]: project generation, KEYS[2]: namespace generation -- ARGV[1]: name
+# prefix, ARGV[2]: name suffix, ARGV[3]: entry, ARGV[4]: ttl (milliseconds).
+# Returns the generations, once the entry is set and its lock released.
+SET_SCRIPT = """
+local project = redis.call('GET', KEYS[1]) or '0'
+local namespace = redis.call('GET', KEYS[2]) or '0'
+local name = ARGV[1] .. 'g' .. project .. '.' .. namespace .. ARGV[2]
+
+redis.call('SET', name, ARGV[3], 'PX', ARGV[4])
+redis.call('DEL', 'lock::' .. name)
+
+return {project, namespace}
+"""
+
+AGENTA_CACHE_SCAN_BATCH_SIZE = 500  # for purge_cache() only
 AGENTA_CACHE_DELETE_BATCH_SIZE = 1000
 
+# In-process L1 cache in front of Redis, with short TTLs, so that hot keys do
+# not cost a round trip on every request. Invalidations are broadcast to all
+# processes over Redis pub/sub; values set elsewhere may be served stale for
+# up to the L1 TTL.
+AGENTA_CACHE_L1_TTL = env.AGENTA_CACHE_L1_TTL  # seconds, 0 to disable
+AGENTA_CACHE_L1_SIZE = env.AGENTA_CACHE_L1_SIZE  # entries
+AGENTA_CACHE_CHANNEL = "cache:v1:invalidations"
+AGENTA_CACHE_RESUBSCRIBE_DELAY = 1  # seconds
+
+# Concurrent misses of an entry within a process are coalesced: the first one
+# fetches the entry, through Redis locks, and recomputes it if needed, while the
+# next ones wait for it to be set and share it. Waiters give up as they would
+# have through Redis locks, after the expected total of their backoffs, and
+# flights that are never ended expire after the flight TTL.
+AGENTA_CACHE_FLIGHT_TTL = 5  # seconds
+
+# Entries are written as "<tag>:<payload>", where the tag names the codec and
+# its version, and read with the codec they were written with, so that codecs
+# can be changed without flushing the cache. Untagged entries are plain JSON.
+# Models are written and read as JSON by pydantic itself, whatever the codec.
+AGENTA_CACHE_CODEC = env.AGENTA_CACHE_CODEC  # json, orjson
+
 CACHE_DEBUG = False
 CACHE_DEBUG_VALUE = False
 
@@ -34,28 +109,68 @@ r = Redis(
     socket_timeout=0.5,  # read/write timeout
 )
 
+# pub/sub blocks on reads, without timeout
+r_pubsub = Redis(
+    host=env.REDIS_CACHE_HOST,
+    port=env.REDIS_CACHE_PORT,
+    db=AGENTA_CACHE_DB,
+    decode_responses=True,
+)
+
+
+def _orjson_dumps(
+    value: Any,
+) -> str:
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+CODECS: Dict[str, Tuple[str, Callable[[Any], str], Callable[[str], Any]]] = {
+    "json": ("j1", dumps, loads),
+    "orjson": ("o1", _orjson_dumps, orjson.loads),
+}
+
+DECODERS: Dict[str, Callable[[str], Any]] = {
+    tag: decode for tag, _, decode in CODECS.values()
+}
+
+if AGENTA_CACHE_CODEC not in CODECS:
+    raise ValueError(
+        f"Invalid AGENTA_CACHE_CODEC [{AGENTA_CACHE_CODEC}], "
+        f"expected one of: {', '.join(CODECS)}"
+    )
+
+_l1: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+_l1_subscriber: Optional[Task] = None
+_l1_subscriber_loop: Optional[AbstractEventLoop] = None
+
+_flights: Dict[Tuple[AbstractEventLoop, str], Future] = dict()
+
+_stats: Dict[str, Dict[str, float]] = dict()
+
 
 # HELPERS ----------------------------------------------------------------------
 
 
-def _pack(
+def _pad(
+    value: Optional[str] = None,
+) -> str:
+    if value:
+        value = value[-12:] if len(value) > 12 else value
+    else:
+        value = ""
+
+    return value + "-" * (12 - len(value))
+
+
+def _pack_parts(
     namespace: Optional[str] = None,
     key: Optional[Union[str, dict]] = None,
     project_id: Optional[str] = None,
     user_id: Optional[str] = None,
     pattern: Optional[bool] = False,
-) -> str:
-    if project_id:
-        project_id = project_id[-12:] if len(project_id) > 12 else project_id
-    else:
-        project_id = ""
-    project_id = project_id + "-" * (12 - len(project_id))
-
-    if user_id:
-        user_id = user_id[-12:] if len(user_id) > 12 else user_id
-    else:
-        user_id = ""
-    user_id = user_id + "-" * (12 - len(user_id))
+) -> Tuple[str, str]:
+    project_id = _pad(project_id)
+    user_id = _pad(user_id)
 
     namespace = namespace or ("" if not pattern else "*")
 
@@ -70,7 +185,282 @@ def _pack(
     else:
         raise TypeError("Cache key must be str or dict")
 
-    return f"p:{project_id}:u:{user_id}:{namespace}:{key}"
+    return f"p:{project_id}:u:{user_id}:{namespace}:", f":{key}"
+
+
+def _pack(
+    namespace: Optional[str] = None,
+    key: Optional[Union[str, dict]] = None,
+    project_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+    pattern: Optional[bool] = False,
+    generation: Optional[str] = None,
+) -> str:
+    prefix, suffix = _pack_parts(
+        namespace=namespace,
+        key=key,
+        project_id=project_id,
+        user_id=user_id,
+        pattern=pattern,
+    )
+
+    generation = generation or ("" if not pattern else "*")
+
+    return f"{prefix}{generation}{suffix}"
+
+
+def _pack_generations(
+    namespace: Optional[str] = None,
+    project_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Tuple[str, str]:
+    scope = f"gen:p:{_pad(project_id)}:u:{_pad(user_id)}"
+
+    return scope, f"{scope}:{namespace or ''}"
+
+
+def _l1_get(
+    cache_name: str,
+) -> Optional[str]:
+    entry = _l1.get(cache_name)
+
+    if entry is None:
+        return None
+
+    expires_at, raw = entry
+
+    if expires_at <= monotonic():
+        _l1.pop(cache_name, None)
+
+        return None
+
+    _l1.move_to_end(cache_name)
+
+    return raw
+
+
+def _l1_set(
+    cache_name: str,
+    raw: str,
+    ttl: Optional[float] = None,
+) -> None:
+    if not AGENTA_CACHE_L1_TTL:
+        return
+
+    l1_ttl = min(AGENTA_CACHE_L1_TTL, ttl) if ttl else AGENTA_CACHE_L1_TTL
+
+    _l1[cache_name] = (monotonic() + l1_ttl, raw)
+    _l1.move_to_end(cache_name)
+
+    while len(_l1) > AGENTA_CACHE_L1_SIZE:
+        _l1.popitem(last=False)
+
+
+def _l1_evict(
+    cache_name: str,
+) -> None:
+    if "*" not in cache_name:
+        _l1.pop(cache_name, None)
+
+        return
+
+    for name in [name for name in _l1 if fnmatchcase(name, cache_name)]:
+        _l1.pop(name, None)
+
+
+async def _l1_subscribe() -> None:
+    while True:
+        try:
+            pubsub = r_pubsub.pubsub()
+
+            await pubsub.subscribe(AGENTA_CACHE_CHANNEL)
+
+            _l1.clear()  # invalidations may have been missed until now
+
+            async for message in pubsub.listen():
+                if message.get("type") == "message":
+                    _l1_evict(message.get("data") or "")
+
+        except CancelledError:
+            raise
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            log.warn(f"[cache] Invalidations unavailable: {e}")
+
+            _l1.clear()
+
+            await sleep(AGENTA_CACHE_RESUBSCRIBE_DELAY)
+
+
+def _l1_ensure_subscriber() -> None:
+    global _l1_subscriber, _l1_subscriber_loop  # pylint: disable=global-statement
+
+    if not AGENTA_CACHE_L1_TTL:
+        return
+
+    loop = get_running_loop()
+
+    if (
+        _l1_subscriber is None
+        or _l1_subscriber.done()
+        or _l1_subscriber_loop is not loop
+    ):
+        _l1.clear()
+
+        _l1_subscriber = loop.create_task(_l1_subscribe())
+        _l1_subscriber_loop = loop
+
+
+def _record(
+    namespace: Optional[str],
+    counter: str,
+    value: float = 1,
+) -> None:
+    stats = _stats.setdefault(
+        namespace or "",
+        {
+            "l1_hits": 0,
+            "l2_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "calls": 0,
+            "latency": 0.0,
+        },
+    )
+
+    stats[counter] += value
+
+
+def _end_flight(
+    cache_name: str,
+    raw: Optional[str] = None,
+) -> None:
+    future = _flights.pop((get_running_loop(), cache_name), None)
+
+    if future is not None and not future.done():
+        future.set_result(raw)
+
+
+def _expire_flight(
+    loop: AbstractEventLoop,
+    cache_name: str,
+    future: Future,
+) -> None:
+    if _flights.get((loop, cache_name)) is future:
+        _flights.pop((loop, cache_name), None)
+
+    if not future.done():
+        future.set_result(None)
+
+
+async def _single_flight(
+    cache_name: str,
+    fetch: Callable[[], Awaitable[Optional[Any]]],
+    model: Optional[Type[BaseModel]] = None,
+    is_list: Optional[bool] = False,
+    namespace: Optional[str] = None,
+    timeout: Optional[float] = None,
+) -> Optional[Any]:
+    loop = get_running_loop()
+
+    future = _flights.get((loop, cache_name))
+
+    if future is not None:
+        try:
+            raw = await wait_for(shield(future), timeout)
+
+        except TimeoutError:
+            if CACHE_DEBUG:
+                log.debug(
+                    "[cache] QUIT ",
+                    name=cache_name,
+                )
+
+            return None  # the leader is still recomputing, or will not set it
+
+        if raw:
+            if CACHE_DEBUG:
+                log.debug(
+                    "[cache] JOIN ",
+                    name=cache_name,
+                )
+
+            _record(namespace, "coalesced")
+
+            return _deserialize(raw, model=model, is_list=is_list)
+
+        return await fetch()  # the flight expired or failed
+
+    future = loop.create_future()
+
+    _flights[(loop, cache_name)] = future
+
+    loop.call_later(
+        AGENTA_CACHE_FLIGHT_TTL,
+        _expire_flight,
+        loop,
+        cache_name,
+        future,
+    )
+
+    try:
+        data = await fetch()
+
+    except BaseException:
+        _end_flight(cache_name)
+
+        raise
+
+    if data is not None:
+        _end_flight(cache_name, _l1_get(cache_name) or _serialize(data))
+
+    return data  # if None, the flight ends when the entry is set
+
+
+async def _generation(
+    namespace: Optional[str] = None,
+    project_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> str:
+    return (
+        await _generations(
+            [
+                {
+                    "namespace": namespace,
+                    "project_id": project_id,
+                    "user_id": user_id,
+                }
+            ]
+        )
+    )[0]
+
+
+async def _generations(
+    entries: List[Dict[str, Any]],
+) -> List[str]:
+    names = [
+        _pack_generations(
+            namespace=entry.get("namespace"),
+            project_id=entry.get("project_id"),
+            user_id=entry.get("user_id"),
+        )
+        for entry in entries
+    ]
+
+    generations = {name: _l1_get(name) for pair in names for name in pair}
+
+    missing = [name for name, generation in generations.items() if generation is None]
+
+    if missing:
+        for name, generation in zip(missing, await r.mget(*missing)):
+            generations[name] = generation or "0"
+
+            _l1_set(name, generations[name])
+
+    return [
+        f"g{generations[project_name]}.{generations[namespace_name]}"
+        for project_name, namespace_name in names
+    ]
 
 
 async def _scan(pattern: str) -> list[str]:
@@ -78,7 +468,7 @@ async def _scan(pattern: str) -> list[str]:
         cursor = 0
         keys: list[str] = []
 
-        while True:  # TODO: Really ?
+        while True:
             cursor, batch = await r.scan(
                 cursor=cursor,
                 match=pattern,
@@ -98,19 +488,35 @@ async def _scan(pattern: str) -> list[str]:
         return []
 
 
+@lru_cache(maxsize=None)
+def _list_adapter(
+    model: Type[BaseModel],
+) -> TypeAdapter:
+    return TypeAdapter(List[model])
+
+
 def _serialize(
     value: Any,
 ) -> str:
     if value is None:
         return "__NULL__"
 
+    tag, encode, _ = CODECS[AGENTA_CACHE_CODEC]
+
     if isinstance(value, BaseModel):
-        return dumps(value.model_dump(mode="json", exclude_none=True))
+        return f"{tag}:{value.model_dump_json(exclude_none=True)}"
 
     elif isinstance(value, list) and all(isinstance(v, BaseModel) for v in value):
-        return dumps([v.model_dump(mode="json", exclude_none=True) for v in value])
+        models = {type(v) for v in value}
+
+        if len(models) == 1:
+            payload = _list_adapter(models.pop()).dump_json(value, exclude_none=True)
+
+            return f"{tag}:{payload.decode('utf-8')}"
 
-    return dumps(value)
+        value = [v.model_dump(mode="json", exclude_none=True) for v in value]
+
+    return f"{tag}:{encode(value)}"
 
 
 def _deserialize(
@@ -121,15 +527,31 @@ def _deserialize(
     if raw == "__NULL__":
         return None
 
-    data = loads(raw)
+    decode = DECODERS.get(raw[:2]) if raw[2:3] == ":" else None
+
+    payload = raw[3:] if decode else raw
 
     if not model:
-        return data
+        return decode(payload) if decode else loads(payload)
 
     if is_list:
-        return [model.model_validate(item) for item in data]
+        return _list_adapter(model).validate_json(payload)
 
-    return model.model_validate(data)
+    return model.model_validate_json(payload)
+
+
+def _backoff(
+    attempts_max: int,
+    backoff_base: float,
+    jitter_spread: float,
+) -> float:
+    delay = sum(
+        (1 - jitter_spread) * backoff_base * ((2 ** (attempts_idx + 1)) - 1)
+        + backoff_base * (2**attempts_idx) * (1 + jitter_spread) / 2
+        for attempts_idx in range(attempts_max)
+    )
+
+    return delay / 1000.0  # convert ms to seconds
 
 
 async def _delay(
@@ -145,42 +567,199 @@ async def _delay(
     await sleep(delay / 1000.0)  # convert ms to seconds
 
 
-async def _try_get_and_maybe_renew(
-    cache_name: str,
-    model: Optional[Type[BaseModel]],
-    is_list: Optional[bool] = False,
+def _lookup(
+    entry: Dict[str, Any],
+) -> Tuple[Tuple[str, str], str, str, Optional[str]]:
+    generation_names = _pack_generations(
+        namespace=entry.get("namespace"),
+        project_id=entry.get("project_id"),
+        user_id=entry.get("user_id"),
+    )
+
+    prefix, suffix = _pack_parts(
+        namespace=entry.get("namespace"),
+        key=entry.get("key"),
+        project_id=entry.get("project_id"),
+        user_id=entry.get("user_id"),
+    )
+
+    project, namespace = [_l1_get(name) for name in generation_names]
+
+    cache_name = (
+        f"{prefix}g{project}.{namespace}{suffix}"
+        if project is not None and namespace is not None
+        else None
+    )
+
+    return generation_names, prefix, suffix, cache_name
+
+
+def _resolve(
+    generation_names: Tuple[str, str],
+    prefix: str,
+    suffix: str,
+    generations: List[str],
+) -> str:
+    project, namespace = generations[0], generations[1]
+
+    _l1_set(generation_names[0], project)
+    _l1_set(generation_names[1], namespace)
+
+    return f"{prefix}g{project}.{namespace}{suffix}"
+
+
+async def _fetch(
+    entries: List[Dict[str, Any]],
     ttl: Optional[int] = None,
-) -> Optional[Any]:
-    data = None
+) -> Tuple[List[str], List[Optional[str]]]:
+    """
+    Read entries from L1, then from Redis in one round trip, renewing them if
+    ttl is given. Returns their names, with their current generations, and
+    their raw values.
+    """
 
-    raw = await r.get(cache_name)
+    cache_names: List[Optional[str]] = [None] * len(entries)
+    raws: List[Optional[str]] = [None] * len(entries)
+    lookups = list()
 
-    if raw:
-        if CACHE_DEBUG:
-            log.debug(
-                "[cache] HIT  ",
-                name=cache_name,
-                value=data if CACHE_DEBUG_VALUE else "***",
-            )
+    for i, entry in enumerate(entries):
+        generation_names, prefix, suffix, cache_names[i] = _lookup(entry)
 
-        data = _deserialize(raw, model=model, is_list=is_list)
+        raws[i] = _l1_get(cache_names[i]) if cache_names[i] else None
 
-        if ttl is not None and ttl > 0:
+        if raws[i]:
             if CACHE_DEBUG:
                 log.debug(
-                    "[cache] RENEW",
-                    name=cache_name,
+                    "[cache] HIT L1",
+                    name=cache_names[i],
                 )
 
-            await r.expire(cache_name, ttl)
-    else:
-        if CACHE_DEBUG:
-            log.debug(
-                "[cache] MISS ",
-                name=cache_name,
+            _record(entry.get("namespace"), "l1_hits")
+
+            continue
+
+        lookups.append((i, generation_names, prefix, suffix))
+
+    if not lookups:
+        return cache_names, raws
+
+    renew = ttl is not None and ttl > 0
+
+    async with r.pipeline(transaction=False) as pipe:
+        for i, generation_names, prefix, suffix in lookups:
+            if cache_names[i]:
+                pipe.get(cache_names[i])
+
+                if renew:
+                    pipe.expire(cache_names[i], ttl)
+
+            else:
+                pipe.eval(
+                    GET_SCRIPT,
+                    2,
+                    *generation_names,
+                    prefix,
+                    suffix,
+                    ttl if renew else 0,
+                )
+
+        results = iter(await pipe.execute())
+
+    for i, generation_names, prefix, suffix in lookups:
+        if cache_names[i]:
+            raws[i] = next(results)
+
+            if renew:
+                next(results)
+
+        else:
+            *generations, raws[i] = next(results)
+
+            cache_names[i] = _resolve(generation_names, prefix, suffix, generations)
+
+        namespace = entries[i].get("namespace")
+
+        if raws[i]:
+            if CACHE_DEBUG:
+                log.debug(
+                    "[cache] HIT  ",
+                    name=cache_names[i],
+                    value=raws[i] if CACHE_DEBUG_VALUE else "***",
+                )
+
+            _record(namespace, "l2_hits")
+
+            _l1_set(cache_names[i], raws[i], ttl)
+
+        else:
+            if CACHE_DEBUG:
+                log.debug(
+                    "[cache] MISS ",
+                    name=cache_names[i],
+                )
+
+            _record(namespace, "misses")
+
+    return cache_names, raws
+
+
+async def _store(
+    entries: List[Dict[str, Any]],
+    ttl: Optional[int] = None,
+) -> List[Tuple[str, str, int]]:
+    """
+    Write entries to Redis in one round trip and release their locks. Returns
+    their names, with their current generations, raw values and ttls.
+    """
+
+    stores = list()
+
+    for entry in entries:
+        generation_names, prefix, suffix, cache_name = _lookup(entry)
+
+        stores.append(
+            (
+                generation_names,
+                prefix,
+                suffix,
+                cache_name,
+                _serialize(entry.get("value")),
+                entry.get("ttl", ttl),
             )
+        )
 
-    return data
+    async with r.pipeline(transaction=False) as pipe:
+        for generation_names, prefix, suffix, cache_name, raw, cache_ttl in stores:
+            if cache_name:
+                pipe.set(cache_name, raw, px=int(cache_ttl * 1000))
+                pipe.delete(f"lock::{cache_name}")
+
+            else:
+                pipe.eval(
+                    SET_SCRIPT,
+                    2,
+                    *generation_names,
+                    prefix,
+                    suffix,
+                    raw,
+                    int(cache_ttl * 1000),
+                )
+
+        results = iter(await pipe.execute())
+
+    cache_entries = list()
+
+    for generation_names, prefix, suffix, cache_name, raw, cache_ttl in stores:
+        if cache_name:
+            next(results)
+            next(results)
+
+        else:
+            cache_name = _resolve(generation_names, prefix, suffix, next(results))
+
+        cache_entries.append((cache_name, raw, cache_ttl))
+
+    return cache_entries
 
 
 async def _maybe_retry_get(
@@ -192,6 +771,7 @@ async def _maybe_retry_get(
     is_list: Optional[bool] = False,
     retry: Optional[bool] = True,
     *,
+    cache_name: str,
     ttl: Optional[int] = None,
     lock_ttl: int,
     backoff_base: float,
@@ -200,13 +780,6 @@ async def _maybe_retry_get(
     jitter_spread: float,
     leakage_p: float,
 ) -> Optional[Any]:
-    cache_name = _pack(
-        namespace=namespace,
-        key=key,
-        project_id=project_id,
-        user_id=user_id,
-    )
-
     if CACHE_DEBUG:
         log.debug(
             "[cache] RETRY",
@@ -294,33 +867,30 @@ async def set_cache(
     ttl: Optional[int] = AGENTA_CACHE_TTL,
 ) -> Optional[bool]:
     try:
-        cache_name = _pack(
-            namespace=namespace,
-            key=key,
-            project_id=project_id,
-            user_id=user_id,
+        _l1_ensure_subscriber()
+
+        cache_entries = await _store(
+            [
+                {
+                    "namespace": namespace,
+                    "project_id": project_id,
+                    "user_id": user_id,
+                    "key": key,
+                    "value": value,
+                }
+            ],
+            ttl,
         )
-        cache_value = _serialize(value)
-        cache_px = int(ttl * 1000)
 
-        await r.set(cache_name, cache_value, px=cache_px)
+        for cache_name, cache_value, cache_ttl in cache_entries:
+            _l1_set(cache_name, cache_value, cache_ttl)
+            _end_flight(cache_name, cache_value)
 
-        if CACHE_DEBUG:
-            log.debug(
-                "[cache] SAVE ",
-                name=cache_name,
-                value=cache_value if CACHE_DEBUG_VALUE else "***",
-            )
-
-        lock_name = f"lock::{cache_name}"
-
-        check = await r.delete(lock_name)
-
-        if check:
             if CACHE_DEBUG:
                 log.debug(
-                    "[cache] FREE ",
+                    "[cache] SAVE ",
                     name=cache_name,
+                    value=cache_value if CACHE_DEBUG_VALUE else "***",
                 )
 
         return True
@@ -340,6 +910,45 @@ async def set_cache(
         return None
 
 
+async def set_cache_many(
+    entries: List[Dict[str, Any]],
+    ttl: Optional[int] = AGENTA_CACHE_TTL,
+) -> Optional[bool]:
+    """
+    Set several entries in one round trip. Entries are given as the arguments
+    of set_cache(): namespace, project_id, user_id, key, value and, optionally,
+    their own ttl.
+    """
+
+    try:
+        _l1_ensure_subscriber()
+
+        cache_entries = await _store(entries, ttl)
+
+        for cache_name, cache_value, cache_ttl in cache_entries:
+            _l1_set(cache_name, cache_value, cache_ttl)
+            _end_flight(cache_name, cache_value)
+
+            if CACHE_DEBUG:
+                log.debug(
+                    "[cache] SAVE ",
+                    name=cache_name,
+                    value=cache_value if CACHE_DEBUG_VALUE else "***",
+                )
+
+        return True
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        log.warn(
+            "[cache] SET  ",
+            namespaces=[entry.get("namespace") for entry in entries],
+            ttl=ttl,
+        )
+        log.warn(e)
+
+        return None
+
+
 async def get_cache(
     namespace: Optional[str] = None,
     project_id: Optional[str] = None,
@@ -357,21 +966,33 @@ async def get_cache(
     jitter: Optional[float] = AGENTA_CACHE_JITTER_SPREAD,
     leakage: Optional[float] = AGENTA_CACHE_LEAKAGE_PROBABILITY,
 ) -> Optional[Any]:
+    start = perf_counter()
+
     try:
-        cache_name = _pack(
-            namespace=namespace,
-            key=key,
-            project_id=project_id,
-            user_id=user_id,
+        _l1_ensure_subscriber()
+
+        cache_names, raws = await _fetch(
+            [
+                {
+                    "namespace": namespace,
+                    "project_id": project_id,
+                    "user_id": user_id,
+                    "key": key,
+                }
+            ],
+            ttl,
         )
 
-        data = await _try_get_and_maybe_renew(cache_name, model, is_list, ttl)
+        cache_name, raw = cache_names[0], raws[0]
+
+        data = _deserialize(raw, model=model, is_list=is_list) if raw else None
 
         if data is not None:
             return data
 
         if retry:
-            return await _maybe_retry_get(
+            fetch = partial(
+                _maybe_retry_get,
                 namespace=namespace,
                 project_id=project_id,
                 user_id=user_id,
@@ -380,6 +1001,7 @@ async def get_cache(
                 is_list=is_list,
                 retry=retry,
                 #
+                cache_name=cache_name,
                 ttl=ttl,
                 lock_ttl=lock,
                 backoff_base=backoff,
@@ -389,6 +1011,18 @@ async def get_cache(
                 leakage_p=leakage,
             )
 
+            if attempt:  # retries are part of the first attempt's flight
+                return await fetch()
+
+            return await _single_flight(
+                cache_name,
+                fetch,
+                model=model,
+                is_list=is_list,
+                namespace=namespace,
+                timeout=_backoff(attempts, backoff, jitter),
+            )
+
         return None
 
     except Exception as e:
@@ -405,6 +1039,106 @@ async def get_cache(
 
         return None
 
+    finally:
+        if not attempt:  # retries are part of the first attempt
+            _record(namespace, "calls")
+            _record(namespace, "latency", perf_counter() - start)
+
+
+async def get_cache_many(
+    entries: List[Dict[str, Any]],
+    retry: Optional[bool] = True,
+    *,
+    ttl: Optional[int] = None,
+    lock: Optional[int] = AGENTA_CACHE_LOCK_TTL,
+    backoff: Optional[float] = AGENTA_CACHE_BACKOFF_BASE,
+    attempts: Optional[int] = AGENTA_CACHE_ATTEMPTS_MAX,
+    jitter: Optional[float] = AGENTA_CACHE_JITTER_SPREAD,
+    leakage: Optional[float] = AGENTA_CACHE_LEAKAGE_PROBABILITY,
+) -> List[Optional[Any]]:
+    """
+    Get several entries in one round trip, in order. Entries are given as the
+    arguments of get_cache(): namespace, project_id, user_id, key and,
+    optionally, model and is_list. Misses are retried entry by entry, with the
+    locks, backoffs and leakage of get_cache().
+    """
+
+    start = perf_counter()
+
+    try:
+        _l1_ensure_subscriber()
+
+        cache_names, raws = await _fetch(entries, ttl)
+
+        data = [
+            (
+                _deserialize(
+                    raw,
+                    model=entry.get("model"),
+                    is_list=entry.get("is_list", False),
+                )
+                if raw
+                else None
+            )
+            for entry, raw in zip(entries, raws)
+        ]
+
+        if retry:
+            retries = [i for i, value in enumerate(data) if value is None]
+
+            values = await gather(
+                *[
+                    _single_flight(
+                        cache_names[i],
+                        partial(
+                            _maybe_retry_get,
+                            namespace=entries[i].get("namespace"),
+                            project_id=entries[i].get("project_id"),
+                            user_id=entries[i].get("user_id"),
+                            key=entries[i].get("key"),
+                            model=entries[i].get("model"),
+                            is_list=entries[i].get("is_list", False),
+                            retry=retry,
+                            #
+                            cache_name=cache_names[i],
+                            ttl=ttl,
+                            lock_ttl=lock,
+                            backoff_base=backoff,
+                            attempts_idx=0,
+                            attempts_max=attempts,
+                            jitter_spread=jitter,
+                            leakage_p=leakage,
+                        ),
+                        model=entries[i].get("model"),
+                        is_list=entries[i].get("is_list", False),
+                        namespace=entries[i].get("namespace"),
+                        timeout=_backoff(attempts, backoff, jitter),
+                    )
+                    for i in retries
+                ]
+            )
+
+            for i, value in zip(retries, values):
+                data[i] = value
+
+        return data
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        log.warn(
+            "[cache] GET  ",
+            namespaces=[entry.get("namespace") for entry in entries],
+        )
+        log.warn(e)
+
+        return [None] * len(entries)
+
+    finally:
+        latency = perf_counter() - start
+
+        for entry in entries:
+            _record(entry.get("namespace"), "calls")
+            _record(entry.get("namespace"), "latency", latency)
+
 
 async def invalidate_cache(
     namespace: Optional[str] = None,
@@ -421,22 +1155,29 @@ async def invalidate_cache(
                 key=key,
                 project_id=project_id,
                 user_id=user_id,
+                generation=await _generation(
+                    namespace=namespace,
+                    project_id=project_id,
+                    user_id=user_id,
+                ),
             )
 
             await r.delete(cache_name)
 
         else:
-            cache_name = _pack(
+            project_generation, namespace_generation = _pack_generations(
                 namespace=namespace,
                 project_id=project_id,
                 user_id=user_id,
-                pattern=True,
             )
 
-            keys = await _scan(cache_name)
+            cache_name = namespace_generation if namespace else project_generation
 
-            for i in range(0, len(keys), AGENTA_CACHE_DELETE_BATCH_SIZE):
-                await r.delete(*keys[i : i + AGENTA_CACHE_DELETE_BATCH_SIZE])
+            await r.incr(cache_name)
+
+        _l1_evict(cache_name)
+
+        await r.publish(AGENTA_CACHE_CHANNEL, cache_name)
 
         if CACHE_DEBUG:
             log.debug(
@@ -457,3 +1198,75 @@ async def invalidate_cache(
         log.warn(e)
 
         return None
+
+
+async def purge_cache(
+    namespace: Optional[str] = None,
+    project_id: Optional[str] = None,
+    user_id: Optional[str] = None,
+) -> Optional[int]:
+    """
+    Delete the entries of a project or a namespace, of all generations, by
+    scanning the keyspace. Slow on large keyspaces: meant for offline cleanup,
+    use invalidate_cache() otherwise.
+    """
+
+    try:
+        cache_name = _pack(
+            namespace=namespace,
+            project_id=project_id,
+            user_id=user_id,
+            pattern=True,
+        )
+
+        keys = await _scan(cache_name)
+
+        for i in range(0, len(keys), AGENTA_CACHE_DELETE_BATCH_SIZE):
+            await r.delete(*keys[i : i + AGENTA_CACHE_DELETE_BATCH_SIZE])
+
+        _l1_evict(cache_name)
+
+        await r.publish(AGENTA_CACHE_CHANNEL, cache_name)
+
+        if CACHE_DEBUG:
+            log.debug(
+                "[cache] PURGE",
+                name=cache_name,
+                count=len(keys),
+            )
+
+        return len(keys)
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        log.warn(
+            "[cache] PURGE",
+            project_id=project_id,
+            user_id=user_id,
+            namespace=namespace,
+        )
+        log.warn(e)
+
+        return None
+
+
+def get_cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    Lookups per tier, coalesced misses and latency of get_cache() per namespace,
+    in this process.
+    """
+
+    return {
+        namespace or "-": {
+            "l1_hits": stats["l1_hits"],
+            "l2_hits": stats["l2_hits"],
+            "misses": stats["misses"],
+            "coalesced": stats["coalesced"],
+            "calls": stats["calls"],
+            "latency_ms": (
+                round(stats["latency"] / stats["calls"] * 1000, 3)
+                if stats["calls"]
+                else 0.0
+            ),
+        }
+        for namespace, stats in sorted(_stats.items())
+    }
@@ -44,6 +44,9 @@ class EnvironSettings(BaseModel):
     # CACHE (REQUIRED)
     REDIS_CACHE_HOST: str = os.getenv("REDIS_CACHE_HOST") or "cache"
     REDIS_CACHE_PORT: int = int(os.getenv("REDIS_CACHE_PORT") or "6378")
+    AGENTA_CACHE_L1_TTL: float = float(os.getenv("AGENTA_CACHE_L1_TTL") or "5")
+    AGENTA_CACHE_L1_SIZE: int = int(os.getenv("AGENTA_CACHE_L1_SIZE") or "10000")
+    AGENTA_CACHE_CODEC: str = os.getenv("AGENTA_CACHE_CODEC") or "orjson"
 
     # Mail
     SENDGRID_API_KEY: str = os.getenv("SENDGRID_API_KEY") or ""
@@ -121,6 +124,89 @@ class EnvironSettings(BaseModel):
     AGENTA_OTLP_MAX_BATCH_BYTES: int = int(
         os.getenv("AGENTA_OTLP_MAX_BATCH_BYTES") or str(10 * 1024 * 1024)
     )
+    AGENTA_OTLP_QUEUE_ENABLED: bool = (
+        os.getenv("AGENTA_OTLP_QUEUE_ENABLED") or "false"
+    ).lower() in _TRUTHY
+    AGENTA_OTLP_QUEUE_MAX_DEPTH: int = int(
+        os.getenv("AGENTA_OTLP_QUEUE_MAX_DEPTH") or "10000"
+    )
+    AGENTA_OTLP_QUEUE_CONSUMERS: int = int(
+        os.getenv("AGENTA_OTLP_QUEUE_CONSUMERS") or "4"
+    )
+    AGENTA_OTLP_QUEUE_RETRY_AFTER: int = int(
+        os.getenv("AGENTA_OTLP_QUEUE_RETRY_AFTER") or "5"
+    )
+    AGENTA_OTLP_FAST_PATH_ENABLED: bool = (
+        os.getenv("AGENTA_OTLP_FAST_PATH_ENABLED") or "false"
+    ).lower() in _TRUTHY
+    AGENTA_OTLP_SAMPLING_RATE: float = float(
+        os.getenv("AGENTA_OTLP_SAMPLING_RATE") or "1.0"
+    )
+    AGENTA_OTLP_SAMPLING_RATES: str = os.getenv("AGENTA_OTLP_SAMPLING_RATES") or "{}"
+    AGENTA_OTLP_RATE_LIMIT: int = int(os.getenv("AGENTA_OTLP_RATE_LIMIT") or "0")
+    AGENTA_OTLP_RATE_LIMITS: str = os.getenv("AGENTA_OTLP_RATE_LIMITS") or "{}"
+    AGENTA_OTLP_RATE_BURST: int = int(os.getenv("AGENTA_OTLP_RATE_BURST") or "0")
+    AGENTA_TRACING_ROLLUPS_ENABLED: bool = (
+        os.getenv("AGENTA_TRACING_ROLLUPS_ENABLED") or "false"
+    ).lower() in _TRUTHY
+    AGENTA_TRACING_EXPORT_BATCH_SIZE: int = int(
+        os.getenv("AGENTA_TRACING_EXPORT_BATCH_SIZE") or "1000"
+    )
+    AGENTA_TRACING_PARTITION_INTERVAL: str = (
+        os.getenv("AGENTA_TRACING_PARTITION_INTERVAL") or "day"
+    ).lower()
+    AGENTA_TRACING_PARTITIONS_AHEAD: int = int(
+        os.getenv("AGENTA_TRACING_PARTITIONS_AHEAD") or "7"
+    )
+    AGENTA_TRACING_RETENTION_DAYS: int = int(
+        os.getenv("AGENTA_TRACING_RETENTION_DAYS") or "0"
+    )
+    AGENTA_EVALUATIONS_LIVE_CONCURRENCY: int = int(
+        os.getenv("AGENTA_EVALUATIONS_LIVE_CONCURRENCY") or "8"
+    )
+    AGENTA_EVALUATIONS_LIVE_RATE_LIMIT: float = float(
+        os.getenv("AGENTA_EVALUATIONS_LIVE_RATE_LIMIT") or "0"
+    )
+    AGENTA_EVALUATIONS_LIVE_BATCH_SIZE: int = int(
+        os.getenv("AGENTA_EVALUATIONS_LIVE_BATCH_SIZE") or "100"
+    )
+    AGENTA_EVALUATIONS_LIVE_LEASE_TTL: int = int(
+        os.getenv("AGENTA_EVALUATIONS_LIVE_LEASE_TTL") or "3600"
+    )
+    AGENTA_EVALUATIONS_LIVE_MAX_CATCHUP: int = int(
+        os.getenv("AGENTA_EVALUATIONS_LIVE_MAX_CATCHUP") or str(24 * 60)
+    )
+    AGENTA_EVALUATIONS_LIVE_SHARD_INTERVAL: int = int(
+        os.getenv("AGENTA_EVALUATIONS_LIVE_SHARD_INTERVAL") or "15"
+    )
+    AGENTA_EVALUATIONS_LIVE_MAX_SHARDS: int = int(
+        os.getenv("AGENTA_EVALUATIONS_LIVE_MAX_SHARDS") or "8"
+    )
+    AGENTA_EVALUATIONS_TRACE_CONCURRENCY: int = int(
+        os.getenv("AGENTA_EVALUATIONS_TRACE_CONCURRENCY") or "10"
+    )
+    AGENTA_EVALUATIONS_ANNOTATION_CONCURRENCY: int = int(
+        os.getenv("AGENTA_EVALUATIONS_ANNOTATION_CONCURRENCY") or "10"
+    )
+    AGENTA_EVALUATIONS_QUEUE_SIZE: int = int(
+        os.getenv("AGENTA_EVALUATIONS_QUEUE_SIZE") or "100"
+    )
+    AGENTA_EVALUATIONS_PROVIDER_LIMITS: str = (
+        os.getenv("AGENTA_EVALUATIONS_PROVIDER_LIMITS") or "{}"
+    )
+    AGENTA_EVALUATIONS_TASK_TIME_LIMIT: float = float(
+        os.getenv("AGENTA_EVALUATIONS_TASK_TIME_LIMIT") or str(24 * 60 * 60)
+    )
+    AGENTA_EVALUATIONS_MEMOS_TTL: int = int(
+        os.getenv("AGENTA_EVALUATIONS_MEMOS_TTL") or str(7 * 24 * 60 * 60)
+    )
+    AGENTA_HTTP_POOL_LIMIT: int = int(os.getenv("AGENTA_HTTP_POOL_LIMIT") or "200")
+    AGENTA_HTTP_POOL_LIMIT_PER_HOST: int = int(
+        os.getenv("AGENTA_HTTP_POOL_LIMIT_PER_HOST") or "100"
+    )
+    AGENTA_HTTP_KEEPALIVE_TIMEOUT: float = float(
+        os.getenv("AGENTA_HTTP_KEEPALIVE_TIMEOUT") or "30"
+    )
 
 
 env = EnvironSettings()
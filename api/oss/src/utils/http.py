@@ -0,0 +1,60 @@
+from asyncio import AbstractEventLoop, get_running_loop
+from typing import Optional
+
+import aiohttp
+
+from oss.src.utils.logging import get_module_logger
+from oss.src.utils.env import env
+
+log = get_module_logger(__name__)
+
+# One pooled session per process (per event loop), so that requests to the
+# same host reuse their connections instead of repeating DNS, TCP and TLS
+# setup. aiohttp speaks HTTP/1.1 only, connections are kept alive instead.
+
+HTTP_POOL_LIMIT = env.AGENTA_HTTP_POOL_LIMIT
+HTTP_POOL_LIMIT_PER_HOST = env.AGENTA_HTTP_POOL_LIMIT_PER_HOST
+HTTP_KEEPALIVE_TIMEOUT = env.AGENTA_HTTP_KEEPALIVE_TIMEOUT
+HTTP_DNS_CACHE_TTL = 300  # seconds
+
+_session: Optional[aiohttp.ClientSession] = None
+_session_loop: Optional[AbstractEventLoop] = None
+
+
+def get_http_session() -> aiohttp.ClientSession:
+    """
+    Return the shared session of the running event loop, creating it if needed.
+
+    Do not close it: it is closed by `close_http_session()`, on API shutdown
+    and, in workers, by `stop_worker_loop()` on worker process shutdown.
+    """
+
+    global _session, _session_loop  # pylint: disable=global-statement
+
+    loop = get_running_loop()
+
+    if _session is None or _session.closed or _session_loop is not loop:
+        if _session is not None and not _session.closed:
+            log.warn("[HTTP] Event loop changed, opening a new session")
+
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=HTTP_POOL_LIMIT,
+                limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+                keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+                ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            ),
+        )
+        _session_loop = loop
+
+    return _session
+
+
+async def close_http_session() -> None:
+    global _session, _session_loop  # pylint: disable=global-statement
+
+    if _session is not None and not _session.closed:
+        await _session.close()
+
+    _session = None
+    _session_loop = None
@@ -0,0 +1,188 @@
+# /// script
+# dependencies = ["orjson", "pydantic>=2"]
+# ///
+"""
+Compare the cost of writing and reading cache entries, shaped like the ones
+cached by auth_helper (bearer and API key states, supertokens users) and by
+entitlements (subscriptions), and like the models cached by the routers, as
+they used to be serialized (stdlib json and model dumps and validations) and
+with the json and orjson codecs of the cache:
+
+    uv run benchmark_cache_codecs.py --rounds 100000
+"""
+
+import argparse
+from functools import lru_cache
+from json import dumps, loads
+from timeit import timeit
+from typing import List, Optional
+from uuid import uuid4
+
+import orjson
+from pydantic import BaseModel, TypeAdapter
+
+# same as oss.src.utils.caching, without the Redis round trips
+
+
+def _orjson_dumps(value):
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+CODECS = {
+    "json": ("j1", dumps, loads),
+    "orjson": ("o1", _orjson_dumps, orjson.loads),
+}
+
+DECODERS = {tag: decode for tag, _, decode in CODECS.values()}
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model):
+    return TypeAdapter(List[model])
+
+
+def serialize(value, codec):
+    tag, encode, _ = CODECS[codec]
+
+    if isinstance(value, BaseModel):
+        return f"{tag}:{value.model_dump_json(exclude_none=True)}"
+
+    elif isinstance(value, list) and all(isinstance(v, BaseModel) for v in value):
+        models = {type(v) for v in value}
+
+        if len(models) == 1:
+            payload = list_adapter(models.pop()).dump_json(value, exclude_none=True)
+
+            return f"{tag}:{payload.decode('utf-8')}"
+
+        value = [v.model_dump(mode="json", exclude_none=True) for v in value]
+
+    return f"{tag}:{encode(value)}"
+
+
+def deserialize(raw, model=None, is_list=False):
+    decode = DECODERS.get(raw[:2]) if raw[2:3] == ":" else None
+
+    payload = raw[3:] if decode else raw
+
+    if not model:
+        return decode(payload) if decode else loads(payload)
+
+    if is_list:
+        return list_adapter(model).validate_json(payload)
+
+    return model.model_validate_json(payload)
+
+
+# as oss.src.utils.caching used to
+
+
+def legacy_serialize(value):
+    if isinstance(value, BaseModel):
+        return dumps(value.model_dump(mode="json", exclude_none=True))
+
+    elif isinstance(value, list) and all(isinstance(v, BaseModel) for v in value):
+        return dumps([v.model_dump(mode="json", exclude_none=True) for v in value])
+
+    return dumps(value)
+
+
+def legacy_deserialize(raw, model=None, is_list=False):
+    data = loads(raw)
+
+    if not model:
+        return data
+
+    if is_list:
+        return [model.model_validate(item) for item in data]
+
+    return model.model_validate(data)
+
+
+# same as oss.src.models.api.user_models.User
+
+
+class User(BaseModel):
+    created_at: str
+    updated_at: str
+    id: Optional[str] = None
+    uid: str
+    email: str
+    username: str
+    profile_picture: Optional[str] = None
+
+
+def _id():
+    return str(uuid4())
+
+
+STATE = {
+    "user_id": _id(),
+    "user_email": "jane.doe@example.com",
+    "project_id": _id(),
+    "workspace_id": _id(),
+    "organization_id": _id(),
+    "organization_name": "Example Organization",
+    "credentials": "Secret " + "x" * 320,  # signed JWT
+}
+
+USER = User(
+    created_at="2025-01-01 12:00:00.000000+00:00",
+    updated_at="2025-01-01 12:00:00.000000+00:00",
+    id=_id(),
+    uid=_id(),
+    email="jane.doe@example.com",
+    username="jane.doe",
+)
+
+ENTRIES = {
+    "verify_bearer_token": (STATE, None, False),
+    "verify_apikey_token": (STATE, None, False),
+    "get_supertokens_user_by_id": (
+        {"user_id": _id(), "user_email": "jane.doe@example.com"},
+        None,
+        False,
+    ),
+    "entitlements:subscription": (
+        {"plan": "cloud_v0_pro", "anchor": 15},
+        None,
+        False,
+    ),
+    "user_profile": (USER, User, False),
+    "users (x100)": ([USER] * 100, User, True),
+}
+
+
+def run(args) -> None:
+    print(f"{'entry':<28} {'codec':<8} {'write':>9} {'read':>9}  (us per entry)")
+
+    for name, (value, model, is_list) in ENTRIES.items():
+        codecs = {
+            "legacy": (lambda: legacy_serialize(value), legacy_deserialize),
+            **{
+                codec: (lambda codec=codec: serialize(value, codec), deserialize)
+                for codec in CODECS
+            },
+        }
+
+        for codec, (write, read) in codecs.items():
+            raw = write()
+
+            write_time = timeit(write, number=args.rounds)
+            read_time = timeit(
+                lambda: read(raw, model=model, is_list=is_list),
+                number=args.rounds,
+            )
+
+            print(
+                f"{name:<28} {codec:<8}"
+                f" {write_time / args.rounds * 1e6:>9.2f}"
+                f" {read_time / args.rounds * 1e6:>9.2f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=100000)
+
+    run(parser.parse_args())
@@ -0,0 +1,159 @@
+# /// script
+# dependencies = ["celery[redis]"]
+# ///
+"""
+Compare the throughput of evaluation-like tasks, which mostly wait on I/O, on
+a worker running one task per child process on a private event loop, as
+evaluation workers used to, and on a threads worker sharing one long-lived
+event loop, as run_task() does, against a local broker:
+
+    docker run --rm -d -p 6379:6379 redis
+    uv run benchmark_celery_worker.py --tasks 200 --latency 2 --concurrency 8
+
+With `--blocking`, each task also runs that many seconds of synchronous work,
+like a sync evaluator, in a thread, as the SDK does for sync handlers.
+"""
+
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+from pathlib import Path
+from threading import Lock, Thread
+from time import perf_counter, sleep
+
+from celery import Celery, signals
+
+BROKER_URL = os.getenv("BENCHMARK_BROKER_URL") or "redis://localhost:6379/0"
+INIT_DELAY = float(os.getenv("BENCHMARK_INIT_DELAY") or "0.5")  # app startup
+
+app = Celery(Path(__file__).stem, broker=BROKER_URL, backend=BROKER_URL)
+app.conf.worker_hijack_root_logger = False
+
+
+@signals.worker_process_init.connect
+def on_worker_process_init(**kwargs):
+    sleep(INIT_DELAY)  # engines, pools and clients of a new child process
+
+
+async def work(latency: float, blocking: float) -> None:
+    for _ in range(10):  # fetches, invocations and writes
+        await asyncio.sleep(latency / 10)
+
+    if blocking:  # a sync evaluator
+        await asyncio.to_thread(sleep, blocking)
+
+
+# same as oss.src.tasks.runtime, without revocation and time limits
+
+_loop = None
+_lock = Lock()
+
+
+def get_worker_loop():
+    global _loop  # pylint: disable=global-statement
+
+    with _lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            Thread(target=_loop.run_forever, daemon=True).start()
+
+    return _loop
+
+
+@app.task(name="forked")
+def forked(latency: float, blocking: float) -> None:
+    asyncio.new_event_loop().run_until_complete(work(latency, blocking))
+
+
+@app.task(name="shared")
+def shared(latency: float, blocking: float) -> None:
+    asyncio.run_coroutine_threadsafe(
+        work(latency, blocking), get_worker_loop()
+    ).result()
+
+
+def start_worker(queue: str, options: list) -> subprocess.Popen:
+    worker = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "celery",
+            "-A",
+            Path(__file__).stem,
+            "worker",
+            "--queues",
+            queue,
+            "--loglevel=WARNING",
+            *options,
+        ],
+        cwd=Path(__file__).parent,
+    )
+
+    while not app.control.ping(timeout=1.0):
+        sleep(0.5)
+
+    return worker
+
+
+def run(task, queue: str, options: list, args) -> None:
+    worker = start_worker(queue, options)
+
+    try:
+        start = perf_counter()
+
+        results = [
+            task.apply_async(args=(args.latency, args.blocking), queue=queue)
+            for _ in range(args.tasks)
+        ]
+
+        for result in results:
+            result.get(
+                timeout=args.tasks * (args.latency + args.blocking + INIT_DELAY + 1)
+            )
+
+        elapsed = perf_counter() - start
+
+    finally:
+        worker.terminate()
+        worker.wait()
+
+    print(
+        f"{task.name:<8}"
+        f" tasks={args.tasks:>5}"
+        f" elapsed={elapsed:>8.1f}s"
+        f" throughput={args.tasks / elapsed * 60:>8.1f}/min"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tasks", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--blocking", type=float, default=0.0)
+
+    args = parser.parse_args()
+
+    run(
+        forked,
+        "benchmark.forked",
+        [
+            "--pool=prefork",
+            "--concurrency=1",
+            "--max-tasks-per-child=1",
+            "--prefetch-multiplier=1",
+        ],
+        args,
+    )
+    run(
+        shared,
+        "benchmark.shared",
+        [
+            "--pool=threads",
+            f"--concurrency={args.concurrency}",
+            "--prefetch-multiplier=1",
+        ],
+        args,
+    )
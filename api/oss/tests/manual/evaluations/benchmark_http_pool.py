@@ -0,0 +1,123 @@
+# /// script
+# dependencies = ["aiohttp"]
+# ///
+"""
+Compare invoking a local stub app with a new session per request, as
+invoke_app() used to, and with one pooled session, as get_http_session()
+does, counting the connections the stub app accepts:
+
+    uv run benchmark_http_pool.py --requests 2000 --concurrency 20
+
+which printed, on a development machine:
+
+    unpooled   connections=  2000 p50=  16.46ms p95=  20.07ms throughput=    1008/s
+    pooled     connections=    20 p50=   9.82ms p95=  12.92ms throughput=    1648/s
+"""
+
+import argparse
+import asyncio
+from statistics import quantiles
+from time import perf_counter
+
+import aiohttp
+from aiohttp import web
+
+HOST = "127.0.0.1"
+
+
+def create_stub_app(connections: set):
+    async def invoke(request: web.Request) -> web.Response:
+        connections.add(request.transport)  # one transport per connection
+
+        await asyncio.sleep(0.005)  # a (very) fast app
+
+        return web.json_response({"data": "ok", "tree": None})
+
+    app = web.Application()
+    app.router.add_post("/test", invoke)
+
+    return app
+
+
+def create_pooled_session(args):
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=args.limit,
+            limit_per_host=args.limit_per_host,
+            keepalive_timeout=30,
+            ttl_dns_cache=300,
+        ),
+    )
+
+
+async def run(url, args, *, session=None):
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+
+    async def call():
+        async with semaphore:
+            start = perf_counter()
+
+            if session is None:
+                async with aiohttp.ClientSession() as client:
+                    async with client.post(url, json={"inputs": {}}) as response:
+                        await response.json()
+            else:
+                async with session.post(url, json={"inputs": {}}) as response:
+                    await response.json()
+
+            latencies.append(perf_counter() - start)
+
+    start = perf_counter()
+    await asyncio.gather(*(call() for _ in range(args.requests)))
+    elapsed = perf_counter() - start
+
+    return latencies, elapsed
+
+
+def report(name, connections, latencies, elapsed):
+    percentiles = quantiles(latencies, n=100)
+
+    print(
+        f"{name:<10}"
+        f" connections={len(connections):>6}"
+        f" p50={percentiles[49] * 1000:>7.2f}ms"
+        f" p95={percentiles[94] * 1000:>7.2f}ms"
+        f" throughput={len(latencies) / elapsed:>8.0f}/s"
+    )
+
+
+async def main(args):
+    connections = set()
+
+    runner = web.AppRunner(create_stub_app(connections))
+    await runner.setup()
+
+    site = web.TCPSite(runner, HOST, args.port)
+    await site.start()
+
+    url = f"http://{HOST}:{args.port}/test"
+
+    try:
+        latencies, elapsed = await run(url, args)
+        report("unpooled", connections, latencies, elapsed)
+
+        connections.clear()
+
+        async with create_pooled_session(args) as session:
+            latencies, elapsed = await run(url, args, session=session)
+            report("pooled", connections, latencies, elapsed)
+
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--limit-per-host", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8765)
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,233 @@
+# /// script
+# dependencies = ["asyncpg", "python-dotenv"]
+# ///
+"""
+Compare the plans of the analytics base query before and after windowing on
+start_time with the partial index on root spans, and of the query selecting
+the minutes to recompute on rollup refreshes, before and after the BRIN index
+on created_at, on synthetic spans.
+
+Everything happens in a scratch schema, dropped at the end:
+
+    POSTGRES_URI_TRACING=postgresql://... uv run benchmark_plans.py --spans 5000000
+"""
+
+import argparse
+import asyncio
+import os
+from datetime import timedelta
+from time import perf_counter
+
+import asyncpg
+from dotenv import load_dotenv
+
+load_dotenv(override=True)
+
+SCHEMA = "analytics_benchmark"
+
+SPANS_PER_TRACE = 5  # one root span per trace
+
+CREATE_STMTS = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    f"""
+    CREATE TABLE {SCHEMA}.spans (
+        project_id UUID NOT NULL,
+        trace_id UUID NOT NULL,
+        span_id UUID NOT NULL,
+        parent_id UUID,
+        start_time TIMESTAMPTZ NOT NULL,
+        created_at TIMESTAMPTZ NOT NULL,
+        attributes JSONB,
+        PRIMARY KEY (project_id, trace_id, span_id)
+    )
+    """,
+]
+
+# one trace every `spacing`, spread over projects, with root spans committed
+# when their traces end, a few seconds to a few minutes after they start
+INSERT_STMT = f"""
+    INSERT INTO {SCHEMA}.spans
+    SELECT
+        ('00000000-0000-0000-0000-' || lpad(((g / $2) % $3)::text, 12, '0'))::uuid,
+        md5('trace' || (g / $2))::uuid,
+        md5('span' || g)::uuid,
+        CASE WHEN g % $2 = 0 THEN NULL ELSE md5('span' || (g - g % $2))::uuid END,
+        start_time,
+        start_time + make_interval(secs => CASE WHEN g % $2 = 0 THEN random() * 300 ELSE random() * 5 END),
+        jsonb_build_object(
+            'ag', jsonb_build_object(
+                'metrics', jsonb_build_object(
+                    'duration', jsonb_build_object('cumulative', random() * 1000),
+                    'costs', jsonb_build_object('cumulative', jsonb_build_object('total', random())),
+                    'tokens', jsonb_build_object('cumulative', jsonb_build_object('total', floor(random() * 1000)))
+                )
+            )
+        )
+    FROM generate_series(0, $1 - 1) AS g,
+    LATERAL (SELECT now() - make_interval(days => $4) + (g / $2) * $5::interval AS start_time) AS t
+"""
+
+BASELINE_INDEXES = [
+    f"CREATE INDEX ON {SCHEMA}.spans (project_id)",
+    f"CREATE INDEX ON {SCHEMA}.spans (project_id, start_time)",
+]
+
+ROOT_INDEX = (
+    f"CREATE INDEX ON {SCHEMA}.spans (project_id, start_time) WHERE parent_id IS NULL"
+)
+
+# as built by build_base_cte() and aggregated by analytics(), windowed on {column}
+ANALYTICS_STMT = """
+    EXPLAIN (ANALYZE, BUFFERS)
+    SELECT
+        date_bin('1 hour', {column}, $2) AS timestamp,
+        count(*),
+        sum((attributes #>> '{{ag,metrics,duration,cumulative}}')::numeric)
+    FROM {schema}.spans
+    WHERE project_id = $1
+    AND {column} >= $2
+    AND {column} < $3
+    AND parent_id IS NULL
+    GROUP BY 1
+"""
+
+
+CREATED_AT_INDEX = f"CREATE INDEX ON {SCHEMA}.spans USING brin (created_at)"
+
+# as built by build_rollup_touched_stmt(), for the last minutes of ingestion
+TOUCHED_STMT = """
+    EXPLAIN (ANALYZE, BUFFERS)
+    SELECT DISTINCT date_bin('1 minute', start_time, 'epoch') AS timestamp
+    FROM {schema}.spans
+    WHERE created_at >= $1
+    AND created_at < $2
+"""
+
+
+async def explain(conn, stmt, *args):
+    await conn.fetch(stmt, *args)  # warm up the cache
+
+    start = perf_counter()
+    rows = await conn.fetch(stmt, *args)
+    elapsed = perf_counter() - start
+
+    return "\n".join(row[0] for row in rows), elapsed
+
+
+async def main(args):
+    uri = os.getenv("POSTGRES_URI_TRACING", "").replace("+asyncpg", "")
+
+    conn = await asyncpg.connect(uri)
+
+    try:
+        for stmt in CREATE_STMTS:
+            await conn.execute(stmt)
+
+        print(f"Inserting {args.spans:,} spans over {args.days} days ...")
+
+        traces = args.spans // SPANS_PER_TRACE
+        spacing = timedelta(days=args.days) / max(traces, 1)
+
+        start = perf_counter()
+        await conn.execute(
+            INSERT_STMT,
+            args.spans,
+            SPANS_PER_TRACE,
+            args.projects,
+            args.days,
+            spacing,
+        )
+        print(f"Inserted in {perf_counter() - start:.1f}s")
+
+        for stmt in BASELINE_INDEXES:
+            await conn.execute(stmt)
+        await conn.execute(f"ANALYZE {SCHEMA}.spans")
+
+        project_id = await conn.fetchval(
+            f"SELECT project_id FROM {SCHEMA}.spans LIMIT 1"
+        )
+        newest = await conn.fetchval(f"SELECT max(start_time) FROM {SCHEMA}.spans")
+        oldest = await conn.fetchval(
+            "SELECT $1::timestamptz - make_interval(days => $2)",
+            newest,
+            args.window,
+        )
+
+        before, before_elapsed = await explain(
+            conn,
+            ANALYTICS_STMT.format(schema=SCHEMA, column="created_at"),
+            project_id,
+            oldest,
+            newest,
+        )
+
+        await conn.execute(ROOT_INDEX)
+        await conn.execute(f"ANALYZE {SCHEMA}.spans")
+
+        after, after_elapsed = await explain(
+            conn,
+            ANALYTICS_STMT.format(schema=SCHEMA, column="start_time"),
+            project_id,
+            oldest,
+            newest,
+        )
+
+        created_at = await conn.fetchval(f"SELECT max(created_at) FROM {SCHEMA}.spans")
+        ingested = await conn.fetchval(
+            "SELECT $1::timestamptz - make_interval(mins => $2)",
+            created_at,
+            args.lookback,
+        )
+
+        touched_before, touched_before_elapsed = await explain(
+            conn,
+            TOUCHED_STMT.format(schema=SCHEMA),
+            ingested,
+            created_at,
+        )
+
+        await conn.execute(CREATED_AT_INDEX)
+        await conn.execute(f"ANALYZE {SCHEMA}.spans")
+
+        touched_after, touched_after_elapsed = await explain(
+            conn,
+            TOUCHED_STMT.format(schema=SCHEMA),
+            ingested,
+            created_at,
+        )
+
+        print(f"\n--- BEFORE (created_at) {before_elapsed * 1000:.1f}ms ---\n")
+        print(before)
+        print(
+            f"\n--- AFTER (start_time, root index) {after_elapsed * 1000:.1f}ms ---\n"
+        )
+        print(after)
+        print(
+            f"\n--- REFRESH BEFORE (created_at, no index)"
+            f" {touched_before_elapsed * 1000:.1f}ms ---\n"
+        )
+        print(touched_before)
+        print(
+            f"\n--- REFRESH AFTER (created_at, brin index)"
+            f" {touched_after_elapsed * 1000:.1f}ms ---\n"
+        )
+        print(touched_after)
+
+    finally:
+        if not args.keep:
+            await conn.execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+
+        await conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--spans", type=int, default=5_000_000)
+    parser.add_argument("--projects", type=int, default=10)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--window", type=int, default=1, help="in days")
+    parser.add_argument("--lookback", type=int, default=5, help="in minutes")
+    parser.add_argument("--keep", action="store_true", help="keep the schema")
+
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,93 @@
+from oss.src.utils import caching
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = dict()
+        self.commands = list()
+
+    async def get(self, name):
+        self.commands.append("GET")
+        return self.data.get(name)
+
+    async def mget(self, *names):
+        self.commands.append("MGET")
+        return [self.data.get(name) for name in names]
+
+    async def set(self, name, value, **kwargs):
+        self.commands.append("SET")
+        self.data[name] = value
+        return True
+
+    async def incr(self, name):
+        self.commands.append("INCR")
+        self.data[name] = str(int(self.data.get(name) or 0) + 1)
+        return int(self.data[name])
+
+    async def delete(self, *names):
+        self.commands.append("DEL")
+        return sum(self.data.pop(name, None) is not None for name in names)
+
+    async def expire(self, name, ttl):
+        self.commands.append("EXPIRE")
+        return name in self.data
+
+    async def eval(self, script, numkeys, *args):
+        self.commands.append("EVAL")
+
+        keys, args = args[:numkeys], args[numkeys:]
+
+        generations = [self.data.get(name) or "0" for name in keys]
+        name = f"{args[0]}g{generations[0]}.{generations[1]}{args[1]}"
+
+        if script == caching.GET_SCRIPT:
+            return [*generations, self.data.get(name)]
+
+        if script == caching.SET_SCRIPT:
+            self.data[name] = args[2]
+            self.data.pop(f"lock::{name}", None)
+
+            return generations
+
+        raise NotImplementedError(script)
+
+    async def publish(self, channel, message):
+        self.commands.append("PUBLISH")
+        return 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = list()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __getattr__(self, command):
+        def queue(*args, **kwargs):
+            self.calls.append((command, args, kwargs))
+            return self
+
+        return queue
+
+    async def execute(self):
+        self.redis.commands.append("PIPELINE")
+
+        commands = self.redis.commands
+        self.redis.commands = list()
+
+        try:
+            return [
+                await getattr(self.redis, command)(*args, **kwargs)
+                for command, args, kwargs in self.calls
+            ]
+
+        finally:
+            self.redis.commands = commands
@@ -0,0 +1,85 @@
+import importlib
+from json import dumps
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+
+from oss.src.utils import caching
+
+
+class Item(BaseModel):
+    name: str
+    size: Optional[int] = None
+
+
+class TestCachingCodecs:
+    def test_entries_are_read_with_the_codec_they_were_written_with(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        value = {"plan": "cloud_v0_pro", "anchor": 12, "ids": ["a", "b"]}
+
+        monkeypatch.setattr(caching, "AGENTA_CACHE_CODEC", "json")
+        json_raw = caching._serialize(value)
+
+        monkeypatch.setattr(caching, "AGENTA_CACHE_CODEC", "orjson")
+        orjson_raw = caching._serialize(value)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        values = [
+            caching._deserialize(raw) for raw in (json_raw, orjson_raw, dumps(value))
+        ]
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert json_raw.startswith("j1:")
+        assert orjson_raw.startswith("o1:")
+        assert values == [value, value, value]
+        assert caching._deserialize(caching._serialize(None)) is None
+        assert caching._deserialize(caching._serialize("o1:")) == "o1:"
+        # ----------------------------------------------------------------------
+
+    def test_models_are_read_with_or_without_tags(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        monkeypatch.setattr(caching, "AGENTA_CACHE_CODEC", "orjson")
+
+        items = [Item(name="a"), Item(name="b", size=2)]
+
+        raws = [caching._serialize(items), caching._serialize(items[1])]
+
+        legacy = dumps(
+            [item.model_dump(mode="json", exclude_none=True) for item in items]
+        )
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        values = [
+            caching._deserialize(raws[0], model=Item, is_list=True),
+            caching._deserialize(raws[1], model=Item),
+            caching._deserialize(legacy, model=Item, is_list=True),
+            caching._deserialize(caching._serialize([]), model=Item, is_list=True),
+        ]
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert raws[0] == 'o1:[{"name":"a"},{"name":"b","size":2}]'
+        assert values == [items, items[1], items, []]
+        # ----------------------------------------------------------------------
+
+    def test_unknown_codecs_fail_at_import(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        monkeypatch.setattr(caching.env, "AGENTA_CACHE_CODEC", "msgpack")
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        with pytest.raises(ValueError, match="AGENTA_CACHE_CODEC"):
+            importlib.reload(caching)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        monkeypatch.undo()
+
+        importlib.reload(caching)
+
+        assert caching.AGENTA_CACHE_CODEC in caching.CODECS
+        # ----------------------------------------------------------------------
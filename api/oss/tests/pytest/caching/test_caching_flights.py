@@ -0,0 +1,118 @@
+from asyncio import gather, sleep
+from time import monotonic
+
+import pytest
+
+from oss.src.utils import caching
+
+from .fakes import FakeRedis
+
+
+class TestCachingFlights:
+    def setup_method(self):
+        caching._l1.clear()
+
+    @pytest.mark.asyncio
+    async def test_concurrent_misses_are_recomputed_once(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        redis = FakeRedis()
+
+        monkeypatch.setattr(caching, "r", redis)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 0)
+
+        computed = list()
+
+        async def get_or_compute():
+            value = await caching.get_cache(namespace="a", key="k", leakage=0)
+
+            if value is None:
+                computed.append(True)
+
+                await sleep(0.01)
+
+                value = {"v": 1}
+
+                await caching.set_cache(namespace="a", key="k", value=value)
+
+            return value
+
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        values = await gather(*[get_or_compute() for _ in range(5)])
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert values == [{"v": 1}] * 5
+        assert values[0] is not values[1]
+        assert len(computed) == 1
+        assert redis.commands.count("SET") == 1  # one lock
+        assert not caching._flights
+        # ----------------------------------------------------------------------
+
+    @pytest.mark.asyncio
+    async def test_abandoned_flights_expire(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        redis = FakeRedis()
+
+        monkeypatch.setattr(caching, "r", redis)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 0)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_FLIGHT_TTL", 0.05)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        leader = await caching.get_cache(namespace="a", key="k", leakage=0)
+        follower = await caching.get_cache(namespace="a", key="k", leakage=0)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert leader is None
+        assert follower is None
+        assert not caching._flights
+        # ----------------------------------------------------------------------
+
+    @pytest.mark.asyncio
+    async def test_waiters_give_up_when_the_leader_does_not_set(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        redis = FakeRedis()
+
+        monkeypatch.setattr(caching, "r", redis)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 0)
+
+        timeout = caching._backoff(attempts_max=2, backoff_base=10, jitter_spread=0)
+
+        async def get_and_fail():
+            value = await caching.get_cache(namespace="a", key="k", leakage=0)
+
+            if value is None:
+                await sleep(0.2)  # recomputes, then fails without setting it
+
+            return value
+
+        async def get_later():
+            await sleep(0)
+
+            start = monotonic()
+
+            value = await caching.get_cache(
+                namespace="a",
+                key="k",
+                backoff=10,
+                attempts=2,
+                jitter=0,
+                leakage=0,
+            )
+
+            return value, monotonic() - start
+
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        _, (value, elapsed) = await gather(get_and_fail(), get_later())
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert value is None
+        assert timeout <= elapsed < 0.2
+        assert redis.commands.count("SET") == 1  # the leader's lock only
+        # ----------------------------------------------------------------------
@@ -0,0 +1,112 @@
+import pytest
+
+from oss.src.utils import caching
+
+from .fakes import FakeRedis
+
+
+class TestCachingGenerations:
+    def setup_method(self):
+        caching._l1.clear()
+
+    @pytest.mark.asyncio
+    async def test_invalidation_increments_generations(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        redis = FakeRedis()
+
+        monkeypatch.setattr(caching, "r", redis)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 0)
+
+        for namespace in ("a", "b"):
+            for project_id in ("p1", "p2"):
+                await caching.set_cache(
+                    namespace=namespace,
+                    project_id=project_id,
+                    key="k",
+                    value=f"{namespace}:{project_id}",
+                )
+
+        redis.commands.clear()
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        await caching.invalidate_cache(namespace="a", project_id="p1")
+
+        namespace_commands = list(redis.commands)
+
+        a1 = await caching.get_cache(namespace="a", project_id="p1", key="k")
+        b1 = await caching.get_cache(namespace="b", project_id="p1", key="k")
+
+        await caching.invalidate_cache(project_id="p2")
+
+        a2 = await caching.get_cache(namespace="a", project_id="p2", key="k")
+        b2 = await caching.get_cache(namespace="b", project_id="p2", key="k")
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert namespace_commands == ["INCR", "PUBLISH"]
+        assert (a1, b1) == (None, "b:p1")
+        assert (a2, b2) == (None, None)
+        # ----------------------------------------------------------------------
+
+    def test_generations_are_folded_into_names(self):
+        # ARRANGE --------------------------------------------------------------
+        name = caching._pack(
+            namespace="ns",
+            key="k",
+            project_id="p1",
+            generation="g1.2",
+        )
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        pattern = caching._pack(namespace="ns", project_id="p1", pattern=True)
+        project, namespace = caching._pack_generations(
+            namespace="ns",
+            project_id="p1",
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert name == "p:p1----------:u:------------:ns:g1.2:k"
+        assert caching.fnmatchcase(name, pattern)
+        assert namespace.startswith(project)
+        assert not caching.fnmatchcase(project, pattern)
+        # ----------------------------------------------------------------------
+
+    @pytest.mark.asyncio
+    async def test_generations_cost_no_round_trip_of_their_own(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        redis = FakeRedis()
+
+        monkeypatch.setattr(caching, "r", redis)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 0)
+
+        await caching.set_cache(namespace="a", project_id="p1", key="k", value=1)
+        await caching.invalidate_cache(namespace="a", project_id="p1")
+        await caching.set_cache(namespace="a", project_id="p1", key="k", value=2)
+
+        redis.commands.clear()
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        value = await caching.get_cache(namespace="a", project_id="p1", key="k")
+
+        commands = list(redis.commands)
+
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 5)
+        monkeypatch.setattr(caching, "_l1_ensure_subscriber", lambda: None)
+
+        await caching.get_cache(namespace="a", project_id="p1", key="k")
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        project, namespace = caching._pack_generations(
+            namespace="a",
+            project_id="p1",
+        )
+
+        assert value == 2
+        assert commands == ["PIPELINE"]
+        assert (caching._l1_get(project), caching._l1_get(namespace)) == ("0", "1")
+        # ----------------------------------------------------------------------
@@ -0,0 +1,52 @@
+from oss.src.utils import caching
+
+
+class TestCachingL1:
+    def setup_method(self):
+        caching._l1.clear()
+
+    def test_l1_expires_and_evicts_least_recently_used(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 5)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_SIZE", 2)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        caching._l1_set("a", "1")
+        caching._l1_set("b", "2")
+        caching._l1_get("a")  # a is now more recent than b
+        caching._l1_set("c", "3")
+
+        kept = caching._l1_get("a"), caching._l1_get("c")
+        evicted = caching._l1_get("b")
+
+        caching._l1_set("d", "4", ttl=-1)  # expired already
+
+        expired = caching._l1_get("d")
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert kept == ("1", "3")
+        assert evicted is None
+        assert expired is None
+        # ----------------------------------------------------------------------
+
+    def test_l1_evicts_patterns(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 5)
+
+        name = caching._pack(namespace="ns", key="k", project_id="p1")
+        other = caching._pack(namespace="ns", key="k", project_id="p2")
+
+        caching._l1_set(name, "1")
+        caching._l1_set(other, "2")
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        caching._l1_evict(caching._pack(namespace="ns", project_id="p1", pattern=True))
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert caching._l1_get(name) is None
+        assert caching._l1_get(other) == "2"
+        # ----------------------------------------------------------------------
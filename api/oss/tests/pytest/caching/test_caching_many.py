@@ -0,0 +1,75 @@
+import pytest
+
+from oss.src.utils import caching
+
+from .fakes import FakeRedis
+
+
+class TestCachingMany:
+    def setup_method(self):
+        caching._l1.clear()
+
+    @pytest.mark.asyncio
+    async def test_entries_are_set_and_got_in_one_round_trip(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        redis = FakeRedis()
+
+        monkeypatch.setattr(caching, "r", redis)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 0)
+
+        entries = [
+            {"namespace": "a", "project_id": "p1", "key": "k"},
+            {"namespace": "b", "project_id": "p1", "user_id": "u1", "key": {"x": 1}},
+            {"namespace": "a", "project_id": "p2", "key": "k"},
+        ]
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        await caching.set_cache_many(
+            [dict(entry, value=i) for i, entry in enumerate(entries)]
+        )
+
+        set_commands = list(redis.commands)
+        redis.commands.clear()
+
+        values = await caching.get_cache_many(entries, ttl=60)
+
+        get_commands = list(redis.commands)
+
+        value = await caching.get_cache(**entries[1])
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert set_commands == ["PIPELINE"]
+        assert get_commands == ["PIPELINE"]
+        assert values == [0, 1, 2]
+        assert value == 1
+        # ----------------------------------------------------------------------
+
+    @pytest.mark.asyncio
+    async def test_misses_are_locked_one_by_one(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        redis = FakeRedis()
+
+        monkeypatch.setattr(caching, "r", redis)
+        monkeypatch.setattr(caching, "AGENTA_CACHE_L1_TTL", 0)
+
+        await caching.set_cache(namespace="a", key="hit", value="v")
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        values = await caching.get_cache_many(
+            [
+                {"namespace": "a", "key": "hit"},
+                {"namespace": "a", "key": "miss"},
+            ],
+            leakage=0,
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert values == ["v", None]
+        assert [name for name in redis.data if name.startswith("lock::")] == [
+            "lock::" + caching._pack(namespace="a", key="miss", generation="g0.0")
+        ]
+        # ----------------------------------------------------------------------
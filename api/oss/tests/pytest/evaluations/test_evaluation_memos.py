@@ -0,0 +1,153 @@
+from uuid import uuid4
+
+import pytest
+
+from oss.src.utils import caching
+from oss.src.core.evaluations import utils
+from oss.src.core.workflows.dtos import (
+    WorkflowRevision,
+    WorkflowRevisionData,
+    WorkflowServiceRequestData,
+)
+from oss.src.core.evaluations.utils import (
+    is_memoizable,
+    compute_memo_key,
+    get_memo,
+    set_memo,
+)
+from oss.tests.pytest.caching.fakes import FakeRedis
+
+
+def _revision(uri, meta=None):
+    return WorkflowRevision(
+        id=uuid4(),
+        meta=meta,
+        data=WorkflowRevisionData(uri=uri),
+    )
+
+
+class TestEvaluationMemos:
+    def test_is_memoizable(self):
+        # ACT ------------------------------------------------------------------
+        exact_match = is_memoizable(_revision("agenta:built-in:auto_exact_match:v0"))
+        llm_judge = is_memoizable(_revision("agenta:built-in:auto_ai_critique:v0"))
+        opted_in = is_memoizable(
+            _revision("agenta:built-in:auto_ai_critique:v0", {"memoize": True})
+        )
+        opted_out = is_memoizable(
+            _revision("agenta:built-in:auto_exact_match:v0", {"memoize": False})
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert exact_match is True
+        assert llm_judge is False
+        assert opted_in is True
+        assert opted_out is False
+        # ----------------------------------------------------------------------
+
+    def test_memo_key_ignores_the_trace(self):
+        # ARRANGE --------------------------------------------------------------
+        revision = _revision("agenta:built-in:auto_exact_match:v0")
+
+        def _data(trace_id, output):
+            return WorkflowServiceRequestData(
+                parameters={"correct_answer_key": "answer"},
+                testcase={"id": str(uuid4()), "data": {"answer": "Paris"}},
+                inputs={"country": "France"},
+                trace={"trace_id": trace_id},
+                outputs=output,
+            )
+
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        key = compute_memo_key(
+            evaluator_revision=revision,
+            request_data=_data(uuid4().hex, "Paris"),
+        )
+        rerun_key = compute_memo_key(
+            evaluator_revision=revision,
+            request_data=_data(uuid4().hex, "Paris"),
+        )
+        other_key = compute_memo_key(
+            evaluator_revision=revision,
+            request_data=_data(uuid4().hex, "Lyon"),
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert key == rerun_key
+        assert key != other_key
+        assert key["evaluator_revision_id"] == str(revision.id)
+        # ----------------------------------------------------------------------
+
+    def test_memo_key_is_scoped_to_the_trace_when_given(self):
+        # ARRANGE --------------------------------------------------------------
+        revision = _revision("agenta:built-in:auto_exact_match:v0")
+
+        data = WorkflowServiceRequestData(
+            inputs={"country": "France"},
+            outputs="Paris",
+        )
+
+        trace_id = uuid4().hex
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        key = compute_memo_key(
+            evaluator_revision=revision,
+            request_data=data,
+            trace_id=trace_id,
+        )
+        same_trace_key = compute_memo_key(
+            evaluator_revision=revision,
+            request_data=data,
+            trace_id=trace_id,
+        )
+        other_trace_key = compute_memo_key(
+            evaluator_revision=revision,
+            request_data=data,
+            trace_id=uuid4().hex,
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert key == same_trace_key
+        assert key != other_trace_key
+        assert key["data_id"] == other_trace_key["data_id"]
+        # ----------------------------------------------------------------------
+
+    @pytest.mark.asyncio
+    async def test_memos_survive_project_invalidations(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        redis = FakeRedis()
+
+        monkeypatch.setattr(caching, "r", redis)
+        monkeypatch.setattr(utils, "_r", redis)
+
+        project_id = uuid4()
+        trace_id = uuid4().hex
+
+        key = compute_memo_key(
+            evaluator_revision=_revision("agenta:built-in:auto_exact_match:v0"),
+            request_data=WorkflowServiceRequestData(
+                inputs={"country": "France"},
+                outputs="Paris",
+            ),
+        )
+
+        await set_memo(project_id=project_id, key=key, trace_id=trace_id)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        await caching.invalidate_cache(project_id=str(project_id))  # on commits
+
+        memo = await get_memo(project_id=project_id, key=key)
+        other_memo = await get_memo(project_id=uuid4(), key=key)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert memo == trace_id
+        assert other_memo is None
+        # ----------------------------------------------------------------------
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from oss.src.core.evaluations.dispatching import (
+    LIVE_MAX_CATCHUP,
+    LIVE_MAX_SHARDS,
+    get_trace_shard,
+    plan_window,
+)
+
+
+class TestLiveDispatching:
+    def test_plan_window_starts_from_the_watermark(self):
+        # ARRANGE --------------------------------------------------------------
+        newest = datetime(2025, 1, 1, 12, 0, tzinfo=timezone.utc)
+        oldest = newest - timedelta(minutes=1)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        tick = plan_window(oldest=oldest, newest=newest)
+        caught_up = plan_window(
+            oldest=oldest,
+            newest=newest,
+            watermark=newest - timedelta(hours=2),
+        )
+        processed = plan_window(oldest=oldest, newest=newest, watermark=newest)
+        capped = plan_window(
+            oldest=oldest,
+            newest=newest,
+            watermark=newest - timedelta(days=30),
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert tick == (oldest, newest, 1)
+        assert caught_up[0] == newest - timedelta(hours=2)
+        assert caught_up[2] == LIVE_MAX_SHARDS
+        assert processed is None
+        assert capped[0] == newest - timedelta(minutes=LIVE_MAX_CATCHUP)
+        # ----------------------------------------------------------------------
+
+    def test_trace_shards_partition_the_traces(self):
+        # ARRANGE --------------------------------------------------------------
+        trace_ids = [uuid4().hex for _ in range(1000)]
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        shards = [get_trace_shard(trace_id, 4) for trace_id in trace_ids]
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert set(shards) == {0, 1, 2, 3}
+        assert all(150 < shards.count(shard) < 350 for shard in range(4))
+        assert shards == [get_trace_shard(trace_id, 4) for trace_id in trace_ids]
+        assert get_trace_shard(trace_ids[0], 1) == 0
+        # ----------------------------------------------------------------------
@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+from oss.src.services.llm_apps_scheduler import (
+    AIMD_WINDOW,
+    RETRY_AFTER_DEFAULT,
+    Scheduler,
+    get_provider,
+    parse_retry_after,
+)
+
+
+class TestLLMAppsScheduler:
+    def test_parse_retry_after(self):
+        # ARRANGE --------------------------------------------------------------
+        date = format_datetime(
+            datetime.now(timezone.utc) + timedelta(seconds=30),
+            usegmt=True,
+        )
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        seconds = parse_retry_after("7")
+        dated = parse_retry_after(date)
+        missing = parse_retry_after(None)
+        invalid = parse_retry_after("soon")
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert seconds == 7.0
+        assert 25.0 <= dated <= 30.0
+        assert missing == RETRY_AFTER_DEFAULT
+        assert invalid == RETRY_AFTER_DEFAULT
+        # ----------------------------------------------------------------------
+
+    def test_get_provider(self):
+        # ACT ------------------------------------------------------------------
+        prefixed = get_provider({"prompt": {"llm_config": {"model": "groq/llama"}}})
+        guessed = get_provider({"prompt": {"llm_config": {"model": "gpt-4o"}}})
+        unknown = get_provider({})
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert prefixed == "groq"
+        assert guessed == "openai"
+        assert unknown == "default"
+        # ----------------------------------------------------------------------
+
+    def test_window_shrinks_on_errors_and_grows_back(self):
+        # ARRANGE --------------------------------------------------------------
+        scheduler = Scheduler(max_concurrency=8)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        for _ in range(AIMD_WINDOW):
+            scheduler.record(error=True)
+
+        shrunk = scheduler.concurrency
+
+        for _ in range(2 * AIMD_WINDOW):
+            scheduler.record(error=False)
+
+        grown = scheduler.concurrency
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert shrunk == 4
+        assert grown == 6
+        # ----------------------------------------------------------------------
+
+    def test_concurrent_throttles_shrink_the_window_once(self):
+        # ARRANGE --------------------------------------------------------------
+        scheduler = Scheduler(max_concurrency=8)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        for _ in range(3):
+            scheduler.throttle(10.0)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert scheduler.concurrency == 4
+        # ----------------------------------------------------------------------
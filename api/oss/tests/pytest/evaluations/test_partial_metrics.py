@@ -0,0 +1,117 @@
+from random import Random
+
+from oss.src.dbs.postgres.tracing.sketches import build_sketch
+from oss.src.core.evaluations.utils import (
+    make_partial_metrics,
+    merge_partial_metrics,
+    finalize_partial_metrics,
+)
+
+
+def _analytics(durations, scores, passes):
+    """Metrics of a step, shaped as tracing analytics returns them."""
+
+    return {
+        "attributes.ag.metrics.duration.cumulative": {
+            "type": "numeric/continuous",
+            "count": len(durations),
+            "sum": sum(durations),
+            "min": min(durations),
+            "max": max(durations),
+            "sketch": build_sketch(durations),
+        },
+        "attributes.ag.data.outputs.score": {
+            "type": "numeric/discrete",
+            "count": len(scores),
+            "freq": [
+                {"value": score, "count": scores.count(score)}
+                for score in sorted(set(scores))
+            ],
+        },
+        "attributes.ag.data.outputs.success": {
+            "type": "binary",
+            "count": len(passes),
+            "freq": [
+                {"value": True, "count": passes.count(True)},
+                {"value": False, "count": passes.count(False)},
+            ],
+        },
+    }
+
+
+class TestPartialMetrics:
+    def test_merged_partials_finalize_like_the_whole(self):
+        # ARRANGE --------------------------------------------------------------
+        random = Random(42)
+
+        durations = [random.lognormvariate(0, 1) for _ in range(1000)]
+        scores = [random.randint(1, 5) for _ in range(1000)]
+        passes = [random.random() < 0.3 for _ in range(1000)]
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        partial = merge_partial_metrics(
+            make_partial_metrics(
+                _analytics(durations[:400], scores[:400], passes[:400])
+            ),
+            make_partial_metrics(
+                _analytics(durations[400:], scores[400:], passes[400:])
+            ),
+        )
+
+        merged = finalize_partial_metrics(partial)
+        whole = finalize_partial_metrics(
+            make_partial_metrics(_analytics(durations, scores, passes))
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        duration = merged["attributes.ag.metrics.duration.cumulative"]
+        score = merged["attributes.ag.data.outputs.score"]
+        success = merged["attributes.ag.data.outputs.success"]
+
+        assert duration["count"] == 1000
+        assert abs(duration["sum"] - sum(durations)) < 1e-6
+        assert (
+            duration["pcts"]
+            == whole["attributes.ag.metrics.duration.cumulative"]["pcts"]
+        )
+        assert "sketch" not in duration
+
+        assert score == whole["attributes.ag.data.outputs.score"]
+        assert score["sum"] == sum(scores)
+
+        assert success["count"] == 1000
+        assert success["freq"][0]["value"] is True
+        assert success["freq"][0]["count"] == passes.count(True)
+        # ----------------------------------------------------------------------
+
+    def test_discrete_percentiles_are_exact(self):
+        # ARRANGE --------------------------------------------------------------
+        partial = make_partial_metrics(
+            {
+                "attributes.ag.data.outputs.score": {
+                    "type": "numeric/discrete",
+                    "count": 4,
+                    "freq": [
+                        {"value": 1, "count": 1},
+                        {"value": 2, "count": 2},
+                        {"value": 4, "count": 1},
+                    ],
+                }
+            }
+        )
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        metrics = finalize_partial_metrics(partial)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        score = metrics["attributes.ag.data.outputs.score"]
+
+        assert score["mean"] == 2.25
+        assert score["pcts"]["p50"] == 2.0  # of 1, 2, 2, 4
+        assert score["pcts"]["p75"] == 2.5
+        assert score["uniq"] == [2, 1, 4]  # most frequent first
+        # ----------------------------------------------------------------------
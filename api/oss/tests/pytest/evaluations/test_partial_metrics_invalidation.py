@@ -0,0 +1,125 @@
+from uuid import uuid4
+
+import pytest
+
+from oss.src.core.evaluations import service as evaluations_service
+from oss.src.core.evaluations.service import EvaluationsService
+from oss.src.core.evaluations.types import (
+    EvaluationResult,
+    EvaluationResultEdit,
+)
+
+PROJECT_ID = uuid4()
+USER_ID = uuid4()
+RUN_ID = uuid4()
+
+STEPS_METRICS_KEYS = {
+    "evaluator": [
+        {
+            "path": "attributes.ag.metrics.duration.cumulative",
+            "type": "numeric/continuous",
+        }
+    ]
+}
+
+
+class FakeEvaluationsDAO:
+    def __init__(self, results):
+        self.results = {result.id: result for result in results}
+
+    async def edit_results(self, *, project_id, user_id, results):
+        return [self.results[result.id] for result in results]
+
+    async def fetch_results(self, *, project_id, result_ids):
+        return [self.results[result_id] for result_id in result_ids]
+
+    async def delete_results(self, *, project_id, result_ids):
+        return [self.results.pop(result_id).id for result_id in result_ids]
+
+
+class TestPartialMetricsInvalidation:
+    @pytest.mark.asyncio
+    async def test_partials_are_rebuilt_when_results_change(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        results = [
+            EvaluationResult(
+                id=uuid4(),
+                run_id=RUN_ID,
+                scenario_id=uuid4(),
+                step_key="evaluator",
+            )
+            for _ in range(2)
+        ]
+
+        service = EvaluationsService(
+            evaluations_dao=FakeEvaluationsDAO(results),
+            tracing_service=None,
+            queries_service=None,
+            testsets_service=None,
+            evaluators_service=None,
+        )
+
+        cache = dict()
+
+        async def get_cache(*, namespace, project_id, key, **kwargs):
+            return cache.get((namespace, project_id, key))
+
+        async def set_cache(*, namespace, project_id, key, value, **kwargs):
+            cache[(namespace, project_id, key)] = value
+
+        async def invalidate_cache(*, namespace, project_id, key):
+            cache.pop((namespace, project_id, key), None)
+
+        windows = list()
+
+        async def compute_steps_metrics(*, windowing=None, **kwargs):
+            windows.append(windowing.oldest)
+
+            return dict()
+
+        monkeypatch.setattr(evaluations_service, "get_cache", get_cache)
+        monkeypatch.setattr(evaluations_service, "set_cache", set_cache)
+        monkeypatch.setattr(evaluations_service, "invalidate_cache", invalidate_cache)
+        monkeypatch.setattr(service, "_compute_steps_metrics", compute_steps_metrics)
+
+        async def refresh():
+            windows.clear()
+
+            await service._refresh_run_metrics(
+                project_id=PROJECT_ID,
+                run_id=RUN_ID,
+                steps_metrics_keys=STEPS_METRICS_KEYS,
+            )
+
+            return windows[0]  # where the partials were updated from
+
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        built = await refresh()
+        updated = await refresh()
+
+        await service.edit_results(
+            project_id=PROJECT_ID,
+            user_id=USER_ID,
+            results=[EvaluationResultEdit(id=results[0].id)],
+        )
+
+        edited = await refresh()
+        updated_again = await refresh()
+
+        await service.delete_results(
+            project_id=PROJECT_ID,
+            result_ids=[results[1].id],
+        )
+
+        deleted = await refresh()
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert built is None
+        assert updated is not None
+        assert edited is None
+        assert updated_again is not None
+        assert deleted is None
+        # ----------------------------------------------------------------------
@@ -0,0 +1,54 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from celery.exceptions import TimeLimitExceeded
+
+from oss.src.tasks.runtime import get_worker_loop, run_task, stop_worker_loop
+
+
+def _task(task_id=None):
+    return SimpleNamespace(request=SimpleNamespace(id=task_id))
+
+
+class TestTasksRuntime:
+    def test_tasks_share_the_worker_loop(self):
+        # ARRANGE --------------------------------------------------------------
+        async def get_loop():
+            return asyncio.get_running_loop()
+
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        first = run_task(_task(), get_loop())
+        second = run_task(_task(), get_loop())
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert first is second
+        assert first is get_worker_loop()
+        # ----------------------------------------------------------------------
+
+    def test_time_limit_cancels_the_task(self):
+        # ARRANGE --------------------------------------------------------------
+        cancelled = asyncio.Event()
+
+        async def hang():
+            try:
+                await asyncio.sleep(60)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        with pytest.raises(TimeLimitExceeded):
+            run_task(_task(), hang(), time_limit=0.5)
+
+        stop_worker_loop()
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert cancelled.is_set()
+        # ----------------------------------------------------------------------
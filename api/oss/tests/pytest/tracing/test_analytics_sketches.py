@@ -0,0 +1,86 @@
+from oss.src.dbs.postgres.tracing.sketches import SKETCH_ACCURACY, build_sketch
+from oss.src.dbs.postgres.tracing.utils import (
+    PERCENTILE_LEVELS,
+    merge_sketch_values,
+    compute_sketch_pcts,
+    compute_sketch_hist,
+    compute_iqrs,
+    compute_pscs,
+)
+
+VALUES = [(1 + (i * 7919) % 5000) * 0.37 for i in range(5000)]  # shuffled
+
+
+def _percentile_cont(values, level):
+    values = sorted(values)
+    rank = level * (len(values) - 1)
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def _value(values):
+    # as returned by the cont_sketch block of build_numeric_continuous_blocks()
+    return {
+        "count": len(values),
+        "sum": sum(values),
+        "min": min(values),
+        "max": max(values),
+        "sketch": build_sketch(values),
+    }
+
+
+class TestSketchValues:
+    def test_merged_values_match_whole_value(self):
+        # ARRANGE --------------------------------------------------------------
+        buckets = [_value(VALUES[:1200]), _value(VALUES[1200:3000]), {}]
+        buckets += [_value(VALUES[3000:])]
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        merged = merge_sketch_values(buckets)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        whole = _value(VALUES)
+        assert merged["count"] == whole["count"]
+        assert merged["sketch"] == whole["sketch"]
+        assert (merged["min"], merged["max"]) == (whole["min"], whole["max"])
+        assert abs(merged["sum"] - whole["sum"]) < 1e-6
+        assert merged["range"] == whole["max"] - whole["min"]
+        # ----------------------------------------------------------------------
+
+    def test_pcts_from_merged_sketches_are_within_accuracy(self):
+        # ARRANGE --------------------------------------------------------------
+        merged = merge_sketch_values([_value(VALUES[:2500]), _value(VALUES[2500:])])
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        value = compute_pscs(compute_iqrs(compute_sketch_pcts(merged)))
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        for key, level in PERCENTILE_LEVELS.items():
+            exact = _percentile_cont(VALUES, level)
+            assert abs(value["pcts"][key] - exact) <= exact * SKETCH_ACCURACY
+
+        exact_iqr = _percentile_cont(VALUES, 0.75) - _percentile_cont(VALUES, 0.25)
+        assert abs(value["iqrs"]["iqr50"] - exact_iqr) <= exact_iqr * 0.05
+        assert "pscs" in value
+        # ----------------------------------------------------------------------
+
+    def test_hist_from_sketch_counts_every_value(self):
+        # ACT ------------------------------------------------------------------
+        value = compute_sketch_hist(_value(VALUES), bins=8)
+        clipped = compute_sketch_hist(_value(VALUES), bins=4, vmin=0.0, vmax=100.0)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert len(value["hist"]) == 8
+        assert sum(h["count"] for h in value["hist"]) == len(VALUES)
+        assert value["hist"][0]["interval"][0] == min(VALUES)
+        assert value["hist"][-1]["interval"][1] == max(VALUES)
+
+        assert clipped["hist"][-1]["interval"][1] == 100.0
+        assert 0 < sum(h["count"] for h in clipped["hist"]) < len(VALUES)
+        # ----------------------------------------------------------------------
@@ -0,0 +1,75 @@
+from contextlib import asynccontextmanager
+from uuid import uuid4
+
+import pytest
+
+from oss.src.core.observability.dtos import NODE_ROW_COLUMNS
+from oss.src.dbs.postgres.observability import dao
+from oss.src.dbs.postgres.observability.dao import ObservabilityDAO
+
+
+class FakeResult:
+    def __init__(self, node_ids):
+        self.node_ids = node_ids
+
+    def scalars(self):
+        return self
+
+    def all(self):
+        return list(self.node_ids)
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+
+    async def execute(self, stmt):
+        return FakeResult(row["node_id"] for row in self.rows)
+
+    async def commit(self):
+        pass
+
+
+class FakeEngine:
+    def __init__(self):
+        self.rows = list()
+
+    @asynccontextmanager
+    async def tracing_session(self):
+        yield FakeSession(self.rows)
+
+
+def _node_row(node_id):
+    return tuple(
+        node_id if column == "node_id" else None for column in NODE_ROW_COLUMNS
+    )
+
+
+class TestNodesInserts:
+    @pytest.mark.asyncio
+    async def test_resent_batches_do_not_add_rows(self, monkeypatch):
+        # ARRANGE --------------------------------------------------------------
+        engine = FakeEngine()
+
+        async def bulk_insert(*, session, DBE, values):
+            session.rows.extend(values)
+
+        monkeypatch.setattr(dao, "engine", engine)
+        monkeypatch.setattr(dao, "bulk_insert", bulk_insert)
+
+        project_id = uuid4()
+        node_ids = [uuid4() for _ in range(3)]
+
+        batch = [_node_row(node_id) for node_id in node_ids[:2]]
+        resent = [_node_row(node_id) for node_id in node_ids]
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        await ObservabilityDAO().create_rows(project_id=project_id, node_rows=batch)
+        await ObservabilityDAO().create_rows(project_id=project_id, node_rows=resent)
+        await ObservabilityDAO().create_rows(project_id=project_id, node_rows=resent)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert [row["node_id"] for row in engine.rows] == node_ids
+        # ----------------------------------------------------------------------
@@ -0,0 +1,50 @@
+import pytest
+
+from oss.src.apis.fastapi.observability.utils import queueing
+from oss.src.apis.fastapi.observability.utils.queueing import OTLPBatchRejected
+
+
+FIELDS = {
+    b"project_id": b"project",
+    b"user_id": b"user",
+    b"organization_id": b"",
+    b"attempts": b"0",
+    b"otlp_stream": b"not a protobuf",
+}
+
+
+class TestOTLPQueueing:
+    @pytest.mark.asyncio
+    async def test_failed_batches_are_requeued_and_rejected_ones_dropped(
+        self, monkeypatch
+    ):
+        # ARRANGE --------------------------------------------------------------
+        requeued = list()
+        settled = list()
+
+        async def enqueue_otlp_batch(**batch):
+            requeued.append(batch["attempts"])
+
+        async def settle(message_id):
+            settled.append(message_id)
+
+        monkeypatch.setattr(queueing, "enqueue_otlp_batch", enqueue_otlp_batch)
+        monkeypatch.setattr(queueing, "_settle", settle)
+
+        async def fail(**batch):
+            return False
+
+        async def reject(**batch):
+            raise OTLPBatchRejected("Failed to parse OTLP stream.")
+
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        await queueing._handle(b"1-0", FIELDS, fail)
+        await queueing._handle(b"2-0", FIELDS, reject)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert requeued == [1]
+        assert settled == [b"1-0", b"2-0"]
+        # ----------------------------------------------------------------------
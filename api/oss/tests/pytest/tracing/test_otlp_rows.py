@@ -0,0 +1,389 @@
+from enum import Enum
+from json import dumps, loads
+from pathlib import Path
+from uuid import uuid4
+
+import pytest
+
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+from opentelemetry.proto.common.v1.common_pb2 import AnyValue, KeyValue
+from opentelemetry.proto.trace.v1.trace_pb2 import Span, Status
+
+from oss.src.core.observability.dtos import NODE_ROW_COLUMNS
+from oss.src.core.observability.utils import (
+    parse_ingest,
+    parse_span_dtos_to_span_idx,
+    parse_span_idx_to_span_id_tree,
+    calculate_costs,
+    cumulate_costs,
+    cumulate_tokens,
+)
+from oss.src.dbs.postgres.observability.mappings import map_span_dto_to_span_dbe
+from oss.src.apis.fastapi.observability.opentelemetry.otlp import parse_otlp_stream
+from oss.src.apis.fastapi.observability.opentelemetry.rows import (
+    parse_otlp_stream_to_node_rows,
+)
+from oss.src.apis.fastapi.observability.utils.processing import (
+    parse_from_otel_span_dto,
+)
+
+
+TRACE_ID = bytes.fromhex("1234567890abcdef1234567890abcdef")
+START_TIME = 1_700_000_000_123_456_789  # nanoseconds
+
+
+def _value(value) -> AnyValue:
+    if isinstance(value, bool):
+        return AnyValue(bool_value=value)
+    if isinstance(value, int):
+        return AnyValue(int_value=value)
+    if isinstance(value, float):
+        return AnyValue(double_value=value)
+    if isinstance(value, bytes):
+        return AnyValue(bytes_value=value)
+    if isinstance(value, list):
+        any_value = AnyValue()
+        any_value.array_value.values.extend([_value(item) for item in value])
+        return any_value
+    if isinstance(value, dict):
+        any_value = AnyValue()
+        any_value.kvlist_value.values.extend(_attributes(value))
+        return any_value
+    return AnyValue(string_value=value)
+
+
+def _attributes(attributes: dict):
+    return [KeyValue(key=key, value=_value(value)) for key, value in attributes.items()]
+
+
+def _span(
+    span_id: str,
+    name: str,
+    attributes: dict,
+    *,
+    parent_id: str = "",
+    offset: int = 0,
+    duration: int = 1_500_000,
+    kind: int = Span.SPAN_KIND_INTERNAL,
+    status: Status = None,
+    events: list = None,
+    links: list = None,
+) -> Span:
+    span = Span(
+        trace_id=TRACE_ID,
+        span_id=bytes.fromhex(span_id),
+        parent_span_id=bytes.fromhex(parent_id),
+        name=name,
+        kind=kind,
+        start_time_unix_nano=START_TIME + offset,
+        end_time_unix_nano=START_TIME + offset + duration,
+        attributes=_attributes(attributes),
+    )
+
+    if status is not None:
+        span.status.CopyFrom(status)
+
+    for event_name, event_offset, event_attributes in events or []:
+        span.events.add(
+            name=event_name,
+            time_unix_nano=START_TIME + event_offset,
+            attributes=_attributes(event_attributes),
+        )
+
+    for link_trace_id, link_span_id, link_attributes in links or []:
+        span.links.add(
+            trace_id=bytes.fromhex(link_trace_id),
+            span_id=bytes.fromhex(link_span_id),
+            attributes=_attributes(link_attributes),
+        )
+
+    return span
+
+
+def _stream(*spans: Span) -> bytes:
+    request = ExportTraceServiceRequest()
+    request.resource_spans.add().scope_spans.add().spans.extend(spans)
+
+    return request.SerializeToString()
+
+
+# Modeled after the scripts in oss/tests/manual/tracing/ingestion ------------
+
+
+def _agenta_decorator() -> bytes:
+    return _stream(
+        _span(
+            "1000000000000001",
+            "generate",
+            {
+                "ag.type.tree": "invocation",
+                "ag.type.node": "workflow",
+                "ag.data.inputs": '@ag.type=json:{"topic": "witches"}',
+                "ag.data.outputs": "Double, double toil and trouble",
+                "ag.meta.configuration.model": "gpt-4o-mini",
+                "ag.refs.application.id": str(uuid4()),
+            },
+            kind=Span.SPAN_KIND_SERVER,
+            duration=9_000_000,
+        ),
+        _span(
+            "1000000000000002",
+            "litellm_client",
+            {
+                "ag.type.node": "chat",
+                "ag.data.inputs.prompt": '@ag.type=json:[{"role": "user"}]',
+                "ag.meta.response.model": "gpt-4o-mini",
+                "ag.metrics.unit.tokens.prompt": 12,
+                "ag.metrics.unit.tokens.completion": 34,
+                "ag.metrics.unit.tokens.total": 46,
+            },
+            parent_id="1000000000000001",
+            offset=1_000_000,
+            kind=Span.SPAN_KIND_CLIENT,
+        ),
+        _span(
+            "1000000000000003",
+            "postprocess",
+            {
+                "ag.type.node": "not-a-node-type",
+                "ag.data.internals": "@ag.type=none:",
+            },
+            parent_id="1000000000000001",
+            offset=3_000_000,
+        ),
+    )
+
+
+def _agenta_exception() -> bytes:
+    return _stream(
+        _span(
+            "2000000000000001",
+            "faulty",
+            {
+                "ag.type.tree": "invocation",
+                "ag.type.node": "task",
+            },
+            status=Status(code=Status.STATUS_CODE_ERROR, message="boom"),
+            events=[
+                (
+                    "exception",
+                    500_000,
+                    {
+                        "exception.type": "ValueError",
+                        "exception.message": "boom",
+                        "exception.stacktrace": "Traceback ...",
+                        "exception.escaped": False,
+                    },
+                )
+            ],
+        ),
+    )
+
+
+def _openinference_openai() -> bytes:
+    return _stream(
+        _span(
+            "3000000000000001",
+            "ChatCompletion",
+            {
+                "openinference.span.kind": "LLM",
+                "llm.model_name": "gpt-4o-mini",
+                "llm.provider": "openai",
+                "llm.invocation_parameters": '{"temperature": 0.2}',
+                "llm.token_count.prompt": 20,
+                "llm.token_count.completion": 5,
+                "llm.token_count.total": 25,
+                "input.value": '{"messages": [{"role": "user", "content": "hi"}]}',
+                "input.mime_type": "application/json",
+                "output.value": "hello",
+            },
+            kind=Span.SPAN_KIND_CLIENT,
+            status=Status(code=Status.STATUS_CODE_OK),
+        ),
+    )
+
+
+def _openllmetry_openai() -> bytes:
+    return _stream(
+        _span(
+            "4000000000000001",
+            "openai.chat",
+            {
+                "llm.request.type": "chat",
+                "gen_ai.system": "OpenAI",
+                "gen_ai.request.model": "gpt-4o-mini",
+                "gen_ai.response.model": "gpt-4o-mini",
+                "gen_ai.prompt.0.role": "user",
+                "gen_ai.prompt.0.content": "hi",
+                "gen_ai.completion.0.role": "assistant",
+                "gen_ai.completion.0.content": "hello",
+                "gen_ai.usage.prompt_tokens": 8,
+                "gen_ai.usage.completion_tokens": 2,
+                "llm.usage.total_tokens": 10,
+            },
+            kind=Span.SPAN_KIND_CLIENT,
+        ),
+    )
+
+
+def _opentelemetry_values() -> bytes:
+    return _stream(
+        _span(
+            "5000000000000001",
+            "values",
+            {
+                "string": "text",
+                "bool": True,
+                "int": 42,
+                "double": 0.5,
+                "nan": float("nan"),
+                "bytes": b"raw",
+                "array": [1, "two", 3.0],
+                "kvlist": {"nested": {"deep": [True]}},
+            },
+            kind=Span.SPAN_KIND_PRODUCER,
+            events=[("checkpoint", 100, {"step": 1}), ("done", 200, {})],
+            links=[("abcdef1234567890abcdef1234567890", "abcdef1234567890", {"x": 1})],
+        ),
+        _span(
+            "5000000000000002",
+            "orphan",
+            {},
+            parent_id="5000000000000009",
+            offset=1_000,
+        ),
+        # same node id as the first span, the last one wins
+        _span(
+            "5000000000000001",
+            "values",
+            {"int": 43},
+            offset=2_000,
+        ),
+    )
+
+
+# Recorded from the scripts in oss/tests/manual/tracing/ingestion, with their
+# expected rows next to them ----------------------------------------------------
+
+DATA = Path(__file__).parent / "data"
+
+RECORDINGS = [
+    "agenta_decorator",
+    "agenta_exception",
+]
+
+
+def _recorded(name: str) -> bytes:
+    return (DATA / f"{name}.pb").read_bytes()
+
+
+def _golden(rows) -> list:
+    return loads(
+        dumps(
+            rows,
+            default=lambda value: value.value
+            if isinstance(value, Enum)
+            else str(value),
+        )
+    )
+
+
+# ------------------------------------------------------------------------------
+
+
+def _legacy_rows(otlp_stream: bytes):
+    span_dtos = [
+        parse_from_otel_span_dto(otel_span).get("nodes")
+        for otel_span in parse_otlp_stream(otlp_stream)
+    ]
+    span_dtos = [span_dto for span_dto in span_dtos if span_dto]
+
+    parse_ingest(span_dtos)
+
+    span_idx = parse_span_dtos_to_span_idx(span_dtos)
+
+    span_id_tree = parse_span_idx_to_span_id_tree(span_idx)
+
+    calculate_costs(span_idx)
+
+    cumulate_costs(span_id_tree, span_idx)
+
+    cumulate_tokens(span_id_tree, span_idx)
+
+    span_dbes = [
+        map_span_dto_to_span_dbe(project_id=None, span_dto=span_dto)
+        for span_dto in span_idx.values()
+    ]
+
+    return [
+        {column: getattr(span_dbe, column) for column in NODE_ROW_COLUMNS}
+        for span_dbe in span_dbes
+    ]
+
+
+def _rows(otlp_stream: bytes):
+    return [
+        dict(zip(NODE_ROW_COLUMNS, node_row))
+        for node_row in parse_otlp_stream_to_node_rows(otlp_stream)
+    ]
+
+
+class TestOTLPRows:
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            _agenta_decorator,
+            _agenta_exception,
+            _openinference_openai,
+            _openllmetry_openai,
+            _opentelemetry_values,
+        ],
+    )
+    def test_rows_match_span_processor(self, payload):
+        # ARRANGE --------------------------------------------------------------
+        otlp_stream = payload()
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        expected = _legacy_rows(otlp_stream)
+        actual = _rows(otlp_stream)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert len(actual) == len(expected) > 0
+        for actual_row, expected_row in zip(actual, expected):
+            assert actual_row == expected_row
+        # ----------------------------------------------------------------------
+
+    def test_rows_keep_tree_metrics(self):
+        # ACT ------------------------------------------------------------------
+        rows = _rows(_agenta_decorator())
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        root = rows[0]
+        assert root["parent_id"] is None
+        assert root["metrics"]["acc.tokens.total"] == 46
+        assert rows[1]["parent_id"] == root["node_id"]
+        assert rows[2]["node_type"].value == "task"
+        # ----------------------------------------------------------------------
+
+    @pytest.mark.parametrize("recording", RECORDINGS)
+    def test_rows_match_recordings(self, recording):
+        # ARRANGE --------------------------------------------------------------
+        otlp_stream = _recorded(recording)
+
+        expected = loads((DATA / f"{recording}.json").read_text())
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        actual = _golden(_rows(otlp_stream))
+        legacy = _golden(_legacy_rows(otlp_stream))
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert actual == expected
+        assert legacy == expected
+        # ----------------------------------------------------------------------
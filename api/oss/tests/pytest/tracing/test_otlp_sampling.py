@@ -0,0 +1,93 @@
+from opentelemetry.proto.collector.trace.v1.trace_service_pb2 import (
+    ExportTraceServiceRequest,
+)
+from opentelemetry.proto.trace.v1.trace_pb2 import Status
+
+from oss.src.apis.fastapi.observability.opentelemetry.otlp import sample_otlp_stream
+
+
+# first 4 bytes as int % 100 -> 0, 50, 99
+SAMPLED_TRACE_ID = bytes.fromhex("00000064" + "0" * 24)
+HALFWAY_TRACE_ID = bytes.fromhex("00000032" + "0" * 24)
+DROPPED_TRACE_ID = bytes.fromhex("00000063" + "0" * 24)
+
+
+def _stream(*spans) -> bytes:
+    request = ExportTraceServiceRequest()
+    scope_spans = request.resource_spans.add().scope_spans.add()
+
+    for idx, (trace_id, is_error) in enumerate(spans):
+        span = scope_spans.spans.add(
+            trace_id=trace_id,
+            span_id=idx.to_bytes(8, "big"),
+            name=f"span-{idx}",
+        )
+        if is_error:
+            span.status.code = Status.STATUS_CODE_ERROR
+
+    return request.SerializeToString()
+
+
+def _trace_ids(otlp_stream: bytes):
+    request = ExportTraceServiceRequest()
+    request.ParseFromString(otlp_stream)
+
+    return [
+        span.trace_id
+        for resource_span in request.resource_spans
+        for scope_span in resource_span.scope_spans
+        for span in scope_span.spans
+    ]
+
+
+class TestOTLPSampling:
+    def test_sampling_keeps_everything_at_full_rate(self):
+        # ARRANGE --------------------------------------------------------------
+        otlp_stream = _stream((SAMPLED_TRACE_ID, False), (DROPPED_TRACE_ID, False))
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        sampled_stream, kept, dropped = sample_otlp_stream(otlp_stream, 1.0)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert sampled_stream == otlp_stream
+        assert (kept, dropped) == (2, 0)
+        # ----------------------------------------------------------------------
+
+    def test_sampling_keeps_whole_traces(self):
+        # ARRANGE --------------------------------------------------------------
+        otlp_stream = _stream(
+            (SAMPLED_TRACE_ID, False),
+            (DROPPED_TRACE_ID, False),
+            (SAMPLED_TRACE_ID, False),
+            (HALFWAY_TRACE_ID, False),
+        )
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        sampled_stream, kept, dropped = sample_otlp_stream(otlp_stream, 0.5)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert (kept, dropped) == (2, 2)
+        assert _trace_ids(sampled_stream) == [SAMPLED_TRACE_ID, SAMPLED_TRACE_ID]
+        # ----------------------------------------------------------------------
+
+    def test_sampling_keeps_error_traces(self):
+        # ARRANGE --------------------------------------------------------------
+        otlp_stream = _stream(
+            (DROPPED_TRACE_ID, False),
+            (DROPPED_TRACE_ID, True),
+            (HALFWAY_TRACE_ID, False),
+        )
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        sampled_stream, kept, dropped = sample_otlp_stream(otlp_stream, 0.0)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert (kept, dropped) == (2, 1)
+        assert _trace_ids(sampled_stream) == [DROPPED_TRACE_ID, DROPPED_TRACE_ID]
+        # ----------------------------------------------------------------------
@@ -0,0 +1,117 @@
+from datetime import datetime, timedelta, timezone
+
+from oss.src.dbs.postgres.tracing.partitions import (
+    floor_partition,
+    parse_partition_bound,
+    plan_partitions,
+)
+
+DAY = timedelta(days=1)
+WEEK = timedelta(weeks=1)
+TODAY = datetime(2025, 10, 22, tzinfo=timezone.utc)  # a wednesday
+
+
+class TestPartitions:
+    def test_parse_partition_bound(self):
+        # ACT ------------------------------------------------------------------
+        legacy = parse_partition_bound(
+            "FOR VALUES FROM (MINVALUE) TO ('2025-10-22 00:00:00+00')"
+        )
+        daily = parse_partition_bound(
+            "FOR VALUES FROM ('2025-10-22 02:00:00+02') TO ('2025-10-23 00:00:00+00')"
+        )
+        default = parse_partition_bound("DEFAULT")
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert legacy == (None, TODAY)
+        assert daily == (TODAY, TODAY + DAY)
+        assert default is None
+        # ----------------------------------------------------------------------
+
+    def test_floor_partition_aligns_weeks_on_mondays(self):
+        # ACT ------------------------------------------------------------------
+        day = floor_partition(TODAY + timedelta(hours=13), DAY)
+        week = floor_partition(TODAY + timedelta(hours=13), WEEK)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert day == TODAY
+        assert week == TODAY - 2 * DAY
+        assert week.weekday() == 0
+        # ----------------------------------------------------------------------
+
+    def test_plan_partitions_creates_contiguous_partitions_ahead(self):
+        # ARRANGE --------------------------------------------------------------
+        bounds = {
+            "spans_legacy": (None, TODAY - DAY),
+            "spans_p20251021": (TODAY - DAY, TODAY),
+        }
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        creates, drops = plan_partitions(
+            table="spans",
+            bounds=bounds,
+            timestamp=TODAY + timedelta(hours=13),
+            interval=DAY,
+            ahead=2,
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert creates == [
+            ("spans_p20251022", TODAY, TODAY + DAY),
+            ("spans_p20251023", TODAY + DAY, TODAY + 2 * DAY),
+            ("spans_p20251024", TODAY + 2 * DAY, TODAY + 3 * DAY),
+        ]
+        assert drops == []
+        # ----------------------------------------------------------------------
+
+    def test_plan_partitions_switches_interval_without_gaps(self):
+        # ARRANGE --------------------------------------------------------------
+        bounds = {"nodes_p20251022": (TODAY, TODAY + DAY)}
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        creates, _ = plan_partitions(
+            table="nodes",
+            bounds=bounds,
+            timestamp=TODAY,
+            interval=WEEK,
+            ahead=1,
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        monday = TODAY + 5 * DAY
+        assert creates == [
+            ("nodes_p20251023", TODAY + DAY, monday),
+            ("nodes_p20251027", monday, monday + WEEK),
+        ]
+        # ----------------------------------------------------------------------
+
+    def test_plan_partitions_drops_partitions_out_of_retention(self):
+        # ARRANGE --------------------------------------------------------------
+        bounds = {
+            "spans_legacy": (None, TODAY - 10 * DAY),
+            "spans_p20251012": (TODAY - 10 * DAY, TODAY - 9 * DAY),
+            "spans_p20251013": (TODAY - 9 * DAY, TODAY - 8 * DAY),
+            "spans_p20251022": (TODAY, TODAY + DAY),
+        }
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        _, drops = plan_partitions(
+            table="spans",
+            bounds=bounds,
+            timestamp=TODAY,
+            interval=DAY,
+            ahead=1,
+            retention=9 * DAY,
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert drops == ["spans_legacy", "spans_p20251012"]
+        # ----------------------------------------------------------------------
@@ -0,0 +1,210 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+from oss.src.core.tracing.dtos import Focus, MetricSpec, MetricType
+from oss.src.dbs.postgres.tracing.sketches import (
+    SKETCH_ACCURACY,
+    build_sketch,
+    merge_sketches,
+    sketch_quantiles,
+)
+from oss.src.dbs.postgres.tracing.rollups import (
+    merge_rollups,
+    plan_rollups,
+    plan_refreshes,
+    parse_rollup_metric,
+)
+
+PROJECT_ID = uuid4()
+ORIGIN = datetime(2025, 10, 1, tzinfo=timezone.utc)
+VALUES = [(1 + (i * 7919) % 5000) * 0.37 for i in range(5000)]  # shuffled
+
+
+def _percentile_cont(values, level):
+    values = sorted(values)
+    rank = level * (len(values) - 1)
+    lower = int(rank)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (rank - lower)
+
+
+def _rollup(minutes, values, *, errors=0):
+    return {
+        "project_id": PROJECT_ID,
+        "granularity": 1,
+        "focus": Focus.TRACE.value,
+        "timestamp": ORIGIN + timedelta(minutes=minutes),
+        "count": len(values),
+        "duration": sum(values),
+        "costs": None,
+        "tokens": None,
+        "errors_count": errors,
+        "errors_duration": None,
+        "errors_costs": None,
+        "errors_tokens": None,
+        "metrics": {
+            "ag.metrics.duration.cumulative": {
+                "count": len(values),
+                "sum": sum(values),
+                "min": min(values),
+                "max": max(values),
+                "sketch": build_sketch(values),
+            },
+            "ag.type.trace": {
+                "count": len(values),
+                "freq": {"invocation": len(values)},
+            },
+        },
+    }
+
+
+class TestSketches:
+    def test_quantiles_are_within_accuracy(self):
+        # ARRANGE --------------------------------------------------------------
+        levels = [0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99]
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        quantiles = sketch_quantiles(
+            build_sketch(VALUES),
+            levels,
+            lowest=min(VALUES),
+            highest=max(VALUES),
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        for level, quantile in zip(levels, quantiles):
+            exact = _percentile_cont(VALUES, level)
+            assert abs(quantile - exact) <= exact * SKETCH_ACCURACY
+        # ----------------------------------------------------------------------
+
+    def test_merged_sketches_match_whole_sketch(self):
+        # ACT ------------------------------------------------------------------
+        merged = merge_sketches(
+            build_sketch(VALUES[:1000]),
+            build_sketch(VALUES[1000:]),
+            None,
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert merged == build_sketch(VALUES)
+        # ----------------------------------------------------------------------
+
+
+class TestRollups:
+    def test_merge_rollups_into_hours(self):
+        # ARRANGE --------------------------------------------------------------
+        rollups = [
+            _rollup(0, VALUES[:2000]),
+            _rollup(59, VALUES[2000:4000], errors=2),
+            _rollup(60, VALUES[4000:]),
+        ]
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        merged = merge_rollups(rollups, granularity=60, origin=ORIGIN)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert [rollup["timestamp"] for rollup in merged] == [
+            ORIGIN,
+            ORIGIN + timedelta(hours=1),
+        ]
+        assert merged[0]["granularity"] == 60
+        assert merged[0]["count"] == 4000
+        assert merged[0]["errors_count"] == 2
+        assert merged[0]["costs"] is None
+
+        metric = merged[0]["metrics"]["ag.metrics.duration.cumulative"]
+        assert metric["count"] == 4000
+        assert metric["min"] == min(VALUES[:4000])
+        assert metric["sketch"] == build_sketch(VALUES[:4000])
+        assert merged[0]["metrics"]["ag.type.trace"]["freq"] == {"invocation": 4000}
+
+        assert rollups[0]["count"] == 2000  # inputs are left untouched
+        # ----------------------------------------------------------------------
+
+    def test_plan_rollups_segments(self):
+        # ARRANGE --------------------------------------------------------------
+        watermarks = {
+            1: (ORIGIN, ORIGIN + timedelta(hours=2, minutes=30)),
+            60: (ORIGIN, ORIGIN + timedelta(hours=2)),
+        }
+        newest = ORIGIN + timedelta(hours=3, seconds=10)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        segments = plan_rollups(
+            oldest=ORIGIN,
+            newest=newest,
+            interval=60,
+            watermarks=watermarks,
+        )
+        unaligned = plan_rollups(
+            oldest=ORIGIN + timedelta(seconds=30),
+            newest=newest,
+            interval=60,
+            watermarks=watermarks,
+        )
+        uncovered = plan_rollups(
+            oldest=ORIGIN - timedelta(hours=1),
+            newest=newest,
+            interval=60,
+            watermarks=watermarks,
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert segments == [
+            (60, ORIGIN, ORIGIN + timedelta(hours=2)),
+            (1, ORIGIN + timedelta(hours=2), ORIGIN + timedelta(hours=2, minutes=30)),
+            (None, ORIGIN + timedelta(hours=2, minutes=30), newest),
+        ]
+        assert unaligned is None
+        assert uncovered is None
+        # ----------------------------------------------------------------------
+
+    def test_plan_refreshes_merges_close_minutes(self):
+        # ARRANGE --------------------------------------------------------------
+        minutes = [0, 1, 1, 5, 25, 60 * 24 * 3]  # started in by spans created together
+
+        timestamps = [ORIGIN + timedelta(minutes=minute) for minute in minutes]
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        ranges = plan_refreshes(reversed(timestamps))
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert ranges == [
+            (ORIGIN, ORIGIN + timedelta(minutes=6)),
+            (ORIGIN + timedelta(minutes=25), ORIGIN + timedelta(minutes=26)),
+            (ORIGIN + timedelta(days=3), ORIGIN + timedelta(days=3, minutes=1)),
+        ]
+        assert plan_refreshes([]) == []
+        # ----------------------------------------------------------------------
+
+    def test_parse_rollup_metric_matches_analytics_shape(self):
+        # ARRANGE --------------------------------------------------------------
+        metric = _rollup(0, VALUES)["metrics"]["ag.metrics.duration.cumulative"]
+        spec = MetricSpec(
+            type=MetricType.NUMERIC_CONTINUOUS,
+            path="ag.metrics.duration.cumulative",
+            bins=10,
+        )
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        value = parse_rollup_metric(metric, spec)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert value["count"] == len(VALUES)
+        assert value["range"] == max(VALUES) - min(VALUES)
+        assert {"pcts", "iqrs", "hist"} <= set(value.keys())
+        assert len(value["hist"]) == 10
+        assert sum(h["count"] for h in value["hist"]) == len(VALUES)
+        assert parse_rollup_metric(None, spec) == {}
+        # ----------------------------------------------------------------------
@@ -0,0 +1,64 @@
+import pytest
+from sqlalchemy import Column, Integer, String
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import declarative_base
+
+from oss.src.dbs.postgres.shared.utils import bulk_insert
+
+
+Base = declarative_base()
+
+
+class ItemDBE(Base):
+    __tablename__ = "items"
+
+    project_id = Column(String, primary_key=True)
+    item_id = Column(Integer, primary_key=True)
+    name = Column(String)
+
+
+class FakeSession:
+    def __init__(self):
+        self.rows = list()
+
+    async def execute(self, stmt):
+        params = stmt.compile(dialect=postgresql.dialect()).params
+
+        self.rows.append(
+            sorted(value for key, value in params.items() if key.startswith("name"))
+        )
+
+
+class TestBulkInsert:
+    @pytest.mark.asyncio
+    async def test_upserts_collapse_rows_on_the_conflict_columns(self):
+        # ARRANGE --------------------------------------------------------------
+        values = [
+            {"project_id": "p", "item_id": 1, "name": "first"},
+            {"project_id": "p", "item_id": 2, "name": "other"},
+            {"project_id": "p", "item_id": 1, "name": "last"},
+        ]
+
+        inserted = FakeSession()
+        upserted = FakeSession()
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        await bulk_insert(
+            session=inserted,
+            DBE=ItemDBE,
+            values=values,
+        )
+        await bulk_insert(
+            session=upserted,
+            DBE=ItemDBE,
+            values=values,
+            conflict=["project_id", "item_id"],
+            update=["name"],
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert inserted.rows == [["first", "last", "other"]]
+        assert upserted.rows == [["last", "other"]]
+        # ----------------------------------------------------------------------
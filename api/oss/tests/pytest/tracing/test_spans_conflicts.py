@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta, timezone
+from uuid import uuid4
+
+import pytest
+from sqlalchemy.sql import Select
+
+from oss.src.core.shared.exceptions import EntityCreationConflict
+from oss.src.dbs.postgres.tracing.dao import TracingDAO
+from oss.src.dbs.postgres.tracing.dbes import SpanDBE
+
+
+NOW = datetime(2025, 10, 22, tzinfo=timezone.utc)
+
+
+class FakeResult:
+    def __init__(self, row):
+        self.row = row
+
+    def first(self):
+        return self.row
+
+
+class FakeSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.locked = list()
+
+    async def execute(self, stmt, params=None):
+        if not isinstance(stmt, Select):
+            self.locked.extend(params["keys"])
+            return None
+
+        return FakeResult(self.rows[0] if self.rows else None)
+
+
+def _span(trace_id, span_id, start_time):
+    return SpanDBE(trace_id=trace_id, span_id=span_id, start_time=start_time)
+
+
+class TestSpansConflicts:
+    @pytest.mark.asyncio
+    async def test_spans_conflict_whatever_their_start_time(self):
+        # ARRANGE --------------------------------------------------------------
+        project_id = uuid4()
+        trace_id, span_id = uuid4(), uuid4()
+
+        span = _span(trace_id, span_id, NOW)
+        moved = _span(trace_id, span_id, NOW + timedelta(seconds=1))
+        other = _span(trace_id, uuid4(), NOW)
+
+        dao = TracingDAO()
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        async def conflict(rows, span_dbes):
+            try:
+                await dao._check_span_conflicts(
+                    session=FakeSession(rows=rows),
+                    project_id=project_id,
+                    span_dbes=span_dbes,
+                )
+            except EntityCreationConflict as e:
+                return e.conflict
+
+        session = FakeSession(rows=[])
+
+        await dao._check_span_conflicts(
+            session=session,
+            project_id=project_id,
+            span_dbes=[span, other],
+        )
+
+        stored = await conflict([(trace_id, span_id)], [moved])
+        batched = await conflict([], [span, other, moved])
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert session.locked == [f"{project_id}:{trace_id}"]
+        assert stored == {"trace_id": str(trace_id), "span_id": str(span_id)}
+        assert batched == stored
+        # ----------------------------------------------------------------------
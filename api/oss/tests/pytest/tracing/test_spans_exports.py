@@ -0,0 +1,119 @@
+from json import loads
+
+
+import pytest
+
+
+@pytest.fixture(scope="class")
+def mock_data(authed_api):
+    trace_ids = [
+        "1234567890abcdef1234567890abc000",
+        "1234567890abcdef1234567890abc001",
+    ]
+
+    # ARRANGE ------------------------------------------------------------------
+    spans = [
+        {
+            "trace_id": trace_ids[1],
+            "span_id": "abcdef1234567891",
+            "span_name": "late_span",
+            "start_time": 1690000000,
+            "end_time": 1690000010,
+        },
+        {
+            "trace_id": trace_ids[0],
+            "span_id": "abcdef1234567890",
+            "span_name": "parent_span",
+            "start_time": 1670000000,
+            "end_time": 1680000000,
+            "attributes": {"some.string": "some-string"},
+        },
+        {
+            "trace_id": trace_ids[0],
+            "span_id": "1234567890abcdef",
+            "parent_id": "abcdef1234567890",
+            "span_name": "child_span",
+            "start_time": 1672500000,
+            "end_time": 1677500000,
+        },
+    ]
+    response = authed_api(
+        "POST",
+        "/preview/tracing/spans/",
+        json={"spans": spans},
+    )
+
+    assert response.status_code == 202
+    response = response.json()
+    assert response["count"] == 3
+    # --------------------------------------------------------------------------
+
+    _mock_data = {"spans": spans}
+
+    return _mock_data
+
+
+class TestSpansExports:
+    def test_export_all_as_ndjson(self, authed_api, mock_data):
+        # ACT ------------------------------------------------------------------
+        response = authed_api(
+            "POST",
+            "/preview/tracing/spans/export",
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        spans = [loads(line) for line in response.text.splitlines() if line]
+        assert [span["span_name"] for span in spans] == [
+            "parent_span",
+            "child_span",
+            "late_span",
+        ]
+        assert spans[0]["attributes"]["some"]["string"] == "some-string"
+        # ----------------------------------------------------------------------
+
+    def test_export_with_limit(self, authed_api, mock_data):
+        # ACT ------------------------------------------------------------------
+        response = authed_api(
+            "POST",
+            "/preview/tracing/spans/export",
+            json={"limit": 2},
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert response.status_code == 200
+        spans = [loads(line) for line in response.text.splitlines() if line]
+        assert [span["span_name"] for span in spans] == [
+            "parent_span",
+            "child_span",
+        ]
+        # ----------------------------------------------------------------------
+
+    def test_export_with_filtering(self, authed_api, mock_data):
+        # ACT ------------------------------------------------------------------
+        response = authed_api(
+            "POST",
+            "/preview/tracing/spans/export",
+            json={
+                "filter": {
+                    "conditions": [
+                        {
+                            "field": "span_name",
+                            "operator": "is",
+                            "value": "late_span",
+                        }
+                    ]
+                }
+            },
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert response.status_code == 200
+        spans = [loads(line) for line in response.text.splitlines() if line]
+        assert len(spans) == 1
+        assert spans[0]["span_name"] == "late_span"
+        # ----------------------------------------------------------------------
@@ -0,0 +1,128 @@
+import pytest
+
+
+@pytest.fixture(scope="class")
+def mock_data(authed_api):
+    trace_ids = [
+        "1234567890abcdef1234567890abc000",
+        "1234567890abcdef1234567890abc001",
+        "1234567890abcdef1234567890abc002",
+    ]
+
+    # ARRANGE ------------------------------------------------------------------
+    spans = [
+        {
+            "trace_id": trace_ids[0],
+            "span_id": "abcdef1234567890",
+            "span_name": "oldest_trace",
+            "start_time": 1670000000,
+            "end_time": 1670000010,
+        },
+        {
+            "trace_id": trace_ids[1],
+            "span_id": "abcdef1234567891",
+            "span_name": "middle_trace",
+            "start_time": 1680000000,
+            "end_time": 1680000010,
+        },
+        {
+            "trace_id": trace_ids[1],
+            "span_id": "1234567890abcdef",
+            "parent_id": "abcdef1234567891",
+            "span_name": "middle_child",
+            "start_time": 1680000001,
+            "end_time": 1680000009,
+            "status_code": "STATUS_CODE_ERROR",
+        },
+        {
+            "trace_id": trace_ids[2],
+            "span_id": "abcdef1234567892",
+            "span_name": "newest_trace",
+            "start_time": 1690000000,
+            "end_time": 1690000010,
+        },
+    ]
+    response = authed_api(
+        "POST",
+        "/preview/tracing/spans/",
+        json={"spans": spans},
+    )
+
+    assert response.status_code == 202
+    response = response.json()
+    assert response["count"] == 4
+    # --------------------------------------------------------------------------
+
+    _mock_data = {"trace_ids": trace_ids, "spans": spans}
+
+    return _mock_data
+
+
+class TestTracesQueries:
+    def test_query_traces_latest_first(self, authed_api, mock_data):
+        # ACT ------------------------------------------------------------------
+        response = authed_api(
+            "POST",
+            "/preview/tracing/spans/query",
+            json={"focus": "trace", "limit": 2},
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert response.status_code == 200
+        response = response.json()
+        assert response["count"] == 2
+        assert list(response["traces"].keys()) == [
+            mock_data["trace_ids"][2],
+            mock_data["trace_ids"][1],
+        ]
+        # ----------------------------------------------------------------------
+
+    def test_query_traces_next_page(self, authed_api, mock_data):
+        # ACT ------------------------------------------------------------------
+        response = authed_api(
+            "POST",
+            "/preview/tracing/spans/query",
+            json={
+                "focus": "trace",
+                "limit": 2,
+                "newest": mock_data["spans"][1]["start_time"],
+            },
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert response.status_code == 200
+        response = response.json()
+        assert response["count"] == 1
+        assert list(response["traces"].keys()) == [mock_data["trace_ids"][0]]
+        # ----------------------------------------------------------------------
+
+    def test_query_traces_by_any_span(self, authed_api, mock_data):
+        # ACT ------------------------------------------------------------------
+        response = authed_api(
+            "POST",
+            "/preview/tracing/spans/query",
+            json={
+                "focus": "trace",
+                "filter": {
+                    "conditions": [
+                        {
+                            "field": "span_name",
+                            "operator": "is",
+                            "value": "middle_child",
+                        }
+                    ]
+                },
+            },
+        )
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert response.status_code == 200
+        response = response.json()
+        assert response["count"] == 1
+        trace = response["traces"][mock_data["trace_ids"][1]]
+        root = trace["spans"]["middle_trace"]
+        assert "middle_child" in root["spans"]
+        # ----------------------------------------------------------------------
@@ -0,0 +1,50 @@
+from uuid import uuid4
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.future import select
+
+from oss.src.core.evaluations.dispatching import get_trace_shard
+from oss.src.core.tracing.dtos import Sharding
+from oss.src.dbs.postgres.tracing.dbes import SpanDBE
+from oss.src.dbs.postgres.tracing.utils import apply_sharding
+
+
+def compiled(stmt):
+    return stmt.compile(dialect=postgresql.dialect())
+
+
+class TestTracingSharding:
+    def test_shards_are_filtered_in_the_query(self):
+        # ARRANGE --------------------------------------------------------------
+        base = select(SpanDBE)
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        unsharded = apply_sharding(base, None)
+        single = apply_sharding(base, Sharding(shard=0, shards=1))
+        sharded = apply_sharding(base, Sharding(shard=2, shards=4))
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert str(compiled(unsharded)) == str(compiled(base))
+        assert str(compiled(single)) == str(compiled(base))
+
+        sql = str(compiled(sharded))
+
+        assert "left(cast(trace_id as varchar), 8)" in sql
+        assert sorted(compiled(sharded).params.values()) == [2, 4]
+        # ----------------------------------------------------------------------
+
+    def test_trace_shards_match_the_query_hash(self):
+        # ARRANGE --------------------------------------------------------------
+        trace_id = uuid4()
+        # ----------------------------------------------------------------------
+
+        # ACT ------------------------------------------------------------------
+        shard = get_trace_shard(str(trace_id), 7)
+        # ----------------------------------------------------------------------
+
+        # ASSERT ---------------------------------------------------------------
+        assert shard == int(str(trace_id)[:8], 16) % 7
+        assert shard == get_trace_shard(trace_id.hex, 7)
+        # ----------------------------------------------------------------------
@@ -1,5 +1,6 @@
 from typing import Optional
 from uuid import UUID
+from asyncio import to_thread
 
 from agenta.sdk.utils.client import authed_api
 from agenta.sdk.models.evaluations import EvaluationMetrics
@@ -18,7 +19,8 @@ async def arefresh(
         scenario_id=str(scenario_id) if scenario_id else None,
     )
 
-    response = authed_api()(
+    response = await to_thread(
+        authed_api(),
         method="POST",
         endpoint=f"/preview/evaluations/metrics/refresh",
         params=payload,
@@ -1,5 +1,6 @@
 from typing import Dict, List, Any, Union, Optional, Tuple
 from uuid import UUID
+from asyncio import Lock, Semaphore, gather
 from copy import deepcopy
 from datetime import datetime
 
@@ -43,9 +44,11 @@ from agenta.sdk.evaluations.runs import (
 )
 from agenta.sdk.evaluations.scenarios import (
     acreate as aadd_scenario,
+    acreate_many as aadd_scenarios,
 )
 from agenta.sdk.evaluations.results import (
     acreate as alog_result,
+    acreate_many as alog_results,
 )
 from agenta.sdk.evaluations.metrics import (
     arefresh as acompute_metrics,
@@ -61,6 +64,9 @@ from agenta.sdk.decorators.running import (
     invoke_evaluator,
 )
 
+DEFAULT_CONCURRENCY = 10  # testcases evaluated at a time, when batched
+BATCH_SIZE = 100  # scenarios or results per request, when batched
+
 
 class EvaluateSpecs(BaseModel):
     testsets: Optional[Target] = None
@@ -257,6 +263,170 @@ async def _retrieve_entities(
     return testset_revisions, application_revisions, evaluator_revisions
 
 
+def _make_application_request(
+    *,
+    testset_revision: TestsetRevision,
+    application_revision: ApplicationRevision,
+    testcase: Dict[str, Any],
+    inputs: Any,
+) -> ApplicationServiceRequest:
+    references = dict(
+        testset=Reference(
+            id=testset_revision.testset_id,
+        ),
+        testset_variant=Reference(
+            id=testset_revision.testset_variant_id,
+        ),
+        testset_revision=Reference(
+            id=testset_revision.id,
+            slug=testset_revision.slug,
+            version=testset_revision.version,
+        ),
+        application=Reference(
+            id=application_revision.application_id,
+        ),
+        application_variant=Reference(
+            id=application_revision.application_variant_id,
+        ),
+        application_revision=Reference(
+            id=application_revision.id,
+            slug=application_revision.slug,
+            version=application_revision.version,
+        ),
+    )
+    links = None
+
+    _revision = application_revision.model_dump(
+        mode="json",
+        exclude_none=True,
+    )
+    interface = WorkflowServiceInterface(
+        **(application_revision.data.model_dump() if application_revision.data else {})
+    )
+    configuration = WorkflowServiceConfiguration(
+        **(application_revision.data.model_dump() if application_revision.data else {})
+    )
+    parameters = application_revision.data.parameters
+
+    _trace = None
+    outputs = None
+
+    workflow_service_request_data = WorkflowServiceRequestData(
+        revision=_revision,
+        parameters=parameters,
+        #
+        testcase=testcase,
+        inputs=inputs,
+        #
+        trace=_trace,
+        outputs=outputs,
+    )
+
+    return ApplicationServiceRequest(
+        interface=interface,
+        configuration=configuration,
+        #
+        data=workflow_service_request_data,
+        #
+        references=references,  # type: ignore
+        links=links,  # type: ignore
+    )
+
+
+def _make_evaluator_request(
+    *,
+    testset_revision: TestsetRevision,
+    evaluator_revision: EvaluatorRevision,
+    application_response: Any,
+    testcase: Dict[str, Any],
+    inputs: Any,
+    trace: Optional[Dict[str, Any]],
+    outputs: Any,
+) -> EvaluatorServiceRequest:
+    references = dict(
+        testset=Reference(
+            id=testset_revision.testset_id,
+        ),
+        testset_variant=Reference(
+            id=testset_revision.testset_variant_id,
+        ),
+        testset_revision=Reference(
+            id=testset_revision.id,
+            slug=testset_revision.slug,
+            version=testset_revision.version,
+        ),
+        evaluator=Reference(
+            id=evaluator_revision.evaluator_id,
+        ),
+        evaluator_variant=Reference(
+            id=evaluator_revision.evaluator_variant_id,
+        ),
+        evaluator_revision=Reference(
+            id=evaluator_revision.id,
+            slug=evaluator_revision.slug,
+            version=evaluator_revision.version,
+        ),
+    )
+    links = (
+        dict(
+            invocation=Link(
+                trace_id=application_response.trace_id,
+                span_id=application_response.span_id,
+            )
+        )
+        if application_response.trace_id and application_response.span_id
+        else None
+    )
+
+    _revision = evaluator_revision.model_dump(
+        mode="json",
+        exclude_none=True,
+    )
+    interface = WorkflowServiceInterface(
+        **(evaluator_revision.data.model_dump() if evaluator_revision.data else {})
+    )
+    configuration = WorkflowServiceConfiguration(
+        **(evaluator_revision.data.model_dump() if evaluator_revision.data else {})
+    )
+    parameters = evaluator_revision.data.parameters
+
+    workflow_service_request_data = WorkflowServiceRequestData(
+        revision=_revision,
+        parameters=parameters,
+        #
+        testcase=testcase,
+        inputs=inputs,
+        #
+        trace=trace,
+        outputs=outputs,
+    )
+
+    return EvaluatorServiceRequest(
+        version="2025.07.14",
+        #
+        interface=interface,
+        configuration=configuration,
+        #
+        data=workflow_service_request_data,
+        #
+        references=references,  # type: ignore
+        links=links,  # type: ignore
+    )
+
+
+def _get_trace_data(
+    trace: Dict[str, Any],
+) -> Tuple[Any, Any]:
+    root_span = list(trace.get("spans", {}).values())[0]
+    trace_attributes: dict = root_span.get("attributes", {})
+    trace_attributes_ag: dict = trace_attributes.get("ag", {})
+    trace_attributes_ag_data: dict = trace_attributes_ag.get("data", {})
+    outputs = trace_attributes_ag_data.get("outputs")
+    inputs = trace_attributes_ag_data.get("inputs")
+
+    return outputs, inputs
+
+
 def _timestamp_suffix():
     suffix = datetime.now().strftime("%y-%m-%d · %H:%M")
     return f" [{suffix}]"
@@ -273,6 +443,281 @@ UNICODE = {
 }
 
 
+async def _aevaluate_batched(
+    *,
+    run_id: UUID,
+    testset_revision: TestsetRevision,
+    application_revisions: Dict[UUID, ApplicationRevision],
+    evaluator_revisions: Dict[UUID, EvaluatorRevision],
+    #
+    concurrency: int,
+) -> List[Dict[str, Any]]:
+    """
+    Evaluate the testcases of a testset, up to `concurrency` at a time, and
+    create their scenarios and results in bulk, `BATCH_SIZE` per request.
+
+    Results are created as testcases complete, and a testcase that fails is
+    reported and skipped, keeping the results of its completed steps.
+    """
+
+    testcases = testset_revision.data.testcases  # type: ignore
+
+    scenarios = list()
+
+    for i in range(0, len(testcases), BATCH_SIZE):
+        scenarios += await aadd_scenarios(
+            run_id=run_id,
+            count=len(testcases[i : i + BATCH_SIZE]),
+        )
+
+    semaphore = Semaphore(max(1, concurrency))
+
+    # (slug, kind, result) of each step of a scenario, logged as they complete
+    Steps = List[Tuple[str, str, Dict[str, Any]]]
+
+    # (slug, kind, logged result) of each step of each scenario
+    scenarios_results: List[List[Tuple[str, str, Any]]] = [list() for _ in scenarios]
+
+    # (scenario index, step) of the steps not logged yet
+    pending: List[Tuple[int, Tuple[str, str, Dict[str, Any]]]] = list()
+    flushing = Lock()
+
+    async def flush(final: bool = False) -> None:
+        async with flushing:
+            while len(pending) >= BATCH_SIZE or (final and pending):
+                batch = pending[:BATCH_SIZE]
+                del pending[:BATCH_SIZE]
+
+                try:
+                    results = await alog_results(
+                        results=[result for _, (_, _, result) in batch],
+                    )
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    print(f"Failed to log {len(batch)} results: {e}")
+                    continue
+
+                for (idx, (slug, kind, _)), result in zip(batch, results):
+                    scenarios_results[idx].append((slug, kind, result))
+
+    async def evaluate_testcase(testcase, scenario, steps: Steps) -> None:
+        steps.append(
+            (
+                testset_revision.slug,  # type: ignore
+                "testcase",
+                dict(
+                    run_id=run_id,
+                    scenario_id=scenario.id,
+                    step_key="testset-" + testset_revision.slug,  # type: ignore
+                    testcase_id=testcase.id,
+                ),
+            )
+        )
+
+        _testcase = testcase.model_dump(
+            mode="json",
+            exclude_none=True,
+        )  # type: ignore
+        inputs = testcase.data
+        if isinstance(inputs, dict):
+            if "testcase_dedup_id" in inputs:
+                del inputs["testcase_dedup_id"]
+
+        async with semaphore:
+            for application_revision in application_revisions.values():
+                if not application_revision or not application_revision.data:
+                    print("Missing or invalid application revision")
+                    continue
+
+                application_response = await invoke_application(
+                    request=_make_application_request(
+                        testset_revision=testset_revision,
+                        application_revision=application_revision,
+                        testcase=_testcase,
+                        inputs=inputs,
+                    ),
+                )
+
+                if (
+                    not application_response
+                    or not application_response.data
+                    or not application_response.trace_id
+                ):
+                    print("Missing or invalid application response")
+                    continue
+
+                if not application_revision.id or not application_revision.name:
+                    print("Missing application revision ID or name")
+                    continue
+
+                application_slug = get_slug_from_name_and_id(
+                    name=application_revision.name,
+                    id=application_revision.id,
+                )
+
+                steps.append(
+                    (
+                        application_slug,
+                        "invocation",
+                        dict(
+                            run_id=run_id,
+                            scenario_id=scenario.id,
+                            step_key="application-" + application_slug,
+                            trace_id=application_response.trace_id,
+                        ),
+                    )
+                )
+
+                trace = await fetch_trace_data(
+                    application_response.trace_id,
+                    max_retries=30,
+                    delay=1.0,
+                )
+
+                if not trace:
+                    print("Failed to fetch trace data for application")
+                    continue
+
+                outputs, trace_inputs = _get_trace_data(trace)
+                inputs = inputs or trace_inputs
+
+                for evaluator_revision in evaluator_revisions.values():
+                    if not evaluator_revision or not evaluator_revision.data:
+                        print("Missing or invalid evaluator revision")
+                        continue
+
+                    evaluator_response = await invoke_evaluator(
+                        request=_make_evaluator_request(
+                            testset_revision=testset_revision,
+                            evaluator_revision=evaluator_revision,
+                            application_response=application_response,
+                            testcase=_testcase,
+                            inputs=inputs,
+                            trace=trace,
+                            outputs=outputs,
+                        ),
+                        #
+                        annotate=True,
+                    )
+
+                    if (
+                        not evaluator_response
+                        or not evaluator_response.data
+                        or not evaluator_response.trace_id
+                    ):
+                        print("Missing or invalid evaluator response")
+                        continue
+
+                    steps.append(
+                        (
+                            evaluator_revision.slug,  # type: ignore
+                            "annotation",
+                            dict(
+                                run_id=run_id,
+                                scenario_id=scenario.id,
+                                step_key="evaluator-" + evaluator_revision.slug,  # type: ignore
+                                trace_id=evaluator_response.trace_id,
+                            ),
+                        )
+                    )
+
+                    # metrics are computed from the traces, once ingested
+                    if not await fetch_trace_data(
+                        evaluator_response.trace_id,
+                        max_retries=20,
+                        delay=1.0,
+                    ):
+                        print("Failed to fetch trace data for evaluator")
+
+    async def evaluate_and_log(idx, testcase, scenario) -> None:
+        steps: Steps = list()
+
+        try:
+            await evaluate_testcase(testcase, scenario, steps)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            print(f"Failed to evaluate testcase {str(testcase.id)}: {e}")
+
+        pending.extend((idx, step) for step in steps)
+
+        await flush()
+
+    await gather(
+        *(
+            evaluate_and_log(idx, testcase, scenario)
+            for idx, (testcase, scenario) in enumerate(zip(testcases, scenarios))
+        )
+    )
+
+    await flush(final=True)
+
+    async def refresh_metrics(scenario):
+        async with semaphore:
+            return await acompute_metrics(
+                run_id=run_id,
+                scenario_id=scenario.id,
+            )
+
+    scenarios_metrics = await gather(
+        *(refresh_metrics(scenario) for scenario in scenarios)
+    )
+
+    evaluated = list()
+
+    for testcase_idx, (testcase, scenario, results, metrics) in enumerate(
+        zip(testcases, scenarios, scenarios_results, scenarios_metrics)
+    ):
+        is_last = testcase_idx == len(testcases) - 1
+
+        print(
+            f"{UNICODE['pipe']}"
+            f"{UNICODE['last' if is_last else 'next']}"
+            f"{UNICODE['here']}"
+            f"{UNICODE['skip']}"
+            f"{UNICODE['skip']}"
+            f"testcase_id={str(testcase.id)}",
+        )
+        print(
+            f"{UNICODE['pipe']}"
+            f"{UNICODE['skip' if is_last else 'pipe']}"
+            f"{UNICODE['next']}"
+            f"{UNICODE['here']}"
+            f"{UNICODE['skip']}"
+            f"scenario_id={str(scenario.id)}",
+        )
+
+        scenario_results = dict()
+
+        for slug, kind, result in results:
+            print(
+                f"{UNICODE['pipe']}"
+                f"{UNICODE['skip' if is_last else 'pipe']}"
+                f"{UNICODE['pipe']}"
+                f"{UNICODE['next']}"
+                f"{UNICODE['here']}"
+                f"  result_id={str(result.id)} ({kind})",
+            )
+
+            scenario_results[slug] = result
+
+        print(
+            f"{UNICODE['pipe']}"
+            f"{UNICODE['skip' if is_last else 'pipe']}"
+            f"{UNICODE['last']}"
+            f"{UNICODE['here']}"
+            f"{UNICODE['skip']}"
+            f" metrics_id={str(metrics.id)}",
+        )
+
+        evaluated.append(
+            {
+                "scenario": scenario,
+                "results": scenario_results,
+                "metrics": metrics,
+            },
+        )
+
+    return evaluated
+
+
 # @debug
 async def aevaluate(
     *,
@@ -286,7 +731,19 @@ async def aevaluate(
     repeats: Optional[int] = None,
     #
     specs: Optional[Union[EvaluateSpecs, Dict[str, Any]]] = None,
+    #
+    batched: bool = False,
+    concurrency: Optional[int] = None,
 ):
+    """
+    Evaluate applications with evaluators on testsets, as an evaluation run.
+
+    By default, testcases are evaluated one after the other, and each scenario
+    and result is created as it comes. With `batched=True`, up to `concurrency`
+    testcases are evaluated at a time, and scenarios and results are created in
+    bulk, which is much faster on large testsets.
+    """
+
     simple_evaluation_data = await _parse_evaluate_kwargs(
         testsets=testsets,
         applications=applications,
@@ -362,179 +819,57 @@ async def aevaluate(
             f" testset_id={str(testset_revision.testset_id)}",
         )
 
-        for testcase_idx, testcase in enumerate(testcases):
-            print(
-                f"{UNICODE['pipe']}"
-                f"{UNICODE['pipe']}"
-                f"{UNICODE['skip']}"
-                f"{UNICODE['skip']}"
-                f"{UNICODE['skip']}"
-                "-----------------------"
-                "--------------------------------------"
-            )
-
-            print(
-                f"{UNICODE['pipe']}"
-                f"{UNICODE['next' if testcase_idx < len(testcases) - 1 else 'last']}"
-                f"{UNICODE['here']}"
-                f"{UNICODE['skip']}"
-                f"{UNICODE['skip']}"
-                f"testcase_id={str(testcase.id)}",
-            )
-
-            scenario = await aadd_scenario(
+        if batched:
+            scenarios += await _aevaluate_batched(
                 run_id=run.id,
+                testset_revision=testset_revision,
+                application_revisions=application_revisions,
+                evaluator_revisions=evaluator_revisions,
+                #
+                concurrency=concurrency or DEFAULT_CONCURRENCY,
             )
 
-            print(
-                f"{UNICODE['pipe']}"
-                f"{UNICODE['pipe' if testcase_idx < len(testcases) - 1 else 'skip']}"
-                f"{UNICODE['next']}"
-                f"{UNICODE['here']}"
-                f"{UNICODE['skip']}"
-                f"scenario_id={str(scenario.id)}",
-            )
-
-            results = dict()
-
-            result = await alog_result(
-                run_id=run.id,
-                scenario_id=scenario.id,
-                step_key="testset-" + testset_revision.slug,  # type: ignore
-                testcase_id=testcase.id,
-            )
-
-            print(
-                f"{UNICODE['pipe']}"
-                f"{UNICODE['pipe' if testcase_idx < len(testcases) - 1 else 'skip']}"
-                f"{UNICODE['pipe']}"
-                f"{UNICODE['next']}"
-                f"{UNICODE['here']}"
-                f"  result_id={str(result.id)} (testcase)",
-            )
-
-            results[testset_revision.slug] = result
-
-            _testcase = testcase.model_dump(
-                mode="json",
-                exclude_none=True,
-            )  # type: ignore
-            inputs = testcase.data
-            if isinstance(inputs, dict):
-                if "testcase_dedup_id" in inputs:
-                    del inputs["testcase_dedup_id"]
-
-            for application_revision in application_revisions.values():
-                if not application_revision or not application_revision.data:
-                    print("Missing or invalid application revision")
-                    if application_revision:
-                        print(application_revision.model_dump(exclude_none=True))
-                    continue
-
-                # print(f"  Application   {application_revision.model_dump(exclude_none=True)}")  # type: ignore
-
-                references = dict(
-                    testset=Reference(
-                        id=testset_revision.testset_id,
-                    ),
-                    testset_variant=Reference(
-                        id=testset_revision.testset_variant_id,
-                    ),
-                    testset_revision=Reference(
-                        id=testset_revision.id,
-                        slug=testset_revision.slug,
-                        version=testset_revision.version,
-                    ),
-                    application=Reference(
-                        id=application_revision.application_id,
-                    ),
-                    application_variant=Reference(
-                        id=application_revision.application_variant_id,
-                    ),
-                    application_revision=Reference(
-                        id=application_revision.id,
-                        slug=application_revision.slug,
-                        version=application_revision.version,
-                    ),
-                )
-                links = None
-
-                _revision = application_revision.model_dump(
-                    mode="json",
-                    exclude_none=True,
-                )
-                interface = WorkflowServiceInterface(
-                    **(
-                        application_revision.data.model_dump()
-                        if application_revision.data
-                        else {}
-                    )
-                )
-                configuration = WorkflowServiceConfiguration(
-                    **(
-                        application_revision.data.model_dump()
-                        if application_revision.data
-                        else {}
-                    )
-                )
-                parameters = application_revision.data.parameters
-
-                _trace = None
-                outputs = None
-
-                workflow_service_request_data = WorkflowServiceRequestData(
-                    revision=_revision,
-                    parameters=parameters,
-                    #
-                    testcase=_testcase,
-                    inputs=inputs,
-                    #
-                    trace=_trace,
-                    outputs=outputs,
+        else:
+            for testcase_idx, testcase in enumerate(testcases):
+                print(
+                    f"{UNICODE['pipe']}"
+                    f"{UNICODE['pipe']}"
+                    f"{UNICODE['skip']}"
+                    f"{UNICODE['skip']}"
+                    f"{UNICODE['skip']}"
+                    "-----------------------"
+                    "--------------------------------------"
                 )
 
-                application_request = ApplicationServiceRequest(
-                    interface=interface,
-                    configuration=configuration,
-                    #
-                    data=workflow_service_request_data,
-                    #
-                    references=references,  # type: ignore
-                    links=links,  # type: ignore
+                print(
+                    f"{UNICODE['pipe']}"
+                    f"{UNICODE['next' if testcase_idx < len(testcases) - 1 else 'last']}"
+                    f"{UNICODE['here']}"
+                    f"{UNICODE['skip']}"
+                    f"{UNICODE['skip']}"
+                    f"testcase_id={str(testcase.id)}",
                 )
 
-                application_response = await invoke_application(
-                    request=application_request,
+                scenario = await aadd_scenario(
+                    run_id=run.id,
                 )
 
-                if (
-                    not application_response
-                    or not application_response.data
-                    or not application_response.trace_id
-                ):
-                    print("Missing or invalid application response")
-                    if application_response:
-                        print(application_response.model_dump(exclude_none=True))
-                    continue
-
-                trace_id = application_response.trace_id
-
-                if not application_revision.id or not application_revision.name:
-                    print("Missing application revision ID or name")
-                    continue
-
-                application_slug = get_slug_from_name_and_id(
-                    name=application_revision.name,
-                    id=application_revision.id,
+                print(
+                    f"{UNICODE['pipe']}"
+                    f"{UNICODE['pipe' if testcase_idx < len(testcases) - 1 else 'skip']}"
+                    f"{UNICODE['next']}"
+                    f"{UNICODE['here']}"
+                    f"{UNICODE['skip']}"
+                    f"scenario_id={str(scenario.id)}",
                 )
 
-                trace = fetch_trace_data(trace_id, max_retries=30, delay=1.0)
+                results = dict()
 
                 result = await alog_result(
                     run_id=run.id,
                     scenario_id=scenario.id,
-                    step_key="application-" + application_slug,  # type: ignore
-                    trace_id=trace_id,
+                    step_key="testset-" + testset_revision.slug,  # type: ignore
+                    testcase_id=testcase.id,
                 )
 
                 print(
@@ -543,134 +878,67 @@ async def aevaluate(
                     f"{UNICODE['pipe']}"
                     f"{UNICODE['next']}"
                     f"{UNICODE['here']}"
-                    f"  result_id={str(result.id)} (invocation)",
+                    f"  result_id={str(result.id)} (testcase)",
                 )
 
-                results[application_slug] = result
-
-                trace = await trace
+                results[testset_revision.slug] = result
 
-                if not trace:
-                    print("Failed to fetch trace data for application")
-                    continue
-
-                root_span = list(trace.get("spans", {}).values())[0]
-                trace_attributes: dict = root_span.get("attributes", {})
-                trace_attributes_ag: dict = trace_attributes.get("ag", {})
-                trace_attributes_ag_data: dict = trace_attributes_ag.get("data", {})
-                outputs = trace_attributes_ag_data.get("outputs")
-                inputs = inputs or trace_attributes_ag_data.get("inputs")
-
-                for i, evaluator_revision in enumerate(evaluator_revisions.values()):
-                    if not evaluator_revision or not evaluator_revision.data:
-                        print("Missing or invalid evaluator revision")
-                        if evaluator_revision:
-                            print(evaluator_revision.model_dump(exclude_none=True))
+                _testcase = testcase.model_dump(
+                    mode="json",
+                    exclude_none=True,
+                )  # type: ignore
+                inputs = testcase.data
+                if isinstance(inputs, dict):
+                    if "testcase_dedup_id" in inputs:
+                        del inputs["testcase_dedup_id"]
+
+                for application_revision in application_revisions.values():
+                    if not application_revision or not application_revision.data:
+                        print("Missing or invalid application revision")
+                        if application_revision:
+                            print(application_revision.model_dump(exclude_none=True))
                         continue
 
-                    references = dict(
-                        testset=Reference(
-                            id=testset_revision.testset_id,
-                        ),
-                        testset_variant=Reference(
-                            id=testset_revision.testset_variant_id,
-                        ),
-                        testset_revision=Reference(
-                            id=testset_revision.id,
-                            slug=testset_revision.slug,
-                            version=testset_revision.version,
-                        ),
-                        evaluator=Reference(
-                            id=evaluator_revision.evaluator_id,
-                        ),
-                        evaluator_variant=Reference(
-                            id=evaluator_revision.evaluator_variant_id,
-                        ),
-                        evaluator_revision=Reference(
-                            id=evaluator_revision.id,
-                            slug=evaluator_revision.slug,
-                            version=evaluator_revision.version,
-                        ),
-                    )
-                    links = (
-                        dict(
-                            invocation=Link(
-                                trace_id=application_response.trace_id,
-                                span_id=application_response.span_id,
-                            )
-                        )
-                        if application_response.trace_id
-                        and application_response.span_id
-                        else None
-                    )
-
-                    _revision = evaluator_revision.model_dump(
-                        mode="json",
-                        exclude_none=True,
-                    )
-                    interface = WorkflowServiceInterface(
-                        **(
-                            evaluator_revision.data.model_dump()
-                            if evaluator_revision.data
-                            else {}
-                        )
-                    )
-                    configuration = WorkflowServiceConfiguration(
-                        **(
-                            evaluator_revision.data.model_dump()
-                            if evaluator_revision.data
-                            else {}
-                        )
-                    )
-                    parameters = evaluator_revision.data.parameters
+                    # print(f"  Application   {application_revision.model_dump(exclude_none=True)}")  # type: ignore
 
-                    workflow_service_request_data = WorkflowServiceRequestData(
-                        revision=_revision,
-                        parameters=parameters,
-                        #
+                    application_request = _make_application_request(
+                        testset_revision=testset_revision,
+                        application_revision=application_revision,
                         testcase=_testcase,
                         inputs=inputs,
-                        #
-                        trace=trace,
-                        outputs=outputs,
-                    )
-
-                    evaluator_request = EvaluatorServiceRequest(
-                        version="2025.07.14",
-                        #
-                        interface=interface,
-                        configuration=configuration,
-                        #
-                        data=workflow_service_request_data,
-                        #
-                        references=references,  # type: ignore
-                        links=links,  # type: ignore
                     )
 
-                    evaluator_response = await invoke_evaluator(
-                        request=evaluator_request,
-                        #
-                        annotate=True,
+                    application_response = await invoke_application(
+                        request=application_request,
                     )
 
                     if (
-                        not evaluator_response
-                        or not evaluator_response.data
-                        or not evaluator_response.trace_id
+                        not application_response
+                        or not application_response.data
+                        or not application_response.trace_id
                     ):
-                        print("Missing or invalid evaluator response")
-                        if evaluator_response:
-                            print(evaluator_response.model_dump(exclude_none=True))
+                        print("Missing or invalid application response")
+                        if application_response:
+                            print(application_response.model_dump(exclude_none=True))
                         continue
 
-                    trace_id = evaluator_response.trace_id
+                    trace_id = application_response.trace_id
+
+                    if not application_revision.id or not application_revision.name:
+                        print("Missing application revision ID or name")
+                        continue
+
+                    application_slug = get_slug_from_name_and_id(
+                        name=application_revision.name,
+                        id=application_revision.id,
+                    )
 
-                    trace = fetch_trace_data(trace_id, max_retries=20, delay=1.0)
+                    trace = fetch_trace_data(trace_id, max_retries=30, delay=1.0)
 
                     result = await alog_result(
                         run_id=run.id,
                         scenario_id=scenario.id,
-                        step_key="evaluator-" + evaluator_revision.slug,  # type: ignore
+                        step_key="application-" + application_slug,  # type: ignore
                         trace_id=trace_id,
                     )
 
@@ -678,40 +946,106 @@ async def aevaluate(
                         f"{UNICODE['pipe']}"
                         f"{UNICODE['pipe' if testcase_idx < len(testcases) - 1 else 'skip']}"
                         f"{UNICODE['pipe']}"
-                        f"{UNICODE['last' if (i == len(evaluator_revisions) - 1) else 'next']}"
+                        f"{UNICODE['next']}"
                         f"{UNICODE['here']}"
-                        f"  result_id={str(result.id)} (annotation)",
+                        f"  result_id={str(result.id)} (invocation)",
                     )
 
-                    results[evaluator_revision.slug] = result
+                    results[application_slug] = result
 
                     trace = await trace
 
                     if not trace:
-                        print("Failed to fetch trace data for evaluator")
+                        print("Failed to fetch trace data for application")
                         continue
 
-            metrics = await acompute_metrics(
-                run_id=run.id,
-                scenario_id=scenario.id,
-            )
+                    outputs, trace_inputs = _get_trace_data(trace)
+                    inputs = inputs or trace_inputs
 
-            print(
-                f"{UNICODE['pipe']}"
-                f"{UNICODE['pipe' if testcase_idx < len(testcases) - 1 else 'skip']}"
-                f"{UNICODE['last']}"
-                f"{UNICODE['here']}"
-                f"{UNICODE['skip']}"
-                f" metrics_id={str(metrics.id)}",
-            )
+                    for i, evaluator_revision in enumerate(
+                        evaluator_revisions.values()
+                    ):
+                        if not evaluator_revision or not evaluator_revision.data:
+                            print("Missing or invalid evaluator revision")
+                            if evaluator_revision:
+                                print(evaluator_revision.model_dump(exclude_none=True))
+                            continue
+
+                        evaluator_request = _make_evaluator_request(
+                            testset_revision=testset_revision,
+                            evaluator_revision=evaluator_revision,
+                            application_response=application_response,
+                            testcase=_testcase,
+                            inputs=inputs,
+                            trace=trace,
+                            outputs=outputs,
+                        )
 
-            scenarios.append(
-                {
-                    "scenario": scenario,
-                    "results": results,
-                    "metrics": metrics,
-                },
-            )
+                        evaluator_response = await invoke_evaluator(
+                            request=evaluator_request,
+                            #
+                            annotate=True,
+                        )
+
+                        if (
+                            not evaluator_response
+                            or not evaluator_response.data
+                            or not evaluator_response.trace_id
+                        ):
+                            print("Missing or invalid evaluator response")
+                            if evaluator_response:
+                                print(evaluator_response.model_dump(exclude_none=True))
+                            continue
+
+                        trace_id = evaluator_response.trace_id
+
+                        trace = fetch_trace_data(trace_id, max_retries=20, delay=1.0)
+
+                        result = await alog_result(
+                            run_id=run.id,
+                            scenario_id=scenario.id,
+                            step_key="evaluator-" + evaluator_revision.slug,  # type: ignore
+                            trace_id=trace_id,
+                        )
+
+                        print(
+                            f"{UNICODE['pipe']}"
+                            f"{UNICODE['pipe' if testcase_idx < len(testcases) - 1 else 'skip']}"
+                            f"{UNICODE['pipe']}"
+                            f"{UNICODE['last' if (i == len(evaluator_revisions) - 1) else 'next']}"
+                            f"{UNICODE['here']}"
+                            f"  result_id={str(result.id)} (annotation)",
+                        )
+
+                        results[evaluator_revision.slug] = result
+
+                        trace = await trace
+
+                        if not trace:
+                            print("Failed to fetch trace data for evaluator")
+                            continue
+
+                metrics = await acompute_metrics(
+                    run_id=run.id,
+                    scenario_id=scenario.id,
+                )
+
+                print(
+                    f"{UNICODE['pipe']}"
+                    f"{UNICODE['pipe' if testcase_idx < len(testcases) - 1 else 'skip']}"
+                    f"{UNICODE['last']}"
+                    f"{UNICODE['here']}"
+                    f"{UNICODE['skip']}"
+                    f" metrics_id={str(metrics.id)}",
+                )
+
+                scenarios.append(
+                    {
+                        "scenario": scenario,
+                        "results": results,
+                        "metrics": metrics,
+                    },
+                )
 
         print(
             f"{UNICODE['pipe']}"
@@ -712,8 +712,10 @@ async def fetch_trace_data(
     """
     for attempt in range(max_retries):
         try:
-            response = authed_api()(
-                method="GET", endpoint=f"/preview/tracing/traces/{trace_id}"
+            response = await asyncio.to_thread(
+                authed_api(),
+                method="GET",
+                endpoint=f"/preview/tracing/traces/{trace_id}",
             )
             response.raise_for_status()
             trace_data = response.json()
@@ -1,5 +1,6 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
+from asyncio import to_thread
 
 from agenta.sdk.utils.client import authed_api
 from agenta.sdk.models.evaluations import EvaluationResult
@@ -7,6 +8,43 @@ from agenta.sdk.models.evaluations import EvaluationResult
 # TODO: ADD TYPES
 
 
+def _make_result(
+    *,
+    run_id: UUID,
+    scenario_id: UUID,
+    step_key: str,
+    # repeat_idx: str,
+    # timestamp: datetime,
+    # interval: float,
+    #
+    testcase_id: Optional[UUID] = None,
+    trace_id: Optional[str] = None,
+    error: Optional[dict] = None,
+    #
+    flags: Optional[Dict[str, Any]] = None,
+    tags: Optional[Dict[str, Any]] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    return dict(
+        flags=flags,
+        tags=tags,
+        meta=meta,
+        #
+        testcase_id=str(testcase_id) if testcase_id else None,
+        trace_id=trace_id,
+        error=error,
+        #
+        # interval=interval,
+        # timestamp=timestamp,
+        # repeat_idx=repeat_idx,
+        step_key=step_key,
+        run_id=str(run_id),
+        scenario_id=str(scenario_id),
+        #
+        status="success",
+    )
+
+
 async def acreate(
     *,
     run_id: UUID,
@@ -26,23 +64,18 @@ async def acreate(
 ) -> EvaluationResult:
     payload = dict(
         results=[
-            dict(
-                flags=flags,
-                tags=tags,
-                meta=meta,
+            _make_result(
+                run_id=run_id,
+                scenario_id=scenario_id,
+                step_key=step_key,
                 #
-                testcase_id=str(testcase_id) if testcase_id else None,
+                testcase_id=testcase_id,
                 trace_id=trace_id,
                 error=error,
                 #
-                # interval=interval,
-                # timestamp=timestamp,
-                # repeat_idx=repeat_idx,
-                step_key=step_key,
-                run_id=str(run_id),
-                scenario_id=str(scenario_id),
-                #
-                status="success",
+                flags=flags,
+                tags=tags,
+                meta=meta,
             )
         ]
     )
@@ -64,3 +97,34 @@ async def acreate(
     result = EvaluationResult(**response["results"][0])
 
     return result
+
+
+async def acreate_many(
+    *,
+    results: List[Dict[str, Any]],
+) -> List[EvaluationResult]:
+    """Create many results in one request, each given as the arguments of `acreate()`."""
+
+    if not results:
+        return []
+
+    payload = dict(
+        results=[_make_result(**result) for result in results],
+    )
+
+    response = await to_thread(
+        authed_api(),
+        method="POST",
+        endpoint="/preview/evaluations/results/",
+        json=payload,
+    )
+
+    try:
+        response.raise_for_status()
+    except:
+        print(response.text)
+        raise
+
+    response = response.json()
+
+    return [EvaluationResult(**result) for result in response["results"]]
@@ -1,5 +1,6 @@
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from uuid import UUID
+from asyncio import to_thread
 
 from agenta.sdk.utils.client import authed_api
 from agenta.sdk.models.evaluations import EvaluationScenario
@@ -46,3 +47,50 @@ async def acreate(
     scenario = EvaluationScenario(**response["scenarios"][0])
 
     return scenario
+
+
+async def acreate_many(
+    *,
+    run_id: UUID,
+    count: int,
+    #
+    flags: Optional[Dict[str, Any]] = None,
+    tags: Optional[Dict[str, Any]] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> List[EvaluationScenario]:
+    """Create `count` scenarios in one request."""
+
+    if count <= 0:
+        return []
+
+    payload = dict(
+        scenarios=[
+            dict(
+                flags=flags,
+                tags=tags,
+                meta=meta,
+                #
+                run_id=str(run_id),
+                #
+                status="success",
+            )
+            for _ in range(count)
+        ]
+    )
+
+    response = await to_thread(
+        authed_api(),
+        method="POST",
+        endpoint="/preview/evaluations/scenarios/",
+        json=payload,
+    )
+
+    try:
+        response.raise_for_status()
+    except:
+        print(response.text)
+        raise
+
+    response = response.json()
+
+    return [EvaluationScenario(**scenario) for scenario in response["scenarios"]]
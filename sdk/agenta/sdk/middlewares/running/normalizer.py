@@ -1,5 +1,6 @@
 # /agenta/sdk/middlewares/running/normalizer.py
 import inspect
+from asyncio import to_thread
 from typing import Any, Dict, Callable, Union
 from inspect import isawaitable, isasyncgen, isgenerator
 from traceback import format_exception
@@ -295,6 +296,17 @@ class NormalizerMiddleware:
 
         return error_response
 
+    @staticmethod
+    def _is_blocking(handler: Callable) -> bool:
+        # decorators (e.g. instrument) wrap generators in plain functions
+        function = inspect.unwrap(handler)
+
+        return inspect.isfunction(function) and not (
+            inspect.iscoroutinefunction(function)
+            or inspect.isasyncgenfunction(function)
+            or inspect.isgeneratorfunction(function)
+        )
+
     async def __call__(
         self,
         request: WorkflowServiceRequest,
@@ -309,7 +321,11 @@ class NormalizerMiddleware:
         kwargs = await self._normalize_request(request, handler)
 
         try:
-            response = handler(**kwargs)
+            # sync handlers run in a thread, not to block the event loop
+            if self._is_blocking(handler):
+                response = await to_thread(handler, **kwargs)
+            else:
+                response = handler(**kwargs)
 
             normalized = await self._normalize_response(response)
 
@@ -1,4 +1,5 @@
 from typing import List, Any, Optional, Any, Dict, Union
+from asyncio import to_thread
 from json import dumps, loads
 import traceback
 import json
@@ -703,7 +704,9 @@ async def auto_custom_code_run_v0(
 
     # --------------------------------------------------------------------------
     try:
-        _outputs = execute_code_safely(
+        # user code may block, it runs in a thread not to stall the event loop
+        _outputs = await to_thread(
+            execute_code_safely,
             app_params={},
             inputs=inputs,
             output=outputs,
@@ -0,0 +1,87 @@
+"""
+Tests for the NormalizerMiddleware of the running middlewares.
+
+Sync handlers, like most built-in evaluators, are run in a thread so that they
+do not block the event loop they are invoked from, which is shared by every
+other invocation (e.g. all the evaluations of an API worker). Async handlers and
+generators, instrumented or not, are still called on the loop.
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from agenta.sdk.contexts.running import RunningContext, running_context_manager
+from agenta.sdk.decorators.tracing import instrument
+from agenta.sdk.middlewares.running.normalizer import NormalizerMiddleware
+from agenta.sdk.models.workflows import (
+    WorkflowServiceRequest,
+    WorkflowServiceRequestData,
+)
+
+
+def sync_handler(inputs=None):
+    return {"thread": threading.get_ident()}
+
+
+async def async_handler(inputs=None):
+    return {"thread": threading.get_ident()}
+
+
+def sync_generator(inputs=None):
+    yield "a"
+
+
+async def async_generator(inputs=None):
+    yield "a"
+
+
+class TestNormalizerMiddleware:
+    def test_only_sync_functions_are_blocking(self):
+        is_blocking = NormalizerMiddleware._is_blocking
+
+        assert is_blocking(sync_handler) is True
+        assert is_blocking(instrument()(sync_handler)) is True
+
+        assert is_blocking(async_handler) is False
+        assert is_blocking(instrument()(async_handler)) is False
+        assert is_blocking(sync_generator) is False
+        assert is_blocking(instrument()(sync_generator)) is False
+        assert is_blocking(async_generator) is False
+        assert is_blocking(instrument()(async_generator)) is False
+
+    @pytest.mark.asyncio
+    async def test_sync_handlers_do_not_block_the_loop(self):
+        loop_thread = threading.get_ident()
+
+        request = WorkflowServiceRequest(data=WorkflowServiceRequestData(inputs={}))
+
+        async def invoke(handler):
+            with running_context_manager(RunningContext(handler=handler)):
+                return await NormalizerMiddleware()(request, None)
+
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        def slow_handler(inputs=None):
+            threading.Event().wait(0.2)  # blocking, e.g. user code
+
+            return {"thread": threading.get_ident()}
+
+        ticker = asyncio.create_task(tick())
+
+        sync_response = await invoke(slow_handler)
+        async_response = await invoke(async_handler)
+
+        ticker.cancel()
+
+        assert sync_response.data.outputs["thread"] != loop_thread
+        assert async_response.data.outputs["thread"] == loop_thread
+        assert ticks >= 10  # the loop kept running while the handler blocked